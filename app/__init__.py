@@ -10,6 +10,7 @@ from datetime import datetime
 import uuid
 import time
 from app.utils.shared import scheduled_bots
+from config import Config
 
 # 글로벌 객체들
 db = SQLAlchemy()
@@ -52,7 +53,9 @@ def create_app(enable_scheduler=True):
         app.logger.info('Application startup')
 
     # 스케줄러 초기화 (애플리케이션 컨텍스트에서 실행) - 옵션에 따라
-    if enable_scheduler:
+    # ENGINE_MODE=process이면 웹 프로세스에서는 실행하지 않고 engine_server.py 프로세스에서만 실행
+    from app.utils.engine_ipc import runs_trading
+    if enable_scheduler and runs_trading():
         with app.app_context():
             initialize_scheduler(app)
 
@@ -82,6 +85,13 @@ def initialize_scheduler(app):
         from app.models import TradingFavorite
         from app.routes import scheduled_trading_cycle, create_trading_bot_from_favorite
         from app.utils.logging_utils import invalidate_logger_cache
+        from app.utils.engine_shards import current_shard, owns_bot
+
+        # 샤드 프로세스는 코디네이터가 조회한 공유 시세 사용 (샤드 수만큼 시세 조회가 늘지 않도록)
+        if current_shard() is not None:
+            from app.utils.market_hub import use_market_hub
+            from app.utils.trading_engine import trading_engine
+            use_market_hub(trading_engine)
 
         if not scheduler_manager.is_started():
             scheduler_manager.start()
@@ -105,6 +115,44 @@ def initialize_scheduler(app):
             replace_existing=True
         )
 
+        # 변동성 돌파 일일 기준값: 09:00 일봉 리셋 직후 배치 계산, 일정 시간 후 일봉 수정 여부 확인
+        from app.utils.daily_levels import daily_levels, DAY_RESET_HOUR
+        scheduler_manager.scheduler.add_job(
+            func=daily_levels.refresh,
+            trigger=CronTrigger(hour=DAY_RESET_HOUR, minute=0, second=Config.DAILY_LEVELS_DELAY_SECONDS),
+            id='daily_levels_refresh',
+            replace_existing=True
+        )
+        scheduler_manager.scheduler.add_job(
+            func=daily_levels.verify,
+            trigger=CronTrigger(hour=DAY_RESET_HOUR, minute=Config.DAILY_LEVELS_VERIFY_MINUTES,
+                                second=Config.DAILY_LEVELS_DELAY_SECONDS),
+            id='daily_levels_verify',
+            replace_existing=True
+        )
+
+        # 변동성 기반 봇 실행 간격 조정 (복원/화면에서 시작한 봇 포함 모든 작업 대상)
+        if Config.CADENCE_ENABLED:
+            from app.utils.cadence_controller import cadence_controller
+            scheduler_manager.scheduler.add_job(
+                func=cadence_controller.update_all,
+                trigger='interval',
+                seconds=Config.CADENCE_UPDATE_SECONDS,
+                id='cadence_controller',
+                replace_existing=True
+            )
+
+        # API 호출 한도/사이클 지연 기반 부하 차단 단계 판단
+        if Config.LOAD_SHED_ENABLED:
+            from app.utils.load_shedder import load_shedder
+            scheduler_manager.scheduler.add_job(
+                func=load_shedder.evaluate,
+                trigger='interval',
+                seconds=Config.LOAD_SHED_CHECK_SECONDS,
+                id='load_shedder',
+                replace_existing=True
+            )
+
         # DB에서 trading_favorite 데이터 가져오기 (user_id, ticker 조합별로 최신 것만)
         favorites = TradingFavorite.query.order_by(TradingFavorite.updated_at.desc()).all()
 
@@ -119,6 +167,10 @@ def initialize_scheduler(app):
         restored_count = 0
 
         for favorite in favorites:
+            # 샤드 프로세스는 기본 배치가 이 샤드인 봇만 복원 (재배치된 봇은 코디네이터가 다시 시작)
+            if not owns_bot(favorite.user_id, favorite.ticker):
+                continue
+
             try:
                 # 봇 생성
                 bot, settings = create_trading_bot_from_favorite(favorite)
@@ -142,10 +194,14 @@ def initialize_scheduler(app):
                 success = scheduler_manager.add_trading_job(
                     job_id=job_id,
                     trading_func=trading_func,
-                    interval_seconds=favorite.sleep_time,
+                    interval_seconds=bot.config.sleep_time,
                     user_id=favorite.user_id,
                     ticker=favorite.ticker,
-                    strategy=favorite.strategy
+                    strategy=favorite.strategy,
+                    trigger_mode=bot.config.trigger_mode,
+                    candle_interval=bot.config.interval,
+                    exit_check_func=bot.exit_check,
+                    bot=bot
                 )
 
                 if success:
@@ -175,9 +231,11 @@ def initialize_scheduler(app):
 
             except Exception as e:
                 app.logger.error(f"즐겨찾기 복원 중 오류 ({favorite.name}): {e}")
-                
-            time.sleep(3) # 3초씩 여유를 두고 재실행
-            
+
+            # 복원한 봇들의 실행 시각은 위상 배정으로 분산되므로 봇마다 쉬지 않음
+            if not Config.PHASE_PLAN_ENABLED:
+                time.sleep(3)  # 3초씩 여유를 두고 재실행
+
         app.logger.info(f"총 {restored_count}개의 트레이딩 작업이 복원되었습니다.")
 
     except Exception as e:
@@ -185,4 +243,4 @@ def initialize_scheduler(app):
 
 
 # Gunicorn에서 직접 임포트할 수 있도록 앱 인스턴스 생성
-app = create_app()
\ No newline at end of file
+app = create_app(enable_scheduler=Config.ENABLE_SCHEDULER)
\ No newline at end of file
@@ -1,10 +1,59 @@
 import pyupbit
+from pyupbit.errors import UpbitBadRequestError, UpbitUnauthorizedError
+from pyupbit.request_api import _send_get_request, _send_post_request
 from app.utils.caching import cache_with_timeout, invalidate_cache
+from app.utils.market_data import candle_store, INTERVAL_MINUTES
+from app.utils.orderbook import orderbook_cache
+from app.utils.daily_levels import daily_levels
+from app.utils.position_ledger import position_ledgers, FEE_RATE
+from app.utils.order_queue import order_queues, new_order_identifier, OrderQueueTimeout
+from app.utils.scheduler_metrics import count_api_calls, timed_phase
+from app.utils.execution_lanes import execution_lanes, in_lane
+from app.utils.load_shedder import load_shedder
+from app.utils.fair_share import fair_share
 from app.models import User
 from config import Config
+import functools
 import time
 
 
+def ohlcv_to_candles(df):
+    """OHLCV DataFrame을 업비트 캔들 형식 딕셔너리 목록으로 변환 (최신 캔들이 먼저)"""
+    candles = []
+    for index, row in df.iterrows():
+        candle = {
+            'candle_date_time_kst': index.strftime('%Y-%m-%dT%H:%M:%S'),
+            'opening_price': float(row['open']),
+            'high_price': float(row['high']),
+            'low_price': float(row['low']),
+            'trade_price': float(row['close']),
+            'candle_acc_trade_volume': float(row['volume']),
+            'timestamp': int(index.timestamp() * 1000)
+        }
+        candles.append(candle)
+
+    # 최신 데이터가 먼저 오도록 역순 정렬
+    candles.reverse()
+    return candles
+
+
+ORDERS_URL = "https://api.upbit.com/v1/orders"
+ORDER_URL = "https://api.upbit.com/v1/order"
+
+
+def serialized_order(func):
+    """사용자별 주문 큐에서 차례대로 실행 (차례를 얻지 못하면 주문하지 않음)"""
+    @functools.wraps(func)
+    def wrapper(self, ticker, *args, **kwargs):
+        try:
+            with order_queues.turn(self.user_id):
+                return func(self, ticker, *args, **kwargs)
+        except OrderQueueTimeout as e:
+            self.logger.error(f"{ticker} 주문 취소: {e}")
+            return {"error": {"name": "order_queue_timeout", "message": str(e)}}
+    return wrapper
+
+
 class UpbitAPI:
     """업비트 API 래퍼 클래스"""
 
@@ -22,6 +71,10 @@ class UpbitAPI:
         self.logger = logger
         self.api_call_count = 0
         self.last_reset_time = 0
+        # 거래 사이클 선조회 스냅샷 {티커: CycleSnapshot} (app.utils.prefetch 참고)
+        self._snapshots = {}
+        # 사용자별 포지션 원장 (잔고/평균 매수가 조회를 계좌 조회 대조 주기로 대체)
+        self.ledger = position_ledgers.get(user_id) if Config.LEDGER_ENABLED else None
 
         # 사용자 정보 및 API 키 복호화
         self.user = User.query.get(user_id)
@@ -68,6 +121,25 @@ class UpbitAPI:
             self.api_call_count = 0
             self.last_reset_time = current_time
 
+    def activate_snapshot(self, snapshot):
+        """snapshot.ticker 시세 조회가 선조회 스냅샷을 사용하도록 설정
+
+        한 사용자의 API 객체를 여러 티커 봇이 공유하므로 티커별로 보관합니다.
+        (앙상블처럼 하위 전략을 다른 스레드에서 실행해도 같은 스냅샷을 사용)
+        """
+        self._snapshots[snapshot.ticker] = snapshot
+
+    def deactivate_snapshot(self, ticker):
+        """티커의 선조회 스냅샷 해제 후 반환"""
+        return self._snapshots.pop(ticker, None)
+
+    def _clear_snapshot(self, ticker):
+        """주문 후에는 같은 사이클이라도 시세를 다시 조회 (공유 호가 캐시 포함)"""
+        orderbook_cache.invalidate(ticker)
+        snapshot = self._snapshots.get(ticker)
+        if snapshot is not None:
+            snapshot.clear()
+
     def refresh_api_keys(self):
         """
         API 키 새로고침 (사용자가 키를 업데이트한 경우)
@@ -159,16 +231,28 @@ class UpbitAPI:
             else:
                 return False, f"API 키 검증 중 오류 발생: {str(e)}"
 
-    def fetch_data(self, fetch_func, max_retries=5, delay=0.5, backoff_factor=2):
-        """데이터 가져오기 - 지수 백오프 추가"""
-        result = self.async_handler.run_sync(
-            fetch_func,
-            max_retries=max_retries,
-            delay=delay,
-            logger=self.logger,
-            backoff_factor=backoff_factor
-        )
+    def fetch_data(self, fetch_func, max_retries=None, delay=None, backoff_factor=None):
+        """데이터 가져오기 - 지수 백오프 추가
+
+        호출 스레드에 실행 레인(app.utils.execution_lanes)이 지정되어 있으면 레인의 스레드 풀/호출 한도/재시도 정책을 사용합니다.
+        재시도 값을 지정하지 않으면 레인 정책 (레인이 없으면 5회, 0.5초, 2배).
+        """
+        lane = execution_lanes.current()
+        if lane is not None:
+            result = lane.run(fetch_func, logger=self.logger, max_retries=max_retries, delay=delay,
+                              backoff_factor=backoff_factor)
+        else:
+            result = self.async_handler.run_sync(
+                fetch_func,
+                max_retries=5 if max_retries is None else max_retries,
+                delay=0.5 if delay is None else delay,
+                logger=self.logger,
+                backoff_factor=2 if backoff_factor is None else backoff_factor
+            )
         self._log_api_call()
+        count_api_calls()
+        load_shedder.record_api_call()
+        fair_share.record_api_call(self.user_id)
         return result
 
     def validate_ticker(self, ticker):
@@ -218,6 +302,14 @@ class UpbitAPI:
 
     @cache_with_timeout(seconds=Config.CACHE_DURATION_PRICE)
     def get_current_price(self, ticker):
+        """현재 가격 조회 (사이클 선조회 스냅샷 우선)"""
+        snapshot = self._snapshots.get(ticker)
+        if snapshot is not None:
+            return snapshot.get_or_fetch('current_price', ticker, None, None,
+                                         lambda: self._fetch_current_price(ticker))
+        return self._fetch_current_price(ticker)
+
+    def _fetch_current_price(self, ticker):
         """현재 가격 조회 - 안전성 및 로깅 개선"""
         try:
             # 먼저 ticker 형식 검증
@@ -312,8 +404,42 @@ class UpbitAPI:
         except Exception as e:
             self.logger.debug(f"티커 제안 중 오류: {e}")
 
-    @cache_with_timeout(seconds=Config.CACHE_DURATION_BALANCE)
+    def _fetch_accounts(self):
+        """업비트 계좌 목록 조회 (원장 대조용, 현금과 모든 코인 잔고/평균 매수가를 한 번에)"""
+        return self.fetch_data(lambda: self.upbit.get_balances())
+
+    def _read_ledger(self):
+        """원장 조회 전 대조 시점이면 계좌 조회 후 스냅샷 저장 (원장 미사용/대조 전이면 None)"""
+        if self.ledger is None:
+            return None
+        synced_at = self.ledger.synced_at
+        self.ledger.ensure_fresh(self._fetch_accounts)
+        if self.ledger.synced_at != synced_at:
+            position_ledgers.save()
+        # 한 번도 대조에 성공하지 못한 원장은 잔고를 모르므로 직접 조회로 대체
+        return self.ledger if self.ledger.synced else None
+
+    def get_positions(self):
+        """보유 현금/포지션 원장 스냅샷 (원장 미사용 또는 대조 전이면 None)"""
+        ledger = self._read_ledger()
+        return ledger.snapshot() if ledger is not None else None
+
+    def get_accounts(self):
+        """계좌 목록 조회 (원장 사용 시 API 호출 없음, get_balances 형식)"""
+        ledger = self._read_ledger()
+        if ledger is not None:
+            return ledger.accounts()
+        return self._fetch_accounts()
+
     def get_balance_cash(self):
+        """현금 잔고 조회 (원장 사용 시 API 호출 없음)"""
+        ledger = self._read_ledger()
+        if ledger is not None:
+            return ledger.cash
+        return self._fetch_balance_cash()
+
+    @cache_with_timeout(seconds=Config.CACHE_DURATION_BALANCE)
+    def _fetch_balance_cash(self):
         """현금 잔고 조회 - 안전성 강화"""
         try:
             balance = self.fetch_data(lambda: self.upbit.get_balance("KRW"))
@@ -342,20 +468,47 @@ class UpbitAPI:
             self.logger.error(f"현금 보유량 조회 중 오류 (사용자: {self.user_id}): {str(e)}")
             return 0.0
 
-    @cache_with_timeout(seconds=Config.CACHE_DURATION_BALANCE)
     def get_balance_coin(self, ticker):
-        """코인 잔고 조회"""
+        """코인 잔고 조회 (원장 사용 시 API 호출 없음)"""
+        ledger = self._read_ledger()
+        if ledger is not None:
+            return ledger.get_quantity(ticker)
+        return self._fetch_balance_coin(ticker)
+
+    @cache_with_timeout(seconds=Config.CACHE_DURATION_BALANCE)
+    def _fetch_balance_coin(self, ticker):
         balance = self.fetch_data(lambda: self.upbit.get_balance(ticker))
         self.logger.debug(f"{ticker} 보유량: {balance}")
         return balance
 
-    @cache_with_timeout(seconds=Config.CACHE_DURATION_PRICE_AVG)
     def get_buy_avg(self, ticker):
-        """평균 매수가 조회"""
+        """평균 매수가 조회 (원장 사용 시 API 호출 없음)"""
+        ledger = self._read_ledger()
+        if ledger is not None:
+            return ledger.get_avg_price(ticker)
+        return self._fetch_buy_avg(ticker)
+
+    @cache_with_timeout(seconds=Config.CACHE_DURATION_PRICE_AVG)
+    def _fetch_buy_avg(self, ticker):
         avg_price = self.fetch_data(lambda: self.upbit.get_avg_buy_price(ticker))
         self.logger.debug(f"{ticker} 평균 매수가: {avg_price}")
         return avg_price
 
+    def _record_fill(self, side, ticker, res, amount=None, volume=None):
+        """주문 결과를 원장에 반영 (실패한 주문은 다음 조회 때 대조)"""
+        if self.ledger is None:
+            return
+        if not res or 'error' in res:
+            self.ledger.mark_drift(f"{ticker} {side} 주문 실패")
+            return
+
+        price = self.get_current_price(ticker)
+        if side == 'buy':
+            self.ledger.record_buy(ticker, amount, price)
+        else:
+            self.ledger.record_sell(ticker, volume, price)
+        position_ledgers.save()
+
     def get_order_info(self, ticker):
         """주문 정보 조회"""
         try:
@@ -367,18 +520,84 @@ class UpbitAPI:
             self.logger.error(f"주문 정보 조회 실패: {str(e)}")
         return None
 
-    def order_buy_market(self, ticker, buy_amount):
-        """시장가 매수"""
+    def _post_order(self, data):
+        """주문 접수 요청 (거절되면 오류 딕셔너리, 응답이 없어 접수 여부를 모르면 None)"""
+        try:
+            return _send_post_request(ORDERS_URL, headers=self.upbit._request_headers(data), data=data)[0]
+        except (UpbitBadRequestError, UpbitUnauthorizedError) as e:
+            return {"error": {"name": type(e).__name__, "message": str(e)}}
+        except Exception as e:
+            self.logger.warning(f"주문 응답 없음 ({data['identifier']}): {e}")
+            return None
+
+    def _find_order(self, identifier):
+        """identifier로 접수된 주문 조회 (없거나 조회 실패 시 None)"""
+        try:
+            data = {'identifier': identifier}
+            order = _send_get_request(ORDER_URL, headers=self.upbit._request_headers(data), data=data)[0]
+        except Exception:
+            return None
+        return order if isinstance(order, dict) and order.get('uuid') else None
+
+    def _place_order(self, ticker, side, **fields):
+        """identifier를 붙여 주문 접수
+
+        응답을 받지 못한 주문은 다시 접수하기 전에 identifier로 조회해, 이미 접수되었으면 그 주문을 반환합니다
+        (시간 초과 후 재시도로 같은 주문이 두 번 접수되지 않도록 fetch_data 재시도 대신 사용).
+        """
+        identifier = new_order_identifier(self.user_id, ticker, side)
+        data = dict(market=ticker, side=side, identifier=identifier, **fields)
+        order_queues.record('submits')
+
+        for attempt in range(Config.ORDER_SUBMIT_ATTEMPTS):
+            if attempt:
+                existing = self.fetch_data(lambda: self._find_order(identifier), max_retries=1)
+                if existing is not None:
+                    order_queues.record('recovered')
+                    self.logger.info(f"응답이 없던 주문이 접수되어 있음: {identifier} ({existing['uuid']})")
+                    return existing
+                order_queues.record('resubmits')
+                self.logger.info(f"주문 재접수 ({attempt + 1}/{Config.ORDER_SUBMIT_ATTEMPTS}): {identifier}")
+
+            res = self.fetch_data(lambda: self._post_order(data), max_retries=1)
+            if res is not None:
+                return res
+
+        self.logger.error(f"주문 접수 여부 확인 실패: {identifier}")
+        return self.fetch_data(lambda: self._find_order(identifier), max_retries=1)
+
+    @timed_phase('order')
+    @in_lane('order')
+    @serialized_order
+    def order_buy_market(self, ticker, buy_amount, min_cash=0):
+        """시장가 매수 (사용자별 주문 큐 안에서 잔고 재확인)
+
+        Args:
+            min_cash (float): 매수 후에도 남겨 둘 최소 보유 현금 (같은 사용자의 앞선 주문을 반영한 잔고 기준)
+        """
         if buy_amount < 5000:
             self.logger.warning(f"매수 금액이 5000원 미만입니다: {buy_amount}")
             return 0
 
-        self.logger.info(f"시장가 매수 시도: {ticker}, {buy_amount:,.2f}원")
-
         # 매수 전 캐시 무효화
         invalidate_cache()
+        self._clear_snapshot(ticker)
+
+        # 주문 차례에서 잔고 재확인 (다른 봇의 앞선 주문은 원장에 이미 반영됨)
+        available = ((self.get_balance_cash() or 0) - min_cash) / (1 + FEE_RATE)
+        if buy_amount > available:
+            if available < 5000:
+                order_queues.record('rejected')
+                self.logger.warning(f"매수 취소: 주문 가능 현금 {available:,.0f}원 (최소 보유 현금 {min_cash:,.0f}원 제외)")
+                return 0
+            order_queues.record('capped')
+            self.logger.info(f"매수 금액을 주문 가능 현금으로 조정: {buy_amount:,.0f}원 → {int(available):,}원")
+            buy_amount = int(available)
+
+        self.logger.info(f"시장가 매수 시도: {ticker}, {buy_amount:,.2f}원")
 
-        res = self.fetch_data(lambda: self.upbit.buy_market_order(ticker, buy_amount))
+        res = self._place_order(ticker, 'bid', ord_type='price', price=str(buy_amount))
+        self._record_fill('buy', ticker, res, amount=buy_amount)
 
         if res and 'error' in res:
             self.logger.error(f"매수 주문 오류: {res}")
@@ -388,14 +607,30 @@ class UpbitAPI:
 
         return res
 
+    @timed_phase('order')
+    @in_lane('order')
+    @serialized_order
     def order_sell_market(self, ticker, volume):
-        """시장가 매도"""
-        self.logger.info(f"시장가 매도 시도: {ticker}, {volume}")
-
+        """시장가 매도 (사용자별 주문 큐 안에서 보유량 재확인)"""
         # 매도 전 캐시 무효화
         invalidate_cache()
+        self._clear_snapshot(ticker)
+
+        # 같은 티커의 다른 봇이 먼저 매도했으면 남은 수량만 매도
+        held = self.get_balance_coin(ticker)
+        if held is not None and held < volume:
+            if held <= 0:
+                order_queues.record('rejected')
+                self.logger.warning(f"매도 취소: {ticker} 보유량이 없습니다.")
+                return 0
+            order_queues.record('capped')
+            self.logger.info(f"매도 수량을 보유량으로 조정: {volume} → {held}")
+            volume = held
 
-        res = self.fetch_data(lambda: self.upbit.sell_market_order(ticker, volume))
+        self.logger.info(f"시장가 매도 시도: {ticker}, {volume}")
+
+        res = self._place_order(ticker, 'ask', ord_type='market', volume=str(volume))
+        self._record_fill('sell', ticker, res, volume=volume)
 
         if res and 'error' in res:
             self.logger.error(f"매도 주문 오류: {res}")
@@ -407,10 +642,25 @@ class UpbitAPI:
 
     @cache_with_timeout(seconds=Config.CACHE_DURATION_OHLCV)
     def get_ohlcv_data(self, ticker, interval, count):
-        """OHLCV 데이터 조회"""
+        """OHLCV 데이터 조회 (사이클 선조회 스냅샷 우선, 분봉은 공유 1분봉 저장소에서 리샘플링)"""
+        snapshot = self._snapshots.get(ticker)
+        if snapshot is not None:
+            return snapshot.get_or_fetch('ohlcv', ticker, interval, count,
+                                         lambda: self._fetch_ohlcv_data(ticker, interval, count))
+        return self._fetch_ohlcv_data(ticker, interval, count)
+
+    def _fetch_ohlcv_data(self, ticker, interval, count):
+        if Config.CANDLE_RESAMPLE_ENABLED and interval in INTERVAL_MINUTES:
+            data = candle_store.get_ohlcv(ticker, interval, count, self.fetch_data)
+            if data is not None:
+                return data
+
         data = self.fetch_data(lambda: pyupbit.get_ohlcv(ticker, interval=interval, count=count))
         return data
 
+    @timed_phase('order')
+    @in_lane('order')
+    @serialized_order
     def order_sell_market_partial(self, ticker, portion):
         """시장가 분할 매도
 
@@ -485,16 +735,19 @@ class UpbitAPI:
 
             # 매도 전 캐시 무효화
             invalidate_cache()
+            self._clear_snapshot(ticker)
 
             # 예상 주문 금액이 5003원 이상일 경우 수수료 포함
             if estimated_value >= (min_order_value + 3):
                 # 업비트 API 호출 및 결과 반환
-                res = self.fetch_data(lambda: self.upbit.sell_market_order(ticker, sell_volume))
+                res = self._place_order(ticker, 'ask', ord_type='market', volume=str(sell_volume))
             else:
                 # 이 경우는 논리적으로 발생하지 않아야 하므로 로그 추가
                 self.logger.error(f"논리 오류: 최종 예상 금액({final_estimated_value:,.2f}원)이 최소 주문 금액({min_order_value}원)보다 작습니다.")
                 res = {"error": {"name": "logic_error", "message": f"최종 예상 주문 금액({final_estimated_value:,.2f}원)이 최소 주문 금액({min_order_value}원)보다 작습니다."}}
 
+            self._record_fill('sell', ticker, res, volume=sell_volume)
+
             if res and 'error' in res:
                 self.logger.error(f"분할 매도 주문 오류: {res} {estimated_value} {min_order_value}")
             elif res:
@@ -512,12 +765,23 @@ class UpbitAPI:
             return {"error": {"name": "execution_error", "message": error_msg}}
 
 
+    def get_daily_levels(self, ticker):
+        """변동성 돌파 일일 기준값 (당일 시가, 전일 변동폭) - 당일 값이 없을 때만 일봉 조회"""
+        return daily_levels.get(ticker, lambda: self.get_ohlcv_data(ticker, 'day', 2))
+
     def get_orderbook(self, ticker):
-        """호가 정보 조회"""
+        """호가 정보 조회 (사이클 선조회 스냅샷 우선)"""
+        snapshot = self._snapshots.get(ticker)
+        if snapshot is not None:
+            return snapshot.get_or_fetch('orderbook', ticker, None, None, lambda: self._fetch_orderbook(ticker))
+        return self._fetch_orderbook(ticker)
+
+    def _fetch_orderbook(self, ticker):
         try:
-            self._log_api_call()
-            # pyupbit를 사용하여 호가 정보 조회
-            orderbook = pyupbit.get_orderbook(ticker)
+            # 티커별 공유 호가 캐시 (TTL 이내면 다른 사용자/봇이 조회한 호가 재사용)
+            orderbook, fetched = orderbook_cache.get(ticker)
+            if fetched:
+                self._log_api_call()
             if orderbook is None:
                 self.logger.warning(f"호가 정보를 가져올 수 없습니다: {ticker}")
                 return None
@@ -527,7 +791,14 @@ class UpbitAPI:
             return None
 
     def get_candles_from_ticker(self, ticker, interval="minute5", count=200):
-        """캔들 데이터 조회"""
+        """캔들 데이터 조회 (사이클 선조회 스냅샷 우선, 최신 캔들이 먼저 오는 목록)"""
+        snapshot = self._snapshots.get(ticker)
+        if snapshot is not None:
+            return snapshot.get_or_fetch('candles', ticker, interval, count,
+                                         lambda: self._fetch_candles_from_ticker(ticker, interval, count))
+        return self._fetch_candles_from_ticker(ticker, interval, count)
+
+    def _fetch_candles_from_ticker(self, ticker, interval, count):
         try:
             self._log_api_call()
             # pyupbit를 사용하여 캔들 데이터 조회
@@ -536,23 +807,7 @@ class UpbitAPI:
                 self.logger.warning(f"캔들 데이터를 가져올 수 없습니다: {ticker}")
                 return None
 
-            # DataFrame을 딕셔너리 리스트로 변환
-            candles = []
-            for index, row in df.iterrows():
-                candle = {
-                    'candle_date_time_kst': index.strftime('%Y-%m-%dT%H:%M:%S'),
-                    'opening_price': float(row['open']),
-                    'high_price': float(row['high']),
-                    'low_price': float(row['low']),
-                    'trade_price': float(row['close']),
-                    'candle_acc_trade_volume': float(row['volume']),
-                    'timestamp': int(index.timestamp() * 1000)
-                }
-                candles.append(candle)
-
-            # 최신 데이터가 먼저 오도록 역순 정렬
-            candles.reverse()
-            return candles
+            return ohlcv_to_candles(df)
 
         except Exception as e:
             self.logger.error(f"캔들 데이터 조회 실패 ({ticker}): {str(e)}")
@@ -0,0 +1,114 @@
+"""백테스트용 과거 OHLCV 저장/조회 및 시간대 정렬"""
+import os
+
+import numpy as np
+import pandas as pd
+import pyupbit
+
+from app.utils.market_data import INTERVAL_MINUTES, UPBIT_CANDLE_ORIGIN, resample_ohlcv
+
+DAY_MINUTES = 24 * 60
+
+
+def interval_minutes(interval):
+    """캔들 간격을 분 단위로 변환 ('day' 포함)"""
+    if interval == 'day':
+        return DAY_MINUTES
+    if interval not in INTERVAL_MINUTES:
+        raise ValueError(f"지원하지 않는 캔들 간격입니다: {interval}")
+    return INTERVAL_MINUTES[interval]
+
+
+def download_ohlcv(ticker, interval, count, path=None):
+    """업비트에서 과거 OHLCV를 받아 CSV로 저장
+
+    pyupbit가 200개 단위로 나누어 조회하므로 1년치 5분봉(약 10만 개)도 한 번에 요청할 수 있습니다.
+    """
+    df = pyupbit.get_ohlcv(ticker, interval=interval, count=count, period=0.1)
+    if df is None or df.empty:
+        raise ValueError(f"OHLCV 데이터를 가져오지 못했습니다: {ticker} {interval}")
+
+    df = df[~df.index.duplicated(keep='last')].sort_index()
+    if path:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        df.to_csv(path)
+    return df
+
+
+def load_ohlcv(path):
+    """CSV로 저장된 OHLCV 로드 (pyupbit 형식, 인덱스는 KST 캔들 시작 시각)"""
+    df = pd.read_csv(path, index_col=0, parse_dates=True)
+    missing = {'open', 'high', 'low', 'close', 'volume'} - set(df.columns)
+    if missing:
+        raise ValueError(f"OHLCV 컬럼이 없습니다: {sorted(missing)}")
+    return df[~df.index.duplicated(keep='last')].sort_index()
+
+
+class MarketData:
+    """기준 간격 OHLCV와 상위 간격 캔들을 함께 다루는 컨테이너
+
+    상위 간격 지표는 기준 바가 끝나는 시점까지 마감된 캔들만 사용하여 미래 참조를 막습니다.
+    """
+
+    def __init__(self, df, interval):
+        self.df = df
+        self.interval = interval
+        self.base_minutes = interval_minutes(interval)
+        self.end_times = (df.index + pd.Timedelta(minutes=self.base_minutes)).to_numpy()
+        self.close = df['close'].to_numpy(dtype='float64')
+        self.high = df['high'].to_numpy(dtype='float64')
+        self._bars = {interval: df}
+        self._available = {}
+
+    def __len__(self):
+        return len(self.df)
+
+    def supports(self, interval):
+        """기준 간격에서 interval 캔들을 만들 수 있는지 여부"""
+        try:
+            minutes = interval_minutes(interval)
+        except ValueError:
+            return False
+        return minutes >= self.base_minutes and minutes % self.base_minutes == 0
+
+    def bars(self, interval):
+        """interval 캔들 (기준 간격에서 업비트 캔들 경계로 리샘플링, 캐시)"""
+        if interval not in self._bars:
+            if not self.supports(interval):
+                raise ValueError(f"{self.interval} 데이터로 {interval} 캔들을 만들 수 없습니다.")
+            if interval == 'day':
+                agg = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+                bars = self.df.resample(f'{DAY_MINUTES}min', origin=UPBIT_CANDLE_ORIGIN,
+                                        label='left', closed='left').agg(agg).dropna(subset=['open'])
+            else:
+                bars = resample_ohlcv(self.df, interval)
+            self._bars[interval] = bars
+        return self._bars[interval]
+
+    def closed_positions(self, interval):
+        """기준 바마다 그 시점까지 마감된 interval 캔들의 마지막 위치 (-1: 없음)"""
+        if interval not in self._available:
+            bars = self.bars(interval)
+            available = (bars.index + pd.Timedelta(minutes=interval_minutes(interval))).to_numpy()
+            self._available[interval] = np.searchsorted(available, self.end_times, side='right') - 1
+        return self._available[interval]
+
+    def align(self, values, interval):
+        """interval 캔들 기준 값을 기준 바 배열로 정렬 (마감 전 구간은 NaN 또는 기본값)"""
+        values = np.asarray(values)
+        if interval == self.interval:
+            return values
+        positions = self.closed_positions(interval)
+        aligned = values[np.clip(positions, 0, None)]
+        if aligned.dtype.kind == 'f':
+            aligned = np.where(positions >= 0, aligned, np.nan)
+        return aligned
+
+    def window(self, interval, i, count):
+        """기준 바 i 시점에 조회 가능한 최근 count개 interval 캔들 (리플레이용)"""
+        if interval == self.interval:
+            return self.df.iloc[max(0, i + 1 - count):i + 1]
+        position = self.closed_positions(interval)[i]
+        if position < 0:
+            return self.bars(interval).iloc[0:0]
+        return self.bars(interval).iloc[max(0, position + 1 - count):position + 1]
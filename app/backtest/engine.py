@@ -0,0 +1,328 @@
+"""과거 OHLCV를 재생하는 백테스트 엔진
+
+UpbitTradingBot.trading()의 주문 규칙(min_cash, max_order_amount, 분할 매도, prevent_loss_sale,
+손절/익절/트레일링 스톱)을 SimulatedUpbitAPI 위에서 그대로 적용합니다.
+
+- vectorized 모드(기본): 지표를 전체 히스토리에 대해 한 번에 계산하고 바마다 배열만 조회합니다.
+  1년치 5분봉(약 10만 바)도 수 초 안에 끝납니다.
+- replay 모드: 라이브 전략 클래스를 SimulatedUpbitAPI로 바마다 호출합니다. 느리지만 벡터화 모델과
+  라이브 로직의 일치 여부를 짧은 구간에서 검증할 때 사용합니다.
+"""
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.backtest import indicators as ind
+from app.backtest.data import MarketData
+from app.backtest.signals import create_signal_model, _to_float
+from app.backtest.simulated_api import SimulatedUpbitAPI, DEFAULT_FEE_RATE, MIN_ORDER_VALUE
+from app.bot.trading_bot import EXIT_MANAGED_STRATEGIES
+
+
+class TradingRules:
+    """UpbitTradingBot.trading()의 주문 규칙을 모의 API에 적용"""
+
+    def __init__(self, settings, data):
+        self.ticker = settings.get('ticker', 'KRW-BTC')
+        self.strategy = settings.get('strategy', 'bollinger')
+        self.buy_amount = _to_float(settings.get('buy_amount'), 10000)
+        self.min_cash = _to_float(settings.get('min_cash'), 0)
+        self.max_order_amount = _to_float(settings.get('max_order_amount'), 0)
+        self.sell_portion = _to_float(settings.get('sell_portion'), 1.0)
+        self.prevent_loss_sale = settings.get('prevent_loss_sale') or 'Y'
+        self.long_term_investment = settings.get('long_term_investment') or 'N'
+        self.exit_managed = self.strategy in EXIT_MANAGED_STRATEGIES
+
+        # 트레일링 스톱: 진입 이후 사이클 가격 최고가 (high_water_marks, check_trailing_stop)
+        self.peak = None
+        self.peak_avg_price = None
+
+        # 변동성 기반 포지션 사이징: 최근 24시간 1시간봉 변동성 (calculate_volatility_based_position_size)
+        if data.supports('minute60'):
+            self.daily_volatility = data.align(ind.daily_volatility(data.bars('minute60')).to_numpy(), 'minute60')
+        else:
+            self.daily_volatility = np.full(len(data), np.nan)
+
+    def position_size(self, i):
+        """변동성 기반 매수 금액 조정"""
+        base_amount = self.buy_amount
+        daily_volatility = self.daily_volatility[i]
+
+        if daily_volatility > 0.1:
+            position_multiplier = 0.7
+        elif daily_volatility < 0.03:
+            position_multiplier = 1.3
+        else:
+            position_multiplier = 1.0
+
+        adjusted_amount = int(base_amount * position_multiplier)
+        if base_amount <= 50000:
+            return max(5000, min(50000, adjusted_amount))
+        min_amount = max(5000, int(base_amount * 0.1))
+        max_amount = min(int(base_amount * 2.0), 10000000)
+        return max(min_amount, min(max_amount, adjusted_amount))
+
+    def profit_loss_action(self, i, api):
+        """손절(-3%)/익절(+5%)/트레일링 스톱 체크 (check_profit_loss_management)"""
+        current_price = api.get_current_price(self.ticker)
+        avg_buy_price = api.get_buy_avg(self.ticker)
+        if not current_price or not avg_buy_price:
+            return None
+
+        profit_rate = (current_price - avg_buy_price) / avg_buy_price * 100
+
+        # 평균 매수가가 바뀌면 새 포지션으로 보고 현재가부터 추적
+        if self.peak is None or self.peak_avg_price != avg_buy_price:
+            self.peak, self.peak_avg_price = current_price, avg_buy_price
+        else:
+            self.peak = max(self.peak, current_price)
+
+        if profit_rate <= -3.0:
+            if self.prevent_loss_sale == 'Y':
+                return None
+            return {'action': 'STOP_LOSS', 'portion': 1.0}
+        elif profit_rate >= 5.0:
+            return {'action': 'TAKE_PROFIT', 'portion': 0.5}
+
+        if profit_rate > 3.0 and current_price < self.peak * 0.98:
+            self.peak = current_price
+            return {'action': 'TRAILING_STOP', 'portion': 0.7}
+        return None
+
+    def step(self, i, api, signal, sell_ratio):
+        """바 i에서 봇 한 사이클 실행"""
+        ticker = self.ticker
+        balance_cash = api.get_balance_cash()
+        balance_coin = api.get_balance_coin(ticker)
+
+        if balance_coin <= 0:
+            self.peak = None  # 청산된 포지션의 최고가 기록 정리
+
+        # 손익 관리 (볼린저 계열에서만, 신호보다 우선)
+        if self.exit_managed and balance_coin > 0:
+            action = self.profit_loss_action(i, api)
+            if action:
+                if action['portion'] >= 1.0:
+                    return api.order_sell_market(ticker, balance_coin, reason=action['action'])
+                return api.order_sell_market_partial(ticker, action['portion'], reason=action['action'])
+
+        if signal == ind.BUY and balance_cash and balance_cash > self.min_cash:
+            return self._buy(i, api, balance_cash, balance_coin)
+
+        if signal in (ind.SELL, ind.PARTIAL_SELL) and balance_coin > 0:
+            return self._sell(api, signal, sell_ratio, balance_coin)
+
+        return None
+
+    def _buy(self, i, api, balance_cash, balance_coin):
+        buy_amount = self.position_size(i)
+
+        if buy_amount > balance_cash:
+            if balance_cash > self.min_cash and balance_cash > 5000:
+                buy_amount = balance_cash - self.min_cash
+            else:
+                return None
+
+        if self.max_order_amount > 0:
+            avg_buy_price = api.get_buy_avg(self.ticker) or 0
+            total_invested_amount = balance_coin * avg_buy_price if balance_coin > 0 and avg_buy_price > 0 else 0
+            if total_invested_amount >= self.max_order_amount:
+                return None
+
+            actual_buy_amount = min(buy_amount, self.max_order_amount - total_invested_amount)
+            if actual_buy_amount < MIN_ORDER_VALUE:
+                return None
+        else:
+            actual_buy_amount = buy_amount
+
+        return api.order_buy_market(self.ticker, actual_buy_amount)
+
+    def _sell(self, api, signal, sell_ratio, balance_coin):
+        ticker = self.ticker
+        current_price = api.get_current_price(ticker)
+
+        if self.long_term_investment == 'Y':
+            return None
+
+        avg_buy_price = api.get_buy_avg(ticker)
+        if self.prevent_loss_sale == 'Y' and avg_buy_price and current_price < avg_buy_price * 1.002:
+            return None
+
+        total_value = balance_coin * current_price
+        if total_value < MIN_ORDER_VALUE:
+            return None
+
+        reason = ind.SIGNAL_NAMES[signal]
+        sell_portion = self.sell_portion
+        if sell_portion >= 1.0:
+            return api.order_sell_market(ticker, balance_coin, reason=reason)
+
+        estimated_sell_value = total_value * sell_portion
+        if estimated_sell_value < MIN_ORDER_VALUE:
+            if MIN_ORDER_VALUE <= total_value < 10000:
+                sell_portion = 1.0
+            else:
+                sell_portion = min(1.0, (MIN_ORDER_VALUE + 1000) / total_value)
+        elif signal == ind.PARTIAL_SELL:
+            sell_portion = sell_portion * sell_ratio
+
+        order_result = api.order_sell_market_partial(ticker, sell_portion, reason=reason)
+        if order_result and 'error' in order_result:
+            if order_result['error'].get('name') == 'too_small_volume':
+                return api.order_sell_market(ticker, balance_coin, reason=reason)
+            return None
+        return order_result
+
+
+class ReplaySignalProvider:
+    """라이브 전략 객체를 모의 API로 바마다 호출하여 신호 생성 (검증용)"""
+
+    def __init__(self, strategy_name, api, settings, logger):
+        from app.strategy import create_strategy
+
+        self.strategy_name = strategy_name
+        self.api = api
+        self.settings = settings
+        self.strategy = create_strategy(strategy_name, api, logger)
+        if self.strategy is None:
+            raise ValueError(f"전략을 생성할 수 없습니다: {strategy_name}")
+
+    def signal_at(self, i, price, coin, avg_price):
+        settings = self.settings
+        ticker = settings.get('ticker')
+
+        if self.strategy_name == 'volatility':
+            result = self.strategy.generate_volatility_signal(
+                ticker, _to_float(settings.get('k'), 0.5), _to_float(settings.get('target_profit'), 3.0),
+                _to_float(settings.get('stop_loss'), -2.0))
+        elif self.strategy_name == 'rsi':
+            result = self.strategy.generate_signal(
+                ticker, settings.get('rsi_period', 14), settings.get('rsi_oversold', 30),
+                settings.get('rsi_overbought', 70), settings.get('rsi_timeframe', 'minute15'))
+        elif self.strategy_name in ('adaptive', 'ensemble'):
+            result = self.strategy.generate_signal(ticker)
+        else:
+            interval = settings.get('interval') or self.api.data.interval
+            window = int(settings.get('window', 20))
+            prices_data = self.api.get_ohlcv_data(ticker, interval, window + 5)
+            if prices_data is None or len(prices_data) < window:
+                return ind.HOLD, 0.0
+            prices = prices_data['close']
+            if self.strategy_name == 'bollinger_asymmetric':
+                result = self.strategy.generate_signal(
+                    ticker, prices, window, float(settings.get('buy_multiplier', 3.0)),
+                    float(settings.get('sell_multiplier', 2.0)), True, 30, interval)
+            else:
+                result = self.strategy.generate_signal(
+                    ticker, prices, window, float(settings.get('multiplier', 2.0)), True, 30, interval)
+
+        if isinstance(result, dict):
+            return ind.SIGNAL_CODES.get(result.get('signal'), ind.HOLD), result.get('sell_ratio', 1.0)
+        return ind.SIGNAL_CODES.get(result, ind.HOLD), 1.0
+
+
+class BacktestResult:
+    """백테스트 결과 (자산 곡선, 거래 기록, 요약 지표)"""
+
+    def __init__(self, settings, equity, trades, initial_cash, elapsed, prices):
+        self.settings = settings
+        self.equity = equity
+        self.trades = trades
+        self.initial_cash = initial_cash
+        self.elapsed = elapsed
+        self.prices = prices
+
+    def summary(self):
+        """요약 지표"""
+        final_equity = float(self.equity.iloc[-1]) if len(self.equity) else self.initial_cash
+        running_max = self.equity.cummax()
+        drawdown = (self.equity / running_max - 1) * 100 if len(self.equity) else pd.Series(dtype=float)
+
+        sells = self.trades[self.trades['side'] == 'SELL'] if len(self.trades) else self.trades
+        wins = int((sells['profit_loss'] > 0).sum()) if len(sells) else 0
+
+        return {
+            'ticker': self.settings.get('ticker'),
+            'strategy': self.settings.get('strategy'),
+            'start': str(self.equity.index[0]) if len(self.equity) else None,
+            'end': str(self.equity.index[-1]) if len(self.equity) else None,
+            'bars': len(self.equity),
+            'initial_cash': self.initial_cash,
+            'final_equity': round(final_equity, 2),
+            'total_return': round((final_equity / self.initial_cash - 1) * 100, 4),
+            'buy_and_hold_return': round((self.prices.iloc[-1] / self.prices.iloc[0] - 1) * 100, 4) if len(self.prices) else 0.0,
+            'max_drawdown': round(float(drawdown.min()), 4) if len(drawdown) else 0.0,
+            'trades': len(self.trades),
+            'buys': int((self.trades['side'] == 'BUY').sum()) if len(self.trades) else 0,
+            'sells': len(sells),
+            'win_rate': round(wins / len(sells) * 100, 2) if len(sells) else 0.0,
+            'fees': round(float(self.trades['fee'].sum()), 2) if len(self.trades) else 0.0,
+            'elapsed_seconds': round(self.elapsed, 3),
+        }
+
+    def save(self, prefix):
+        """자산 곡선과 거래 기록을 CSV로 저장 (<prefix>_equity.csv, <prefix>_trades.csv)"""
+        self.equity.rename('equity').to_csv(f"{prefix}_equity.csv")
+        self.trades.to_csv(f"{prefix}_trades.csv", index=False)
+
+
+class BacktestEngine:
+    """과거 OHLCV로 봇 설정(settings)을 시뮬레이션"""
+
+    TRADE_COLUMNS = ['time', 'side', 'price', 'volume', 'amount', 'fee', 'reason', 'profit_loss',
+                     'cash_after', 'coin_after']
+
+    def __init__(self, df, interval, settings, initial_cash=1000000, fee_rate=DEFAULT_FEE_RATE, slippage=0.0,
+                 logger=None):
+        """
+        Args:
+            df (DataFrame): 기준 간격 OHLCV (pyupbit 형식)
+            interval (str): df의 캔들 간격 (예: 'minute5')
+            settings (dict): 봇 설정 (ticker, strategy, interval, window, buy_amount, min_cash, ...)
+        """
+        self.data = df if isinstance(df, MarketData) else MarketData(df, interval)
+        self.settings = dict(settings)
+        self.settings.setdefault('strategy', 'bollinger')
+        self.settings.setdefault('ticker', 'KRW-BTC')
+        self.initial_cash = float(initial_cash)
+        self.fee_rate = fee_rate
+        self.slippage = slippage
+        self.logger = logger or logging.getLogger('backtest')
+
+    def run(self, mode='vectorized', start=0):
+        """백테스트 실행
+
+        Args:
+            mode (str): 'vectorized' 또는 'replay'
+            start (int): 시작 바 인덱스 (지표 워밍업 구간을 건너뛸 때 사용)
+        """
+        started = time.perf_counter()
+        data = self.data
+        strategy_name = self.settings['strategy']
+
+        api = SimulatedUpbitAPI(data, self.settings['ticker'], self.initial_cash, self.fee_rate, self.slippage,
+                                self.logger)
+        rules = TradingRules(self.settings, data)
+
+        if mode == 'vectorized':
+            model = create_signal_model(strategy_name, data, self.settings)
+        elif mode == 'replay':
+            model = ReplaySignalProvider(strategy_name, api, self.settings, self.logger)
+        else:
+            raise ValueError(f"알 수 없는 백테스트 모드: {mode}")
+
+        close = data.close
+        equity = np.full(len(data), self.initial_cash)
+        for i in range(start, len(data)):
+            api.set_cursor(i)
+            price = close[i]
+            signal, sell_ratio = model.signal_at(i, price, api.coin, api.avg_price)
+            rules.step(i, api, signal, sell_ratio)
+            equity[i] = api.cash + api.coin * price
+
+        index = data.df.index[start:]
+        trades = pd.DataFrame(api.trades, columns=self.TRADE_COLUMNS)
+        return BacktestResult(self.settings, pd.Series(equity[start:], index=index), trades, self.initial_cash,
+                              time.perf_counter() - started, data.df['close'].iloc[start:])
@@ -0,0 +1,208 @@
+"""백테스트용 벡터화 지표
+
+라이브 전략(app/strategy)이 매 사이클마다 최근 N개 캔들로 계산하는 지표를
+전체 히스토리에 대해 한 번에 계산합니다. 각 함수는 라이브 코드의 계산식을 그대로
+따르며, 바마다 API를 흉내내어 다시 계산하는 방식보다 수백 배 빠릅니다.
+
+주의: 라이브 RSI는 매번 최근 60개 캔들에서 새로 시드(SMA)를 잡기 때문에, 전체
+히스토리로 계산한 값과 소수점 단위의 차이가 있을 수 있습니다.
+"""
+import numpy as np
+import pandas as pd
+
+# 신호 코드 (numpy 배열로 다루기 위해 정수로 표현)
+HOLD = 0
+BUY = 1
+SELL = 2
+PARTIAL_SELL = 3
+
+SIGNAL_NAMES = {HOLD: 'HOLD', BUY: 'BUY', SELL: 'SELL', PARTIAL_SELL: 'PARTIAL_SELL'}
+SIGNAL_CODES = {name: code for code, name in SIGNAL_NAMES.items()}
+
+# 추세 코드 (RSIStrategy.check_rsi_trend / RSIVolumeIntegratedStrategy.get_rsi_trend)
+FALLING = -1
+NEUTRAL = 0
+RISING = 1
+
+# 다이버전스 코드 (RSIStrategy.check_divergence)
+BEARISH = -1
+BULLISH = 1
+
+
+def bollinger_bands(close, window=20, buy_multiplier=2.0, sell_multiplier=2.0):
+    """볼린저 밴드 (BollingerBandsStrategy.get_bollinger_bands와 동일, 표본 표준편차)
+
+    Returns:
+        tuple: (상단밴드, 하단밴드) Series
+    """
+    window = int(window)
+    sma = close.rolling(window).mean()
+    rolling_std = close.rolling(window).std()
+    return sma + rolling_std * float(sell_multiplier), sma - rolling_std * float(buy_multiplier)
+
+
+def rsi(close, period=14):
+    """지수 이동평균 RSI (RSIStrategy.calculate_rsi의 use_ema=True 경로와 동일한 점화식)
+
+    첫 평균은 1~period 구간의 단순 평균이고 이후는 alpha=1/period 지수 평활입니다.
+    계산 전 구간(처음 period개)은 라이브 코드와 같이 50으로 채웁니다.
+    """
+    period = int(period)
+    result = pd.Series(50.0, index=close.index, dtype='float64')
+    if len(close) < period + 1:
+        return result
+
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0.0)
+    loss = -delta.where(delta < 0, 0.0)
+
+    seeded_gain = gain.iloc[period:].copy()
+    seeded_loss = loss.iloc[period:].copy()
+    seeded_gain.iloc[0] = gain.iloc[1:period + 1].mean()
+    seeded_loss.iloc[0] = loss.iloc[1:period + 1].mean()
+
+    alpha = 1.0 / period
+    avg_gain = seeded_gain.ewm(alpha=alpha, adjust=False).mean()
+    avg_loss = seeded_loss.ewm(alpha=alpha, adjust=False).mean()
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = np.where(avg_loss.values == 0, 100.0, 100 - 100 / (1 + avg_gain.values / avg_loss.values))
+
+    result.iloc[period:] = values
+    return result.fillna(50.0)
+
+
+def rsi_trend(rsi_values, period=3):
+    """RSI 연속 상승/하락 여부 (RSIStrategy.check_rsi_trend)
+
+    Returns:
+        ndarray: RISING / FALLING / NEUTRAL 코드
+    """
+    values = rsi_values.to_numpy(dtype='float64')
+    rising = np.ones(len(values), dtype=bool)
+    falling = np.ones(len(values), dtype=bool)
+    for lag in range(period - 1):
+        current = np.roll(values, lag)
+        previous = np.roll(values, lag + 1)
+        rising &= current > previous
+        falling &= current < previous
+    rising[:period - 1] = False
+    falling[:period - 1] = False
+    return np.where(rising, RISING, np.where(falling, FALLING, NEUTRAL))
+
+
+def rsi_momentum_trend(rsi_values, lookback=5):
+    """RSI 기울기/모멘텀 추세 (RSIVolumeIntegratedStrategy.get_rsi_trend)
+
+    Returns:
+        tuple: (추세 코드 ndarray, 모멘텀 ndarray)
+    """
+    prev_mean = rsi_values.shift(1).rolling(lookback - 1).mean()
+    slope = (rsi_values - prev_mean).to_numpy()
+    momentum = rsi_values.diff().fillna(0.0).to_numpy()
+    trend = np.where((slope > 2) & (momentum > 0), RISING,
+                     np.where((slope < -2) & (momentum < 0), FALLING, NEUTRAL))
+    return trend, momentum
+
+
+def divergence(close, rsi_values, lookback=10, min_change_threshold=2.0):
+    """가격-RSI 다이버전스 (RSIStrategy.check_divergence)
+
+    Returns:
+        ndarray: BULLISH / BEARISH / 0 코드
+    """
+    offset = lookback - 1 - lookback // 2
+    price_ref = close.shift(offset)
+    rsi_ref = rsi_values.shift(offset)
+    price_change = (close - price_ref).to_numpy()
+    rsi_change = (rsi_values - rsi_ref).to_numpy()
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        price_change_pct = price_change / price_ref.to_numpy() * 100
+        rsi_change_pct = np.abs(rsi_change / rsi_ref.to_numpy() * 100)
+
+    significant = np.abs(price_change_pct) >= min_change_threshold
+    significant[:lookback - 1] = False
+    bearish = significant & (price_change > 0) & (rsi_change < 0) & (rsi_change_pct > min_change_threshold)
+    bullish = significant & (price_change < 0) & (rsi_change > 0) & (rsi_change_pct > min_change_threshold)
+    return np.where(bearish, BEARISH, np.where(bullish, BULLISH, 0))
+
+
+def volume_confirmation(volume, lookback=5, min_ratio=1.2):
+    """거래량 확인 (RSIStrategy.check_volume_confirmation)"""
+    avg_volume = volume.rolling(lookback).mean()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(avg_volume.to_numpy() > 0, volume.to_numpy() / avg_volume.to_numpy(), 1.0)
+    confirmed = ratio >= min_ratio
+    confirmed[:lookback - 1] = True  # 데이터 부족 시 기본 승인
+    return confirmed
+
+
+def true_range(df):
+    """True Range (AdaptiveStrategy / get_market_volatility 공통)"""
+    prev_close = df['close'].shift()
+    return pd.concat([
+        df['high'] - df['low'],
+        (df['high'] - prev_close).abs(),
+        (df['low'] - prev_close).abs(),
+    ], axis=1).max(axis=1)
+
+
+def sell_signal_strength(price, sell_band, rsi_values, momentum):
+    """매도 신호 강도 (RSIVolumeIntegratedStrategy.get_sell_signal_strength)"""
+    breakout = (price - sell_band) / sell_band
+    strong = (rsi_values >= 80) & (momentum <= 0)
+    medium = ~strong & (rsi_values >= 70) & (momentum > 0)
+    return np.where(strong, np.minimum(1.0, 0.8 + breakout * 0.2),
+                    np.where(medium, np.minimum(0.6, 0.3 + breakout * 0.3),
+                             np.minimum(1.0, 0.5 + breakout * 0.5)))
+
+
+def volatility_level_scores(df_minute5):
+    """5분봉 ATR 비율 기반 변동성 등급 (RSIVolumeIntegratedStrategy.get_market_volatility)
+
+    Returns:
+        tuple: (변동성 배수 ndarray, 매수 지연 점수 ndarray)
+    """
+    atr = true_range(df_minute5).rolling(14).mean()
+    atr_ratio = (atr / df_minute5['close'] * 100).to_numpy()
+
+    # 데이터 부족 시 라이브 코드 기본값과 같이 MEDIUM 처리
+    very_high = atr_ratio > 4.0
+    high = ~very_high & (atr_ratio > 2.5)
+    low = ~np.isnan(atr_ratio) & (atr_ratio <= 1.2)
+
+    multiplier = np.select([very_high, high, low], [1.5, 1.2, 0.8], default=1.0)
+    score = np.select([very_high, high, low], [20, 15, 5], default=10)
+    return multiplier, score
+
+
+def rapid_decline_delay(df_minute5, coin_multiplier=1.0):
+    """5분봉 급락 시 매수 지연 여부 (RSIVolumeIntegratedStrategy.should_delay_buy_gradual_approach)
+
+    호가 기반 매도 압력은 과거 데이터로 재현할 수 없으므로 매도 압력 점수는 0으로 봅니다.
+    (급락이 아닌 경우 매도 압력 검사만 하므로 지연하지 않습니다.)
+    """
+    close = df_minute5['close']
+    vol_multiplier, vol_score = volatility_level_scores(df_minute5)
+
+    base_thresholds = {1: -1.5, 3: -2.5, 6: -4.0, 12: -6.0}
+    severity = np.zeros(len(close))
+    declining = np.zeros(len(close), dtype=bool)
+    for periods, base in base_thresholds.items():
+        threshold = base * coin_multiplier * vol_multiplier
+        ref = close.shift(periods)
+        rate = ((close - ref) / ref * 100).to_numpy()
+        hit = rate <= threshold
+        declining |= hit
+        severity = np.where(hit, np.maximum(severity, np.abs(rate) / np.abs(threshold)), severity)
+
+    rsi5 = rsi(close, 14).to_numpy()
+    rsi_adjust = np.where(rsi5 <= 20, -15, np.where(rsi5 <= 30, -10, 0))
+    delay_score = np.minimum(severity * 20, 50) + vol_score + rsi_adjust
+    return declining & (delay_score >= 70)
+
+
+def daily_volatility(df_minute60, periods=24):
+    """1시간봉 기반 일일 변동성 (UpbitTradingBot.calculate_volatility_based_position_size)"""
+    return df_minute60['close'].pct_change().rolling(periods - 1).std() * (periods ** 0.5)
@@ -0,0 +1,308 @@
+"""라이브 전략의 신호 로직을 벡터화한 백테스트 신호 모델
+
+각 모델은 생성 시점에 전체 히스토리의 지표를 한 번에 계산하고, signal_at()에서는
+바 인덱스로 배열을 조회하며 잔고/평균 매수가에 의존하는 조건만 평가합니다.
+"""
+import numpy as np
+import pandas as pd
+
+from app.backtest import indicators as ind
+from app.strategy.rsi_selling_pressure import get_coin_specific_thresholds
+
+
+def _to_float(value, default):
+    try:
+        return float(value) if value is not None and value != '' else default
+    except (ValueError, TypeError):
+        return default
+
+
+def _to_int(value, default):
+    try:
+        return int(float(value)) if value is not None and value != '' else default
+    except (ValueError, TypeError):
+        return default
+
+
+def _normalize(code, ratio):
+    """하위 전략 신호를 BUY/SELL/HOLD로 정규화 (EnsembleStrategy._normalize_signal)"""
+    return ind.SELL if code == ind.PARTIAL_SELL else code
+
+
+class BollingerSignal:
+    """볼린저 밴드 / 비대칭 볼린저 밴드 전략 (RSI 급락 보호 필터 포함)"""
+
+    def __init__(self, data, ticker, interval='minute5', window=20, buy_multiplier=2.0, sell_multiplier=2.0,
+                 rsi_interval=None, sell_rsi_threshold=70):
+        self.window = _to_int(window, 20)
+        interval = interval or data.interval
+        rsi_interval = rsi_interval or interval
+
+        # 밴드: 봇의 간격과 기준 데이터 간격이 같으면 현재 바 종가까지 포함 (라이브와 동일)
+        bars = data.bars(interval)
+        upper, lower = ind.bollinger_bands(bars['close'], self.window, _to_float(buy_multiplier, 2.0),
+                                           _to_float(sell_multiplier, 2.0))
+        upper = data.align(upper.to_numpy(), interval)
+        lower = data.align(lower.to_numpy(), interval)
+        price = data.close
+
+        # 매도: RSI 상승세이면 강도에 따른 부분 매도 (should_delay_sell_rsi_rising / get_sell_signal_strength)
+        if data.supports(rsi_interval):
+            rsi_bars = data.bars(rsi_interval)
+            rsi_values = ind.rsi(rsi_bars['close'], 14)
+            trend, momentum = ind.rsi_momentum_trend(rsi_values)
+            rsi_values = data.align(rsi_values.to_numpy(), rsi_interval)
+            trend = data.align(trend, rsi_interval)
+            momentum = data.align(momentum, rsi_interval)
+        else:
+            rsi_values = np.full(len(data), 50.0)
+            trend = np.zeros(len(data), dtype=int)
+            momentum = np.zeros(len(data))
+
+        rsi_rising = (rsi_values > sell_rsi_threshold) & (trend == ind.RISING)
+        strength = ind.sell_signal_strength(price, upper, rsi_values, momentum)
+
+        # 매수: 5분봉 급락 보호 (호가 기반 매도 압력은 재현 불가)
+        if data.supports('minute5'):
+            coin_multiplier = get_coin_specific_thresholds(ticker, {'base': 1.0})['base']
+            delay = ind.rapid_decline_delay(data.bars('minute5'), coin_multiplier)
+            delay = data.align(delay.astype(int), 'minute5').astype(bool)
+        else:
+            delay = np.zeros(len(data), dtype=bool)
+
+        above = price > upper
+        below = ~above & (price < lower)
+
+        self.codes = np.select(
+            [above & rsi_rising, above, below & ~delay],
+            [ind.PARTIAL_SELL, ind.SELL, ind.BUY],
+            default=ind.HOLD
+        )
+        self.ratios = np.where(above & rsi_rising, strength, np.where(above, 0.5, 0.0))
+
+    def signal_at(self, i, price, coin, avg_price):
+        return self.codes[i], self.ratios[i]
+
+
+class RSISignal:
+    """RSI 전략 (과매도 회복/강한 과매도 반등/다이버전스, 보유 시 손익 기준 매도)"""
+
+    def __init__(self, data, period=14, oversold=30, overbought=70, timeframe='minute15'):
+        # RSIStrategy.generate_signal의 매개변수 검증 규칙
+        period = _to_int(period, 14)
+        oversold = _to_float(oversold, 30.0)
+        overbought = _to_float(overbought, 70.0)
+        if period < 2:
+            period = 14
+        if oversold <= 0 or oversold >= 50:
+            oversold = 30.0
+        if overbought <= 50 or overbought >= 100:
+            overbought = 70.0
+        if oversold >= overbought:
+            oversold, overbought = 30.0, 70.0
+
+        timeframe = timeframe or 'minute15'
+        bars = data.bars(timeframe)
+        rsi_series = ind.rsi(bars['close'], period)
+        rsi_values = rsi_series.to_numpy()
+        prev_rsi = rsi_series.shift(1).fillna(rsi_series).to_numpy()
+        trend = ind.rsi_trend(rsi_series)
+        div = ind.divergence(bars['close'], rsi_series)
+        volume_ok = ind.volume_confirmation(bars['volume'])
+
+        sell = ((overbought <= rsi_values) & (rsi_values < prev_rsi)) | (rsi_values >= 80) | \
+               ((div == ind.BEARISH) & (rsi_values > 50))
+
+        recovery = (prev_rsi <= oversold) & (oversold < rsi_values)
+        strong_rebound = (rsi_values <= 20) & (trend == ind.RISING)
+        bullish = (div == ind.BULLISH) & (rsi_values < 50) & volume_ok
+        buy = np.where(recovery, volume_ok, strong_rebound | bullish)
+
+        # 라이브 코드는 period + 5개 미만이면 HOLD
+        valid = np.arange(1, len(bars) + 1) >= period + 5
+
+        self.sell = data.align(sell.astype(int), timeframe).astype(bool)
+        self.buy = data.align(buy.astype(int), timeframe).astype(bool)
+        self.valid = data.align(valid.astype(int), timeframe).astype(bool)
+        if timeframe != data.interval:
+            # 아직 마감된 캔들이 없는 구간 제외
+            self.valid &= data.closed_positions(timeframe) >= 0
+
+    def signal_at(self, i, price, coin, avg_price):
+        if not self.valid[i]:
+            return ind.HOLD, 0.0
+
+        if coin > 0:
+            if avg_price > 0:
+                profit_loss = (price - avg_price) / avg_price * 100
+                if self.sell[i] or profit_loss >= 3.0 or profit_loss <= -2.0:
+                    return ind.SELL, 0.0
+            return ind.HOLD, 0.0
+
+        return (ind.BUY, 0.0) if self.buy[i] else (ind.HOLD, 0.0)
+
+
+class VolatilitySignal:
+    """변동성 돌파 전략 (09:00 KST 기준 일봉 목표가, 08:50~09:00 청산)"""
+
+    def __init__(self, data, k=0.5, target_profit=3.0, stop_loss=-2.0):
+        self.target_profit = _to_float(target_profit, 3.0)
+        self.stop_loss = _to_float(stop_loss, -2.0)
+        k = _to_float(k, 0.5)
+
+        days = data.bars('day')
+        target = (days['open'] + (days['high'].shift(1) - days['low'].shift(1)) * k).to_numpy()
+
+        # 당일 시가는 장 시작과 함께 확정되므로 기준 바가 속한 일봉의 값을 사용
+        positions = np.searchsorted(days.index.to_numpy(), data.df.index.to_numpy(), side='right') - 1
+        self.target = np.where(positions >= 0, target[np.clip(positions, 0, None)], np.nan)
+
+        decision = pd.DatetimeIndex(data.end_times)
+        minutes = np.asarray(decision.hour * 60 + decision.minute)
+        self.sell_window = (minutes >= 8 * 60 + 50) & (minutes < 9 * 60)
+        self.trading_time = ~self.sell_window
+
+    def signal_at(self, i, price, coin, avg_price):
+        if coin > 0:
+            if self.sell_window[i]:
+                return ind.SELL, 0.0
+            if avg_price:
+                profit_loss = (price - avg_price) / avg_price * 100
+                if profit_loss >= self.target_profit or profit_loss <= self.stop_loss:
+                    return ind.SELL, 0.0
+
+        target = self.target[i]
+        if np.isnan(target) or not self.trading_time[i]:
+            return ind.HOLD, 0.0
+
+        if price > target and not coin:
+            return ind.BUY, 0.0
+        return ind.HOLD, 0.0
+
+
+class EnsembleSignal:
+    """앙상블 전략 (변동성 돌파 + 15분봉 볼린저 + RSI 가중 투표)"""
+
+    SCORES = {ind.BUY: 1, ind.HOLD: 0, ind.SELL: -1}
+
+    def __init__(self, data, ticker):
+        self.volatility = VolatilitySignal(data, k=0.5)
+        self.bollinger = BollingerSignal(data, ticker, interval='minute15', window=20,
+                                         buy_multiplier=2, sell_multiplier=2, rsi_interval='minute5')
+        self.rsi = RSISignal(data)
+
+        # EnsembleStrategy.generate_signal의 시간대별 가중치
+        hours = np.asarray(pd.DatetimeIndex(data.end_times).hour)
+        morning = (hours >= 9) & (hours < 12)
+        afternoon = (hours >= 14) & (hours < 18)
+        self.weights = {
+            'volatility': np.select([morning, afternoon], [0.5, 0.3], default=0.3),
+            'bollinger': np.select([morning, afternoon], [0.3, 0.5], default=0.3),
+            'rsi': np.select([morning, afternoon], [0.2, 0.2], default=0.4),
+        }
+
+    def signal_at(self, i, price, coin, avg_price):
+        signals = {
+            'volatility': _normalize(*self.volatility.signal_at(i, price, coin, avg_price)),
+            'bollinger': _normalize(*self.bollinger.signal_at(i, price, coin, avg_price)),
+            'rsi': _normalize(*self.rsi.signal_at(i, price, coin, avg_price)),
+        }
+        total_score = sum(self.SCORES[signal] * self.weights[name][i] for name, signal in signals.items())
+        buy_count = sum(1 for signal in signals.values() if signal == ind.BUY)
+        sell_count = sum(1 for signal in signals.values() if signal == ind.SELL)
+
+        if total_score > 0.4 and buy_count >= 2:
+            return ind.BUY, 0.0
+        if total_score < -0.4 and sell_count >= 2:
+            return ind.SELL, 0.0
+        return ind.HOLD, 0.0
+
+
+class AdaptiveSignal:
+    """어댑티브 전략 (15분봉 시장 상황 + 시간대별 하위 전략 선택)"""
+
+    HIGH_VOLATILITY = 2
+    TRENDING = 1
+    RANGING = 0
+
+    def __init__(self, data, ticker):
+        bars = data.bars('minute15')
+        tr = ind.true_range(bars)
+        current_atr = tr.rolling(14).mean()
+        avg_atr = tr.rolling(50).mean()
+        relative_volatility = (current_atr / avg_atr).where(avg_atr > 0, 1.0)
+        ma20 = bars['close'].rolling(20).mean()
+        ma20_slope = (ma20 - ma20.shift(4)) / ma20.shift(4) * 100
+
+        condition = np.select(
+            [relative_volatility.to_numpy() > 1.5, np.abs(ma20_slope.to_numpy()) > 1.0],
+            [self.HIGH_VOLATILITY, self.TRENDING],
+            default=self.RANGING
+        )
+        # 50개 미만이면 횡보로 간주 (detect_market_condition 기본값)
+        condition[:49] = self.RANGING
+        self.condition = data.align(condition, 'minute15')
+        if data.interval != 'minute15':
+            self.condition = np.where(data.closed_positions('minute15') >= 0, self.condition, self.RANGING)
+
+        hours = np.asarray(pd.DatetimeIndex(data.end_times).hour)
+        # 시간대별 전략: 0=volatility, 1=rsi, 2=bollinger (get_time_based_strategy)
+        self.time_strategy = np.select(
+            [(hours >= 9) & (hours < 12), (hours >= 12) & (hours < 14), (hours >= 14) & (hours < 18),
+             (hours >= 18) & (hours < 22)],
+            [0, 1, 2, 0],
+            default=1
+        )
+
+        self.bollinger_high_vol = BollingerSignal(data, ticker, interval='minute15', window=20,
+                                                  buy_multiplier=2.5, sell_multiplier=2.5, rsi_interval='minute5')
+        self.bollinger = BollingerSignal(data, ticker, interval='minute15', window=20,
+                                         buy_multiplier=2.0, sell_multiplier=2.0, rsi_interval='minute5')
+        self.volatility_trend = VolatilitySignal(data, k=0.5)
+        self.volatility_ranging = VolatilitySignal(data, k=0.3)
+        self.rsi = RSISignal(data)
+
+    def signal_at(self, i, price, coin, avg_price):
+        condition = self.condition[i]
+        if condition == self.HIGH_VOLATILITY:
+            return self.bollinger_high_vol.signal_at(i, price, coin, avg_price)
+        if condition == self.TRENDING:
+            return self.volatility_trend.signal_at(i, price, coin, avg_price)
+
+        strategy = self.time_strategy[i]
+        if strategy == 0:
+            return self.volatility_ranging.signal_at(i, price, coin, avg_price)
+        if strategy == 2:
+            return self.bollinger.signal_at(i, price, coin, avg_price)
+        return self.rsi.signal_at(i, price, coin, avg_price)
+
+
+def create_signal_model(strategy_name, data, settings):
+    """봇 설정(settings dict)으로 백테스트 신호 모델 생성"""
+    ticker = settings.get('ticker', '')
+
+    if strategy_name == 'bollinger':
+        multiplier = settings.get('multiplier', 2.0)
+        interval = settings.get('interval') or data.interval
+        return BollingerSignal(data, ticker, interval, settings.get('window', 20), multiplier, multiplier)
+
+    elif strategy_name == 'bollinger_asymmetric':
+        interval = settings.get('interval') or data.interval
+        return BollingerSignal(data, ticker, interval, settings.get('window', 20),
+                               settings.get('buy_multiplier', 3.0), settings.get('sell_multiplier', 2.0))
+
+    elif strategy_name == 'rsi':
+        return RSISignal(data, settings.get('rsi_period', 14), settings.get('rsi_oversold', 30),
+                         settings.get('rsi_overbought', 70), settings.get('rsi_timeframe', 'minute15'))
+
+    elif strategy_name == 'volatility':
+        return VolatilitySignal(data, settings.get('k', 0.5), settings.get('target_profit', 3.0),
+                                settings.get('stop_loss', -2.0))
+
+    elif strategy_name == 'ensemble':
+        return EnsembleSignal(data, ticker)
+
+    elif strategy_name == 'adaptive':
+        return AdaptiveSignal(data, ticker)
+
+    raise ValueError(f"알 수 없는 전략: {strategy_name}")
@@ -0,0 +1,187 @@
+"""과거 데이터를 재생하는 모의 UpbitAPI
+
+UpbitAPI와 같은 메서드 이름/반환 형식을 제공하므로 전략과 봇 주문 규칙을 그대로 적용할 수 있습니다.
+주문은 현재 바 종가에 수수료와 슬리피지를 반영해 즉시 체결됩니다.
+"""
+import logging
+
+import pandas as pd
+
+MIN_ORDER_VALUE = 5000
+MIN_VOLUME = 0.00000001  # 업비트 최소 거래량
+DEFAULT_FEE_RATE = 0.0005  # 업비트 KRW 마켓 수수료 0.05%
+
+
+class SimulatedUpbitAPI:
+    """백테스트용 모의 UpbitAPI (현금/코인 잔고, 평균 매수가, 체결 기록 관리)"""
+
+    def __init__(self, market_data, ticker, initial_cash, fee_rate=DEFAULT_FEE_RATE, slippage=0.0, logger=None):
+        self.data = market_data
+        self.ticker = ticker
+        self.fee_rate = fee_rate
+        self.slippage = slippage
+        self.logger = logger or logging.getLogger(__name__)
+
+        self.cash = float(initial_cash)
+        self.coin = 0.0
+        self.avg_price = 0.0
+        self.cursor = 0
+        self.trades = []
+        self._order_seq = 0
+
+    # ------------------------------------------------------------------
+    # 재생 위치
+    # ------------------------------------------------------------------
+    def set_cursor(self, i):
+        """현재 시점을 기준 바 i로 이동"""
+        self.cursor = i
+
+    @property
+    def now(self):
+        """현재 시점 (기준 바 마감 시각)"""
+        return pd.Timestamp(self.data.end_times[self.cursor])
+
+    # ------------------------------------------------------------------
+    # 시세/잔고 조회 (UpbitAPI 호환)
+    # ------------------------------------------------------------------
+    def get_current_price(self, ticker):
+        return float(self.data.close[self.cursor])
+
+    def get_balance_cash(self):
+        return self.cash
+
+    def get_balance_coin(self, ticker):
+        return self.coin
+
+    def get_buy_avg(self, ticker):
+        return self.avg_price if self.coin > 0 else 0.0
+
+    def get_ohlcv_data(self, ticker, interval, count):
+        if not self.data.supports(interval):
+            return None
+        return self.data.window(interval, self.cursor, count).copy()
+
+    def get_candles_data(self, ticker, interval='minute5', count=200):
+        df = self.get_ohlcv_data(ticker, interval, count)
+        if df is None or len(df) == 0:
+            return []
+        return [{
+            'trade_price': row.close,
+            'high_price': row.high,
+            'low_price': row.low,
+            'opening_price': row.open,
+            'timestamp': idx,
+            'candle_acc_trade_volume': row.volume
+        } for idx, row in zip(df.index, df.itertuples(index=False))]
+
+    def get_orderbook(self, ticker):
+        # 과거 호가는 저장되어 있지 않으므로 호가 기반 필터는 건너뜁니다.
+        return None
+
+    def get_candles_from_ticker(self, ticker, interval="minute5", count=200):
+        return None
+
+    # ------------------------------------------------------------------
+    # 주문 (UpbitAPI 호환)
+    # ------------------------------------------------------------------
+    def _next_uuid(self):
+        self._order_seq += 1
+        return f"backtest-{self._order_seq}"
+
+    def _record(self, side, price, volume, amount, fee, reason, profit_loss=None):
+        trade = {
+            'time': self.now,
+            'side': side,
+            'price': price,
+            'volume': volume,
+            'amount': amount,
+            'fee': fee,
+            'reason': reason,
+            'profit_loss': profit_loss,
+            'cash_after': self.cash,
+            'coin_after': self.coin,
+        }
+        self.trades.append(trade)
+        return trade
+
+    def order_buy_market(self, ticker, buy_amount, reason='BUY'):
+        """시장가 매수 (주문 금액 + 수수료만큼 현금 차감)"""
+        if buy_amount < MIN_ORDER_VALUE:
+            return 0
+
+        fee = buy_amount * self.fee_rate
+        if buy_amount + fee > self.cash:
+            self.logger.debug(f"잔고 부족으로 매수 실패: 필요 {buy_amount + fee:,.0f}원 / 보유 {self.cash:,.0f}원")
+            return 0
+
+        fill_price = self.get_current_price(ticker) * (1 + self.slippage)
+        volume = buy_amount / fill_price
+
+        self.avg_price = (self.coin * self.avg_price + volume * fill_price) / (self.coin + volume)
+        self.coin += volume
+        self.cash -= buy_amount + fee
+
+        self._record('BUY', fill_price, volume, buy_amount, fee, reason)
+        return {'uuid': self._next_uuid(), 'side': 'bid', 'price': buy_amount, 'volume': volume}
+
+    def order_sell_market(self, ticker, volume, reason='SELL'):
+        """시장가 매도"""
+        volume = min(float(volume), self.coin)
+        if volume < MIN_VOLUME:
+            return 0
+
+        fill_price = self.get_current_price(ticker) * (1 - self.slippage)
+        amount = volume * fill_price
+        fee = amount * self.fee_rate
+        profit_loss = (fill_price - self.avg_price) / self.avg_price * 100 if self.avg_price else None
+
+        self.coin -= volume
+        self.cash += amount - fee
+        if self.coin < MIN_VOLUME:
+            self.coin = 0.0
+            self.avg_price = 0.0
+
+        self._record('SELL', fill_price, volume, amount, fee, reason, profit_loss)
+        return {'uuid': self._next_uuid(), 'side': 'ask', 'volume': volume}
+
+    def order_sell_market_partial(self, ticker, portion, reason='PARTIAL_SELL'):
+        """시장가 분할 매도 (UpbitAPI.order_sell_market_partial과 같은 최소 금액 규칙)"""
+        if portion <= 0 or portion > 1:
+            return {"error": {"name": "invalid_portion", "message": f"매도 비율 오류: {portion}"}}
+
+        volume = self.coin
+        if not volume or volume <= 0:
+            return {"error": {"name": "no_balance", "message": f"{ticker} 보유량이 없습니다."}}
+
+        current_price = self.get_current_price(ticker)
+        total_value = volume * current_price
+        sell_volume = volume * portion
+        estimated_value = sell_volume * current_price
+
+        if estimated_value < MIN_ORDER_VALUE and total_value < MIN_ORDER_VALUE:
+            return {"error": {"name": "insufficient_total_value", "message": "전체 보유 가치가 최소 매도 금액 미만"}}
+
+        if sell_volume < MIN_VOLUME:
+            return {"error": {"name": "too_small_volume", "message": f"매도 수량이 너무 적습니다: {sell_volume}"}}
+
+        if 10000 > total_value > MIN_ORDER_VALUE:
+            sell_volume = volume
+            estimated_value = sell_volume * current_price
+
+        if estimated_value < MIN_ORDER_VALUE + 3:
+            return {"error": {"name": "logic_error", "message": "최종 예상 주문 금액이 최소 주문 금액 미만"}}
+
+        res = self.order_sell_market(ticker, sell_volume, reason)
+        if res:
+            res['actual_sell_portion'] = sell_volume / volume
+            res['original_portion'] = portion
+        return res
+
+    # ------------------------------------------------------------------
+    # 평가
+    # ------------------------------------------------------------------
+    def equity(self, price=None):
+        """현재 평가 자산 (현금 + 코인 평가액)"""
+        if price is None:
+            price = self.get_current_price(self.ticker)
+        return self.cash + self.coin * price
@@ -0,0 +1,318 @@
+"""백테스트 파라미터 탐색 (그리드/랜덤/연속 절반 탐색)
+
+캔들 데이터는 한 번만 .npy 파일로 저장하고, 프로세스 풀의 각 워커는 np.load(mmap_mode='r')로
+같은 파일을 메모리 매핑하여 사용합니다. 작업마다 DataFrame을 피클링하지 않으므로 파라미터 조합만
+전달되고, 리샘플링된 상위 간격 캔들은 워커 프로세스 안에서 캐시됩니다.
+"""
+import itertools
+import json
+import math
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from app.backtest.data import MarketData, interval_minutes
+from app.backtest.engine import BacktestEngine
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+# 전략별 기본 탐색 공간 (TradingFavorite에서 사용자가 직접 정하던 값들)
+DEFAULT_PARAM_SPACES = {
+    'bollinger': {
+        'window': [10, 15, 20, 25, 30, 40],
+        'multiplier': [1.5, 1.75, 2.0, 2.25, 2.5, 3.0],
+    },
+    'bollinger_asymmetric': {
+        'window': [10, 15, 20, 25, 30],
+        'buy_multiplier': [2.0, 2.5, 3.0, 3.5],
+        'sell_multiplier': [1.5, 2.0, 2.5],
+    },
+    'volatility': {
+        'k': [0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8],
+        'target_profit': [2.0, 3.0, 4.0, 5.0],
+        'stop_loss': [-1.0, -2.0, -3.0],
+    },
+    'rsi': {
+        'rsi_period': [9, 14, 21],
+        'rsi_oversold': [20, 25, 30, 35],
+        'rsi_overbought': [65, 70, 75, 80],
+    },
+}
+
+SEARCH_METHODS = ('grid', 'random', 'halving')
+
+
+def _sharpe(result, summary):
+    """바 수익률 기준 연환산 샤프 비율"""
+    returns = result.equity.pct_change().dropna()
+    std = returns.std()
+    if not std or np.isnan(std):
+        return 0.0
+    minutes = interval_minutes(result.settings.get('data_interval', 'minute5'))
+    bars_per_year = 365 * 24 * 60 / minutes
+    return float(returns.mean() / std * math.sqrt(bars_per_year))
+
+
+def _calmar(result, summary):
+    """수익률 / 최대 낙폭"""
+    drawdown = abs(summary['max_drawdown'])
+    return summary['total_return'] / drawdown if drawdown else summary['total_return']
+
+
+OBJECTIVES = {
+    'total_return': lambda result, summary: summary['total_return'],
+    'excess_return': lambda result, summary: summary['total_return'] - summary['buy_and_hold_return'],
+    'sharpe': _sharpe,
+    'calmar': _calmar,
+    'win_rate': lambda result, summary: summary['win_rate'],
+}
+
+
+def parse_objectives(objective):
+    """'sharpe,total_return' 형태의 목적 함수 목록 파싱 (앞쪽이 우선순위)"""
+    names = [name.strip() for name in (objective or 'total_return').split(',') if name.strip()]
+    unknown = [name for name in names if name not in OBJECTIVES]
+    if unknown:
+        raise ValueError(f"알 수 없는 목적 함수: {unknown} (사용 가능: {sorted(OBJECTIVES)})")
+    return names
+
+
+def parse_param_spec(spec):
+    """파라미터 범위 문자열 파싱
+
+    'window=10:40:5' → window: [10, 15, ..., 40]
+    'multiplier=1.5,2,2.5' → multiplier: [1.5, 2.0, 2.5]
+    """
+    name, _, values = spec.partition('=')
+    if not name or not values:
+        raise ValueError(f"파라미터 형식 오류: {spec} (예: window=10:40:5)")
+
+    def number(text):
+        value = float(text)
+        return int(value) if value.is_integer() and '.' not in text else value
+
+    if ':' in values:
+        start, stop, step = (values.split(':') + ['1'])[:3]
+        start, stop, step = number(start), number(stop), number(step)
+        count = int(math.floor((stop - start) / step + 1e-9)) + 1
+        return name.strip(), [round(start + step * i, 10) for i in range(count)]
+    return name.strip(), [number(value) for value in values.split(',')]
+
+
+# ----------------------------------------------------------------------
+# 공유 캔들 데이터 (메모리 매핑)
+# ----------------------------------------------------------------------
+def save_shared_candles(df, directory):
+    """워커들이 메모리 매핑으로 읽을 수 있도록 OHLCV를 .npy 파일로 저장"""
+    np.save(os.path.join(directory, 'index.npy'), df.index.values.astype('datetime64[ns]').astype('int64'))
+    np.save(os.path.join(directory, 'ohlcv.npy'), np.ascontiguousarray(df[OHLCV_COLUMNS].to_numpy(dtype='float64')))
+    return directory
+
+
+def load_shared_candles(directory):
+    """메모리 매핑된 .npy 파일로 DataFrame 구성 (값 배열은 복사하지 않음)"""
+    index = np.load(os.path.join(directory, 'index.npy'), mmap_mode='r')
+    values = np.load(os.path.join(directory, 'ohlcv.npy'), mmap_mode='r')
+    return pd.DataFrame(values, index=pd.DatetimeIndex(np.asarray(index).astype('datetime64[ns]')),
+                        columns=OHLCV_COLUMNS, copy=False)
+
+
+# 워커 프로세스 상태 (initializer에서 한 번 설정)
+_worker = {}
+
+
+def _init_worker(shared_dir, interval, base_settings, engine_kwargs, objectives, min_trades):
+    _worker['data'] = MarketData(load_shared_candles(shared_dir), interval)
+    _worker['base_settings'] = base_settings
+    _worker['engine_kwargs'] = engine_kwargs
+    _worker['objectives'] = objectives
+    _worker['min_trades'] = min_trades
+
+
+def _evaluate(params, start):
+    """워커에서 파라미터 조합 하나를 백테스트"""
+    settings = dict(_worker['base_settings'], **params)
+    engine = BacktestEngine(_worker['data'], _worker['data'].interval, settings, **_worker['engine_kwargs'])
+    result = engine.run(start=start)
+    summary = result.summary()
+
+    scores = [float(OBJECTIVES[name](result, summary)) for name in _worker['objectives']]
+    eligible = summary['trades'] >= _worker['min_trades']
+    return {
+        'params': params,
+        'scores': dict(zip(_worker['objectives'], scores)),
+        'rank_key': scores if eligible else [float('-inf')] * len(scores),
+        'eligible': eligible,
+        'summary': summary,
+        'start': start,
+    }
+
+
+# ----------------------------------------------------------------------
+# 탐색
+# ----------------------------------------------------------------------
+def build_candidates(space, method, samples=None, seed=None):
+    """탐색 방법에 따른 후보 파라미터 조합 목록"""
+    names = list(space)
+    grid = [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+    if method == 'grid' or not samples or samples >= len(grid):
+        return grid
+    return random.Random(seed).sample(grid, samples)
+
+
+class ParameterSweep:
+    """프로세스 풀 기반 백테스트 파라미터 탐색"""
+
+    def __init__(self, df, interval, base_settings, space=None, method='grid', objective='total_return',
+                 samples=None, workers=None, min_trades=1, eta=3, seed=None, engine_kwargs=None,
+                 progress_callback=None):
+        strategy = base_settings.get('strategy', 'bollinger')
+        if method not in SEARCH_METHODS:
+            raise ValueError(f"알 수 없는 탐색 방법: {method} (사용 가능: {SEARCH_METHODS})")
+
+        self.space = space or DEFAULT_PARAM_SPACES.get(strategy)
+        if not self.space:
+            raise ValueError(f"{strategy} 전략은 탐색할 파라미터가 없습니다.")
+
+        self.df = df
+        self.interval = interval
+        self.base_settings = dict(base_settings, data_interval=interval)
+        self.method = method
+        self.objectives = parse_objectives(objective)
+        self.samples = samples
+        self.workers = workers or os.cpu_count() or 1
+        self.min_trades = min_trades
+        self.eta = max(2, int(eta))
+        self.seed = seed
+        self.engine_kwargs = engine_kwargs or {}
+        self.progress_callback = progress_callback
+
+        self.completed = 0
+        self.total = 0
+
+    def _rounds(self, candidates):
+        """연속 절반 탐색의 라운드별 (후보 수, 데이터 비율)"""
+        if self.method != 'halving':
+            return [(len(candidates), 1.0)]
+
+        rounds = max(0, int(math.floor(math.log(len(candidates), self.eta)))) if len(candidates) > 1 else 0
+        return [(max(1, math.ceil(len(candidates) / self.eta ** r)), 1.0 / self.eta ** (rounds - r))
+                for r in range(rounds + 1)]
+
+    def run(self):
+        """탐색 실행
+
+        Returns:
+            list: 목적 함수 기준 내림차순 정렬된 결과 행
+        """
+        candidates = build_candidates(self.space, self.method, self.samples, self.seed)
+        rounds = self._rounds(candidates)
+        self.total = sum(count for count, _ in rounds)
+
+        with tempfile.TemporaryDirectory(prefix='sweep_') as shared_dir:
+            save_shared_candles(self.df, shared_dir)
+            initargs = (shared_dir, self.interval, self.base_settings, self.engine_kwargs, self.objectives,
+                        self.min_trades)
+
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                     initargs=initargs) as pool:
+                results = []
+                for count, fraction in rounds:
+                    candidates = candidates[:count]
+                    # 짧은 예산 라운드는 최근 구간만 평가 (지표는 전체 히스토리로 계산되어 워밍업 불필요)
+                    start = len(self.df) - max(1, int(len(self.df) * fraction))
+                    results = self._evaluate_round(pool, candidates, start)
+                    candidates = [row['params'] for row in results]
+
+        return results
+
+    def _evaluate_round(self, pool, candidates, start):
+        futures = [pool.submit(_evaluate, params, start) for params in candidates]
+        results = []
+        for future in as_completed(futures):
+            results.append(future.result())
+            self.completed += 1
+            if self.progress_callback:
+                self.progress_callback(self.completed, self.total, results)
+
+        results.sort(key=lambda row: row['rank_key'], reverse=True)
+        return results
+
+
+# ----------------------------------------------------------------------
+# 결과 저장 (관리자 페이지에서 조회)
+# ----------------------------------------------------------------------
+def write_sweep_status(path, sweep_id, settings, status, completed=0, total=0, results=None, top=20, error=None,
+                       started_at=None):
+    """탐색 진행 상태/결과를 JSON 파일로 저장 (원자적 교체)"""
+    payload = {
+        'id': sweep_id,
+        'status': status,
+        'settings': settings,
+        'completed': completed,
+        'total': total,
+        'started_at': started_at,
+        'updated_at': datetime.now().isoformat(),
+        'error': error,
+        'results': [{key: row[key] for key in ('params', 'scores', 'eligible', 'summary')}
+                    for row in (results or [])[:top]],
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2, default=str)
+    os.replace(tmp_path, path)
+    return payload
+
+
+def list_sweeps(directory):
+    """저장된 탐색 결과 목록 (최신순)"""
+    if not os.path.isdir(directory):
+        return []
+
+    sweeps = []
+    for name in os.listdir(directory):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(directory, name), encoding='utf-8') as f:
+                sweeps.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return sorted(sweeps, key=lambda sweep: sweep.get('started_at') or '', reverse=True)
+
+
+def run_sweep_job(sweep_id, df, interval, base_settings, results_dir, top=20, status_interval=2.0, **sweep_kwargs):
+    """탐색을 실행하며 진행 상황을 results_dir/<sweep_id>.json에 기록"""
+    os.makedirs(results_dir, exist_ok=True)
+    path = os.path.join(results_dir, f"{sweep_id}.json")
+    started_at = datetime.now().isoformat()
+    settings = dict(base_settings, data_interval=interval, **{
+        key: value for key, value in sweep_kwargs.items() if key in ('method', 'objective', 'samples', 'space')
+    })
+    last_write = [0.0]
+
+    def on_progress(completed, total, results):
+        if time.time() - last_write[0] >= status_interval or completed == total:
+            last_write[0] = time.time()
+            ranked = sorted(results, key=lambda row: row['rank_key'], reverse=True)
+            write_sweep_status(path, sweep_id, settings, 'running', completed, total, ranked, top,
+                               started_at=started_at)
+
+    write_sweep_status(path, sweep_id, settings, 'running', started_at=started_at)
+    sweep = ParameterSweep(df, interval, base_settings, progress_callback=on_progress, **sweep_kwargs)
+    try:
+        results = sweep.run()
+    except Exception as e:
+        write_sweep_status(path, sweep_id, settings, 'failed', sweep.completed, sweep.total, error=str(e),
+                           started_at=started_at)
+        raise
+
+    write_sweep_status(path, sweep_id, settings, 'completed', sweep.completed, sweep.total, results, top,
+                       started_at=started_at)
+    return results
@@ -0,0 +1,239 @@
+"""벤치마크 케이스 정의
+
+각 케이스의 setup(context)는 (측정할 함수, 호출 횟수를 셀 FakeUpbitAPI 또는 None)을 반환합니다.
+전략 케이스는 호출마다 픽스처의 최근 구간을 한 바씩 이동하며 신호를 계산하므로
+캔들 모양에 따라 달라지는 분기(매수 지연 확인, 다이버전스 등)도 고르게 측정됩니다.
+"""
+import itertools
+import os
+
+import numpy as np
+
+from app.backtest import indicators as ind
+from app.backtest.engine import ReplaySignalProvider
+from app.benchmark.fake_api import FakeUpbitAPI
+from app.benchmark.fixtures import make_orderbook, write_log_fixture
+
+STRATEGY_SPAN = 240  # 전략 케이스가 순환하는 최근 바 수
+DEFAULT_TICKER = 'KRW-BTC'
+
+STRATEGY_SETTINGS = {
+    'bollinger': {'interval': 'minute5', 'window': 20, 'multiplier': 2.0},
+    'bollinger_asymmetric': {'interval': 'minute5', 'window': 20, 'buy_multiplier': 3.0, 'sell_multiplier': 2.0},
+    'rsi': {'rsi_period': 14, 'rsi_oversold': 30, 'rsi_overbought': 70, 'rsi_timeframe': 'minute15'},
+    'volatility': {'k': 0.5, 'target_profit': 3.0, 'stop_loss': -2.0},
+    'adaptive': {},
+    'ensemble': {},
+}
+
+
+class BenchmarkContext:
+    """케이스 공용 입력 (픽스처 캔들, 로거, 임시 디렉터리)"""
+
+    def __init__(self, df, interval, logger, work_dir):
+        self.df = df
+        self.interval = interval
+        self.logger = logger
+        self.work_dir = work_dir
+
+    def api(self):
+        return FakeUpbitAPI(self.df, self.interval, DEFAULT_TICKER, logger=self.logger)
+
+
+class BenchmarkCase:
+    """이름/그룹/준비 함수 묶음"""
+
+    def __init__(self, name, group, setup, description=''):
+        self.name = name
+        self.group = group
+        self.setup = setup
+        self.description = description
+
+
+def _cycling(api, call):
+    """호출마다 커서를 최근 STRATEGY_SPAN 구간 안에서 한 바씩 이동"""
+    positions = itertools.cycle(range(max(0, len(api.data) - STRATEGY_SPAN), len(api.data)))
+
+    def run():
+        api.set_cursor(next(positions))
+        return call()
+    return run
+
+
+# ----------------------------------------------------------------------
+# 전략
+# ----------------------------------------------------------------------
+def _strategy_signal(strategy_name):
+    def setup(ctx):
+        api = ctx.api()
+        settings = dict(STRATEGY_SETTINGS[strategy_name], ticker=DEFAULT_TICKER, strategy=strategy_name)
+        provider = ReplaySignalProvider(strategy_name, api, settings, ctx.logger)
+        return _cycling(api, lambda: provider.signal_at(api.cursor, None, api.coin, api.avg_price)), api
+    return setup
+
+
+def _volume_sell_pressure(ctx):
+    from app.strategy.volume_base_buy import VolumeBasedBuyStrategy
+
+    api = ctx.api()
+    strategy = VolumeBasedBuyStrategy(api, ctx.logger)
+    return _cycling(api, lambda: strategy.analyze_sell_pressure(DEFAULT_TICKER)), api
+
+
+def _volume_market_sentiment(ctx):
+    from app.strategy.volume_base_buy import VolumeBasedBuyStrategy
+
+    api = ctx.api()
+    strategy = VolumeBasedBuyStrategy(api, ctx.logger)
+    return _cycling(api, lambda: strategy.get_market_sentiment(DEFAULT_TICKER)), api
+
+
+def _selling_pressure_delay_buy(ctx):
+    from app.strategy.rsi_selling_pressure import RSIVolumeIntegratedStrategy
+
+    api = ctx.api()
+    strategy = RSIVolumeIntegratedStrategy(api, ctx.logger)
+    return _cycling(api, lambda: strategy.should_delay_buy_gradual_approach(DEFAULT_TICKER)), api
+
+
+def _selling_pressure_sell_strength(ctx):
+    from app.strategy.rsi_selling_pressure import RSIVolumeIntegratedStrategy
+
+    api = ctx.api()
+    strategy = RSIVolumeIntegratedStrategy(api, ctx.logger)
+
+    def call():
+        price = api.get_current_price(DEFAULT_TICKER)
+        return strategy.get_sell_signal_strength(DEFAULT_TICKER, price, price * 0.99, 'minute5')
+    return _cycling(api, call), api
+
+
+# ----------------------------------------------------------------------
+# 지표
+# ----------------------------------------------------------------------
+def _live_rsi(ctx):
+    from app.strategy.rsi import RSIStrategy
+
+    strategy = RSIStrategy(None, ctx.logger)
+    prices = ctx.df['close'].iloc[-200:]
+    return lambda: strategy.calculate_rsi(prices, 14), None
+
+
+def _live_bollinger(ctx):
+    from app.strategy.bollinger import BollingerBandsStrategy
+
+    strategy = BollingerBandsStrategy(None, ctx.logger)
+    prices = ctx.df['close'].iloc[-25:]
+    return lambda: strategy.get_bollinger_bands(prices, 20, 2.0), None
+
+
+def _vector_rsi(ctx):
+    close = ctx.df['close']
+    return lambda: ind.rsi(close, 14), None
+
+
+def _vector_bollinger(ctx):
+    close = ctx.df['close']
+    return lambda: ind.bollinger_bands(close, 20, 2.0, 2.0), None
+
+
+def _batch_bands_panel(ctx):
+    from app.strategy.batch import compute_bands_panel, compute_signals
+
+    rng = np.random.default_rng(0)
+    panel = 50000 * np.exp(np.cumsum(rng.normal(0, 0.002, (100, 20)), axis=1))
+    prices = panel[:, -1] * (1 + rng.normal(0, 0.01, 100))
+
+    def call():
+        upper, lower = compute_bands_panel(panel, 3.0, 2.0)
+        return compute_signals(prices, upper, lower)
+    return call, None
+
+
+def _orderbook_depth(ctx):
+    from app.utils.orderbook import OrderbookDepth
+
+    orderbook = make_orderbook(DEFAULT_TICKER, float(ctx.df['close'].iloc[-1]))
+
+    def call():
+        depth = OrderbookDepth.from_orderbook(orderbook)
+        return depth.summary(), depth.estimate_buy(1000000)
+    return call, None
+
+
+# ----------------------------------------------------------------------
+# 유틸리티
+# ----------------------------------------------------------------------
+def _cache_hit(ctx):
+    from app.utils.caching import cache_with_timeout
+
+    @cache_with_timeout(seconds=3600, max_size=100)
+    def benchmark_cached_hit(ticker, count=200):
+        return ticker
+
+    benchmark_cached_hit(DEFAULT_TICKER, count=200)
+    return lambda: benchmark_cached_hit(DEFAULT_TICKER, count=200), None
+
+
+def _cache_miss(ctx):
+    from app.utils.caching import cache_with_timeout
+
+    @cache_with_timeout(seconds=3600, max_size=100)
+    def benchmark_cached_miss(key):
+        return key
+
+    # 매번 새 키라 가득 찬 캐시에서 가장 오래된 항목을 제거하는 경로까지 측정
+    keys = itertools.count()
+    return lambda: benchmark_cached_miss(next(keys)), None
+
+
+def _log_fixture(ctx):
+    path = os.path.join(ctx.work_dir, 'benchmark.log')
+    if not os.path.exists(path):
+        write_log_fixture(path)
+    return path
+
+
+def _routes_tail_file(ctx):
+    from app.routes import tail_file
+
+    path = _log_fixture(ctx)
+    return lambda: tail_file(path, 100), None
+
+
+def _websocket_tail_file(ctx):
+    from app.websocket_handlers import tail_file
+
+    path = _log_fixture(ctx)
+    return lambda: tail_file(path, 100), None
+
+
+def _parse_log_line(ctx):
+    from app.websocket_handlers import parse_log_line
+
+    with open(_log_fixture(ctx), encoding='utf-8') as f:
+        lines = itertools.cycle([line.strip() for line in itertools.islice(f, 1000)])
+    return lambda: parse_log_line(next(lines)), None
+
+
+CASES = [
+    *(BenchmarkCase(f'strategy.{name}', 'strategy', _strategy_signal(name), f'{name} 신호 생성')
+      for name in STRATEGY_SETTINGS),
+    BenchmarkCase('strategy.volume_base_buy.sell_pressure', 'strategy', _volume_sell_pressure, '호가 매도 압력 분석'),
+    BenchmarkCase('strategy.volume_base_buy.market_sentiment', 'strategy', _volume_market_sentiment, '호가 시장 심리'),
+    BenchmarkCase('strategy.rsi_selling_pressure.delay_buy', 'strategy', _selling_pressure_delay_buy,
+                  '급락 시 매수 지연 판단'),
+    BenchmarkCase('strategy.rsi_selling_pressure.sell_strength', 'strategy', _selling_pressure_sell_strength,
+                  '매도 신호 강도'),
+    BenchmarkCase('indicator.live_rsi', 'indicator', _live_rsi, 'RSIStrategy.calculate_rsi (200개)'),
+    BenchmarkCase('indicator.live_bollinger', 'indicator', _live_bollinger, 'get_bollinger_bands (window 20)'),
+    BenchmarkCase('indicator.vector_rsi', 'indicator', _vector_rsi, '백테스트 RSI (픽스처 전체)'),
+    BenchmarkCase('indicator.vector_bollinger', 'indicator', _vector_bollinger, '백테스트 볼린저 밴드 (픽스처 전체)'),
+    BenchmarkCase('indicator.batch_bands_panel', 'indicator', _batch_bands_panel, '100개 티커 밴드 배치 계산'),
+    BenchmarkCase('indicator.orderbook_depth', 'indicator', _orderbook_depth, '호가 깊이 분석 + 매수 슬리피지 추정'),
+    BenchmarkCase('utils.cache_with_timeout.hit', 'utils', _cache_hit, '캐시 적중'),
+    BenchmarkCase('utils.cache_with_timeout.miss', 'utils', _cache_miss, '캐시 미스 + 제거'),
+    BenchmarkCase('utils.routes.tail_file', 'utils', _routes_tail_file, '로그 마지막 100줄 (역방향 읽기)'),
+    BenchmarkCase('utils.websocket.tail_file', 'utils', _websocket_tail_file, '로그 마지막 100줄 (전체 읽기)'),
+    BenchmarkCase('utils.websocket.parse_log_line', 'utils', _parse_log_line, '로그 라인 파싱'),
+]
@@ -0,0 +1,56 @@
+"""호출 횟수를 세는 벤치마크용 UpbitAPI
+
+백테스트 모의 API(SimulatedUpbitAPI)를 그대로 재사용하고, 과거 데이터가 없는 호가/캔들 목록 조회만
+합성 데이터로 채웁니다. 실제 UpbitAPI와 마찬가지로 내부에서 다른 조회 메서드를 부르면 각각 집계됩니다.
+"""
+from collections import Counter
+
+from app.backtest.data import MarketData
+from app.backtest.simulated_api import SimulatedUpbitAPI
+from app.benchmark.fixtures import make_orderbook
+
+# 집계 대상 (UpbitAPI 공개 조회/주문 메서드)
+COUNTED_METHODS = (
+    'get_current_price', 'get_balance_cash', 'get_balance_coin', 'get_buy_avg', 'get_ohlcv_data',
+    'get_candles_data', 'get_candles_from_ticker', 'get_orderbook',
+    'order_buy_market', 'order_sell_market', 'order_sell_market_partial',
+)
+
+
+class FakeUpbitAPI(SimulatedUpbitAPI):
+    """메서드별 호출 횟수를 기록하는 모의 API"""
+
+    def __init__(self, df, interval, ticker='KRW-BTC', initial_cash=1000000, logger=None):
+        super().__init__(MarketData(df, interval), ticker, initial_cash, logger=logger)
+        self.calls = Counter()
+        self.cursor = len(df) - 1
+
+        for name in COUNTED_METHODS:
+            setattr(self, name, self._counted(name, getattr(self, name)))
+
+    def _counted(self, name, method):
+        def wrapper(*args, **kwargs):
+            self.calls[name] += 1
+            return method(*args, **kwargs)
+        return wrapper
+
+    def reset_calls(self):
+        self.calls.clear()
+
+    def get_orderbook(self, ticker):
+        return make_orderbook(ticker, float(self.data.close[self.cursor]), seed=self.cursor)
+
+    def get_candles_from_ticker(self, ticker, interval="minute5", count=200):
+        df = self.data.window(interval, self.cursor, count) if self.data.supports(interval) else None
+        if df is None or len(df) == 0:
+            return None
+        # UpbitAPI와 같이 최신 캔들이 먼저 오도록 역순
+        return [{
+            'candle_date_time_kst': idx.strftime('%Y-%m-%dT%H:%M:%S'),
+            'opening_price': float(row.open),
+            'high_price': float(row.high),
+            'low_price': float(row.low),
+            'trade_price': float(row.close),
+            'candle_acc_trade_volume': float(row.volume),
+            'timestamp': int(idx.timestamp() * 1000)
+        } for idx, row in zip(df.index[::-1], df.iloc[::-1].itertuples(index=False))]
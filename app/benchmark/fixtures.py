@@ -0,0 +1,81 @@
+"""벤치마크용 캔들/호가/로그 픽스처
+
+합성 픽스처는 시드가 고정된 랜덤 워크라 실행마다 같은 데이터가 만들어집니다.
+실제 시세로 측정하려면 `python benchmark.py record`로 받은 CSV(백테스트와 같은 형식)를 사용합니다.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from app.backtest.data import load_ohlcv
+
+SYNTHETIC = 'synthetic'
+DEFAULT_FIXTURE_DAYS = 4  # 일봉 2개 + 15분봉 RSI 구간을 충분히 덮는 기간
+LOG_LEVELS = ('INFO', 'INFO', 'INFO', 'DEBUG', 'WARNING', 'ERROR')
+
+
+def synthetic_candles(bars=DEFAULT_FIXTURE_DAYS * 24 * 60, seed=42, start='2024-01-01 09:00', price=50000000):
+    """1분봉 합성 OHLCV (변동성 구간이 섞인 랜덤 워크)"""
+    rng = np.random.default_rng(seed)
+    volatility = np.where(rng.random(bars) < 0.1, 0.004, 0.0012)
+    close = price * np.exp(np.cumsum(rng.normal(0, volatility)))
+    open_ = np.r_[price, close[:-1]]
+    high = np.maximum(open_, close) * (1 + rng.random(bars) * 0.001)
+    low = np.minimum(open_, close) * (1 - rng.random(bars) * 0.001)
+    volume = rng.gamma(2.0, 0.5, bars)
+
+    index = pd.date_range(start, periods=bars, freq='1min')
+    return pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume,
+                         'value': volume * close}, index=index)
+
+
+def load_fixture(fixture=SYNTHETIC, seed=42):
+    """픽스처 이름('synthetic') 또는 녹화한 CSV 경로로 (DataFrame, 캔들 간격) 반환
+
+    녹화 CSV의 간격은 인덱스 간격에서 추정합니다.
+    """
+    if fixture == SYNTHETIC:
+        return synthetic_candles(seed=seed), 'minute1'
+
+    if not os.path.isfile(fixture):
+        raise ValueError(f"픽스처 파일을 찾을 수 없습니다: {fixture}")
+    df = load_ohlcv(fixture)
+    minutes = int(pd.Series(df.index).diff().dropna().min().total_seconds() // 60)
+    return df, f'minute{minutes}'
+
+
+def make_orderbook(ticker, price, depth=15, seed=0):
+    """pyupbit.get_orderbook 형식의 합성 호가"""
+    rng = np.random.default_rng(seed)
+    tick = max(price * 0.0001, 1)
+    ask_sizes = rng.gamma(2.0, 0.3, depth)
+    bid_sizes = rng.gamma(2.0, 0.3, depth)
+    units = [{
+        'ask_price': price + tick * (level + 1),
+        'bid_price': price - tick * level,
+        'ask_size': float(ask_sizes[level]),
+        'bid_size': float(bid_sizes[level]),
+    } for level in range(depth)]
+    return {
+        'market': ticker,
+        'timestamp': 0,
+        'total_ask_size': float(ask_sizes.sum()),
+        'total_bid_size': float(bid_sizes.sum()),
+        'orderbook_units': units,
+    }
+
+
+def write_log_fixture(path, lines=20000, seed=0):
+    """setup_logger 형식('%(asctime)s - %(levelname)s - %(message)s')의 로그 파일 생성"""
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp('2024-01-01 09:00:00')
+    levels = rng.integers(0, len(LOG_LEVELS), lines)
+    prices = 50000000 + rng.normal(0, 100000, lines).round()
+
+    with open(path, 'w', encoding='utf-8') as f:
+        for n in range(lines):
+            timestamp = (start + pd.Timedelta(seconds=n * 10)).strftime('%Y-%m-%d %H:%M:%S,%f')[:-3]
+            f.write(f"{timestamp} - {LOG_LEVELS[levels[n]]} - KRW-BTC 현재가: {prices[n]:,.0f}원, "
+                    f"신호: HOLD <볼린저 밴드 내부>\n")
+    return path
@@ -0,0 +1,166 @@
+"""벤치마크 실행, 기준선 저장 및 회귀 비교"""
+import json
+import logging
+import os
+import platform
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from fnmatch import fnmatch
+
+from app.benchmark.cases import CASES, STRATEGY_SPAN, BenchmarkContext
+from app.benchmark.fixtures import SYNTHETIC, load_fixture
+
+DEFAULT_REPEAT = 5
+DEFAULT_MIN_TIME = 0.2  # 라운드당 최소 측정 시간 (초)
+DEFAULT_LATENCY_THRESHOLD = 0.25  # 중앙값이 25% 이상 느려지면 회귀
+DEFAULT_NOISE_FLOOR_US = 5.0  # 이보다 작은 절대 증가는 측정 오차로 간주
+
+
+def _quiet_logger():
+    """전략 로그가 측정을 방해하지 않도록 출력 없는 로거"""
+    logger = logging.getLogger('benchmark')
+    logger.handlers = [logging.NullHandler()]
+    logger.propagate = False
+    logger.setLevel(logging.WARNING)
+    return logger
+
+
+def select_cases(patterns=None):
+    """이름/그룹 패턴(fnmatch)으로 케이스 선택"""
+    if not patterns:
+        return list(CASES)
+    return [case for case in CASES
+            if any(fnmatch(case.name, pattern) or fnmatch(case.group, pattern) for pattern in patterns)]
+
+
+def measure(func, api=None, repeat=DEFAULT_REPEAT, min_time=DEFAULT_MIN_TIME):
+    """호출당 지연(µs)과 API 호출 수 측정
+
+    timeit.autorange처럼 라운드 시간이 min_time을 넘는 반복 횟수를 먼저 정한 뒤 repeat 라운드를 측정합니다.
+    API 호출 수는 반복 횟수와 무관하게 비교할 수 있도록 커서 한 주기(STRATEGY_SPAN회) 동안 따로 셉니다.
+    """
+    func()  # 워밍업 (지연 임포트, 리샘플링 캐시 등)
+
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        if time.perf_counter() - started >= min_time or number >= 1 << 20:
+            break
+        number *= 2
+
+    rounds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        rounds.append((time.perf_counter() - started) / number * 1e6)
+
+    api_calls = {}
+    if api is not None:
+        api.reset_calls()
+        for _ in range(STRATEGY_SPAN):
+            func()
+        api_calls = {name: round(count / STRATEGY_SPAN, 4) for name, count in sorted(api.calls.items())}
+
+    return {
+        'number': number,
+        'repeat': repeat,
+        'min_us': round(min(rounds), 3),
+        'median_us': round(statistics.median(rounds), 3),
+        'mean_us': round(statistics.mean(rounds), 3),
+        'max_us': round(max(rounds), 3),
+        'api_calls': api_calls,
+        'api_calls_total': round(sum(api_calls.values()), 4),
+    }
+
+
+def run_benchmarks(patterns=None, fixture=SYNTHETIC, repeat=DEFAULT_REPEAT, min_time=DEFAULT_MIN_TIME,
+                   progress=None):
+    """선택한 케이스를 실행하고 결과 dict 반환 (실패한 케이스는 error로 기록)"""
+    df, interval = load_fixture(fixture)
+    logger = _quiet_logger()
+    results = {}
+
+    with tempfile.TemporaryDirectory(prefix='benchmark_') as work_dir:
+        context = BenchmarkContext(df, interval, logger, work_dir)
+        for case in select_cases(patterns):
+            try:
+                func, api = case.setup(context)
+                results[case.name] = dict(measure(func, api, repeat, min_time), group=case.group,
+                                          description=case.description)
+            except Exception as e:
+                results[case.name] = {'group': case.group, 'description': case.description, 'error': str(e)}
+            if progress:
+                progress(case.name, results[case.name])
+
+    return {
+        'created_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'fixture': fixture,
+        'fixture_bars': len(df),
+        'cases': results,
+    }
+
+
+def save_results(results, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_results(baseline, current, latency_threshold=DEFAULT_LATENCY_THRESHOLD,
+                    noise_floor_us=DEFAULT_NOISE_FLOOR_US):
+    """기준선 대비 변화 비교
+
+    Returns:
+        list: 케이스별 {'name', 'status', 'baseline_us', 'current_us', 'change', 'api_changes'}
+              status는 'regression' / 'improved' / 'ok' / 'new' / 'missing' / 'error'
+    """
+    rows = []
+    base_cases = baseline.get('cases', {})
+    current_cases = current.get('cases', {})
+
+    for name in sorted(set(base_cases) | set(current_cases)):
+        base, cur = base_cases.get(name), current_cases.get(name)
+        row = {'name': name, 'baseline_us': None, 'current_us': None, 'change': None, 'api_changes': {}}
+
+        if cur is None:
+            rows.append(dict(row, status='missing'))
+            continue
+        if 'error' in cur:
+            rows.append(dict(row, status='error', error=cur['error']))
+            continue
+        if base is None or 'error' in base:
+            rows.append(dict(row, status='new', current_us=cur['median_us']))
+            continue
+
+        base_us, cur_us = base['median_us'], cur['median_us']
+        change = (cur_us - base_us) / base_us if base_us else 0.0
+        api_changes = {
+            method: (base['api_calls'].get(method, 0), cur['api_calls'].get(method, 0))
+            for method in set(base['api_calls']) | set(cur['api_calls'])
+            if cur['api_calls'].get(method, 0) != base['api_calls'].get(method, 0)
+        }
+
+        slower = change > latency_threshold and cur_us - base_us > noise_floor_us
+        more_calls = any(after > before for before, after in api_changes.values())
+        if slower or more_calls:
+            status = 'regression'
+        elif change < -latency_threshold and base_us - cur_us > noise_floor_us:
+            status = 'improved'
+        else:
+            status = 'ok'
+
+        rows.append(dict(row, status=status, baseline_us=base_us, current_us=cur_us, change=round(change, 4),
+                         api_changes=api_changes))
+    return rows
@@ -0,0 +1,178 @@
+"""
+봇 설정 컴파일
+
+봇 설정은 WTForms 폼, 즐겨찾기에서 만든 딕셔너리, 일반 객체 등 여러 형태로 들어옵니다.
+봇 생성 시 한 번만 값을 꺼내 형 변환/검증한 뒤 전략별 읽기 전용 설정 객체로 만들어 두므로,
+거래 사이클에서는 속성만 읽고 잘못된 설정은 거래 도중이 아니라 봇 시작 시점에 드러납니다.
+"""
+from config import Config
+
+
+def _field_value(field):
+    """폼 필드(.data)나 일반 값에서 실제 값 추출"""
+    return field.data if hasattr(field, 'data') else field
+
+
+def _read(args, name):
+    """딕셔너리/객체 설정에서 값 조회 (없으면 None)"""
+    if isinstance(args, dict):
+        return _field_value(args.get(name))
+    return _field_value(getattr(args, name, None))
+
+
+def _to_int(value):
+    return int(float(value)) if isinstance(value, str) else int(value)
+
+
+def _to_str(value):
+    return str(value).strip()
+
+
+def _to_yn(value):
+    value = str(value).strip().upper()
+    if value not in ('Y', 'N'):
+        raise ValueError("'Y' 또는 'N'이어야 합니다")
+    return value
+
+
+def _non_negative(convert):
+    def _convert(value):
+        value = convert(value)
+        if value < 0:
+            raise ValueError("0 이상이어야 합니다")
+        return value
+    return _convert
+
+
+def _positive(convert):
+    def _convert(value):
+        value = convert(value)
+        if value <= 0:
+            raise ValueError("0보다 커야 합니다")
+        return value
+    return _convert
+
+
+class BotConfig:
+    """모든 전략 공통 봇 설정 (읽기 전용)
+
+    FIELDS: (이름, 변환 함수, 기본값) - 값이 없거나 빈 문자열이면 기본값 사용 (기본값 None은 필수 항목)
+    """
+
+    FIELDS = (
+        ('ticker', _to_str, None),
+        ('strategy', _to_str, 'bollinger'),
+        ('user_id', lambda value: value, None),
+        ('buy_amount', _non_negative(_to_int), 0),
+        ('min_cash', _non_negative(_to_int), 0),
+        ('max_order_amount', _non_negative(_to_int), 0),
+        ('sell_portion', _positive(float), 1.0),
+        ('prevent_loss_sale', _to_yn, 'Y'),
+        ('long_term_investment', _to_yn, 'N'),
+        ('sleep_time', _positive(_to_int), 60),
+        ('interval', _to_str, 'minute5'),
+        ('trigger_mode', _to_str, Config.SCHEDULER_TRIGGER_MODE),
+    )
+    __slots__ = tuple(name for name, _, _ in FIELDS)
+
+    # 필수가 아닌데 기본값이 None인 항목
+    OPTIONAL = ('user_id',)
+
+    def __init__(self, args):
+        errors = []
+        for name, convert, default in self._all_fields():
+            value = _read(args, name)
+            if value is None or value == '':
+                if default is None and name not in self.OPTIONAL:
+                    errors.append(f"{name}: 값이 없습니다")
+                object.__setattr__(self, name, default)
+                continue
+            try:
+                object.__setattr__(self, name, convert(value))
+            except (TypeError, ValueError) as e:
+                errors.append(f"{name}={value!r}: {e}")
+
+        if errors:
+            raise ValueError(f"봇 설정 오류 ({type(self).__name__}): {', '.join(errors)}")
+
+    @classmethod
+    def _all_fields(cls):
+        """상위 클래스 공통 항목 + 전략별 항목"""
+        fields = []
+        for klass in reversed(cls.__mro__):
+            fields.extend(klass.__dict__.get('FIELDS', ()))
+        return fields
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"봇 설정은 변경할 수 없습니다: {name}")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"봇 설정은 변경할 수 없습니다: {name}")
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name, _, _ in self._all_fields()}
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()})"
+
+
+class VolatilityBotConfig(BotConfig):
+    """변동성 돌파 전략 설정"""
+
+    FIELDS = (
+        ('k', _positive(float), 0.5),
+        ('target_profit', float, 3.0),
+        ('stop_loss', float, -2.0),
+    )
+    __slots__ = tuple(name for name, _, _ in FIELDS)
+
+
+class RsiBotConfig(BotConfig):
+    """RSI 전략 설정"""
+
+    FIELDS = (
+        ('rsi_period', _positive(_to_int), 14),
+        ('rsi_oversold', float, 30.0),
+        ('rsi_overbought', float, 70.0),
+        ('rsi_timeframe', _to_str, 'minute15'),
+    )
+    __slots__ = tuple(name for name, _, _ in FIELDS)
+
+    def __init__(self, args):
+        super().__init__(args)
+        if self.rsi_oversold >= self.rsi_overbought:
+            raise ValueError(f"봇 설정 오류 (RsiBotConfig): 과매도 기준({self.rsi_oversold})이 "
+                             f"과매수 기준({self.rsi_overbought}) 이상입니다")
+
+
+class BollingerBotConfig(BotConfig):
+    """볼린저 밴드 / 비대칭 볼린저 밴드 전략 설정"""
+
+    FIELDS = (
+        ('window', _positive(_to_int), 20),
+        ('multiplier', _positive(float), 2.0),
+        ('buy_multiplier', _positive(float), 2.0),
+        ('sell_multiplier', _positive(float), 2.0),
+    )
+    __slots__ = tuple(name for name, _, _ in FIELDS)
+
+
+# 전략별 설정 클래스 (적응형/앙상블은 내부에서 자체 파라미터 사용, 그 외는 볼린저 밴드로 거래)
+CONFIG_CLASSES = {
+    'volatility': VolatilityBotConfig,
+    'rsi': RsiBotConfig,
+    'adaptive': BotConfig,
+    'ensemble': BotConfig,
+}
+
+
+def compile_bot_config(args):
+    """봇 설정을 전략별 읽기 전용 설정 객체로 변환 (이미 변환된 설정은 그대로 반환)
+
+    Raises:
+        ValueError: 필수 항목 누락 또는 형 변환/검증 실패
+    """
+    if isinstance(args, BotConfig):
+        return args
+    strategy = _read(args, 'strategy') or 'bollinger'
+    return CONFIG_CLASSES.get(strategy, BollingerBotConfig)(args)
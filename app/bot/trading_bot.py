@@ -1,5 +1,15 @@
 from flask_login import current_user
 from app.utils.scheduler_manager import scheduler_manager
+from app.strategy.batch import batch_evaluator
+from app.utils.signal_bus import signal_bus
+from app.utils.prefetch import begin_cycle, end_cycle
+from app.utils.scheduler_metrics import cycle_phase, mark_phase, timed_phase
+from app.utils.execution_lanes import in_lane
+from app.utils.load_shedder import load_shedder
+from app.utils.high_water_mark import high_water_marks, position_key
+from app.bot.bot_config import compile_bot_config
+from app.utils.cadence_controller import (compute_volatility, volatility_regime, regime_interval, VOLATILITY_INTERVAL,
+                                          VOLATILITY_BARS)
 
 from app.utils.telegram_utils import TelegramNotifier
 
@@ -41,28 +51,35 @@ from app.utils.shared import trading_bots, lock  # 공유 자원 가져오기
 
 shutdown_event = threading.Event()  # 글로벌 종료 이벤트 정의
 
+# 손익 관리(손절/익절)가 적용되는 전략 - 캔들 마감 모드의 캔들 간 체크 대상
+EXIT_MANAGED_STRATEGIES = ('bollinger', 'bollinger_asymmetric')
+
 
 class UpbitTradingBot:
     """업비트 자동 거래 봇 클래스"""
 
     def __init__(self, args, upbit_api, strategy, logger, username=None):
-        """초기화"""
+        """초기화
+
+        Raises:
+            ValueError: 설정 누락 또는 형 변환/검증 실패 (거래 사이클 전에 봇 생성 시점에 발생)
+        """
         self.args = args
+        # 설정은 생성 시 한 번만 읽어 전략별 읽기 전용 설정으로 변환 (사이클에서는 속성만 조회)
+        self.config = compile_bot_config(args)
         self.api = upbit_api
         self.strategy = strategy
         self.logger = logger
         self.username = username
         self.job_id = None
         self.is_running = False
+        # 신호 사이클과 캔들 간 손절/익절 체크가 같은 포지션을 동시에 매도하지 않도록 직렬화
+        self._cycle_lock = threading.RLock()
 
         # 사용자 ID 확인 및 저장
-        self.user_id = None
-        if hasattr(args, 'user_id'):
-            self.user_id = args.user_id
-            self.logger.info(f"봇 초기화: 사용자 ID {self.user_id} (객체 속성)")
-        elif isinstance(args, dict) and 'user_id' in args:
-            self.user_id = args['user_id']
-            self.logger.info(f"봇 초기화: 사용자 ID {self.user_id} (딕셔너리)")
+        self.user_id = self.config.user_id
+        if self.user_id is not None:
+            self.logger.info(f"봇 초기화: 사용자 ID {self.user_id} ({type(self.config).__name__})")
 
         # 텔레그램 알림 초기화
         self.telegram_enabled = Config.TELEGRAM_NOTIFICATIONS_ENABLED
@@ -96,50 +113,24 @@ class UpbitTradingBot:
         except Exception as e:
             self.logger.error(f"텔레그램 거래 알림 전송 중 오류: {str(e)}")
 
-    def _get_field_value(self, field, default=None):
-        """폼 필드나 딕셔너리 값을 안전하게 추출"""
-        if field is None:
-            return default
-
-        # WTForms 필드인 경우
-        if hasattr(field, 'data'):
-            value = field.data
-        else:
-            # 일반 값인 경우
-            value = field
-
-        # 문자열인 경우 정수로 변환 시도
-        if isinstance(value, str) and value.isdigit():
-            try:
-                return int(value)
-            except ValueError:
-                return default
-
-        return value
-
     def calculate_dynamic_sleep_time(self, ticker, base_sleep_time):
         """변동성 기반 동적 거래 간격 계산"""
         try:
             # 최근 1시간 데이터로 변동성 계산
-            df = self.api.get_ohlcv_data(ticker, 'minute5', 12)  # 5분봉 12개 = 1시간
-            if df is None or len(df) < 2:
+            df = self.api.get_ohlcv_data(ticker, VOLATILITY_INTERVAL, VOLATILITY_BARS)  # 5분봉 12개 = 1시간
+            volatility = compute_volatility(df)
+            if volatility is None:
                 return base_sleep_time
 
-            # 변동성 계산 (표준편차)
-            price_changes = df['close'].pct_change().dropna()
-            volatility = price_changes.std()
-
             # 변동성에 따른 간격 조정
-            if volatility > 0.02:  # 높은 변동성 (2% 이상)
-                adjusted_time = max(30, base_sleep_time * 0.5)  # 최소 30초
+            regime = volatility_regime(volatility)
+            adjusted_time = regime_interval(regime, base_sleep_time)
+            if regime == 'high':  # 높은 변동성 (2% 이상)
                 self.logger.info(f"높은 변동성 감지 ({volatility:.4f}), 거래간격 단축: {adjusted_time}초")
-            elif volatility < 0.005:  # 낮은 변동성 (0.5% 미만)
-                adjusted_time = min(300, base_sleep_time * 2)  # 최대 5분
+            elif regime == 'low':  # 낮은 변동성 (0.5% 미만)
                 self.logger.info(f"낮은 변동성 감지 ({volatility:.4f}), 거래간격 연장: {adjusted_time}초")
-            else:
-                adjusted_time = base_sleep_time
 
-            return int(adjusted_time)
+            return adjusted_time
         except Exception as e:
             self.logger.error(f"동적 거래간격 계산 오류: {e}")
             return base_sleep_time
@@ -179,6 +170,7 @@ class UpbitTradingBot:
             self.logger.error(f"변동성 기반 포지션 사이징 오류: {e}")
             return base_amount
 
+    @in_lane('order')
     def check_profit_loss_management(self, ticker, balance_coin):
         """손익 관리 기능 - 손절/익절 체크"""
         try:
@@ -195,8 +187,12 @@ class UpbitTradingBot:
             profit_rate = (current_price - avg_buy_price) / avg_buy_price * 100
             self.logger.info(f"현재 수익률: {profit_rate:.2f}% (현재가: {current_price:,}, 평균가: {avg_buy_price:,})")
 
+            # 진입 이후 최고가 갱신 (추적 기록이 없는 기존 보유분은 최근 15분 고가로 시작)
+            high_water_marks.observe(self._position_key(ticker), current_price, avg_buy_price,
+                                     seed=lambda: self._recent_high(ticker))
+
             # 손절 금지 설정 확인
-            prevent_loss_sale = self._get_field_value(getattr(self.args, 'prevent_loss_sale', None), 'Y')
+            prevent_loss_sale = self.config.prevent_loss_sale
 
             # 손절 라인 체크 (-3%) - prevent_loss_sale이 'Y'이면 손절하지 않음
             if profit_rate <= -3.0:
@@ -223,18 +219,61 @@ class UpbitTradingBot:
             self.logger.error(f"손익 관리 체크 중 오류: {e}")
             return None
 
+    @in_lane('order')
+    def _execute_profit_loss_action(self, ticker, balance_coin, profit_loss_action):
+        """손익 관리 결과에 따른 매도 실행"""
+        # 손익 관리에 의한 매도 실행
+        sell_portion = profit_loss_action['portion']
+        if sell_portion >= 1.0:
+            # 전량 매도
+            order_result = self.api.order_sell_market(ticker, balance_coin)
+            self.logger.info(f"손익 관리에 의한 전량 매도 실행")
+            if order_result and 'error' not in order_result:
+                high_water_marks.close(self._position_key(ticker))
+        else:
+            # 부분 매도
+            order_result = self.api.order_sell_market_partial(ticker, sell_portion)
+            self.logger.info(f"손익 관리에 의한 부분 매도 실행 ({sell_portion * 100:.1f}%)")
+
+        if order_result and 'error' not in order_result:
+            # 거래 기록 저장
+            current_price = self.api.get_current_price(ticker)
+            volume = balance_coin * sell_portion
+            amount = volume * current_price if current_price else 0
+            avg_buy_price = self.api.get_buy_avg(ticker)
+            profit_rate = ((current_price - avg_buy_price) / avg_buy_price * 100) if avg_buy_price else None
+
+            self.record_trade('SELL', ticker, current_price, volume, amount, profit_rate)
+
+            # 텔레그램 알림
+            self.send_trade_notification('SELL', ticker, {'volume': volume})
+
+        return order_result
+
+    @property
+    def exit_check(self):
+        """캔들 간 손절/익절 체크 함수 (손익 관리가 적용되지 않는 전략은 None)"""
+        return self.run_exit_check if self.config.strategy in EXIT_MANAGED_STRATEGIES else None
+
+    def _position_key(self, ticker):
+        return position_key(self.user_id or self.username, ticker)
+
+    def _recent_high(self, ticker):
+        """최근 15분 고가"""
+        df = self.api.get_ohlcv_data(ticker, 'minute1', 15)
+        return float(df['high'].max()) if df is not None and len(df) > 0 else None
+
     def check_trailing_stop(self, ticker, current_price, current_profit_rate):
-        """트레일링 스톱 체크"""
+        """트레일링 스톱 체크 (진입 이후 최고가 대비, 추가 조회 없음)"""
         try:
-            # 최고점 추적을 위한 간단한 구현 (실제로는 더 정교한 구현 필요)
             if current_profit_rate > 3.0:  # 3% 이상 수익 시에만 트레일링 스톱 적용
-                # 최근 15분간 최고가 대비 체크
-                df = self.api.get_ohlcv_data(ticker, 'minute1', 15)
-                if df is not None and len(df) > 0:
-                    recent_high = df['high'].max()
-                    if current_price < recent_high * 0.98:  # 최고점 대비 2% 하락
-                        self.logger.info(f"트레일링 스톱 발동! 최고점: {recent_high:,}, 현재가: {current_price:,}")
-                        return {'action': 'TRAILING_STOP', 'reason': '최고점 대비 2% 하락', 'portion': 0.7}
+                key = self._position_key(ticker)
+                peak = high_water_marks.get_peak(key)
+                if peak and current_price < peak * 0.98:  # 최고점 대비 2% 하락
+                    self.logger.info(f"트레일링 스톱 발동! 최고점: {peak:,}, 현재가: {current_price:,}")
+                    # 남은 물량은 현재가부터 다시 최고가 추적
+                    high_water_marks.reset(key, current_price)
+                    return {'action': 'TRAILING_STOP', 'reason': '최고점 대비 2% 하락', 'portion': 0.7}
 
             return None
         except Exception as e:
@@ -242,83 +281,87 @@ class UpbitTradingBot:
             return None
 
     def get_ticker(self):
-        """ticker 값을 안전하게 가져오기"""
-        if isinstance(self.args, dict):
-            return self.args.get('ticker', 'Unknown')
-        elif hasattr(self.args, 'ticker'):
-            return self._get_field_value(getattr(self.args, 'ticker', None), 'Unknown')
-        else:
-            return 'Unknown'
+        """ticker 값 조회"""
+        return self.config.ticker or 'Unknown'
+
+    def get_data_requirements(self):
+        """거래 사이클 데이터 요구 목록 (거래 엔진 틱 선조회용)"""
+        return self._cycle_data_requirements(self.config.strategy)
+
+    def _cycle_data_requirements(self, strategy_name):
+        """사이클에 필요한 데이터 목록 (전략 요구 + 주문 판단에 쓰는 잔고)"""
+        get_requirements = getattr(self.strategy, 'get_data_requirements', None)
+        if get_requirements is None:
+            return []
+
+        config = self.config
+        if strategy_name == 'rsi':
+            return get_requirements(config.rsi_period, config.rsi_timeframe)
+        if strategy_name in EXIT_MANAGED_STRATEGIES:
+            # 볼린저 계열은 신호 계산 후 잔고로 주문 여부를 판단 (잔고 TTL 캐시를 미리 채움)
+            requirements = get_requirements(config.window, config.interval)
+            if batch_evaluator.serves(config.ticker, config.interval, config.window):
+                # 밴드 계산용 캔들과 현재가는 배치 평가기가 그룹 단위로 조회 (RSI 필터 캔들은 그대로 선조회)
+                batched = (('ohlcv', config.interval, config.window + 5), ('current_price', None, None))
+                requirements = [requirement for requirement in requirements if tuple(requirement) not in batched]
+            return requirements + [('balance_cash', None, None), ('balance_coin', None, None)]
+        return get_requirements()
 
     def trading(self):
-        """트레이딩 로직 실행"""
+        """트레이딩 로직 실행 (캔들 간 손절/익절 체크가 실행 중이면 끝날 때까지 대기)"""
+        with self._cycle_lock:
+            return self._trade()
+
+    def _trade(self):
+        """트레이딩 로직"""
+        snapshot = None
         try:
             # 기본 검증 먼저 수행
             if not self._validate_trading_conditions():
                 return None
 
+            config = self.config
+
             # 스레드 모니터링 등록 (사용 가능한 경우만)
             if THREAD_MONITOR_AVAILABLE:
-                ticker_value = self._get_field_value(self.args.get('ticker') if isinstance(self.args, dict) else getattr(self.args, 'ticker', None))
-                strategy_value = self._get_field_value(self.args.get('strategy') if isinstance(self.args, dict) else getattr(self.args, 'strategy', None))
-
                 thread_monitor.register_thread(
                     user_id=self.username,
-                    ticker=ticker_value,
-                    strategy=strategy_value
+                    ticker=config.ticker,
+                    strategy=config.strategy
                 )
 
-            # 필드 값들을 안전하게 추출 - 통합된 방식
-            ticker = self._get_field_value(
-                self.args.get('ticker') if isinstance(self.args, dict) else getattr(self.args, 'ticker', None)
-            )
-            buy_amount = self._get_field_value(
-                self.args.get('buy_amount') if isinstance(self.args, dict) else getattr(self.args, 'buy_amount', None)
-            )
-            min_cash = self._get_field_value(
-                self.args.get('min_cash') if isinstance(self.args, dict) else getattr(self.args, 'min_cash', None)
-            )
-            # 매수 평단가 이하 매도 금지
-            prevent_loss_sale = self._get_field_value(
-                self.args.get('prevent_loss_sale') if isinstance(self.args, dict) else getattr(self.args, 'prevent_loss_sale', None),
-                'Y'
-            )
-            # 장기 투자
-            long_term_investment = self._get_field_value(
-                self.args.get('long_term_investment') if isinstance(self.args, dict) else getattr(self.args, 'long_term_investment', None),
-                'N'
-            )
-            # 최대 주문 금액 추가
-            max_order_amount = self._get_field_value(
-                self.args.get('max_order_amount') if isinstance(self.args, dict) else getattr(self.args, 'max_order_amount', None),
-                0  # 기본값 5만원
-            )
-
-            # 전략 이름 안전하게 가져오기 - 개선된 부분
-            strategy_name = self._get_field_value(
-                self.args.get('strategy') if isinstance(self.args, dict) else getattr(self.args, 'strategy', None),
-                'bollinger'  # 기본값을 'bollinger'로 변경
-            )
+            # 봇 생성 시 변환된 설정 사용
+            ticker = config.ticker
+            buy_amount = config.buy_amount
+            min_cash = config.min_cash
+            prevent_loss_sale = config.prevent_loss_sale  # 매수 평단가 이하 매도 금지
+            long_term_investment = config.long_term_investment  # 장기 투자
+            max_order_amount = config.max_order_amount
+            strategy_name = config.strategy
 
             if not ticker:
                 self.logger.error("티커 정보를 가져올 수 없습니다.")
-                self.logger.error(f"디버그 - args 타입: {type(self.args)}")
-                self.logger.error(f"디버그 - args 내용: {self.args}")
+                self.logger.error(f"디버그 - 설정: {config}")
                 return None
 
+            # API 호출 한도 소진 시 신호 분석은 몇 사이클에 한 번만 실행하고 그 사이에는 손절/익절 체크만 실행
+            # 손익 관리가 없는 전략은 분석을 건너뛰면 청산도 멈추므로 늘리지 않음
+            if (strategy_name in EXIT_MANAGED_STRATEGIES
+                    and not load_shedder.analysis_due((self.user_id or self.username, ticker))):
+                self.logger.info(f"부하 차단으로 이번 사이클은 손절/익절 체크만 실행: {ticker}")
+                return self.run_exit_check()
+
+            # 전략이 공개한 데이터 요구 목록을 신호 계산 전에 한 번에 동시 조회 (사이클 동안 재사용)
+            with cycle_phase('fetch'):
+                snapshot = begin_cycle(self.api, ticker, self._cycle_data_requirements(strategy_name), self.logger)
+
+            # 신호 계산 구간 (사이클 지표, 안쪽의 시세 조회는 fetch로 따로 집계)
+            mark_phase('signal')
+
             if strategy_name == 'volatility':
                 # 변동성 돌파 전략 사용
                 self.logger.info(f"변동성 돌파 전략으로 거래 분석 시작: {ticker}")
-                k_value = self._get_field_value(
-                    self.args.get('k') if isinstance(self.args, dict) else getattr(self.args, 'k', None)
-                )
-                target_profit = self._get_field_value(
-                    self.args.get('target_profit') if isinstance(self.args, dict) else getattr(self.args, 'target_profit', None)
-                )
-                stop_loss = self._get_field_value(
-                    self.args.get('stop_loss') if isinstance(self.args, dict) else getattr(self.args, 'stop_loss', None)
-                )
-                signal = self.strategy.generate_volatility_signal(ticker, k_value, target_profit, stop_loss)
+                signal = self.strategy.generate_volatility_signal(ticker, config.k, config.target_profit, config.stop_loss)
 
             elif strategy_name == 'adaptive':
                 # 어댑티브 전략 사용
@@ -333,37 +376,16 @@ class UpbitTradingBot:
             elif strategy_name == 'rsi':
                 # RSI 전략 사용
                 self.logger.info(f"RSI 전략으로 거래 분석 시작: {ticker}")
-                rsi_period = self._get_field_value(
-                    self.args.get('rsi_period') if isinstance(self.args, dict) else getattr(self.args, 'rsi_period', None)
-                )
-                rsi_oversold = self._get_field_value(
-                    self.args.get('rsi_oversold') if isinstance(self.args, dict) else getattr(self.args, 'rsi_oversold', None)
-                )
-                rsi_overbought = self._get_field_value(
-                    self.args.get('rsi_overbought') if isinstance(self.args, dict) else getattr(self.args, 'rsi_overbought', None)
-                )
-                rsi_timeframe = self._get_field_value(
-                    self.args.get('rsi_timeframe') if isinstance(self.args, dict) else getattr(self.args, 'rsi_timeframe', None)
-                )
-                signal = self.strategy.generate_signal(ticker, rsi_period, rsi_oversold, rsi_overbought, rsi_timeframe)
+                signal = self.strategy.generate_signal(ticker, config.rsi_period, config.rsi_oversold,
+                                                       config.rsi_overbought, config.rsi_timeframe)
 
             else:
                 # 볼린저 밴드 전략 사용 (기본값)
-                interval = self._get_field_value(
-                    self.args.get('interval') if isinstance(self.args, dict) else getattr(self.args, 'interval', None)
-                )
-                window = self._get_field_value(
-                    self.args.get('window') if isinstance(self.args, dict) else getattr(self.args, 'window', None)
-                )
-                multiplier = self._get_field_value(
-                    self.args.get('multiplier') if isinstance(self.args, dict) else getattr(self.args, 'multiplier', None)
-                )
-                buy_multiplier = self._get_field_value(
-                    self.args.get('buy_multiplier') if isinstance(self.args, dict) else getattr(self.args, 'buy_multiplier', None)
-                )
-                sell_multiplier = self._get_field_value(
-                    self.args.get('sell_multiplier') if isinstance(self.args, dict) else getattr(self.args, 'sell_multiplier', None)
-                )
+                interval = config.interval
+                window = config.window
+                multiplier = config.multiplier
+                buy_multiplier = config.buy_multiplier
+                sell_multiplier = config.sell_multiplier
 
                 # 우선  use_rsi_filter, rsi_threshold 값을 default 로 셋팅하고 모니터링 해보자
                 use_rsi_filter = True
@@ -372,29 +394,58 @@ class UpbitTradingBot:
                 self.logger.info(f"볼린저 밴드 전략으로 거래 분석 시작: {ticker}, 간격: {interval}")
                 self.logger.info(f"급락 방지 필터 사용: {use_rsi_filter}, RSI 임계값: {rsi_threshold}")
 
-                # OHLCV 데이터 가져오기
-                prices_data = self.api.get_ohlcv_data(ticker, interval, window + 5)  # 여유있게 가져옴
+                # 같은 (전략, 간격, 파라미터) 그룹의 티커들과 함께 배치로 계산된 밴드 조회
+                bands = None
+                if Config.BATCH_EVAL_ENABLED:
+                    if strategy_name == 'bollinger_asymmetric':
+                        bands = batch_evaluator.get_bands(strategy_name, ticker, interval, window, buy_multiplier,
+                                                          sell_multiplier, self.api)
+                    else:
+                        bands = batch_evaluator.get_bands(strategy_name, ticker, interval, window, multiplier, multiplier,
+                                                          self.api)
+
+                prices = None
+                if bands is None:
+                    # OHLCV 데이터 가져오기
+                    with cycle_phase('fetch'):
+                        prices_data = self.api.get_ohlcv_data(ticker, interval, window + 5)  # 여유있게 가져옴
 
-                if prices_data is None or len(prices_data) < window:
-                    self.logger.error(f"가격 데이터를 충분히 가져오지 못했습니다. 받은 데이터 수: {0 if prices_data is None else len(prices_data)}")
-                    return None
+                    if prices_data is None or len(prices_data) < window:
+                        self.logger.error(f"가격 데이터를 충분히 가져오지 못했습니다. 받은 데이터 수: {0 if prices_data is None else len(prices_data)}")
+                        return None
 
-                # 종가 데이터만 추출
-                prices = prices_data['close']
+                    # 종가 데이터만 추출
+                    prices = prices_data['close']
+                else:
+                    self.logger.info(f"배치 평가 밴드 사용: 상단 {bands['upper']:.2f} / 하단 {bands['lower']:.2f} / 기본 신호 {bands['signal']}")
 
                 if strategy_name == 'bollinger_asymmetric':
                     # 매매 신호 생성 (비대칭 볼린저 밴드 전략에 맞는 매개변수 전달)
-                    signal_result = self.strategy.generate_signal(ticker, prices, window, buy_multiplier, sell_multiplier, use_rsi_filter, rsi_threshold, interval)
+                    config_key = (ticker, strategy_name, interval, window, buy_multiplier, sell_multiplier, use_rsi_filter, rsi_threshold)
+                    compute_signal = lambda: self.strategy.generate_signal(ticker, prices, window, buy_multiplier, sell_multiplier, use_rsi_filter, rsi_threshold, interval, bands=bands)
                 else:
                     # 매매 신호 생성 (볼린저 밴드 전략에 맞는 매개변수 전달)
-                    signal_result = self.strategy.generate_signal(ticker, prices, window, multiplier, use_rsi_filter, rsi_threshold, interval)
+                    config_key = (ticker, strategy_name, interval, window, multiplier, use_rsi_filter, rsi_threshold)
+                    compute_signal = lambda: self.strategy.generate_signal(ticker, prices, window, multiplier, use_rsi_filter, rsi_threshold, interval, bands=bands)
+
+                if Config.SIGNAL_BUS_ENABLED:
+                    # 볼린저 계열 신호는 잔고와 무관하므로 같은 설정의 다른 사용자와 공유
+                    if bands is not None:
+                        input_stamp = bands['computed_at']
+                    else:
+                        input_stamp = (prices.index[-1], signal_bus.tick_bucket())
+                    signal_result = signal_bus.get_or_compute(config_key, input_stamp, self.user_id, compute_signal)
+                else:
+                    signal_result = compute_signal()
 
                 signal = signal_result['signal']
                 sell_ratio = signal_result.get('sell_ratio', 1.0)
+                mark_phase(None)
 
                 # 잔고 조회
-                balance_cash = self.api.get_balance_cash()
-                balance_coin = self.api.get_balance_coin(ticker)
+                with cycle_phase('fetch'):
+                    balance_cash = self.api.get_balance_cash()
+                    balance_coin = self.api.get_balance_coin(ticker)
 
                 # 잔고 정보 로깅
                 if balance_cash is not None:
@@ -414,32 +465,10 @@ class UpbitTradingBot:
                     profit_loss_action = self.check_profit_loss_management(ticker, balance_coin)
                     if profit_loss_action:
                         self.logger.info(f"손익 관리 발동: {profit_loss_action['action']} - {profit_loss_action['reason']}")
-
-                        # 손익 관리에 의한 매도 실행
-                        sell_portion = profit_loss_action['portion']
-                        if sell_portion >= 1.0:
-                            # 전량 매도
-                            order_result = self.api.order_sell_market(ticker, balance_coin)
-                            self.logger.info(f"손익 관리에 의한 전량 매도 실행")
-                        else:
-                            # 부분 매도
-                            order_result = self.api.order_sell_market_partial(ticker, sell_portion)
-                            self.logger.info(f"손익 관리에 의한 부분 매도 실행 ({sell_portion * 100:.1f}%)")
-
-                        if order_result and 'error' not in order_result:
-                            # 거래 기록 저장
-                            current_price = self.api.get_current_price(ticker)
-                            volume = balance_coin * sell_portion
-                            amount = volume * current_price if current_price else 0
-                            avg_buy_price = self.api.get_buy_avg(ticker)
-                            profit_rate = ((current_price - avg_buy_price) / avg_buy_price * 100) if avg_buy_price else None
-
-                            self.record_trade('SELL', ticker, current_price, volume, amount, profit_rate)
-
-                            # 텔레그램 알림
-                            self.send_trade_notification('SELL', ticker, {'volume': volume})
-
-                        return order_result
+                        return self._execute_profit_loss_action(ticker, balance_coin, profit_loss_action)
+                elif balance_coin == 0:
+                    # 보유 물량이 없으면 (신호 매도 등으로 청산) 최고가 기록 정리
+                    high_water_marks.close(self._position_key(ticker))
 
                 # 매매 신호에 따른 주문 처리
                 if signal == 'BUY' and balance_cash and balance_cash > min_cash:
@@ -499,7 +528,7 @@ class UpbitTradingBot:
                         self.logger.info("최대 주문 금액 제한 없음 (max_order_amount = 0)")
 
                     self.logger.info(f"매수 시그널 발생: {actual_buy_amount:,.2f}원 매수 시도")
-                    order_result = self.api.order_buy_market(ticker, actual_buy_amount)
+                    order_result = self.api.order_buy_market(ticker, actual_buy_amount, min_cash=min_cash)
 
                     # 매수 완료 텔레그램 알림 전송
                     if order_result and not isinstance(order_result, int) and 'error' not in order_result:
@@ -575,7 +604,7 @@ class UpbitTradingBot:
                             return None
 
                     # 분할 매도 처리
-                    sell_portion = self._get_field_value(self.args.get('sell_portion') if isinstance(self.args, dict) else getattr(self.args, 'sell_portion', None), 1.0)
+                    sell_portion = config.sell_portion
 
                     # 매도 전략 결정
                     if sell_portion < 1.0:
@@ -680,6 +709,9 @@ class UpbitTradingBot:
 
         except Exception as e:
             self.logger.error(f"거래 중 오류 발생: {str(e)}", exc_info=True)
+        finally:
+            if snapshot is not None:
+                end_cycle(self.api, snapshot.ticker, self.logger)
 
         return None
 
@@ -692,7 +724,6 @@ class UpbitTradingBot:
 
             self.logger.info("=" * 20 + f" 거래자 ID : {self.username} " + "=" * 20)
             ticker = self.get_ticker()  # 새로운 메서드 사용
-            # ticker = self._get_field_value(getattr(self.args, 'ticker', None), 'Unknown')
             self.logger.info(f"거래 사이클 시작: {ticker}")
 
             # 트레이딩 실행
@@ -707,6 +738,42 @@ class UpbitTradingBot:
         except Exception as e:
             self.logger.error(f"실행 중 오류 발생: {str(e)}", exc_info=True)
 
+    @in_lane('order')
+    def run_exit_check(self):
+        """캔들 마감 모드에서 캔들 사이에 실행되는 가격 기반 손절/익절 체크 (부하 차단 stretch 단계의 분석 생략 사이클에도 사용)
+
+        신호 평가 없이 현재가만으로 손익 관리를 실행합니다 (EXIT_MANAGED_STRATEGIES에서만 동작).
+        신호 사이클이 실행 중이면 사이클이 손익 관리를 함께 하므로 이번 체크는 건너뜁니다.
+        """
+        if not self._cycle_lock.acquire(blocking=False):
+            self.logger.info("거래 사이클 실행 중이므로 이번 손절/익절 체크는 건너뜁니다.")
+            return None
+        try:
+            if shutdown_event.is_set():
+                return None
+
+            if self.config.strategy not in EXIT_MANAGED_STRATEGIES:
+                return None
+
+            ticker = self.get_ticker()
+            balance_coin = self.api.get_balance_coin(ticker)
+            if not balance_coin or balance_coin <= 0:
+                return None
+
+            profit_loss_action = self.check_profit_loss_management(ticker, balance_coin)
+            if not profit_loss_action:
+                return None
+
+            self.logger.info(f"손익 관리 발동(캔들 간 체크): {profit_loss_action['action']} - {profit_loss_action['reason']}")
+            return self._execute_profit_loss_action(ticker, balance_coin, profit_loss_action)
+
+        except Exception as e:
+            self.logger.error(f"손절/익절 체크 중 오류: {e}", exc_info=True)
+            return None
+        finally:
+            self._cycle_lock.release()
+
+    @timed_phase('persist')
     def record_trade(self, trade_type, ticker, price, volume, amount, profit_loss=None):
         """거래 기록 저장"""
         try:
@@ -735,12 +802,6 @@ class UpbitTradingBot:
                     except Exception as e:
                         self.logger.warning(f"수익률 계산 실패: {str(e)}")
 
-                # 전략 이름 안전하게 가져오기
-                strategy_name = self._get_field_value(
-                    self.args.get('strategy') if isinstance(self.args, dict) else getattr(self.args, 'strategy', None),
-                    'bollinger'  # 기본값을 'bollinger'로 변경
-                )
-
                 # TradeRecord 생성 및 저장
                 trade_record = TradeRecord(
                     user_id=self.user_id,
@@ -750,7 +811,7 @@ class UpbitTradingBot:
                     volume=volume,
                     amount=amount,
                     profit_loss=profit_loss,
-                    strategy=strategy_name,
+                    strategy=self.config.strategy,
                     timestamp=kst_now()
                 )
 
@@ -771,14 +832,11 @@ class UpbitTradingBot:
             return False
 
         # 간격 설정 (기본값: args에서 가져오기)
+        base_interval = None
         if interval_seconds is None:
-            base_interval = self._get_field_value(getattr(self.args, 'sleep_time', None), 60)
-            # 동적 거래 간격 적용
-            ticker = self._get_field_value(getattr(self.args, 'ticker', None))
-            if ticker:
-                interval_seconds = self.calculate_dynamic_sleep_time(ticker, base_interval)
-            else:
-                interval_seconds = base_interval
+            base_interval = self.config.sleep_time
+            # 동적 거래 간격 적용 (이후에는 변동성 기반 간격 조정기가 주기적으로 갱신)
+            interval_seconds = self.calculate_dynamic_sleep_time(self.config.ticker, base_interval)
 
         # interval_seconds를 정수로 변환
         try:
@@ -787,8 +845,8 @@ class UpbitTradingBot:
             interval_seconds = 60  # 기본값
 
         # 작업 ID 생성
-        ticker = self._get_field_value(getattr(self.args, 'ticker', None))
-        strategy = self._get_field_value(getattr(self.args, 'strategy', None))
+        ticker = self.config.ticker
+        strategy = self.config.strategy
         self.job_id = f"Trading_bot_{self.user_id}_{ticker}_{strategy}_{int(datetime.now().timestamp())}"
 
         # 스케줄러에 작업 추가
@@ -798,7 +856,12 @@ class UpbitTradingBot:
             interval_seconds=interval_seconds,
             user_id=self.username,
             ticker=ticker,
-            strategy=strategy
+            strategy=strategy,
+            trigger_mode=self.config.trigger_mode,
+            candle_interval=self.config.interval,
+            exit_check_func=self.exit_check,
+            base_interval=base_interval,
+            bot=self
         )
 
         if success:
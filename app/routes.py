@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash
+from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash, Response
 from flask_login import login_user, logout_user, current_user, login_required
 from app import db, socketio
 from app.forms import TradingSettingsForm, LoginForm, RegistrationForm, ProfileForm, FavoriteForm
@@ -12,8 +12,27 @@ from app.bot.trading_bot import UpbitTradingBot
 from app.utils.coin_recommender import CoinRecommender
 import time
 import os
+import sys
+import subprocess
 from datetime import datetime
 from app.utils.scheduler_manager import scheduler_manager
+from app.utils.signal_bus import signal_bus
+from app.utils.prefetch import prefetch_stats
+from app.utils.scheduler_metrics import scheduler_metrics
+from app.utils.execution_lanes import execution_lanes
+from app.utils.order_queue import order_queues
+from app.utils.load_shedder import load_shedder
+from app.utils.fair_share import fair_share
+from app.utils.phase_planner import phase_planner
+from app.utils.trading_engine import trading_engine
+from app.utils.orderbook import orderbook_cache
+from app.utils.daily_levels import daily_levels
+from app.utils.high_water_mark import high_water_marks
+from app.utils.position_ledger import position_ledgers
+from app.utils.cadence_controller import cadence_controller
+from app.utils.engine_ipc import remote_engine, forward_logs, log_buffer
+from app.backtest.sweep import list_sweeps, OBJECTIVES, SEARCH_METHODS, DEFAULT_PARAM_SPACES
+from config import Config
 import uuid
 
 # Blueprint 생성
@@ -70,6 +89,10 @@ def validate_api_access():
 
     return None
 
+def shed_response():
+    """부하 차단 중 생략한 필수가 아닌 조회 응답 (app.utils.load_shedder)"""
+    return error_response("API 호출 한도 보호를 위해 잠시 중단된 기능입니다. 잠시 후 다시 시도해주세요.", 503, "LOAD_SHEDDING")
+
 def get_or_create_upbit_api(user_id):
     """사용자별 UpbitAPI 객체 가져오기 또는 생성 (성능 최적화)"""
     try:
@@ -317,7 +340,7 @@ def dashboard():
                 api = upbit_apis[user_id]
             try:
                 # 사용자별 봇 정보 가져오기
-                user_bots = scheduled_bots.get(user_id, {})
+                user_bots = get_user_bots(user_id)
 
                 # 봇 정보 정규화 및 템플릿 호환성 개선
                 for ticker, bot_info in user_bots.items():
@@ -481,11 +504,14 @@ def dashboard():
                         if balance_info['cash'] is None:
                             balance_info['cash'] = 0
 
-                        # 보유 코인 정보 조회 - pyupbit를 직접 사용
+                        # 보유 코인 정보 조회 - 포지션 원장 사용 (대조 주기에만 API 호출)
                         try:
-                            all_balances = api.upbit.get_balances()
+                            all_balances = api.get_accounts()
                             balance_info['coins'] = []
                             total_balance = balance_info['cash']
+                            # 부하 차단 중에는 코인별 현재가 조회를 생략하고 매수 평균가 기준으로 평가
+                            skip_valuation = bool(all_balances) and load_shedder.shed('dashboard_valuation')
+                            balance_info['valuation_skipped'] = skip_valuation
 
                             if all_balances:
                                 for balance in all_balances:
@@ -493,7 +519,10 @@ def dashboard():
                                         ticker = f"KRW-{balance['currency']}"
                                         try:
                                             # 현재 코인 가격
-                                            current_price = api.get_current_price(ticker)
+                                            if skip_valuation:
+                                                current_price = float(balance['avg_buy_price'])
+                                            else:
+                                                current_price = api.get_current_price(ticker)
                                             coin_value = float(balance['balance']) * current_price
                                             total_balance += coin_value
 
@@ -709,9 +738,21 @@ def settings():
 
 
 # 자동매매 시작
-def start_bot(ticker, strategy_name, settings):
-    """APScheduler를 사용한 자동매매 시작"""
-    user_id = current_user.id
+def start_bot(ticker, strategy_name, settings, user=None):
+    """APScheduler를 사용한 자동매매 시작
+
+    Args:
+        user: 봇을 실행할 사용자 (기본값: 현재 로그인 사용자)
+    """
+    user = user or current_user
+    user_id = user.id
+
+    # 거래 엔진이 별도 프로세스에서 실행 중이면 엔진에 시작 요청 (설정은 값만 전달)
+    engine = remote_engine()
+    if engine is not None:
+        return engine.call('start', user_id=user_id, ticker=ticker, strategy_name=strategy_name,
+                           settings=settings_to_dict(settings))
+
     try:
         logger = get_logger_with_current_date(ticker, 'INFO', 7)
         # 기존에 같은 ticker 관련 봇이 있다면 삭제 진행
@@ -729,7 +770,7 @@ def start_bot(ticker, strategy_name, settings):
     if user_id not in upbit_apis:
         logger.info(f"새 API 객체 생성: user_id={user_id}")
         # UpbitAPI 클래스에서 자동으로 복호화 처리
-        upbit_api = UpbitAPI.create_from_user(current_user, async_handler, logger)
+        upbit_api = UpbitAPI.create_from_user(user, async_handler, logger)
 
         # API 키 유효성 검증
         is_valid, error_msg = upbit_api.validate_api_keys()
@@ -762,23 +803,13 @@ def start_bot(ticker, strategy_name, settings):
         logger.warning(f"알 수 없는 settings 유형: {type(settings)}")
 
     websocket_logger = WebSocketLogger(ticker, user_id)
-    bot = UpbitTradingBot(settings, upbit_api, strategy, websocket_logger, current_user.username)
-
-    # 거래 간격 설정
-    if hasattr(settings, 'sleep_time'):
-        sleep_time = settings.sleep_time.data if hasattr(settings.sleep_time, 'data') else settings.sleep_time
-    elif isinstance(settings, dict) and 'sleep_time' in settings:
-        sleep_time = settings['sleep_time']
-    else:
-        sleep_time = 60  # 기본값
+    bot = UpbitTradingBot(settings, upbit_api, strategy, websocket_logger, user.username)
 
-    # 장기 투자 여부
-    if hasattr(settings, 'long_term_investment'):
-        long_term_investment = settings.long_term_investment.data if hasattr(settings.long_term_investment, 'data') else settings.long_term_investment
-    elif isinstance(settings, dict) and 'long_term_investment' in settings:
-        long_term_investment = settings['long_term_investment']
-    else:
-        long_term_investment = 'N'  # 기본값
+    # 거래 간격/장기 투자/캔들 간격/스케줄 모드 (봇 생성 시 변환된 설정 사용)
+    sleep_time = bot.config.sleep_time
+    long_term_investment = bot.config.long_term_investment
+    candle_interval = bot.config.interval
+    trigger_mode = bot.config.trigger_mode
 
     # 고유한 작업 ID 생성
     job_id = f"Trading_bot_{user_id}_{ticker}_{strategy_name}_{uuid.uuid4().hex[:8]}"
@@ -790,7 +821,11 @@ def start_bot(ticker, strategy_name, settings):
         interval_seconds=sleep_time,
         user_id=user_id,
         ticker=ticker,
-        strategy=strategy_name
+        strategy=strategy_name,
+        trigger_mode=trigger_mode,
+        candle_interval=candle_interval,
+        exit_check_func=bot.exit_check,
+        bot=bot
     )
 
     if success:
@@ -802,7 +837,7 @@ def start_bot(ticker, strategy_name, settings):
                 'settings': settings,
                 'interval': sleep_time,
                 'start_time': datetime.now(),
-                'username': current_user.username,
+                'username': user.username,
                 'cycle_count': 0,
                 'last_run': None,
                 'running': True,  # 실행 상태 추가
@@ -817,6 +852,41 @@ def start_bot(ticker, strategy_name, settings):
         return None
 
 
+def settings_to_dict(settings):
+    """봇 설정(폼/딕셔너리)을 프로세스 간 전달 가능한 값 딕셔너리로 변환"""
+    if isinstance(settings, dict):
+        return dict(settings)
+    if hasattr(settings, 'data') and isinstance(settings.data, dict):
+        return dict(settings.data)  # WTForms 폼
+    return {name: getattr(settings, name) for name in vars(settings)}
+
+
+def get_user_bots(user_id):
+    """사용자의 실행 중인 봇 정보 ({티커: 봇 정보})
+
+    거래 엔진이 별도 프로세스에서 실행 중이면 엔진에서 봇 객체를 제외한 정보를 받아옵니다.
+    """
+    engine = remote_engine()
+    if engine is None:
+        return scheduled_bots.get(user_id, {})
+    try:
+        return engine.call('bots', user_id=user_id)
+    except Exception as e:
+        logger.error(f"거래 엔진 봇 목록 조회 실패 (사용자: {user_id}): {str(e)}")
+        return {}
+
+
+def export_user_bots(user_id):
+    """프로세스 간 전달용 봇 정보 (봇 객체 제외, 설정은 변환된 값)"""
+    exported = {}
+    for ticker, bot_info in scheduled_bots.get(user_id, {}).items():
+        info = {key: value for key, value in bot_info.items() if key not in ('bot', 'settings')}
+        bot = bot_info.get('bot')
+        info['settings'] = bot.config.to_dict() if bot is not None else {}
+        exported[ticker] = info
+    return exported
+
+
 # 스케줄러 호출
 def scheduled_trading_cycle(user_id, ticker, bot=None, websocket_logger=None):
     """스케줄된 트레이딩 사이클 실행 - 에러 처리 강화"""
@@ -1001,6 +1071,15 @@ def stop_bot_route(ticker):
 # 자동매매 중지
 def stop_bot(user_id, ticker):
     """봇 중지 함수"""
+    # 거래 엔진이 별도 프로세스에서 실행 중이면 엔진에 중지 요청
+    engine = remote_engine()
+    if engine is not None:
+        try:
+            return engine.call('stop', user_id=user_id, ticker=ticker)
+        except Exception as e:
+            logger.error(f"거래 엔진 봇 중지 요청 실패: {user_id}/{ticker} - {str(e)}")
+            return False
+
     try:
         # 봇 정보 확인
         if user_id not in scheduled_bots:
@@ -1109,33 +1188,14 @@ class WebSocketLogger:
         if hasattr(self.file_logger, level.lower()):
             getattr(self.file_logger, level.lower())(message)
 
-        # WebSocket을 통해 실시간 전송
+        # WebSocket을 통해 실시간 전송 (별도 엔진 프로세스에서는 웹 프로세스가 로그 스트림으로 받아 전송)
+        if Config.ENGINE_MODE == 'process':
+            log_buffer.publish(self.user_id, self.ticker, formatted_message)
         self._send_to_subscribers(formatted_message)
 
     def _send_to_subscribers(self, log_entry):
         """구독자들에게 로그 전송"""
-        try:
-            # websocket_handlers의 active_connections를 사용하여 특정 사용자에게만 전송
-            from app.websocket_handlers import active_connections
-
-            # 해당 사용자의 활성 세션들을 찾아서 전송
-            for session_id, conn_info in active_connections.items():
-                if str(conn_info['user_id']) == self.user_id:
-                    # 해당 사용자가 구독 중인 티커와 일치하거나 전체 로그를 구독 중인 경우
-                    subscribed_ticker = conn_info.get('subscribed_ticker', '')
-                    if not subscribed_ticker or subscribed_ticker == self.ticker:
-                        # socketio 대신 websocket_handlers에서 직접 emit
-                        try:
-                            socketio.emit('new_log', log_entry, room=session_id)
-                        except Exception as emit_error:
-                            self.file_logger.debug(f"세션 {session_id}로 로그 전송 실패: {str(emit_error)}")
-
-        except ImportError:
-            # active_connections 가져오기 실패 시 기본 파일 로깅만 수행
-            self.file_logger.debug("active_connections를 가져올 수 없음. 파일 로깅만 수행.")
-        except Exception as e:
-            # WebSocket 전송 실패 시 파일 로거에만 기록
-            self.file_logger.debug(f"WebSocket 로그 전송 실패: {str(e)}")
+        send_log_to_subscribers(self.user_id, self.ticker, log_entry, self.file_logger)
 
     def info(self, message):
         self._emit_log('INFO', message)
@@ -1153,15 +1213,53 @@ class WebSocketLogger:
         self._emit_log('DEBUG', message)
 
 
+def send_log_to_subscribers(user_id, ticker, log_entry, file_logger=None):
+    """해당 사용자의 WebSocket 구독자들에게 봇 로그 전송"""
+    file_logger = file_logger or logger
+    try:
+        # websocket_handlers의 active_connections를 사용하여 특정 사용자에게만 전송
+        from app.websocket_handlers import active_connections
+
+        # 해당 사용자의 활성 세션들을 찾아서 전송
+        for session_id, conn_info in active_connections.items():
+            if str(conn_info['user_id']) == str(user_id):
+                # 해당 사용자가 구독 중인 티커와 일치하거나 전체 로그를 구독 중인 경우
+                subscribed_ticker = conn_info.get('subscribed_ticker', '')
+                if not subscribed_ticker or subscribed_ticker == ticker:
+                    # socketio 대신 websocket_handlers에서 직접 emit
+                    try:
+                        socketio.emit('new_log', log_entry, room=session_id)
+                    except Exception as emit_error:
+                        file_logger.debug(f"세션 {session_id}로 로그 전송 실패: {str(emit_error)}")
+
+    except ImportError:
+        # active_connections 가져오기 실패 시 기본 파일 로깅만 수행
+        file_logger.debug("active_connections를 가져올 수 없음. 파일 로깅만 수행.")
+    except Exception as e:
+        # WebSocket 전송 실패 시 파일 로거에만 기록
+        file_logger.debug(f"WebSocket 로그 전송 실패: {str(e)}")
+
+
+# 엔진 로그 스트림 수신 작업을 시작한 프로세스 (preload 후 fork된 워커마다 새로 시작)
+_log_forwarder_pid = None
+
+
+@bp.before_app_request
+def start_engine_log_forwarder():
+    """거래 엔진이 별도 프로세스이면 웹 워커마다 엔진 봇 로그를 받아 WebSocket 구독자에게 전달"""
+    global _log_forwarder_pid
+    if _log_forwarder_pid == os.getpid() or remote_engine() is None:
+        return
+    _log_forwarder_pid = os.getpid()
+    socketio.start_background_task(forward_logs, send_log_to_subscribers)
+
+
 @bp.route('/api/active_tickers')
 @login_required
 def get_active_tickers():
     # 현재 사용자의 활성 티커 목록 반환
     user_id = current_user.id
-    if user_id in scheduled_bots:
-        tickers = list(scheduled_bots[user_id].keys())
-        return jsonify(tickers)
-    return jsonify([])
+    return jsonify(list(get_user_bots(user_id).keys()))
 
 
 def tail_file(file_path, n=100):
@@ -1304,8 +1402,9 @@ def delete_user(user_id):
 
     # 사용자의 모든 거래 봇 중지
     try:
-        if user.id in scheduled_bots:
-            for ticker in list(scheduled_bots[user.id].keys()):
+        user_bots = get_user_bots(user.id)
+        if user_bots:
+            for ticker in list(user_bots.keys()):
                 stop_bot(user.id, ticker)
             logger.info(f"사용자 {user.username}의 모든 거래 봇이 중지되었습니다.")
     except Exception as e:
@@ -1752,240 +1851,351 @@ def admin_monitor():
     return render_template('admin/monitor_dashboard.html')
 
 
+@bp.route('/admin/sweeps', methods=['GET', 'POST'])
+@login_required
+def admin_sweeps():
+    """백테스트 파라미터 탐색 실행 및 결과 조회"""
+    if not current_user.is_admin:
+        flash('관리자 권한이 필요합니다.', 'danger')
+        return redirect(url_for('main.index'))
+
+    if request.method == 'POST':
+        data_file = os.path.basename(request.form.get('data_file', ''))
+        data_path = os.path.join(Config.BACKTEST_DATA_DIR, data_file)
+        if not data_file or not os.path.isfile(data_path):
+            flash('백테스트 데이터 파일을 찾을 수 없습니다.', 'danger')
+            return redirect(url_for('main.admin_sweeps'))
+
+        strategy = request.form.get('strategy', 'bollinger')
+        sweep_id = f"{strategy}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        command = [
+            sys.executable, os.path.join(project_dir, 'backtest.py'), 'sweep',
+            '--id', sweep_id, '--data', data_path, '--results-dir', Config.SWEEP_RESULTS_DIR,
+        ]
+        for field in ('data_interval', 'ticker', 'strategy', 'interval', 'method', 'objective', 'samples',
+                      'buy_amount', 'min_trades'):
+            value = request.form.get(field, '').strip()
+            if value:
+                command += [f"--{field.replace('_', '-')}", value]
+        for spec in request.form.get('params', '').splitlines():
+            if spec.strip():
+                command += ['--param', spec.strip()]
+
+        # 탐색은 별도 프로세스에서 실행 (웹 프로세스 포크 시 스케줄러/봇이 복제되지 않도록 스케줄러 비활성화)
+        os.makedirs(Config.SWEEP_RESULTS_DIR, exist_ok=True)
+        with open(os.path.join(Config.SWEEP_RESULTS_DIR, f"{sweep_id}.log"), 'w') as log_file:
+            subprocess.Popen(command, cwd=project_dir, env=dict(os.environ, ENABLE_SCHEDULER='False'),
+                             stdout=log_file, stderr=subprocess.STDOUT, start_new_session=True)
+        flash(f'파라미터 탐색을 시작했습니다: {sweep_id}', 'success')
+        return redirect(url_for('main.admin_sweeps'))
+
+    data_files = []
+    if os.path.isdir(Config.BACKTEST_DATA_DIR):
+        data_files = sorted(name for name in os.listdir(Config.BACKTEST_DATA_DIR) if name.endswith('.csv'))
+
+    return render_template('admin/sweeps.html', sweeps=list_sweeps(Config.SWEEP_RESULTS_DIR), data_files=data_files,
+                           objectives=list(OBJECTIVES), methods=SEARCH_METHODS,
+                           strategies=list(DEFAULT_PARAM_SPACES))
+
+
 @bp.route('/api/scheduler/status')
 @login_required
 def get_scheduler_status():
     """모든 사용자의 스케줄러 상태 조회"""
     try:
-        # 모든 사용자의 봇 정보를 조회
-        all_user_bots = []
-
-        # get_jobs() 대신 get_all_jobs() 사용
-        all_jobs = scheduler_manager.get_all_jobs()
-
-        status = {
-            'scheduler_running': scheduler_manager.is_started(),
-            'total_jobs': len(all_jobs),
-            'all_user_bots': []
-        }
+        # 거래 엔진이 별도 프로세스에서 실행 중이면 엔진에서 조회
+        engine = remote_engine()
+        status = engine.call('status') if engine is not None else build_scheduler_status()
+        return jsonify(status)
 
-        # scheduled_bots의 모든 사용자 정보 순회
-        for user_id, user_bots in scheduled_bots.items():
-            user_bot_list = []
-            user_total_investment = 0
-            user_total_current_value = 0
-            user_portfolio_info = {}
+    except Exception as e:
+        logger.error(f"모든 사용자의 스케줄러 상태 조회 중 오류: {str(e)}")
+        return jsonify({'error': str(e)}), 500
 
-            # print(f"scheduled_bots[{user_id}] = {user_bots}")
 
-            for ticker, bot_info in user_bots.items():
-                job_id = bot_info.get('job_id')
-                formdata = bot_info.get('settings')  # 딕셔너리 형태의 settings
-                # print(f"bot_info: {bot_info}, formdata: {formdata}")
+def build_scheduler_status():
+    """스케줄러/봇/투자 현황 (거래 엔진을 실행하는 프로세스에서 호출)"""
+    # 모든 사용자의 봇 정보를 조회
+    all_user_bots = []
+
+    # get_jobs() 대신 get_all_jobs() 사용
+    all_jobs = scheduler_manager.get_all_jobs()
+
+    status = {
+        'scheduler_running': scheduler_manager.is_started(),
+        'total_jobs': len(all_jobs),
+        'all_user_bots': [],
+        'signal_bus': signal_bus.get_stats(),
+        'prefetch': prefetch_stats.get_stats(),
+        'orderbook_cache': orderbook_cache.get_stats(),
+        'daily_levels': daily_levels.get_stats(),
+        'high_water_marks': high_water_marks.get_stats(),
+        'position_ledger': position_ledgers.get_stats(),
+        'cadence': cadence_controller.get_stats(),
+        'trading_engine': trading_engine.get_stats(),
+        'execution_lanes': execution_lanes.get_stats(),
+        'order_queue': order_queues.get_stats(),
+        'load_shedder': load_shedder.get_stats(),
+        'fair_share': fair_share.get_stats(),
+        'phase_planner': phase_planner.get_stats()
+    }
 
-                job_info_from_scheduler = scheduler_manager.get_job_info(job_id) if job_id else None
+    # 부하 차단 중에는 평가금액용 현재가 조회를 생략하고 매수 평균가 기준으로 표시
+    skip_valuation = load_shedder.shed('dashboard_valuation')
+    status['valuation_skipped'] = skip_valuation
 
-                # APScheduler에서 직접 job 가져오기
-                job = None
-                if job_id and scheduler_manager.scheduler:
-                    try:
-                        job = scheduler_manager.scheduler.get_job(job_id)
-                    except:
-                        job = None
-
-                # settings에서 값 안전하게 가져오기
-                def get_setting_value(key, default=None):
-                    if formdata and isinstance(formdata, dict):
-                        return formdata.get(key, default)
-                    elif formdata and hasattr(formdata, key):
-                        field = getattr(formdata, key)
-                        return field.data if hasattr(field, 'data') else field
-                    return default
-
-                # 현재가 및 포트폴리오 정보 가져오기 (업비트 API 사용)
-                try:
-                    user = User.query.filter_by(id=user_id).first()
-                    if user:
-                        # User 모델에서 암호화된 API 키 복호화
-                        access_key, secret_key = user.get_upbit_keys()
-
-                        if access_key and secret_key:
-                            # UpbitAPI 클래스를 user_id로 초기화하는 방식 사용
-                            upbit_api = UpbitAPI.create_from_user(user, async_handler, logger)
-
-                            # 현재가 조회 - 단일 ticker로 호출하여 float 값 반환
-                            current_price = upbit_api.get_current_price(ticker)
-                            current_price = float(current_price) if current_price else 0
-
-                            # 보유 코인 정보 조회 - get_balances 메서드 사용 (iterable 반환)
-                            balances = upbit_api.upbit.get_balances()
-                            coin_currency = ticker.split('-')[1]  # KRW-BTC -> BTC
-
-                            coin_balance = 0
-                            avg_buy_price = 0
-                            if balances:
-                                for balance in balances:
-                                    if balance['currency'] == coin_currency:
-                                        coin_balance = float(balance['balance'])
-                                        avg_buy_price = float(balance['avg_buy_price'])
-                                        break
+    # scheduled_bots의 모든 사용자 정보 순회
+    for user_id, user_bots in scheduled_bots.items():
+        user_bot_list = []
+        user_total_investment = 0
+        user_total_current_value = 0
+        user_portfolio_info = {}
 
-                            # 현재 보유 가치 계산 (현재 투자된 ticker들의 평가금액)
-                            current_value = coin_balance * current_price
-                            # 투자 정보 계산
-                            investment_amount = coin_balance * avg_buy_price  # 실제 투자한 금액
+        # print(f"scheduled_bots[{user_id}] = {user_bots}")
 
-                            # 수익률 계산
-                            profit_rate = ((current_price - avg_buy_price) / avg_buy_price * 100) if avg_buy_price > 0 else 0
-
-                            # 포트폴리오 정보 저장
-                            user_portfolio_info[ticker] = {
-                                'investment_amount': investment_amount,
-                                'coin_balance': coin_balance,
-                                'avg_buy_price': avg_buy_price,
-                                'current_price': current_price,
-                                'current_value': current_value,
-                                'profit_rate': profit_rate
-                            }
-                        else:
-                            # API 키가 없는 경우 기본값 설정
-                            user_portfolio_info[ticker] = {
-                                'investment_amount': 0,
-                                'coin_balance': 0,
-                                'avg_buy_price': 0,
-                                'current_price': 0,
-                                'current_value': 0,
-                                'profit_rate': 0
-                            }
-
-                except Exception as e:
-                    logger.error(f"투자 정보 조회 중 오류 (사용자: {user_id}, 티커: {ticker}): {str(e)}")
-                    # 오류 발생 시 기본값 설정
-                    user_portfolio_info[ticker] = {
-                        'investment_amount': 0,
-                        'coin_balance': 0,
-                        'avg_buy_price': 0,
-                        'current_price': 0,
-                        'current_value': 0,
-                        'profit_rate': 0
-                    }
+        for ticker, bot_info in user_bots.items():
+            job_id = bot_info.get('job_id')
+            formdata = bot_info.get('settings')  # 딕셔너리 형태의 settings
+            # print(f"bot_info: {bot_info}, formdata: {formdata}")
 
-                bot_status = {
-                    'ticker': ticker,
-                    'strategy': bot_info.get('strategy', 'Unknown'),
-                    'start_time': bot_info.get('start_time', datetime.now()).strftime('%Y-%m-%d %H:%M:%S'),
-                    'cycle_count': bot_info.get('cycle_count', 0),
-                    'last_run': bot_info.get('last_run', datetime.now()).strftime('%Y-%m-%d %H:%M:%S') if bot_info.get('last_run') else 'Never',
-                    'next_run': job.next_run_time.strftime('%Y-%m-%d %H:%M:%S') if job and job.next_run_time else 'Unknown',
-                    'job_id': job_id,
-                    'running': job is not None,
-                    'interval': bot_info.get('interval', 0),
-                    'run_count': job_info_from_scheduler.get('run_count', 0) if job_info_from_scheduler else 0,
-                    'username': bot_info.get('username', 'Unknown'),
-                    'interval_label': bot_info.get('interval_label', 'Unknown'),
-                    # 봇 설정 정보 추가
-                    'settings': {
-                        'buy_amount': get_setting_value('buy_amount', 0),
-                        'window': get_setting_value('window', 20),
-                        'multiplier': get_setting_value('multiplier', 2.0),
-                        'buy_multiplier': get_setting_value('buy_multiplier', 3.0),
-                        'sell_multiplier': get_setting_value('sell_multiplier', 2.0),
-                        'max_order_amount': get_setting_value('max_order_amount', 0),
-                        'min_cash': get_setting_value('min_cash', 0),
-                        'sleep_time': get_setting_value('sleep_time', 60),
-                        'sell_portion': get_setting_value('sell_portion', 1.0),
-                        'prevent_loss_sale': get_setting_value('prevent_loss_sale', 'N'),
-                        # RSI 관련 설정
-                        'rsi_buy_threshold': get_setting_value('rsi_buy_threshold', 30),
-                        'rsi_sell_threshold': get_setting_value('rsi_sell_threshold', 70),
-                        'rsi_period': get_setting_value('rsi_period', 14),
-                        # 변동성 돌파 관련 설정
-                        'volatility_multiplier': get_setting_value('volatility_multiplier', 0.5),
-                        'volatility_period': get_setting_value('volatility_period', 20),
-                        # 앙상블 관련 설정
-                        'ensemble_weights': get_setting_value('ensemble_weights', {}),
-                        'ensemble_threshold': get_setting_value('ensemble_threshold', 0.6)
-                    },
-                    'long_term_investment': bot_info.get('long_term_investment', 'N'),
-                    # 투자 정보 추가
-                    'portfolio_info': user_portfolio_info.get(ticker, {
-                        'investment_amount': 0,  # 투자 금액
-                        'coin_balance': 0,
-                        'avg_buy_price': 0,
-                        'current_price': 0,
-                        'current_value': 0,
-                        'profit_rate': 0
-                    })
-                }
-
-                user_bot_list.append(bot_status)
-
-            # 사용자 username 가져오기
-            user = User.query.filter_by(id=user_id).first()
-            user_name = user.username if user else None
+            job_info_from_scheduler = scheduler_manager.get_job_info(job_id) if job_id else None
 
-            # 현금 보유량 조회 (get_balance_cash 메서드 직접 사용 - float 반환)
-            krw_balance = 0
+            # APScheduler에서 직접 job 가져오기
+            job = None
+            if job_id and scheduler_manager.scheduler:
+                try:
+                    job = scheduler_manager.scheduler.get_job(job_id)
+                except:
+                    job = None
+
+            # 거래 엔진에서 실행하는 작업은 APScheduler 작업이 없으므로 엔진에서 다음 실행 시각 조회
+            next_run_time = job.next_run_time if job else None
+            scheduled = job is not None
+            if job is None and job_id:
+                next_run_time = trading_engine.next_run_time(job_id)
+                scheduled = next_run_time is not None
+
+            # settings에서 값 안전하게 가져오기
+            def get_setting_value(key, default=None):
+                if formdata and isinstance(formdata, dict):
+                    return formdata.get(key, default)
+                elif formdata and hasattr(formdata, key):
+                    field = getattr(formdata, key)
+                    return field.data if hasattr(field, 'data') else field
+                return default
+
+            # 현재가 및 포트폴리오 정보 가져오기 (업비트 API 사용)
             try:
+                user = User.query.filter_by(id=user_id).first()
                 if user:
                     # User 모델에서 암호화된 API 키 복호화
                     access_key, secret_key = user.get_upbit_keys()
 
                     if access_key and secret_key:
+                        # UpbitAPI 클래스를 user_id로 초기화하는 방식 사용
                         upbit_api = UpbitAPI.create_from_user(user, async_handler, logger)
-                        # get_balance_cash는 float 값을 직접 반환
-                        krw_balance = upbit_api.get_balance_cash()
-                        krw_balance = float(krw_balance) if krw_balance else 0
-                        balances = upbit_api.upbit.get_balances()
 
+                        # 현재가 조회 - 단일 ticker로 호출하여 float 값 반환
+                        current_price = upbit_api.get_current_price(ticker) if not skip_valuation else None
+                        current_price = float(current_price) if current_price else 0
+
+                        # 보유 코인 정보 조회 - 포지션 원장 사용 (get_balances 형식)
+                        balances = upbit_api.get_accounts()
+                        coin_currency = ticker.split('-')[1]  # KRW-BTC -> BTC
+
+                        coin_balance = 0
+                        avg_buy_price = 0
                         if balances:
                             for balance in balances:
-                                if balance['currency'] != 'KRW':
-                                    user_total_current_value += float(balance['balance']) * float(upbit_api.get_current_price(f'KRW-{balance['currency']}'))
-                                    user_total_investment += float(balance['balance']) * float(balance['avg_buy_price'])
+                                if balance['currency'] == coin_currency:
+                                    coin_balance = float(balance['balance'])
+                                    avg_buy_price = float(balance['avg_buy_price'])
+                                    break
+                        if skip_valuation:
+                            current_price = avg_buy_price
+
+                        # 현재 보유 가치 계산 (현재 투자된 ticker들의 평가금액)
+                        current_value = coin_balance * current_price
+                        # 투자 정보 계산
+                        investment_amount = coin_balance * avg_buy_price  # 실제 투자한 금액
+
+                        # 수익률 계산
+                        profit_rate = ((current_price - avg_buy_price) / avg_buy_price * 100) if avg_buy_price > 0 else 0
+
+                        # 포트폴리오 정보 저장
+                        user_portfolio_info[ticker] = {
+                            'investment_amount': investment_amount,
+                            'coin_balance': coin_balance,
+                            'avg_buy_price': avg_buy_price,
+                            'current_price': current_price,
+                            'current_value': current_value,
+                            'profit_rate': profit_rate
+                        }
+                    else:
+                        # API 키가 없는 경우 기본값 설정
+                        user_portfolio_info[ticker] = {
+                            'investment_amount': 0,
+                            'coin_balance': 0,
+                            'avg_buy_price': 0,
+                            'current_price': 0,
+                            'current_value': 0,
+                            'profit_rate': 0
+                        }
 
             except Exception as e:
-                logger.error(f"현금 보유량 조회 중 오류 (사용자: {user_id}): {str(e)}")
-
-            # 계산 수정: 요구사항에 따른 정확한 계산
-            # 총 금액: 전체 투자 및 보유금액의 합 (투자한 금액 + 보유 현금)
-            total_investment_amount = user_total_investment + krw_balance
-
-            # 보유현금: 전체 투자 금액에서 투자한 금액을 뺀 값 (이미 krw_balance로 계산됨)
-            cash_balance = krw_balance
-
-            # 손익: 현재 평가금액 - 투자금액
-            profit_loss = user_total_current_value - user_total_investment
-
-            # 수익률: 손익에 대한 백분율
-            total_profit_rate = 0
-            if user_total_investment > 0:
-                total_profit_rate = (profit_loss / user_total_investment * 100)
-
-            # 사용자별 봇 정보 추가
-            if user_bot_list:  # 봇이 있는 사용자만 추가
-                user_info = {
-                    'user_id': user_id,
-                    'user_name': user_name,
-                    'bot_count': len(user_bot_list),
-                    'bots': user_bot_list,
-                    # 투자 정보 수정
-                    'investment_info': {
-                        'total_investment': total_investment_amount,  # 총 투자금액: 전체 투자 + 보유금액의 합
-                        'current_value': user_total_current_value,  # 현재 평가금액: 현재 투자된 ticker들의 합
-                        'krw_balance': cash_balance,  # 보유현금: 전체 투자 금액에서 투자한 금액을 뺀 값
-                        'profit_loss': profit_loss,  # 손익: 현재 평가금액 - 투자금액
-                        'total_profit_rate': total_profit_rate  # 수익률: 손익에 대한 백분율
-                    }
+                logger.error(f"투자 정보 조회 중 오류 (사용자: {user_id}, 티커: {ticker}): {str(e)}")
+                # 오류 발생 시 기본값 설정
+                user_portfolio_info[ticker] = {
+                    'investment_amount': 0,
+                    'coin_balance': 0,
+                    'avg_buy_price': 0,
+                    'current_price': 0,
+                    'current_value': 0,
+                    'profit_rate': 0
                 }
-                status['all_user_bots'].append(user_info)
 
-        return jsonify(status)
+            bot_status = {
+                'ticker': ticker,
+                'strategy': bot_info.get('strategy', 'Unknown'),
+                'start_time': bot_info.get('start_time', datetime.now()).strftime('%Y-%m-%d %H:%M:%S'),
+                'cycle_count': bot_info.get('cycle_count', 0),
+                'last_run': bot_info.get('last_run', datetime.now()).strftime('%Y-%m-%d %H:%M:%S') if bot_info.get('last_run') else 'Never',
+                'next_run': next_run_time.strftime('%Y-%m-%d %H:%M:%S') if next_run_time else 'Unknown',
+                'job_id': job_id,
+                'running': scheduled,
+                'interval': bot_info.get('interval', 0),
+                'run_count': job_info_from_scheduler.get('run_count', 0) if job_info_from_scheduler else 0,
+                'username': bot_info.get('username', 'Unknown'),
+                'interval_label': bot_info.get('interval_label', 'Unknown'),
+                # 봇 설정 정보 추가
+                'settings': {
+                    'buy_amount': get_setting_value('buy_amount', 0),
+                    'window': get_setting_value('window', 20),
+                    'multiplier': get_setting_value('multiplier', 2.0),
+                    'buy_multiplier': get_setting_value('buy_multiplier', 3.0),
+                    'sell_multiplier': get_setting_value('sell_multiplier', 2.0),
+                    'max_order_amount': get_setting_value('max_order_amount', 0),
+                    'min_cash': get_setting_value('min_cash', 0),
+                    'sleep_time': get_setting_value('sleep_time', 60),
+                    'sell_portion': get_setting_value('sell_portion', 1.0),
+                    'prevent_loss_sale': get_setting_value('prevent_loss_sale', 'N'),
+                    # RSI 관련 설정
+                    'rsi_buy_threshold': get_setting_value('rsi_buy_threshold', 30),
+                    'rsi_sell_threshold': get_setting_value('rsi_sell_threshold', 70),
+                    'rsi_period': get_setting_value('rsi_period', 14),
+                    # 변동성 돌파 관련 설정
+                    'volatility_multiplier': get_setting_value('volatility_multiplier', 0.5),
+                    'volatility_period': get_setting_value('volatility_period', 20),
+                    # 앙상블 관련 설정
+                    'ensemble_weights': get_setting_value('ensemble_weights', {}),
+                    'ensemble_threshold': get_setting_value('ensemble_threshold', 0.6)
+                },
+                'long_term_investment': bot_info.get('long_term_investment', 'N'),
+                # 투자 정보 추가
+                'portfolio_info': user_portfolio_info.get(ticker, {
+                    'investment_amount': 0,  # 투자 금액
+                    'coin_balance': 0,
+                    'avg_buy_price': 0,
+                    'current_price': 0,
+                    'current_value': 0,
+                    'profit_rate': 0
+                })
+            }
+
+            user_bot_list.append(bot_status)
+
+        # 사용자 username 가져오기
+        user = User.query.filter_by(id=user_id).first()
+        user_name = user.username if user else None
+
+        # 현금 보유량 조회 (get_balance_cash 메서드 직접 사용 - float 반환)
+        krw_balance = 0
+        try:
+            if user:
+                # User 모델에서 암호화된 API 키 복호화
+                access_key, secret_key = user.get_upbit_keys()
+
+                if access_key and secret_key:
+                    upbit_api = UpbitAPI.create_from_user(user, async_handler, logger)
+                    # get_balance_cash는 float 값을 직접 반환
+                    krw_balance = upbit_api.get_balance_cash()
+                    krw_balance = float(krw_balance) if krw_balance else 0
+                    balances = upbit_api.get_accounts()
+
+                    if balances:
+                        for balance in balances:
+                            if balance['currency'] != 'KRW':
+                                price = balance['avg_buy_price'] if skip_valuation else \
+                                    upbit_api.get_current_price(f'KRW-{balance['currency']}')
+                                user_total_current_value += float(balance['balance']) * float(price)
+                                user_total_investment += float(balance['balance']) * float(balance['avg_buy_price'])
+
+        except Exception as e:
+            logger.error(f"현금 보유량 조회 중 오류 (사용자: {user_id}): {str(e)}")
+
+        # 계산 수정: 요구사항에 따른 정확한 계산
+        # 총 금액: 전체 투자 및 보유금액의 합 (투자한 금액 + 보유 현금)
+        total_investment_amount = user_total_investment + krw_balance
+
+        # 보유현금: 전체 투자 금액에서 투자한 금액을 뺀 값 (이미 krw_balance로 계산됨)
+        cash_balance = krw_balance
+
+        # 손익: 현재 평가금액 - 투자금액
+        profit_loss = user_total_current_value - user_total_investment
+
+        # 수익률: 손익에 대한 백분율
+        total_profit_rate = 0
+        if user_total_investment > 0:
+            total_profit_rate = (profit_loss / user_total_investment * 100)
+
+        # 사용자별 봇 정보 추가
+        if user_bot_list:  # 봇이 있는 사용자만 추가
+            user_info = {
+                'user_id': user_id,
+                'user_name': user_name,
+                'bot_count': len(user_bot_list),
+                'bots': user_bot_list,
+                # 투자 정보 수정
+                'investment_info': {
+                    'total_investment': total_investment_amount,  # 총 투자금액: 전체 투자 + 보유금액의 합
+                    'current_value': user_total_current_value,  # 현재 평가금액: 현재 투자된 ticker들의 합
+                    'krw_balance': cash_balance,  # 보유현금: 전체 투자 금액에서 투자한 금액을 뺀 값
+                    'profit_loss': profit_loss,  # 손익: 현재 평가금액 - 투자금액
+                    'total_profit_rate': total_profit_rate  # 수익률: 손익에 대한 백분율
+                }
+            }
+            status['all_user_bots'].append(user_info)
+
+    return status
 
+
+@bp.route('/api/scheduler/metrics')
+@login_required
+def get_scheduler_metrics():
+    """거래 사이클 단계별 소요 시간/대기 시간/건너뜀 지표 (?format=prometheus 이면 Prometheus 텍스트 형식)"""
+    output_format = 'prometheus' if request.args.get('format') == 'prometheus' else 'json'
+    try:
+        engine = remote_engine()
+        if engine is not None:
+            metrics = engine.call('metrics', format=output_format)
+        else:
+            metrics = build_scheduler_metrics(output_format)
     except Exception as e:
-        logger.error(f"모든 사용자의 스케줄러 상태 조회 중 오류: {str(e)}")
+        logger.error(f"스케줄러 지표 조회 중 오류: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+    if output_format == 'prometheus':
+        return Response(metrics, mimetype='text/plain; version=0.0.4; charset=utf-8')
+    return jsonify(metrics)
+
+
+def build_scheduler_metrics(format='json', labels=None, include_help=True):
+    """사이클 지표 (거래 엔진을 실행하는 프로세스에서 호출)"""
+    if format == 'prometheus':
+        return scheduler_metrics.prometheus_text(labels=labels, include_help=include_help)
+    return scheduler_metrics.get_stats()
+
 
 # 코인 추천 관련 API 엔드포인트
 @bp.route('/api/coin_recommendations')
@@ -1997,6 +2207,10 @@ def get_coin_recommendations():
     if auth_error:
         return auth_error
 
+    # 부하 차단 중에는 코인 추천 스캔 생략
+    if load_shedder.shed('recommender'):
+        return shed_response()
+
     try:
         # 파라미터 유효성 검사
         limit = request.args.get('limit', 10, type=int)
@@ -2047,6 +2261,10 @@ def get_coin_analysis(ticker):
     if auth_error:
         return auth_error
 
+    # 부하 차단 중에는 코인 추천 스캔 생략
+    if load_shedder.shed('recommender'):
+        return shed_response()
+
     try:
         # 티커 유효성 검사
         if not ticker or not isinstance(ticker, str):
@@ -2098,6 +2316,10 @@ def get_market_analysis():
     if auth_error:
         return auth_error
 
+    # 부하 차단 중에는 코인 추천 스캔 생략
+    if load_shedder.shed('recommender'):
+        return shed_response()
+
     try:
         # 사용자 API 객체 가져오기 (성능 최적화)
         user_id = current_user.id
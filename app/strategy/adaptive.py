@@ -21,6 +21,17 @@ class AdaptiveStrategy:
             'rsi': RSIStrategy(upbit_api, logger)
         }
 
+    def get_data_requirements(self):
+        """한 사이클에 조회하는 데이터 목록 [(endpoint, interval, count)]
+
+        선택되는 하위 전략은 시장 상황/시간대에 따라 달라지므로 모든 하위 전략의 요구를 합칩니다.
+        (15분봉/5분봉/일봉이 대부분 겹쳐 병합 후 조회 건수는 크게 늘지 않음)
+        """
+        return [('ohlcv', 'minute15', 50)] + \
+            self.strategies['bollinger'].rsi_analyzer.get_data_requirements() + \
+            self.strategies['volatility'].get_data_requirements() + \
+            self.strategies['rsi'].get_data_requirements()
+
     def detect_market_condition(self, ticker):
         """시장 상황 감지 (추세/횡보/고변동성)"""
         try:
@@ -0,0 +1,209 @@
+"""
+티커 간 배치 볼린저 밴드 평가
+
+같은 (전략, interval, 파라미터) 그룹의 봇들이 각자 pandas 파이프라인을 돌리는 대신,
+그룹 내 모든 티커의 종가를 2차원 NumPy 패널로 쌓아 밴드와 신호를 한 번에 계산합니다.
+
+시세는 요청한 봇의 UpbitAPI(fetch_data 재시도/호출 한도 집계)로 잠금 없이 동시에 조회하고,
+그룹당 한 번에 한 봇만 평가합니다 (평가 중 다른 봇은 이전 결과를 쓰거나 개별 계산).
+조회에 실패한 티커는 BATCH_EVAL_FAILURE_TTL초 동안 그룹 평가에서 빠집니다.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pyupbit
+
+from config import Config
+
+
+def compute_bands_panel(panel, buy_multiplier, sell_multiplier):
+    """종가 패널의 마지막 시점 볼린저 밴드 계산
+
+    Args:
+        panel (ndarray): (티커 수, window) 형태의 종가 배열
+        buy_multiplier (float): 하단 밴드 승수
+        sell_multiplier (float): 상단 밴드 승수
+
+    Returns:
+        tuple: (상단 밴드 배열, 하단 밴드 배열) - pandas rolling().std()와 동일하게 ddof=1 사용
+    """
+    sma = panel.mean(axis=1)
+    std = panel.std(axis=1, ddof=1)
+    return sma + std * sell_multiplier, sma - std * buy_multiplier
+
+
+def compute_signals(prices, upper, lower):
+    """현재가와 밴드 비교로 기본 신호 계산 (RSI/매도압력 필터 적용 전)"""
+    return np.where(prices > upper, 'SELL', np.where(prices < lower, 'BUY', 'HOLD'))
+
+
+class BatchBollingerEvaluator:
+    """(전략, interval, window, 승수) 그룹 단위 볼린저 밴드 배치 평가기"""
+
+    def __init__(self, ttl=None, member_ttl=None):
+        self.ttl = ttl if ttl is not None else Config.BATCH_EVAL_TTL
+        self.member_ttl = member_ttl if member_ttl is not None else Config.BATCH_EVAL_MEMBER_TTL
+        self.logger = logging.getLogger(__name__)
+
+        self._members = {}  # {group_key: {ticker: 마지막 요청 시각}}
+        self._results = {}  # {group_key: {'computed_at': float, 'bands': {ticker: dict}}}
+        self._evaluating = set()  # 평가 중인 group_key
+        self._failed = {}  # {(ticker, interval, window): 다시 시도할 시각}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=Config.PREFETCH_MAX_WORKERS, thread_name_prefix='BatchEval')
+        self._stats = {'batches': 0, 'hits': 0, 'evaluated_tickers': 0, 'failed_tickers': 0, 'busy': 0}
+
+    @staticmethod
+    def make_group_key(strategy_name, interval, window, buy_multiplier, sell_multiplier):
+        """그룹 키 생성 (파라미터 타입 정규화 실패 시 None)"""
+        try:
+            return strategy_name, interval, int(window), float(buy_multiplier), float(sell_multiplier)
+        except (ValueError, TypeError):
+            return None
+
+    def _is_failed(self, ticker, interval, window, now):
+        return self._failed.get((ticker, interval, window), 0) > now
+
+    def serves(self, ticker, interval, window):
+        """배치 평가가 티커의 밴드/현재가를 제공하는지 (최근 조회에 실패한 티커는 개별 계산)"""
+        if not Config.BATCH_EVAL_ENABLED:
+            return False
+        with self._lock:
+            return not self._is_failed(ticker, interval, int(window), time.time())
+
+    def get_bands(self, strategy_name, ticker, interval, window, buy_multiplier, sell_multiplier, api):
+        """티커의 최신 밴드/현재가/기본 신호 조회 (필요 시 그룹 전체를 배치 평가)
+
+        Args:
+            api: 시세 조회에 사용할 요청 봇의 UpbitAPI
+
+        Returns:
+            dict: {'upper', 'lower', 'price', 'signal', 'computed_at'} 또는 None (개별 계산으로 대체 필요)
+        """
+        group_key = self.make_group_key(strategy_name, interval, window, buy_multiplier, sell_multiplier)
+        if group_key is None:
+            return None
+
+        now = time.time()
+        with self._lock:
+            self._members.setdefault(group_key, {})[ticker] = now
+            result = self._results.get(group_key)
+            fresh = result is not None and now - result['computed_at'] < self.ttl
+            if fresh and (ticker in result['bands'] or self._is_failed(ticker, group_key[1], group_key[2], now)):
+                self._stats['hits'] += 1
+                return result['bands'].get(ticker)
+            if group_key in self._evaluating:
+                # 다른 봇이 평가 중이면 기다리지 않고 개별 계산
+                self._stats['busy'] += 1
+                return None
+            self._evaluating.add(group_key)
+
+        try:
+            result = self._evaluate_group(group_key, api)
+            with self._lock:
+                self._results[group_key] = result
+        finally:
+            with self._lock:
+                self._evaluating.discard(group_key)
+
+        return result['bands'].get(ticker)
+
+    def _active_tickers(self, group_key):
+        """최근 member_ttl 안에 요청했고 최근 조회에 실패하지 않은 티커 목록 (중지된 봇은 자동으로 빠짐)"""
+        _, interval, window, _, _ = group_key
+        now = time.time()
+        with self._lock:
+            members = self._members.get(group_key, {})
+            for ticker in [t for t, seen in members.items() if now - seen > self.member_ttl]:
+                del members[ticker]
+            return sorted(t for t in members if not self._is_failed(t, interval, window, now))
+
+    def _load_closes(self, api, ticker, interval, window):
+        """티커의 최근 window개 종가 (공유 캔들 저장소 우선, 없으면 fetch_data로 조회)"""
+        df = api.get_ohlcv_data(ticker, interval, window)
+        if df is None or len(df) < window:
+            return None
+        return df['close'].to_numpy(dtype='float64')[-window:]
+
+    def _load_prices(self, api, tickers):
+        """그룹 티커들의 현재가를 한 번의 요청으로 조회"""
+        try:
+            prices = api.fetch_data(lambda: pyupbit.get_current_price(tickers))
+            if isinstance(prices, dict):
+                return prices
+            if len(tickers) == 1 and isinstance(prices, (int, float)):
+                return {tickers[0]: prices}
+        except Exception as e:
+            self.logger.warning(f"배치 현재가 조회 실패: {e}")
+        return {}
+
+    def _evaluate_group(self, group_key, api):
+        """그룹의 모든 티커를 하나의 패널로 쌓아 밴드/신호를 계산 (잠금 없이 호출)"""
+        strategy_name, interval, window, buy_multiplier, sell_multiplier = group_key
+        tickers = self._active_tickers(group_key)
+        futures = {ticker: self._executor.submit(self._load_closes, api, ticker, interval, window) for ticker in tickers}
+
+        rows = []
+        valid_tickers = []
+        failed = []
+        for ticker, future in futures.items():
+            try:
+                closes = future.result()
+            except Exception as e:
+                self.logger.warning(f"배치 평가용 캔들 조회 실패 ({ticker}): {e}")
+                closes = None
+            if closes is not None:
+                rows.append(closes)
+                valid_tickers.append(ticker)
+            else:
+                failed.append(ticker)
+
+        if failed:
+            retry_at = time.time() + Config.BATCH_EVAL_FAILURE_TTL
+            with self._lock:
+                for ticker in failed:
+                    self._failed[(ticker, interval, window)] = retry_at
+                self._stats['failed_tickers'] += len(failed)
+
+        computed_at = time.time()
+        if not rows:
+            return {'computed_at': computed_at, 'bands': {}}
+
+        panel = np.vstack(rows)
+        upper, lower = compute_bands_panel(panel, buy_multiplier, sell_multiplier)
+
+        # 현재가 조회 실패 티커는 마지막 종가(진행 중 캔들)로 대체
+        price_map = self._load_prices(api, valid_tickers)
+        prices = np.array([float(price_map.get(t) or panel[i, -1]) for i, t in enumerate(valid_tickers)])
+        signals = compute_signals(prices, upper, lower)
+
+        with self._lock:
+            self._stats['batches'] += 1
+            self._stats['evaluated_tickers'] += len(valid_tickers)
+        self.logger.info(f"배치 볼린저 평가 완료: {group_key} - {len(valid_tickers)}개 티커")
+
+        bands = {
+            ticker: {
+                'upper': float(upper[i]),
+                'lower': float(lower[i]),
+                'price': float(prices[i]),
+                'signal': str(signals[i]),
+                'computed_at': computed_at
+            }
+            for i, ticker in enumerate(valid_tickers)
+        }
+        return {'computed_at': computed_at, 'bands': bands}
+
+    def get_stats(self):
+        """그룹별 구성 및 배치 통계"""
+        with self._lock:
+            groups = {str(key): len(members) for key, members in self._members.items()}
+            now = time.time()
+            return dict(self._stats, groups=groups, failing=sum(1 for until in self._failed.values() if until > now))
+
+
+# 글로벌 배치 평가기 인스턴스
+batch_evaluator = BatchBollingerEvaluator()
@@ -1,5 +1,6 @@
 from app.strategy.volume_base_buy import VolumeBasedBuyStrategy
 from app.strategy.rsi_selling_pressure import RSIVolumeIntegratedStrategy
+from app.utils.load_shedder import load_shedder
 
 
 class BollingerBandsStrategy:
@@ -12,6 +13,11 @@ class BollingerBandsStrategy:
         self.volume_analyzer = VolumeBasedBuyStrategy(upbit_api, logger)
         self.rsi_analyzer = RSIVolumeIntegratedStrategy(upbit_api, logger)
 
+    def get_data_requirements(self, window=20, interval='minute5', use_rsi_filter=True):
+        """한 사이클에 조회하는 데이터 목록 [(endpoint, interval, count)] - 봇이 신호 계산 전에 선조회"""
+        return [('ohlcv', interval, int(window) + 5), ('current_price', None, None)] + \
+            self.rsi_analyzer.get_data_requirements(interval, use_rsi_filter)
+
     def get_bollinger_bands(self, prices, window=20, multiplier=2):
         """볼린저 밴드 계산"""
         self.logger.info(f"볼린저 밴드 계산 시작 (window={window}, multiplier={multiplier})")
@@ -67,14 +73,22 @@ class BollingerBandsStrategy:
             self.logger.error(f"매수 지연 판단 중 오류: {e}")
             return False
 
-    def generate_signal(self, ticker, prices, window, multiplier, use_rsi_filter=True, rsi_threshold=30, interval='minute5'):
-        """매매 신호 생성 - RSI 필터 선택 가능"""
-        upper_band, lower_band = self.get_bollinger_bands(prices, window, multiplier)
+    def generate_signal(self, ticker, prices, window, multiplier, use_rsi_filter=True, rsi_threshold=30, interval='minute5', bands=None):
+        """매매 신호 생성 - RSI 필터 선택 가능
+
+        bands가 주어지면 (배치 평가기에서 계산된 {'upper', 'lower', 'price'}) 밴드 계산과 현재가 조회를 생략합니다.
+        """
+        if bands is not None:
+            band_high = bands['upper']
+            band_low = bands['lower']
+            cur_price = bands['price']
+        else:
+            upper_band, lower_band = self.get_bollinger_bands(prices, window, multiplier)
 
-        # 마지막 값만 필요하므로 최적화
-        band_high = upper_band.iloc[-1]
-        band_low = lower_band.iloc[-1]
-        cur_price = self.api.get_current_price(ticker)
+            # 마지막 값만 필요하므로 최적화
+            band_high = upper_band.iloc[-1]
+            band_low = lower_band.iloc[-1]
+            cur_price = self.api.get_current_price(ticker)
 
         if cur_price is None:
             self.logger.error("현재가를 가져올 수 없어 신호 생성을 중단합니다.")
@@ -83,8 +97,8 @@ class BollingerBandsStrategy:
         self.logger.info(f"매도밴드: {band_high:.2f} / 매수밴드: {band_low:.2f} / {ticker} PRICE: {cur_price:.2f}")
 
         if cur_price > band_high:
-            # RSI 상승세 체크로 매도 지연 여부 판단
-            if self.rsi_analyzer.should_delay_sell_rsi_rising(ticker, interval, 70):
+            # RSI 상승세 체크로 매도 지연 여부 판단 (부하 차단 중에는 추가 조회 없이 일반 매도)
+            if not load_shedder.shed('rsi_filter') and self.rsi_analyzer.should_delay_sell_rsi_rising(ticker, interval, 70):
                 # RSI가 계속 상승 중이면 부분 매도만 진행
                 sell_strength = self.rsi_analyzer.get_sell_signal_strength(ticker, cur_price, band_high, interval)
                 self.logger.info(f"RSI 상승세 감지, 부분 매도 진행 (강도: {sell_strength:.2f})")
@@ -1,4 +1,15 @@
 import datetime
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from app.utils.execution_lanes import bind_lane, in_lane
+from config import Config
+
+# 하위 전략 평가 및 데이터 선조회에 사용하는 공유 스레드 풀 (봇마다 풀을 만들지 않도록 모듈 단위로 공유)
+_executor = ThreadPoolExecutor(max_workers=Config.ENSEMBLE_MAX_WORKERS, thread_name_prefix='Ensemble')
+
+# RSI 하위 전략이 조회하는 캔들 수 (RSIStrategy.generate_signal 기본값: max(period * 3, 60))
+RSI_CANDLE_COUNT = 60
+BOLLINGER_CANDLE_COUNT = 30
 
 
 class EnsembleStrategy:
@@ -20,6 +31,57 @@ class EnsembleStrategy:
             'rsi': RSIStrategy(upbit_api, logger)
         }
 
+    def get_data_requirements(self):
+        """한 사이클에 조회하는 데이터 목록 [(endpoint, interval, count)] - 하위 전략 요구의 합"""
+        return [('ohlcv', 'minute15', RSI_CANDLE_COUNT)] + \
+            self.strategies['bollinger'].rsi_analyzer.get_data_requirements() + \
+            self.strategies['volatility'].get_data_requirements() + \
+            self.strategies['rsi'].get_data_requirements()
+
+    def _prefetch_data(self, ticker):
+        """하위 전략들이 필요로 하는 데이터를 한 번에 동시 조회
+
+        조회 결과는 UpbitAPI 캐시에 저장되므로, 이후 하위 전략들의 조회는 캐시에서 처리됩니다.
+
+        Returns:
+            dict: {요청 이름: 결과} (조회 실패 시 None)
+        """
+        requests = {
+            'day_candles': (self.api.get_ohlcv_data, (ticker, 'day', 2)),
+            'minute15_candles': (self.api.get_ohlcv_data, (ticker, 'minute15', RSI_CANDLE_COUNT)),
+            'current_price': (self.api.get_current_price, (ticker,)),
+            'balance_coin': (self.api.get_balance_coin, (ticker,)),
+            'buy_avg': (self.api.get_buy_avg, (ticker,)),
+        }
+
+        futures = {name: _executor.submit(bind_lane(func), *args) for name, (func, args) in requests.items()}
+
+        results = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result(timeout=Config.ENSEMBLE_TIMEOUT)
+            except FutureTimeoutError:
+                self.logger.warning(f"앙상블 데이터 선조회 시간 초과: {name}")
+                results[name] = None
+            except Exception as e:
+                self.logger.warning(f"앙상블 데이터 선조회 실패 ({name}): {str(e)}")
+                results[name] = None
+
+        return results
+
+    @staticmethod
+    def _normalize_signal(signal):
+        """하위 전략 신호를 'BUY', 'SELL', 'HOLD' 중 하나로 정규화"""
+        # 볼린저 밴드 전략은 {'signal': ..., 'sell_ratio': ...} 형태로 반환
+        if isinstance(signal, dict):
+            signal = signal.get('signal', 'HOLD')
+
+        if signal == 'PARTIAL_SELL':
+            return 'SELL'
+
+        return signal if signal in ('BUY', 'SELL', 'HOLD') else 'HOLD'
+
+    @in_lane('analysis')
     def generate_signal(self, ticker, weights=None):
         """앙상블 매매 신호 생성
 
@@ -49,24 +111,41 @@ class EnsembleStrategy:
             total_score = 0
             valid_strategies = 0
 
+            # 1단계: 모든 하위 전략의 데이터를 한 번에 동시 조회
+            prefetched = self._prefetch_data(ticker)
+
+            # 볼린저 밴드는 RSI용 15분봉에서 마지막 30개만 잘라서 사용 (추가 조회 없음)
+            bollinger_prices = None
+            minute15_candles = prefetched.get('minute15_candles')
+            if minute15_candles is not None and len(minute15_candles) >= BOLLINGER_CANDLE_COUNT:
+                bollinger_prices = minute15_candles['close'].iloc[-BOLLINGER_CANDLE_COUNT:].copy()
+
+            def run_bollinger():
+                if bollinger_prices is None:
+                    return 'HOLD'
+                return self.strategies['bollinger'].generate_signal(ticker, bollinger_prices, 20, 2)
+
+            tasks = {
+                'volatility': lambda: self.strategies['volatility'].generate_volatility_signal(ticker, k=0.5),
+                'bollinger': run_bollinger,
+                'rsi': lambda: self.strategies['rsi'].generate_signal(ticker),
+            }
+
+            # 2단계: 선조회된 데이터로 하위 전략들을 동시에 평가
+            futures = {name: _executor.submit(bind_lane(task)) for name, task in tasks.items()}
+
             # 각 전략별 신호 수집
-            for name, strategy in self.strategies.items():
+            for name, future in futures.items():
                 try:
-                    if name == 'volatility':
-                        signals[name] = strategy.generate_volatility_signal(ticker, k=0.5)
-                    elif name == 'bollinger':
-                        prices = self.api.get_ohlcv_data(ticker, 'minute15', 30)
-                        if prices is not None and len(prices) >= 30:
-                            signals[name] = strategy.generate_signal(ticker, prices['close'], 20, 2)
-                        else:
-                            signals[name] = 'HOLD'
-                    else:  # rsi
-                        signals[name] = strategy.generate_signal(ticker)
+                    signals[name] = self._normalize_signal(future.result(timeout=Config.ENSEMBLE_TIMEOUT))
 
                     # 가중치 적용하여 점수 계산
                     total_score += signal_scores[signals[name]] * weights[name]
                     valid_strategies += 1
 
+                except FutureTimeoutError:
+                    self.logger.warning(f"{name} 전략 실행 시간 초과 ({Config.ENSEMBLE_TIMEOUT}초)")
+                    signals[name] = 'HOLD'
                 except Exception as e:
                     self.logger.warning(f"{name} 전략 실행 중 오류: {str(e)}")
                     signals[name] = 'HOLD'
@@ -96,4 +175,4 @@ class EnsembleStrategy:
 
         except Exception as e:
             self.logger.error(f"앙상블 전략 신호 생성 중 오류: {str(e)}")
-            return 'HOLD'
\ No newline at end of file
+            return 'HOLD'
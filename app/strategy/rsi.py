@@ -81,6 +81,24 @@ class RSIStrategy:
             self.logger.error(f"RSI 계산 중 오류: {str(e)}")
             return pd.Series([50.0] * len(prices), index=prices.index, dtype='float64')
 
+    def get_data_requirements(self, period=14, timeframe='minute15', use_multi_timeframe=False):
+        """한 사이클에 조회하는 데이터 목록 [(endpoint, interval, count)] (generate_signal과 같은 기본값 보정)"""
+        try:
+            period = int(period)
+        except (ValueError, TypeError):
+            period = 14
+        if period < 2:
+            period = 14
+
+        requirements = [
+            ('ohlcv', timeframe or 'minute15', max(period * 3, 60)),
+            ('current_price', None, None),
+            ('balance_coin', None, None),
+        ]
+        if use_multi_timeframe:
+            requirements += [('ohlcv', tf, max(period * 3, 60)) for tf in ('minute15', 'minute60', 'day')]
+        return requirements
+
     def get_market_data_safely(self, ticker, timeframe='minute15', count=50, max_retries=3):
         """안전한 데이터 조회 함수"""
         for attempt in range(max_retries):
@@ -56,6 +56,18 @@ class RSIVolumeIntegratedStrategy:
         self.rsi_strategy = RSIStrategy(upbit_api, logger)
         self.volume_analyzer = VolumeBasedBuyStrategy(upbit_api, logger)
 
+    def get_data_requirements(self, interval='minute5', use_rsi_filter=True):
+        """매도 지연/급락 보호 필터가 조회하는 데이터 목록 [(endpoint, interval, count)]
+
+        호가와 틱 캔들은 매수 밴드 이탈 시에만 필요하므로 목록에 넣지 않습니다.
+        (조회되더라도 사이클 스냅샷에 저장되어 같은 사이클에서 다시 조회되지 않음)
+        """
+        requirements = [('ohlcv', interval, 14 + 5 + 10)]  # get_rsi_trend 기본값 (period + lookback + 10)
+        if use_rsi_filter:
+            # get_rsi_state 50개 (급락 감지 17개, 변동성 20개 조회도 같은 5분봉에서 처리)
+            requirements.append(('ohlcv', 'minute5', 50))
+        return requirements
+
     def detect_rapid_decline(self, ticker, lookback_periods=5):
         """급격한 가격 하락 감지 (기존 15분봉 기반)"""
         try:
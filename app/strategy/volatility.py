@@ -1,5 +1,7 @@
 import datetime
 
+from app.utils.daily_levels import compute_daily_levels, breakout_target
+
 
 def is_trading_time():
     """거래 시간 확인 (9시부터 다음날 8시 50분까지)"""
@@ -28,26 +30,34 @@ class VolatilityBreakoutStrategy:
         self.api = upbit_api
         self.logger = logger
 
+    def get_data_requirements(self):
+        """한 사이클에 조회하는 데이터 목록 [(endpoint, interval, count)]
+
+        일봉은 API의 일일 기준값 저장소에서 제공되면 사이클마다 조회하지 않습니다.
+        """
+        requirements = [('balance_coin', None, None), ('current_price', None, None)]
+        if not hasattr(self.api, 'get_daily_levels'):
+            requirements.append(('ohlcv', 'day', 2))
+        return requirements
+
+    def get_daily_levels(self, ticker):
+        """당일 시가/전일 변동폭 (실거래 API는 일일 기준값 저장소, 그 외에는 일봉 직접 조회)"""
+        if hasattr(self.api, 'get_daily_levels'):
+            return self.api.get_daily_levels(ticker)
+        return compute_daily_levels(self.api.get_ohlcv_data(ticker, 'day', 2))
+
     def calculate_target_price(self, ticker, k):
         """변동성 돌파 전략의 매수 목표가 계산"""
         try:
-            # 일봉 데이터 가져오기
-            df = self.api.get_ohlcv_data(ticker, 'day', 2)
-            if df is None or len(df) < 2:
+            levels = self.get_daily_levels(ticker)
+            if levels is None:
                 self.logger.error("목표가 계산을 위한 OHLCV 데이터를 가져오지 못했습니다.")
                 return None
 
-            # 전일 데이터
-            yesterday = df.iloc[-2]
-            today_open = df.iloc[-1]['open']
-
-            # 변동폭 계산 (전일 고가 - 전일 저가)
-            volatility = yesterday['high'] - yesterday['low']
-
             # 매수 목표가 = 당일 시가 + (전일 변동폭 * k)
-            target_price = today_open + (volatility * k)
+            target_price = breakout_target(levels, k)
 
-            self.logger.info(f"변동성 돌파 목표가 계산: 시가({today_open:,.2f}) + 변동폭({volatility:,.2f}) * k({k}) = {target_price:,.2f}")
+            self.logger.info(f"변동성 돌파 목표가 계산: 시가({levels['open']:,.2f}) + 변동폭({levels['range']:,.2f}) * k({k}) = {target_price:,.2f}")
             return target_price
 
         except Exception as e:
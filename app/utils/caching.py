@@ -34,12 +34,6 @@ def cache_with_timeout(seconds=30, max_size=100, enable_stats=False):
                 cache = _CACHE[cache_key]
                 now = time.time()
 
-                # 캐시 크기 제한 관리
-                if len(cache) >= max_size:
-                    # 가장 오래된 항목 제거
-                    oldest_key = min(cache.items(), key=lambda x: x[1][1])[0]
-                    del cache[oldest_key]
-
                 # 캐시에서 가져오기
                 if key in cache:
                     result, timestamp = cache[key]
@@ -51,11 +45,21 @@ def cache_with_timeout(seconds=30, max_size=100, enable_stats=False):
                 if enable_stats:
                     stats["misses"] += 1
 
-                # 함수 실행 및 결과 캐싱
-                result = func(*args, **kwargs)
+            # 함수 실행은 락 밖에서 수행 (느린 API 호출이 다른 스레드의 캐시 조회/동시 조회를 막지 않도록)
+            result = func(*args, **kwargs)
+
+            with _CACHE_LOCK:
+                cache = _CACHE.setdefault(cache_key, {})
+
+                # 캐시 크기 제한 관리
+                if key not in cache and len(cache) >= max_size:
+                    # 가장 오래된 항목 제거
+                    oldest_key = min(cache.items(), key=lambda x: x[1][1])[0]
+                    del cache[oldest_key]
+
                 cache[key] = (result, now)
 
-                return result
+            return result
 
         # 통계 정보 접근을 위한 메서드 추가
         if enable_stats:
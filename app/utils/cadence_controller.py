@@ -0,0 +1,155 @@
+"""
+변동성 기반 봇 실행 간격 조정
+
+주기적으로 공유 1분봉 저장소에서 티커별 최근 변동성을 계산하고, 각 봇 작업의 실행 간격을
+설정값(sleep_time) 기준으로 줄이거나 늘립니다. 조용한 장에서는 API 호출을 줄이고,
+변동성이 큰 장에서는 더 빨리 반응합니다. 경계 근처에서 간격이 계속 바뀌지 않도록
+구간(high/normal/low)을 바꿀 때 히스테리시스를 적용합니다.
+"""
+import logging
+import threading
+from datetime import datetime
+
+from app.utils.market_data import candle_store
+from config import Config
+
+# 변동성 구간 경계 (5분봉 수익률 표준편차)
+HIGH_VOLATILITY = 0.02
+LOW_VOLATILITY = 0.005
+
+# 변동성 계산 구간 (5분봉 12개 = 1시간)
+VOLATILITY_INTERVAL = 'minute5'
+VOLATILITY_BARS = 12
+
+
+def compute_volatility(df):
+    """종가 수익률 표준편차 (데이터 부족 시 None)"""
+    if df is None or len(df) < 2:
+        return None
+    return float(df['close'].pct_change().dropna().std())
+
+
+def volatility_regime(volatility, previous='normal', hysteresis=0.0):
+    """변동성 구간 판정
+
+    이전 구간을 벗어날 때는 경계보다 hysteresis 비율만큼 더 넘어서야 구간이 바뀝니다.
+    """
+    high_exit = HIGH_VOLATILITY * (1 - hysteresis)
+    low_exit = LOW_VOLATILITY * (1 + hysteresis)
+
+    if previous == 'high' and volatility > high_exit:
+        return 'high'
+    if previous == 'low' and volatility < low_exit:
+        return 'low'
+    if volatility > HIGH_VOLATILITY:
+        return 'high'
+    if volatility < LOW_VOLATILITY:
+        return 'low'
+    return 'normal'
+
+
+def regime_interval(regime, base_interval, min_seconds=None, max_seconds=None):
+    """구간별 실행 간격 (high: 절반, low: 두 배, 범위 제한 - 범위 밖 기준 간격은 반대 방향으로 바꾸지 않음)"""
+    min_seconds = min_seconds if min_seconds is not None else Config.CADENCE_MIN_SECONDS
+    max_seconds = max_seconds if max_seconds is not None else Config.CADENCE_MAX_SECONDS
+
+    if regime == 'high':
+        return int(min(base_interval, max(min_seconds, base_interval * 0.5)))
+    if regime == 'low':
+        return int(max(base_interval, min(max_seconds, base_interval * 2)))
+    return int(base_interval)
+
+
+class CadenceController:
+    """봇 작업별 실행 간격 조정기"""
+
+    def __init__(self, scheduler_manager=None, hysteresis=None):
+        self._scheduler_manager = scheduler_manager
+        self.hysteresis = hysteresis if hysteresis is not None else Config.CADENCE_HYSTERESIS
+        self.logger = logging.getLogger(__name__)
+
+        self._states = {}  # {job_id: {'regime', 'volatility', 'interval', 'updated_at'}}
+        self._lock = threading.Lock()
+        self._stats = {'runs': 0, 'reschedules': 0, 'skipped': 0}
+
+    @property
+    def scheduler_manager(self):
+        if self._scheduler_manager is None:
+            from app.utils.scheduler_manager import scheduler_manager
+            self._scheduler_manager = scheduler_manager
+        return self._scheduler_manager
+
+    def _ticker_volatility(self, ticker):
+        try:
+            return compute_volatility(candle_store.get_ohlcv(ticker, VOLATILITY_INTERVAL, VOLATILITY_BARS))
+        except Exception as e:
+            self.logger.warning(f"변동성 계산 실패 ({ticker}): {e}")
+            return None
+
+    def update_all(self):
+        """모든 봇 작업의 간격 재계산 (스케줄러 주기 작업)"""
+        jobs = self.scheduler_manager.get_all_jobs()
+        volatilities = {}  # 같은 티커는 한 번만 계산
+        rescheduled = 0
+
+        for job_id, info in jobs.items():
+            ticker = info['ticker']
+            if ticker not in volatilities:
+                volatilities[ticker] = self._ticker_volatility(ticker)
+            if self.update_job(job_id, info, volatilities[ticker]):
+                rescheduled += 1
+
+        # 제거된 작업 상태 정리
+        with self._lock:
+            for job_id in set(self._states) - set(jobs):
+                del self._states[job_id]
+            self._stats['runs'] += 1
+
+        if rescheduled:
+            self.logger.info(f"변동성 기반 간격 조정: {rescheduled}/{len(jobs)}개 작업")
+        return rescheduled
+
+    def update_job(self, job_id, info, volatility):
+        """작업 하나의 구간/간격 갱신 - 간격이 바뀌면 스케줄 변경 후 True"""
+        if volatility is None:
+            with self._lock:
+                self._stats['skipped'] += 1
+            return False
+
+        base_interval = info.get('base_interval') or info['interval']
+        with self._lock:
+            previous = self._states.get(job_id, {}).get('regime', 'normal')
+        regime = volatility_regime(volatility, previous, self.hysteresis)
+        interval = regime_interval(regime, base_interval)
+
+        with self._lock:
+            self._states[job_id] = {
+                'ticker': info['ticker'],
+                'regime': regime,
+                'volatility': round(volatility, 5),
+                'base_interval': base_interval,
+                'interval': interval,
+                'updated_at': datetime.now().isoformat(timespec='seconds')
+            }
+
+        if interval == info['interval']:
+            return False
+
+        if not self.scheduler_manager.reschedule_job(job_id, interval):
+            return False
+
+        with self._lock:
+            self._stats['reschedules'] += 1
+        self.logger.info(
+            f"거래 간격 조정 ({job_id}): {info['interval']}초 → {interval}초 "
+            f"(변동성 {volatility:.4f}, 구간 {previous} → {regime})"
+        )
+        return True
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self._stats, jobs={job_id: dict(state) for job_id, state in self._states.items()})
+
+
+# 글로벌 간격 조정기
+cadence_controller = CadenceController()
@@ -8,6 +8,8 @@ import logging
 import time
 from typing import List, Dict, Tuple, Optional
 
+from app.utils.execution_lanes import bind_lane, in_lane
+
 
 class CoinRecommender:
     """코인 수익성 분석 및 추천 클래스"""
@@ -155,6 +157,7 @@ class CoinRecommender:
             'KRW-QTUM', 'KRW-OMG', 'KRW-BAT', 'KRW-ZRX', 'KRW-GRT'
         ]
 
+    @in_lane('analysis')
     def get_market_analysis(self, timeframe='1h', period_hours=24) -> Dict:
         """전체 시장 분석 - 캐싱 및 성능 개선"""
         try:
@@ -215,7 +218,7 @@ class CoinRecommender:
             with ThreadPoolExecutor(max_workers=5) as executor:
                 # 작업 제출
                 future_to_market = {
-                    executor.submit(analyze_single_coin, market): market
+                    executor.submit(bind_lane(analyze_single_coin), market): market
                     for market in krw_markets
                 }
 
@@ -653,6 +656,7 @@ class CoinRecommender:
         else:
             return "매우높음"
 
+    @in_lane('analysis')
     def get_top_recommendations(self, limit: int = 10, min_score: float = 30) -> List[Dict]:
         """상위 추천 코인 목록"""
         try:
@@ -672,6 +676,7 @@ class CoinRecommender:
             self.logger.error(f"상위 추천 코인 조회 오류: {e}")
             return []
 
+    @in_lane('analysis')
     def get_coin_detailed_analysis(self, ticker: str) -> Dict:
         """특정 코인 상세 분석"""
         try:
@@ -0,0 +1,200 @@
+"""
+변동성 돌파 일일 기준값 (당일 시가, 전일 변동폭)
+
+변동성 돌파 목표가(당일 시가 + 전일 변동폭 * k)는 업비트 일봉이 바뀌는 09:00(KST)에만 달라지므로,
+리셋 직후 변동성 전략 봇이 있는 티커의 기준값을 한 번에 계산해 파일로 저장하고
+사이클마다 일봉을 조회하는 대신 메모리에서 바로 반환합니다.
+리셋 직후 조회한 일봉은 전일 마지막 체결이 늦게 반영될 수 있어 일정 시간 후 한 번 더 확인하며,
+값이 바뀐 경우에만 다시 계산합니다.
+거래 엔진 샤드들은 같은 파일을 쓰므로 저장 시 이 프로세스가 계산한 티커만 병합합니다.
+"""
+import logging
+import threading
+from datetime import datetime, timedelta
+
+import pyupbit
+
+from app.utils.json_store import merge_json, read_json
+from config import Config
+
+# 일봉 기준값을 사용하는 전략 (적응형/앙상블은 내부에서 변동성 돌파 전략 사용)
+DAILY_LEVEL_STRATEGIES = ('volatility', 'adaptive', 'ensemble')
+
+# 업비트 일봉 시작 시각 (KST)
+DAY_RESET_HOUR = 9
+
+
+def trading_date(now=None):
+    """업비트 일봉 기준 거래일 (09:00 이전은 전날 일봉)"""
+    now = now or datetime.now()
+    return (now - timedelta(hours=DAY_RESET_HOUR)).strftime('%Y-%m-%d')
+
+
+def compute_daily_levels(df):
+    """최근 2개 일봉으로 기준값 계산
+
+    Returns:
+        dict: {'date', 'open', 'prev_high', 'prev_low', 'range'} 또는 None (일봉 부족)
+    """
+    if df is None or len(df) < 2:
+        return None
+
+    yesterday = df.iloc[-2]
+    today = df.iloc[-1]
+    return {
+        'date': df.index[-1].strftime('%Y-%m-%d'),
+        'open': float(today['open']),
+        'prev_high': float(yesterday['high']),
+        'prev_low': float(yesterday['low']),
+        'range': float(yesterday['high'] - yesterday['low']),
+    }
+
+
+def breakout_target(levels, k):
+    """매수 목표가 = 당일 시가 + 전일 변동폭 * k"""
+    return levels['open'] + levels['range'] * k
+
+
+def _fetch_day_candles(ticker):
+    """업비트 시세 API에서 최근 일봉 2개 조회 (API 키 불필요)"""
+    return pyupbit.get_ohlcv(ticker, interval='day', count=2)
+
+
+class DailyLevels:
+    """티커별 일일 기준값 저장소"""
+
+    def __init__(self, path=None, fetcher=None):
+        self.path = path or Config.DAILY_LEVELS_PATH
+        self.fetcher = fetcher or _fetch_day_candles
+        self.logger = logging.getLogger(__name__)
+
+        self._levels = {}  # {티커: 기준값 dict}
+        self._ticker_locks = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'computes': 0, 'revisions': 0, 'failures': 0}
+        self._load()
+
+    def _get_ticker_lock(self, ticker):
+        with self._lock:
+            if ticker not in self._ticker_locks:
+                self._ticker_locks[ticker] = threading.Lock()
+            return self._ticker_locks[ticker]
+
+    def _load(self):
+        """저장된 기준값 복원 (재시작 후 당일 값은 다시 조회하지 않음)"""
+        try:
+            self._levels = read_json(self.path)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"일일 기준값 파일을 읽지 못했습니다 ({self.path}): {e}")
+
+    def _save(self, tickers):
+        """계산한 티커의 기준값을 파일에 병합 (원자적 교체)"""
+        try:
+            with self._lock:
+                payload = {ticker: self._levels[ticker] for ticker in tickers if ticker in self._levels}
+            merge_json(self.path, payload)
+        except OSError as e:
+            self.logger.warning(f"일일 기준값 저장 실패 ({self.path}): {e}")
+
+    def _compute(self, ticker, fetch=None):
+        """일봉을 조회해 기준값 계산 (당일 일봉이 아직 없으면 None)"""
+        try:
+            levels = compute_daily_levels((fetch or (lambda: self.fetcher(ticker)))())
+        except Exception as e:
+            self.logger.error(f"일일 기준값 조회 실패 ({ticker}): {e}")
+            levels = None
+
+        if levels is None or levels['date'] != trading_date():
+            self._stats['failures'] += 1
+            return None
+
+        self._stats['computes'] += 1
+        levels['computed_at'] = datetime.now().isoformat(timespec='seconds')
+        return levels
+
+    def get(self, ticker, fetch=None):
+        """당일 기준값 조회 - 저장된 값이 없거나 전날 값이면 그때 계산
+
+        Args:
+            fetch (callable): 최근 2개 일봉 DataFrame을 반환하는 조회 함수 (기본값: 시세 API 직접 조회)
+        """
+        today = trading_date()
+        levels = self._levels.get(ticker)
+        if levels is not None and levels['date'] == today:
+            self._stats['hits'] += 1
+            return levels
+
+        with self._get_ticker_lock(ticker):
+            levels = self._levels.get(ticker)
+            if levels is not None and levels['date'] == today:
+                self._stats['hits'] += 1
+                return levels
+
+            levels = self._compute(ticker, fetch)
+            if levels is None:
+                return None
+            with self._lock:
+                self._levels[ticker] = levels
+
+        self._save([ticker])
+        return levels
+
+    def get_target(self, ticker, k, fetch=None):
+        """매수 목표가 (O(1) - 당일 기준값이 있으면 조회 없음)"""
+        levels = self.get(ticker, fetch)
+        return breakout_target(levels, k) if levels is not None else None
+
+    def active_tickers(self):
+        """일봉 기준값을 사용하는 봇이 실행 중인 티커"""
+        from app.utils.scheduler_manager import scheduler_manager
+
+        return sorted({info['ticker'] for info in scheduler_manager.get_all_jobs().values()
+                       if info.get('strategy') in DAILY_LEVEL_STRATEGIES})
+
+    def refresh(self, tickers=None):
+        """일봉 리셋 직후 배치 계산 (이미 당일 값이 있는 티커는 건너뜀)"""
+        tickers = tickers if tickers is not None else self.active_tickers()
+        computed = [ticker for ticker in tickers if self.get(ticker) is not None]
+        self.logger.info(f"일일 기준값 계산 완료: {len(computed)}/{len(tickers)}개 티커 ({trading_date()})")
+        return computed
+
+    def verify(self, tickers=None):
+        """리셋 직후 계산한 값을 다시 확인하여 일봉이 수정된 티커만 갱신"""
+        today = trading_date()
+        tickers = tickers if tickers is not None else self.active_tickers()
+        revised = []
+
+        for ticker in tickers:
+            current = self._levels.get(ticker)
+            if current is None or current['date'] != today:
+                self.get(ticker)
+                continue
+
+            levels = self._compute(ticker)
+            if levels is None:
+                continue
+            if all(levels[key] == current[key] for key in ('open', 'prev_high', 'prev_low')):
+                continue
+
+            with self._lock:
+                self._levels[ticker] = levels
+            self._stats['revisions'] += 1
+            revised.append(ticker)
+            self.logger.info(
+                f"일봉 수정 감지 ({ticker}): 변동폭 {current['range']:,.2f} → {levels['range']:,.2f}, "
+                f"시가 {current['open']:,.2f} → {levels['open']:,.2f}"
+            )
+
+        if revised:
+            self._save(revised)
+        return revised
+
+    def get_stats(self):
+        """저장소 통계"""
+        today = trading_date()
+        return dict(self._stats, date=today, tickers=len(self._levels),
+                    current=sum(1 for levels in self._levels.values() if levels['date'] == today))
+
+
+# 글로벌 일일 기준값 저장소
+daily_levels = DailyLevels()
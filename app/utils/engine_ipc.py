@@ -0,0 +1,214 @@
+"""
+거래 엔진 프로세스 제어 채널
+
+ENGINE_MODE가 'process'이면 스케줄러/봇/시세 데이터는 engine_server.py 프로세스에서만 실행되고,
+웹 프로세스(gunicorn 워커)는 로컬 IPC 채널(multiprocessing.connection, authkey 인증)로
+봇 시작/중지/상태 조회를 요청하고 봇 로그를 스트림으로 받습니다.
+웹 워커 수를 늘려도 봇이 중복 실행되지 않습니다.
+
+메시지 형식: 요청 {'command': 이름, 'args': dict} → 응답 {'ok': bool, 'result' | 'error'}
+'logs' 명령은 연결을 유지한 채 새 로그 묶음을 계속 보냅니다.
+"""
+import collections
+import logging
+import os
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+
+from config import ENGINE_PROCESS_ENV, Config, engine_ipc_error, mark_engine_process
+
+logger = logging.getLogger(__name__)
+
+
+def runs_trading():
+    """이 프로세스에서 스케줄러/봇을 실행하는지 (embedded 모드 또는 엔진 프로세스)"""
+    return Config.ENGINE_MODE != 'process' or os.environ.get(ENGINE_PROCESS_ENV) == '1'
+
+
+def _address():
+    return Config.ENGINE_IPC_HOST, Config.ENGINE_IPC_PORT
+
+
+def _authkey():
+    """제어 채널 키 (키/주소 설정이 안전하지 않으면 연결하지 않음)"""
+    error = engine_ipc_error()
+    if error:
+        raise RuntimeError(f"거래 엔진 제어 채널 설정 오류: {error}")
+    return Config.ENGINE_IPC_AUTHKEY.encode('utf-8')
+
+
+class LogBuffer:
+    """엔진 프로세스의 최근 봇 로그 (순번으로 스트림 구독자가 이어 받음)"""
+
+    def __init__(self, size=None):
+        self._entries = collections.deque(maxlen=size or Config.ENGINE_LOG_BUFFER)
+        self._seq = 0
+        self._condition = threading.Condition()
+
+    def publish(self, user_id, ticker, entry):
+        with self._condition:
+            self._seq += 1
+            self._entries.append((self._seq, user_id, ticker, entry))
+            self._condition.notify_all()
+
+    def read_since(self, seq, timeout=None):
+        """seq 이후 로그 (없으면 timeout까지 대기)"""
+        with self._condition:
+            if self._seq <= seq and timeout:
+                self._condition.wait(timeout)
+            return [item for item in self._entries if item[0] > seq]
+
+    @property
+    def seq(self):
+        return self._seq
+
+
+# 엔진 프로세스 봇 로그 버퍼
+log_buffer = LogBuffer()
+
+
+class EngineServer:
+    """엔진 프로세스 측 명령 서버 (연결당 스레드)"""
+
+    def __init__(self, handlers, address=None, authkey=None):
+        self.handlers = dict(handlers)
+        self.address = address or _address()
+        self.authkey = authkey or _authkey()
+        self._listener = None
+        self._stats = {'connections': 0, 'requests': 0, 'errors': 0, 'log_streams': 0}
+
+    def start(self):
+        self._listener = Listener(self.address, authkey=self.authkey)
+        threading.Thread(target=self._accept_loop, name='EngineIPC', daemon=True).start()
+        logger.info(f"거래 엔진 제어 채널 대기: {self.address[0]}:{self.address[1]}")
+
+    def close(self):
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+
+    def _accept_loop(self):
+        while self._listener is not None:
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                break  # 종료
+            except Exception as e:
+                # 인증 실패 등은 연결만 거부
+                logger.warning(f"제어 채널 연결 거부: {e}")
+                continue
+            self._stats['connections'] += 1
+            threading.Thread(target=self._serve, args=(conn,), name='EngineIPCConn', daemon=True).start()
+
+    def _serve(self, conn):
+        with conn:
+            while True:
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    return
+
+                command = request.get('command')
+                args = request.get('args') or {}
+                if command == 'logs':
+                    self._stream_logs(conn, **args)
+                    return
+
+                self._stats['requests'] += 1
+                handler = self.handlers.get(command)
+                try:
+                    if handler is None:
+                        raise ValueError(f"알 수 없는 명령입니다: {command}")
+                    response = {'ok': True, 'result': handler(**args)}
+                except Exception as e:
+                    self._stats['errors'] += 1
+                    logger.error(f"제어 명령 처리 실패 ({command}): {e}", exc_info=True)
+                    response = {'ok': False, 'error': str(e)}
+
+                try:
+                    conn.send(response)
+                except (EOFError, OSError):
+                    return
+
+    def _stream_logs(self, conn, since=None):
+        """구독자에게 새 로그를 계속 전송 (연결이 끊기면 종료)"""
+        self._stats['log_streams'] += 1
+        # 엔진이 재시작되면 순번이 처음부터 다시 시작하므로 구독자 순번이 더 크면 현재부터 전송
+        seq = log_buffer.seq if since is None or since > log_buffer.seq else since
+        while True:
+            entries = log_buffer.read_since(seq, timeout=Config.ENGINE_IPC_TIMEOUT)
+            try:
+                conn.send(entries)  # 빈 목록은 연결 확인용
+            except (EOFError, OSError):
+                return
+            if entries:
+                seq = entries[-1][0]
+
+    def get_stats(self):
+        return dict(self._stats)
+
+
+class EngineClient:
+    """웹 프로세스 측 명령 클라이언트 (요청마다 연결)"""
+
+    def __init__(self, address=None, authkey=None):
+        self.address = address or _address()
+        self._authkey = authkey  # 없으면 연결할 때 설정 확인 후 사용 (embedded 모드에서는 사용하지 않음)
+
+    @property
+    def authkey(self):
+        return self._authkey or _authkey()
+
+    def call(self, command, **args):
+        """명령 실행 후 결과 반환
+
+        Raises:
+            ConnectionError: 엔진 프로세스에 연결할 수 없음
+            RuntimeError: 엔진에서 명령 처리 실패
+        """
+        try:
+            conn = Client(self.address, authkey=self.authkey)
+        except OSError as e:
+            raise ConnectionError(f"거래 엔진 프로세스에 연결할 수 없습니다 ({self.address[0]}:{self.address[1]}): {e}")
+
+        with conn:
+            conn.send({'command': command, 'args': args})
+            if not conn.poll(Config.ENGINE_IPC_TIMEOUT):
+                raise ConnectionError(f"거래 엔진 응답 시간 초과: {command}")
+            response = conn.recv()
+
+        if not response['ok']:
+            raise RuntimeError(response['error'])
+        return response['result']
+
+    def stream_logs(self, since=None):
+        """엔진 봇 로그 스트림 ((seq, user_id, ticker, 로그) 생성, 연결이 끊기면 종료)"""
+        with Client(self.address, authkey=self.authkey) as conn:
+            conn.send({'command': 'logs', 'args': {'since': since}})
+            while True:
+                for item in conn.recv():
+                    yield item
+
+
+# 웹 프로세스용 엔진 클라이언트
+engine_client = EngineClient()
+
+
+def remote_engine():
+    """봇을 다른 프로세스(엔진)에서 실행 중이면 클라이언트, 이 프로세스에서 실행하면 None"""
+    return None if runs_trading() else engine_client
+
+
+def forward_logs(send, retry_seconds=5, client=None):
+    """엔진 로그 스트림을 받아 send(user_id, ticker, 로그)로 전달 (연결이 끊기면 재연결)"""
+    client = client or engine_client
+    since = None
+    while True:
+        try:
+            for seq, user_id, ticker, entry in client.stream_logs(since):
+                since = seq
+                send(user_id, ticker, entry)
+        except Exception as e:
+            logger.warning(f"거래 엔진 로그 스트림 연결 끊김: {e}")
+        time.sleep(retry_seconds)
@@ -0,0 +1,463 @@
+"""
+거래 엔진 샤드
+
+봇이 많으면 엔진 프로세스 하나에서 pandas 지표 계산이 GIL에 막혀 직렬로 실행됩니다.
+ENGINE_SHARDS > 1이면 engine_server.py는 코디네이터로 실행되어 봇을 ENGINE_SHARDS개의 샤드 프로세스에
+사용자(또는 티커) 해시로 나눠 배치합니다. 코디네이터는
+
+- 배치: 웹에서 받은 봇 시작/중지 요청을 담당 샤드로 전달하고 배치 정보를 기록
+- 재배치: 샤드 간 봇 수 차이가 ENGINE_SHARD_IMBALANCE를 넘으면 사용자(샤드 키) 단위로 이동
+- 장애 복구: 종료된 샤드를 재시작하고 배치 정보로 봇을 다시 시작 (재시작이 반복되면 다른 샤드로 이동)
+- 시세 공유: 샤드의 틱 시세 조회를 MarketDataHub로 받아 샤드 수만큼 조회가 늘지 않도록 함
+
+을 맡고, 웹 프로세스에는 단일 엔진과 같은 제어 채널(start/stop/status/bots/logs)을 제공합니다.
+같은 사용자의 봇은 기본적으로 한 샤드에 모여 포지션 원장이 프로세스 하나에만 있게 됩니다.
+"""
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+import zlib
+
+from app.utils.engine_ipc import EngineClient, forward_logs, log_buffer, mark_engine_process
+from app.utils.fair_share import compute_shares
+from app.utils.scheduler_metrics import merge_metric_stats
+from config import Config
+
+# 샤드 프로세스 번호 환경 변수 (코디네이터가 샤드 실행 시 설정)
+SHARD_ENV = 'UPBIT_ENGINE_SHARD'
+
+# 샤드 프로세스 실행 스크립트
+ENGINE_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                             'engine_server.py')
+
+
+def shard_key(user_id, ticker):
+    """배치 단위 키 (같은 키의 봇은 같은 샤드에서 실행)"""
+    return f"user:{user_id}" if Config.ENGINE_SHARD_KEY == 'user' else f"ticker:{ticker}"
+
+
+def shard_for(key, shards=None):
+    """키 해시로 정한 기본 샤드 번호 (프로세스 재시작과 무관하게 같은 값)"""
+    return zlib.crc32(key.encode('utf-8')) % (shards or Config.ENGINE_SHARDS)
+
+
+def current_shard():
+    """현재 프로세스의 샤드 번호 (샤드 프로세스가 아니면 None)"""
+    value = os.environ.get(SHARD_ENV)
+    return int(value) if value is not None else None
+
+
+def owns_bot(user_id, ticker):
+    """현재 프로세스가 기본 배치로 실행할 봇인지 (즐겨찾기 복원용, 샤드가 아니면 항상 True)"""
+    shard = current_shard()
+    return shard is None or shard_for(shard_key(user_id, ticker)) == shard
+
+
+def shard_address(index):
+    """샤드 제어 채널 주소 (코디네이터 포트 다음 번호부터)"""
+    return Config.ENGINE_IPC_HOST, Config.ENGINE_IPC_PORT + 1 + index
+
+
+def _merge_counters(stats_list):
+    """샤드별 통계 딕셔너리 병합 (횟수는 합계, 평균/비율은 평균, 그 외는 첫 샤드 값)"""
+    merged = {}
+    for key, value in stats_list[0].items():
+        values = [stats.get(key) for stats in stats_list]
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            merged[key] = value
+        elif key.startswith('avg_') or 'ratio' in key:
+            numbers = [v for v in values if isinstance(v, (int, float))]
+            merged[key] = round(sum(numbers) / len(numbers), 3) if numbers else 0
+        else:
+            merged[key] = sum(v for v in values if isinstance(v, (int, float)))
+    return merged
+
+
+class EngineShard:
+    """샤드 프로세스 하나 (실행/상태 확인/재시작 기록)"""
+
+    def __init__(self, index):
+        self.index = index
+        self.client = EngineClient(address=shard_address(index))
+        self.process = None
+        self.started_at = None
+        self.restarts = []  # 재시작 시각 (ENGINE_SHARD_RESTART_WINDOW 이내)
+        self.failed = False
+
+    def start(self):
+        env = dict(os.environ)
+        mark_engine_process(env)
+        env[SHARD_ENV] = str(self.index)
+        self.process = subprocess.Popen([sys.executable, ENGINE_SCRIPT], env=env)
+        self.started_at = time.time()
+
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def wait_ready(self, timeout=60):
+        """제어 채널이 응답할 때까지 대기 (봇 복원 포함)"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if not self.alive():
+                return False
+            try:
+                self.client.call('ping')
+                return True
+            except ConnectionError:
+                time.sleep(0.5)
+        return False
+
+    def stop(self, timeout=30):
+        if not self.alive():
+            return
+        self.process.terminate()
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+    def get_stats(self):
+        return {
+            'index': self.index,
+            'pid': self.process.pid if self.process else None,
+            'alive': self.alive(),
+            'failed': self.failed,
+            'restarts': len(self.restarts),
+            'uptime': round(time.time() - self.started_at) if self.started_at and self.alive() else 0,
+        }
+
+
+class ShardCoordinator:
+    """샤드 배치/재배치/장애 복구 및 웹 제어 명령 전달"""
+
+    def __init__(self, shards=None):
+        self.shards = [EngineShard(index) for index in range(shards or Config.ENGINE_SHARDS)]
+        self.logger = logging.getLogger(__name__)
+
+        self._placements = {}  # {(user_id, ticker): {'shard', 'strategy', 'settings'}}
+        self._overrides = {}  # {샤드 키: 샤드 번호} - 재배치/장애로 기본 배치에서 옮긴 키
+        self._lock = threading.RLock()
+        self._stop_event = threading.Event()
+        self._stats = {'started': 0, 'stopped': 0, 'moves': 0, 'restarts': 0, 'replays': 0, 'failures': 0}
+
+    # ------------------------------------------------------------------
+    # 시작/종료
+    # ------------------------------------------------------------------
+    def start(self):
+        """샤드 실행 후 각 샤드가 복원한 봇을 배치 정보로 등록하고 감시 시작"""
+        for shard in self.shards:
+            shard.start()
+        for shard in self.shards:
+            if shard.wait_ready():
+                self.reconcile(shard)
+            else:
+                self.logger.error(f"샤드 {shard.index} 시작 실패 (감시 작업에서 재시작)")
+
+        for shard in self.shards:
+            threading.Thread(target=forward_logs, args=(log_buffer.publish,), kwargs={'client': shard.client},
+                             name=f'ShardLogs-{shard.index}', daemon=True).start()
+        threading.Thread(target=self._monitor, name='ShardMonitor', daemon=True).start()
+        self.logger.info(f"거래 엔진 샤드 {len(self.shards)}개 시작 (샤드 키: {Config.ENGINE_SHARD_KEY})")
+
+    def close(self):
+        self._stop_event.set()
+        for shard in self.shards:
+            shard.stop()
+
+    # ------------------------------------------------------------------
+    # 배치
+    # ------------------------------------------------------------------
+    def _live_shards(self):
+        return [shard for shard in self.shards if not shard.failed]
+
+    def shard_of(self, user_id, ticker):
+        """봇을 실행할 샤드 (기존 배치 → 재배치 키 → 해시, 장애 샤드는 제외)"""
+        with self._lock:
+            placement = self._placements.get((user_id, ticker))
+            if placement is not None:
+                return self.shards[placement['shard']]
+
+            key = shard_key(user_id, ticker)
+            if key in self._overrides:
+                return self.shards[self._overrides[key]]
+
+            shard = self.shards[shard_for(key, len(self.shards))]
+            if shard.failed:
+                live = self._live_shards()
+                if not live:
+                    raise RuntimeError("실행 가능한 거래 엔진 샤드가 없습니다")
+                shard = live[zlib.crc32(key.encode('utf-8')) % len(live)]
+            return shard
+
+    def _shard_loads(self):
+        loads = {shard.index: 0 for shard in self._live_shards()}
+        for placement in self._placements.values():
+            if placement['shard'] in loads:
+                loads[placement['shard']] += 1
+        return loads
+
+    def _units(self, shard_index):
+        """샤드의 배치 단위별 봇 목록 {샤드 키: [(user_id, ticker)]}"""
+        units = {}
+        for (user_id, ticker), placement in self._placements.items():
+            if placement['shard'] == shard_index:
+                units.setdefault(shard_key(user_id, ticker), []).append((user_id, ticker))
+        return units
+
+    def _start_on(self, shard, user_id, ticker, placement):
+        job_id = shard.client.call('start', user_id=user_id, ticker=ticker, strategy_name=placement['strategy'],
+                                   settings=placement['settings'])
+        placement['shard'] = shard.index
+        return job_id
+
+    def _move_unit(self, key, bots, source, target):
+        """배치 단위를 다른 샤드로 이동 (원래 샤드에서 중지 후 대상 샤드에서 시작)"""
+        self._overrides[key] = target.index
+        for user_id, ticker in bots:
+            placement = self._placements[(user_id, ticker)]
+            if source.alive():
+                try:
+                    source.client.call('stop', user_id=user_id, ticker=ticker)
+                except Exception as e:
+                    self.logger.warning(f"샤드 {source.index} 봇 중지 실패 ({user_id}/{ticker}): {e}")
+            try:
+                self._start_on(target, user_id, ticker, placement)
+                self._stats['moves'] += 1
+            except Exception as e:
+                self._stats['failures'] += 1
+                self.logger.error(f"샤드 {target.index} 봇 시작 실패 ({user_id}/{ticker}): {e}")
+        self.logger.info(f"배치 이동: {key} 샤드 {source.index} → {target.index} (봇 {len(bots)}개)")
+
+    def rebalance(self):
+        """샤드 간 봇 수 차이가 허용치를 넘으면 배치 단위를 가장 한가한 샤드로 이동
+
+        Returns:
+            int: 이동한 배치 단위 수
+        """
+        moved = 0
+        with self._lock:
+            for _ in range(len(self._placements)):
+                loads = self._shard_loads()
+                if len(loads) < 2:
+                    break
+                busiest = max(loads, key=loads.get)
+                idlest = min(loads, key=loads.get)
+                gap = loads[busiest] - loads[idlest]
+                if gap <= Config.ENGINE_SHARD_IMBALANCE:
+                    break
+
+                # 옮긴 뒤에도 차이가 줄어드는 가장 큰 단위
+                candidates = [(len(bots), key, bots) for key, bots in self._units(busiest).items() if len(bots) < gap]
+                if not candidates:
+                    break
+                _, key, bots = max(candidates)
+                self._move_unit(key, bots, self.shards[busiest], self.shards[idlest])
+                moved += 1
+        return moved
+
+    def reconcile(self, shard):
+        """샤드에서 실제 실행 중인 봇과 배치 정보 맞춤 (시작/재시작 직후)
+
+        - 배치 정보에 없는 봇(즐겨찾기 복원): 배치 등록, 다른 샤드 소속이면 그 샤드로 이동
+        - 다른 샤드에 배치된 봇: 이 샤드에서 중지
+        - 이 샤드에 배치됐는데 실행 중이 아닌 봇(재시작 등): 다시 시작
+        """
+        with self._lock:
+            running = shard.client.call('bots')
+            for user_id, user_bots in running.items():
+                for ticker, info in user_bots.items():
+                    placement = self._placements.get((user_id, ticker))
+                    if placement is None:
+                        self._placements[(user_id, ticker)] = {'shard': shard.index, 'strategy': info.get('strategy'),
+                                                               'settings': info.get('settings', {})}
+                        # 재배치로 다른 샤드에 모인 사용자(샤드 키)의 봇이면 그 샤드로 이동
+                        key = shard_key(user_id, ticker)
+                        target = self.shards[self._overrides[key]] if key in self._overrides else shard
+                        if target is not shard:
+                            self._move_unit(key, [(user_id, ticker)], shard, target)
+                    elif placement['shard'] != shard.index:
+                        shard.client.call('stop', user_id=user_id, ticker=ticker)
+
+            for (user_id, ticker), placement in self._placements.items():
+                if placement['shard'] == shard.index and ticker not in running.get(user_id, {}):
+                    try:
+                        self._start_on(shard, user_id, ticker, placement)
+                        self._stats['replays'] += 1
+                    except Exception as e:
+                        self._stats['failures'] += 1
+                        self.logger.error(f"샤드 {shard.index} 봇 재시작 실패 ({user_id}/{ticker}): {e}")
+
+    # ------------------------------------------------------------------
+    # 장애 복구
+    # ------------------------------------------------------------------
+    def _monitor(self):
+        while not self._stop_event.wait(Config.ENGINE_SHARD_CHECK_SECONDS):
+            try:
+                self.check()
+                self.rebalance()
+            except Exception as e:
+                self.logger.error(f"샤드 감시 중 오류: {e}", exc_info=True)
+
+    def check(self):
+        """종료된 샤드 재시작 (재시작 기간 내 최대 횟수를 넘으면 봇을 다른 샤드로 이동)"""
+        for shard in self.shards:
+            if shard.failed or shard.alive():
+                continue
+
+            now = time.time()
+            shard.restarts = [at for at in shard.restarts if now - at < Config.ENGINE_SHARD_RESTART_WINDOW]
+            exit_code = shard.process.returncode if shard.process else None
+            if len(shard.restarts) >= Config.ENGINE_SHARD_MAX_RESTARTS:
+                shard.failed = True
+                self.logger.error(f"샤드 {shard.index} 재시작 한도 초과 (종료 코드 {exit_code}) - 봇을 다른 샤드로 이동")
+                self._evacuate(shard)
+                continue
+
+            shard.restarts.append(now)
+            self._stats['restarts'] += 1
+            self.logger.warning(f"샤드 {shard.index} 종료 감지 (종료 코드 {exit_code}) - 재시작")
+            shard.start()
+            if shard.wait_ready():
+                self.reconcile(shard)
+
+    def _evacuate(self, shard):
+        """장애 샤드의 배치 단위를 봇이 가장 적은 샤드로 이동"""
+        with self._lock:
+            for key, bots in self._units(shard.index).items():
+                loads = self._shard_loads()
+                if not loads:
+                    self.logger.error("실행 가능한 거래 엔진 샤드가 없습니다")
+                    return
+                target = self.shards[min(loads, key=loads.get)]
+                self._move_unit(key, bots, shard, target)
+
+    # ------------------------------------------------------------------
+    # 웹 제어 명령
+    # ------------------------------------------------------------------
+    def start_bot(self, user_id, ticker, strategy_name, settings):
+        with self._lock:
+            shard = self.shard_of(user_id, ticker)
+            placement = {'shard': shard.index, 'strategy': strategy_name, 'settings': settings}
+            job_id = self._start_on(shard, user_id, ticker, placement)
+            self._placements[(user_id, ticker)] = placement
+            self._stats['started'] += 1
+            return job_id
+
+    def stop_bot(self, user_id, ticker):
+        with self._lock:
+            shard = self.shard_of(user_id, ticker)
+            stopped = shard.client.call('stop', user_id=user_id, ticker=ticker)
+            self._placements.pop((user_id, ticker), None)
+            self._stats['stopped'] += 1
+            return stopped
+
+    def user_bots(self, user_id=None):
+        """실행 중인 봇 정보 (user_id가 있으면 {티커: 정보}, 없으면 {user_id: {티커: 정보}})"""
+        merged = {}
+        for shard in self._live_shards():
+            try:
+                bots = shard.client.call('bots', user_id=user_id)
+            except Exception as e:
+                self.logger.warning(f"샤드 {shard.index} 봇 목록 조회 실패: {e}")
+                continue
+            if user_id is not None:
+                merged.update(bots)
+            else:
+                for uid, user_bots in bots.items():
+                    merged.setdefault(uid, {}).update(user_bots)
+        return merged
+
+    def metrics(self, format='json'):
+        """샤드 사이클 지표 병합 (Prometheus 형식은 샤드 라벨을 붙여 이어 붙임)"""
+        results = []
+        for shard in self._live_shards():
+            try:
+                results.append(shard.client.call('metrics', format=format, labels={'shard': shard.index},
+                                                 include_help=not results))
+            except Exception as e:
+                self.logger.warning(f"샤드 {shard.index} 지표 조회 실패: {e}")
+        if not results:
+            raise RuntimeError("응답한 거래 엔진 샤드가 없습니다")
+
+        if format == 'prometheus':
+            return ''.join(results)
+        return merge_metric_stats(results)
+
+    def load_shed(self):
+        """샤드 중 가장 높은 부하 차단 단계 (웹 프로세스의 필수가 아닌 조회 생략 판단용)"""
+        results = []
+        for shard in self._live_shards():
+            try:
+                results.append(shard.client.call('load_shed'))
+            except Exception as e:
+                self.logger.warning(f"샤드 {shard.index} 부하 차단 단계 조회 실패: {e}")
+        if not results:
+            raise RuntimeError("응답한 거래 엔진 샤드가 없습니다")
+        return max(results, key=lambda stats: stats['level'])
+
+    def status(self):
+        """샤드 상태를 단일 엔진 상태 형식으로 병합"""
+        statuses = []
+        for shard in self._live_shards():
+            try:
+                statuses.append(shard.client.call('status'))
+            except Exception as e:
+                self.logger.warning(f"샤드 {shard.index} 상태 조회 실패: {e}")
+        if not statuses:
+            raise RuntimeError("응답한 거래 엔진 샤드가 없습니다")
+
+        merged = {}
+        for key, value in statuses[0].items():
+            if isinstance(value, dict):
+                merged[key] = _merge_counters([status[key] for status in statuses if isinstance(status.get(key), dict)])
+            else:
+                merged[key] = value
+        merged['scheduler_running'] = all(status['scheduler_running'] for status in statuses)
+        # 부하 차단 단계는 가장 높은 샤드 기준
+        shedders = [status['load_shedder'] for status in statuses if status.get('load_shedder')]
+        if shedders:
+            merged['load_shedder'] = max(shedders, key=lambda stats: stats['level'])
+        # 사용자별 공정 분배 통계는 샤드 값을 합친 뒤 점유율 재계산
+        if 'fair_share' in merged:
+            fair_users = {}
+            for status in statuses:
+                for user_id, stats in status['fair_share']['users'].items():
+                    if user_id in fair_users:
+                        merged_user = _merge_counters([fair_users[user_id], stats])
+                        merged_user['weight'] = stats['weight']
+                        merged_user['calls_per_run'] = round(merged_user['api_calls'] / merged_user['runs'], 2) \
+                            if merged_user['runs'] else stats['calls_per_run']
+                        fair_users[user_id] = merged_user
+                    else:
+                        fair_users[user_id] = dict(stats)
+            for key in ('enabled', 'max_concurrency', 'quantum', 'window'):
+                merged['fair_share'][key] = statuses[0]['fair_share'][key]
+            merged['fair_share']['users'] = compute_shares(fair_users)
+        # 위상 배정은 샤드별로 하므로 최대 부하 합계는 상한값
+        if 'phase_planner' in merged:
+            merged['phase_planner']['horizon'] = statuses[0]['phase_planner']['horizon']
+        merged['total_jobs'] = sum(status['total_jobs'] for status in statuses)
+
+        # 샤드 키가 티커이면 한 사용자의 봇이 여러 샤드에 있으므로 사용자별로 합침
+        users = {}
+        for status in statuses:
+            for user_info in status['all_user_bots']:
+                existing = users.get(user_info['user_id'])
+                if existing is None:
+                    users[user_info['user_id']] = dict(user_info, bots=list(user_info['bots']))
+                else:
+                    existing['bots'].extend(user_info['bots'])
+                    existing['bot_count'] = len(existing['bots'])
+        merged['all_user_bots'] = list(users.values())
+        merged['shards'] = self.get_stats()
+        return merged
+
+    def get_stats(self):
+        with self._lock:
+            loads = self._shard_loads()
+            return dict(self._stats, key=Config.ENGINE_SHARD_KEY, bots=len(self._placements),
+                        overrides=len(self._overrides),
+                        shards=[dict(shard.get_stats(), bots=loads.get(shard.index, 0)) for shard in self.shards])
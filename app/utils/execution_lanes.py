@@ -0,0 +1,190 @@
+"""
+API 실행 레인 (우선순위별 스레드 풀/호출 한도/재시도 정책)
+
+모든 UpbitAPI 호출은 같은 AsyncHandler 스레드 풀(5개)과 같은 재시도 정책(5회, 최대 8초 백오프)을 사용해
+시스템이 포화되면 손절/익절 매도가 앙상블 신호 계산이나 코인 추천 스캔 뒤에 줄을 섰습니다.
+호출하는 쪽이 레인을 지정하면 fetch_data가 레인의 스레드 풀/호출 한도/재시도 정책으로 실행합니다.
+
+- order: 주문 실행과 손절/익절 체크 (전용 스레드 풀, 거래소 주문 한도 기준 호출 한도, 짧은 재시도)
+- analysis: 앙상블 신호/코인 추천 등 분석·리포트 (별도 스레드 풀, 낮은 호출 한도, order 레인이 처리 중이면 양보)
+
+레인을 지정하지 않은 호출은 기존처럼 UpbitAPI에 전달된 AsyncHandler를 사용합니다.
+레인은 스레드별로 지정되므로 다른 스레드 풀에 작업을 넘길 때는 bind_lane()으로 감싸 레인을 이어 줍니다.
+"""
+import contextlib
+import functools
+import logging
+import threading
+import time
+
+from app.utils.async_utils import AsyncHandler
+from config import Config
+
+_current = threading.local()
+
+
+class RateBucket:
+    """토큰 버킷 호출 한도 (초당 rate개, 최대 burst개까지 몰아서 허용)"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst or max(1.0, rate))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """토큰 하나를 얻을 때까지 대기 (대기한 시간(초) 반환, 한도 0 이하면 제한 없음)"""
+        if self.rate <= 0:
+            return 0.0
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+
+class ExecutionLane:
+    """우선순위 레인 (전용 AsyncHandler + 호출 한도 + 재시도 정책)"""
+
+    def __init__(self, name, workers, rate, max_retries, delay, backoff_factor, yields_to=(), max_yield_seconds=0):
+        self.name = name
+        self.handler = AsyncHandler(max_workers=workers, thread_name_prefix=f"Lane-{name}")
+        self.bucket = RateBucket(rate)
+        self.max_retries = max_retries
+        self.delay = delay
+        self.backoff_factor = backoff_factor
+        self.yields_to = tuple(yields_to)  # 처리 중이면 양보할 상위 레인
+        self.max_yield_seconds = max_yield_seconds
+        self.in_flight = 0
+
+        self._lock = threading.Lock()
+        self._stats = {'calls': 0, 'throttled': 0, 'throttle_wait_ms': 0.0, 'yields': 0, 'yield_wait_ms': 0.0,
+                       'failures': 0}
+
+    def retry_policy(self, max_retries=None, delay=None, backoff_factor=None):
+        """호출 시 지정한 값 우선, 없으면 레인 정책"""
+        return (self.max_retries if max_retries is None else max_retries,
+                self.delay if delay is None else delay,
+                self.backoff_factor if backoff_factor is None else backoff_factor)
+
+    def _yield(self):
+        """상위 레인에 처리 중인 호출이 있으면 최대 max_yield_seconds까지 대기"""
+        if not self.yields_to:
+            return
+        started = time.monotonic()
+        yielded = False
+        while any(lane.in_flight for lane in self.yields_to):
+            if time.monotonic() - started >= self.max_yield_seconds:
+                break
+            yielded = True
+            time.sleep(0.05)
+        if yielded:
+            with self._lock:
+                self._stats['yields'] += 1
+                self._stats['yield_wait_ms'] += (time.monotonic() - started) * 1000
+
+    def wrap(self, func):
+        """재시도마다 호출 한도를 거치도록 API 호출 함수 감싸기"""
+        def call():
+            self._yield()
+            waited = self.bucket.acquire()
+            with self._lock:
+                self._stats['calls'] += 1
+                self.in_flight += 1
+                if waited:
+                    self._stats['throttled'] += 1
+                    self._stats['throttle_wait_ms'] += waited * 1000
+            try:
+                return func()
+            finally:
+                with self._lock:
+                    self.in_flight -= 1
+        return call
+
+    def run(self, func, logger=None, max_retries=None, delay=None, backoff_factor=None):
+        """레인 스레드 풀에서 재시도 정책으로 실행 (AsyncHandler.run_sync와 같은 반환값)"""
+        max_retries, delay, backoff_factor = self.retry_policy(max_retries, delay, backoff_factor)
+        result = self.handler.run_sync(self.wrap(func), max_retries=max_retries, delay=delay, logger=logger,
+                                       backoff_factor=backoff_factor)
+        if result is None:
+            with self._lock:
+                self._stats['failures'] += 1
+        return result
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats, in_flight=self.in_flight, rate=self.bucket.rate)
+        stats['throttle_wait_ms'] = round(stats['throttle_wait_ms'], 1)
+        stats['yield_wait_ms'] = round(stats['yield_wait_ms'], 1)
+        return stats
+
+
+class ExecutionLanes:
+    """레인 목록과 현재 스레드의 레인 지정"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        order = ExecutionLane('order', workers=Config.ORDER_LANE_WORKERS, rate=Config.ORDER_LANE_RATE,
+                              max_retries=Config.ORDER_LANE_MAX_RETRIES, delay=Config.ORDER_LANE_RETRY_DELAY,
+                              backoff_factor=2)
+        analysis = ExecutionLane('analysis', workers=Config.ANALYSIS_LANE_WORKERS, rate=Config.ANALYSIS_LANE_RATE,
+                                 max_retries=5, delay=1.0, backoff_factor=2, yields_to=(order,),
+                                 max_yield_seconds=Config.ANALYSIS_LANE_MAX_YIELD)
+        self.lanes = {lane.name: lane for lane in (order, analysis)}
+
+    def current(self):
+        """현재 스레드에 지정된 레인 (없으면 None)"""
+        if not Config.EXECUTION_LANES_ENABLED:
+            return None
+        return self.lanes.get(getattr(_current, 'lane', None))
+
+    def get_stats(self):
+        return {name: lane.get_stats() for name, lane in self.lanes.items()}
+
+
+@contextlib.contextmanager
+def execution_lane(name):
+    """블록 안의 API 호출을 name 레인으로 실행 (중첩 시 안쪽 레인 우선)"""
+    previous = getattr(_current, 'lane', None)
+    _current.lane = name
+    try:
+        yield
+    finally:
+        _current.lane = previous
+
+
+def in_lane(name):
+    """함수 안의 API 호출을 name 레인으로 실행하는 데코레이터"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with execution_lane(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def bind_lane(func):
+    """현재 스레드의 레인을 다른 스레드 풀에서 실행할 함수에 이어 주기"""
+    name = getattr(_current, 'lane', None)
+    if name is None:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with execution_lane(name):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+# 글로벌 실행 레인
+execution_lanes = ExecutionLanes()
@@ -0,0 +1,210 @@
+"""
+사용자별 공정 분배 스케줄링
+
+즐겨찾기 봇이 30개인 사용자가 있으면 한 틱에 실행 시점이 된 봇 대부분이 그 사용자의 봇이라
+작업 풀과 공유 시세 조회 한도를 거의 다 차지해 봇이 한두 개인 사용자의 봇이 뒤로 밀렸습니다.
+
+- 거래 엔진은 실행 시점이 된 봇을 사용자별 대기열에 넣고 작업 풀에 빈 자리가 생길 때마다
+  사용자 간 결손 라운드 로빈(DRR)으로 다음 봇을 고릅니다. 사용자는 라운드마다 FAIR_SHARE_QUANTUM × 가중치만큼
+  API 호출 몫을 받고, 봇을 실행할 때마다 사이클당 평균 API 호출 수만큼 씁니다.
+  호출이 많은 봇을 가진 사용자는 라운드당 실행하는 봇이 줄어 시세 조회 한도도 사용자 간에 나뉩니다.
+- 사용자별 동시 실행 상한(FAIR_SHARE_USER_MAX_CONCURRENCY): 거래 엔진은 상한에 걸린 사용자를 건너뛰고
+  다른 사용자의 봇을 먼저 실행합니다. 개별 APScheduler 작업(캔들 마감 모드 등)은 상한에 걸리면 이번 실행을 건너뜁니다.
+- 사용자별 API 호출 수/실행 수/대기 시간을 집계해 관리자 모니터에 사용자별 점유율로 표시합니다.
+"""
+import collections
+import functools
+import logging
+import threading
+import time
+
+from app.utils.load_shedder import ApiBudget
+from config import Config
+
+
+def parse_weights(spec):
+    """'사용자ID:가중치,...' 형식 설정을 {사용자 ID: 가중치}로 변환 (잘못된 항목은 무시)"""
+    weights = {}
+    for item in (spec or '').split(','):
+        user_id, _, weight = item.partition(':')
+        try:
+            weights[int(user_id)] = max(0.1, float(weight))
+        except ValueError:
+            continue
+    return weights
+
+
+def compute_shares(users):
+    """사용자별 통계에 점유율 추가 (최근 API 호출 점유율, 누적 실행 점유율)"""
+    total_calls = sum(stats['recent_api_calls'] for stats in users.values())
+    total_runs = sum(stats['runs'] for stats in users.values())
+    for stats in users.values():
+        stats['api_share'] = round(stats['recent_api_calls'] / total_calls, 3) if total_calls else 0
+        stats['run_share'] = round(stats['runs'] / total_runs, 3) if total_runs else 0
+    return users
+
+
+class UserShare:
+    """사용자 한 명의 대기열과 실행/호출 집계"""
+
+    def __init__(self, user_id, window):
+        self.user_id = user_id
+        self.queue = collections.deque()  # [(실행 정보, 대기 시작 시각)]
+        self.listed = False  # DRR 순서에 들어 있는지
+        self.deficit = 0.0
+        self.in_flight = 0
+        self.recent_calls = ApiBudget(0, window)
+        self.stats = {'runs': 0, 'dispatched': 0, 'api_calls': 0, 'capped': 0, 'wait_ms': 0.0}
+
+    def cost(self):
+        """봇 한 사이클의 예상 API 호출 수 (사이클당 평균, 최소 1)"""
+        if not self.stats['runs']:
+            return 1.0
+        return max(1.0, self.stats['api_calls'] / self.stats['runs'])
+
+
+class FairShareScheduler:
+    """사용자별 결손 라운드 로빈 + 동시 실행 상한"""
+
+    def __init__(self, max_concurrency=None, quantum=None, weights=None, window=None):
+        self.max_concurrency = max_concurrency or Config.FAIR_SHARE_USER_MAX_CONCURRENCY
+        self.quantum = quantum or Config.FAIR_SHARE_QUANTUM
+        self.weights = weights if weights is not None else parse_weights(Config.FAIR_SHARE_WEIGHTS)
+        self.window = window or Config.FAIR_SHARE_WINDOW
+        self.logger = logging.getLogger(__name__)
+
+        self._users = {}  # {user_id: UserShare}
+        self._active = collections.deque()  # 대기열이 있는 사용자 (DRR 순서)
+        self._turn = False  # 맨 앞 사용자가 이번 라운드 몫을 받았는지
+        self._lock = threading.Lock()
+        self._stats = {'enqueued': 0, 'dispatched': 0, 'rounds': 0, 'skipped_runs': 0}
+
+    def _user(self, user_id):
+        share = self._users.get(user_id)
+        if share is None:
+            share = self._users[user_id] = UserShare(user_id, self.window)
+        return share
+
+    def weight(self, user_id):
+        return self.weights.get(user_id, 1.0)
+
+    def _next_user(self):
+        self._active.rotate(-1)
+        self._turn = False
+
+    def enqueue(self, entries):
+        """실행 시점이 된 봇을 사용자별 대기열에 추가 (entry['user_id'] 기준)"""
+        now = time.time()
+        with self._lock:
+            for entry in entries:
+                share = self._user(entry['user_id'])
+                share.queue.append((entry, now))
+                if not share.listed:
+                    share.listed = True
+                    self._active.append(share.user_id)
+            self._stats['enqueued'] += len(entries)
+
+    def select(self, slots):
+        """빈 자리 slots개에 실행할 봇 선택 (선택한 봇은 finish()까지 사용자 동시 실행 수에 포함)"""
+        chosen = []
+        now = time.time()
+        with self._lock:
+            capped = 0  # 연속으로 상한에 걸린 사용자 수 (대기 중인 사용자가 모두 상한이면 중단)
+            while slots > 0 and self._active and capped < len(self._active):
+                share = self._users[self._active[0]]
+                if not share.queue:
+                    self._active.popleft()
+                    share.listed = False
+                    share.deficit = 0.0
+                    self._turn = False
+                    continue
+
+                if share.in_flight >= self.max_concurrency:
+                    share.stats['capped'] += 1
+                    capped += 1
+                    self._next_user()
+                    continue
+
+                if not self._turn:
+                    share.deficit += self.quantum * self.weight(share.user_id)
+                    self._turn = True
+                    self._stats['rounds'] += 1
+                    capped = 0
+
+                cost = share.cost()
+                if share.deficit < cost:
+                    self._next_user()
+                    continue
+
+                entry, queued_at = share.queue.popleft()
+                share.deficit -= cost
+                share.in_flight += 1
+                share.stats['dispatched'] += 1
+                share.stats['wait_ms'] += (now - queued_at) * 1000
+                chosen.append(entry)
+                slots -= 1
+                capped = 0
+            self._stats['dispatched'] += len(chosen)
+        return chosen
+
+    def finish(self, user_id):
+        """선택한 봇 실행 종료"""
+        with self._lock:
+            share = self._user(user_id)
+            share.in_flight = max(0, share.in_flight - 1)
+            share.stats['runs'] += 1
+
+    def limit(self, user_id, func):
+        """개별 스케줄러 작업용 래퍼 - 사용자 동시 실행 상한이면 이번 실행을 건너뜀"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self._lock:
+                share = self._user(user_id)
+                if share.in_flight >= self.max_concurrency:
+                    share.stats['capped'] += 1
+                    self._stats['skipped_runs'] += 1
+                    self.logger.warning(f"사용자 동시 실행 상한({self.max_concurrency})으로 이번 실행 건너뜀 (사용자: {user_id})")
+                    return None
+                share.in_flight += 1
+                share.stats['dispatched'] += 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.finish(user_id)
+        return wrapper
+
+    def record_api_call(self, user_id, count=1):
+        """사용자별 API 호출 집계 (사용자 없는 호출은 제외)"""
+        if user_id is None:
+            return
+        with self._lock:
+            share = self._user(user_id)
+            share.stats['api_calls'] += count
+        share.recent_calls.record(count)
+
+    @property
+    def queued(self):
+        with self._lock:
+            return sum(len(share.queue) for share in self._users.values())
+
+    def get_stats(self):
+        with self._lock:
+            shares = list(self._users.values())
+            stats = dict(self._stats, enabled=Config.FAIR_SHARE_ENABLED, max_concurrency=self.max_concurrency,
+                         quantum=self.quantum, window=self.window)
+            users = {}
+            for share in shares:
+                users[share.user_id] = dict(share.stats, weight=self.weight(share.user_id), in_flight=share.in_flight,
+                                            queued=len(share.queue), calls_per_run=round(share.cost(), 2),
+                                            avg_wait_ms=round(share.stats['wait_ms'] / share.stats['dispatched'], 1)
+                                            if share.stats['dispatched'] else 0)
+                users[share.user_id]['wait_ms'] = round(share.stats['wait_ms'], 1)
+        for share in shares:
+            users[share.user_id]['recent_api_calls'] = share.recent_calls.calls()
+        stats['queued'] = sum(user['queued'] for user in users.values())
+        stats['users'] = compute_shares(users)
+        return stats
+
+
+# 글로벌 사용자별 공정 분배 스케줄러
+fair_share = FairShareScheduler()
@@ -0,0 +1,163 @@
+"""
+포지션별 최고가(high-water mark) 추적
+
+트레일링 스톱은 진입 이후 최고가 대비 하락폭으로 판단합니다. 사이클마다 받는 현재가로
+최고가를 갱신하고 파일에 저장해 두므로, 재시작 후에도 최고가가 유지되고 트레일링 스톱 판단에
+별도의 캔들 조회가 필요 없습니다.
+거래 엔진 샤드들은 같은 파일을 쓰므로 저장 시 이 프로세스가 바꾼 포지션만 병합하고,
+다른 샤드에서 옮겨 온 봇은 시작할 때 파일에서 최고가를 다시 읽습니다.
+"""
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime
+
+from app.utils.json_store import merge_json, read_json
+from config import Config
+
+# 평균 매수가가 이 비율 이상 바뀌어야 추가 매수로 보고 최고가를 다시 추적
+# (원장 추정 평균가 → 대조 후 실제 평균가 보정, 부동소수점 오차로는 초기화하지 않음)
+AVG_PRICE_TOLERANCE = 0.005
+
+
+def position_key(user_id, ticker):
+    """포지션 식별 키 (사용자, 티커)"""
+    return f"{user_id}:{ticker}"
+
+
+def _avg_price_moved(previous, current):
+    """평균 매수가가 추가 매수로 볼 만큼 바뀌었는지"""
+    if not previous or not current:
+        return previous != current
+    return abs(current - previous) / previous >= AVG_PRICE_TOLERANCE
+
+
+class HighWaterMarkTracker:
+    """포지션별 진입 이후 최고가 저장소"""
+
+    def __init__(self, path=None, save_interval=None):
+        self.path = path or Config.HIGH_WATER_MARK_PATH
+        self.save_interval = save_interval if save_interval is not None else Config.HIGH_WATER_MARK_SAVE_SECONDS
+        self.logger = logging.getLogger(__name__)
+
+        self._marks = {}  # {포지션 키: {'peak', 'avg_price', 'opened_at', 'updated_at'}}
+        self._lock = threading.Lock()
+        self._changed = set()  # 저장 전 갱신/삭제된 포지션 키
+        self._last_save = 0.0
+        self._load()
+
+    def _load(self):
+        """저장된 최고가 복원"""
+        try:
+            self._marks = read_json(self.path)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"최고가 파일을 읽지 못했습니다 ({self.path}): {e}")
+
+    def reload(self):
+        """파일의 최고가로 아직 저장하지 않은 포지션 외의 기록 갱신 (다른 샤드에서 옮겨 온 봇 시작 시)"""
+        try:
+            marks = read_json(self.path)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"최고가 파일을 읽지 못했습니다 ({self.path}): {e}")
+            return
+        with self._lock:
+            pending = {key: self._marks[key] for key in self._changed if key in self._marks}
+            self._marks = {key: mark for key, mark in marks.items() if key not in self._changed}
+            self._marks.update(pending)
+
+    def _save(self, force=False):
+        """변경된 최고가 저장 (새 고점마다 쓰지 않도록 save_interval 간격으로 모아서 저장)"""
+        with self._lock:
+            if not self._changed or (not force and time.time() - self._last_save < self.save_interval):
+                return
+            changed, self._changed = self._changed, set()
+            updates = {key: dict(self._marks[key]) for key in changed if key in self._marks}
+            removed = [key for key in changed if key not in self._marks]
+            self._last_save = time.time()
+
+        try:
+            merge_json(self.path, updates, removed)
+        except OSError as e:
+            with self._lock:
+                self._changed |= changed
+            self.logger.warning(f"최고가 저장 실패 ({self.path}): {e}")
+
+    def observe(self, key, price, avg_price, seed=None):
+        """현재가로 최고가 갱신 후 최고가 반환
+
+        기록이 없거나 (신규 진입, 청산 시 close()로 삭제) 평균 매수가가 AVG_PRICE_TOLERANCE 이상 바뀌면
+        (추가 매수) 새 포지션으로 보고 현재가부터 다시 추적합니다. 그보다 작은 변화는 평균가만 보정합니다.
+
+        Args:
+            seed (callable): 추적 기록이 없는 포지션의 초기 최고가를 반환하는 함수 (기존 보유분 이어받기용)
+        """
+        if not price:
+            return None
+
+        now = datetime.now().isoformat(timespec='seconds')
+        with self._lock:
+            mark = self._marks.get(key)
+            new_position = mark is None or _avg_price_moved(mark['avg_price'], avg_price)
+            if not new_position and mark['avg_price'] != avg_price:
+                mark['avg_price'] = avg_price
+                self._changed.add(key)
+
+        if new_position:
+            peak = price
+            if seed is not None and mark is None:
+                try:
+                    peak = max(price, seed() or 0)
+                except Exception as e:
+                    self.logger.warning(f"초기 최고가 조회 실패 ({key}): {e}")
+            with self._lock:
+                self._marks[key] = {'peak': peak, 'avg_price': avg_price, 'opened_at': now, 'updated_at': now}
+                self._changed.add(key)
+            self._save(force=True)
+            return peak
+
+        if price <= mark['peak']:
+            return mark['peak']
+
+        with self._lock:
+            mark['peak'] = price
+            mark['updated_at'] = now
+            self._changed.add(key)
+        self._save()
+        return price
+
+    def get_peak(self, key):
+        mark = self._marks.get(key)
+        return mark['peak'] if mark else None
+
+    def reset(self, key, price):
+        """트레일링 스톱 부분 매도 후 현재가부터 다시 추적 (남은 물량에 같은 고점으로 연속 발동 방지)"""
+        with self._lock:
+            mark = self._marks.get(key)
+            if mark is None:
+                return
+            mark['peak'] = price
+            mark['updated_at'] = datetime.now().isoformat(timespec='seconds')
+            self._changed.add(key)
+        self._save(force=True)
+
+    def close(self, key):
+        """포지션 청산 시 기록 삭제"""
+        with self._lock:
+            if self._marks.pop(key, None) is None:
+                return
+            self._changed.add(key)
+        self._save(force=True)
+
+    def flush(self):
+        """미저장 최고가 즉시 저장 (종료 시)"""
+        self._save(force=True)
+
+    def get_stats(self):
+        with self._lock:
+            return {'positions': len(self._marks), 'pending_save': bool(self._changed)}
+
+
+# 글로벌 최고가 추적기 (종료 시 모아 둔 최고가 저장)
+high_water_marks = HighWaterMarkTracker()
+atexit.register(high_water_marks.flush)
@@ -0,0 +1,68 @@
+"""
+여러 프로세스가 함께 쓰는 JSON 파일 저장
+
+거래 엔진 샤드는 최고가/일일 기준값/원장 스냅샷 파일을 함께 씁니다. 샤드마다 파일 전체를 덮어쓰면
+다른 샤드가 저장한 항목이 사라지고, 고정된 임시 파일(<path>.tmp)을 같이 쓰면 쓰는 도중의 내용이 섞입니다.
+저장은 파일 잠금(<path>.lock) 안에서 현재 파일을 읽어 이 프로세스가 바꾼 항목만 반영한 뒤,
+프로세스/스레드별 임시 파일로 원자적으로 교체합니다.
+"""
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 스레드 잠금만 사용
+    fcntl = None
+
+_thread_lock = threading.Lock()
+
+
+def read_json(path):
+    """저장된 JSON 객체 (파일이 없으면 빈 dict, 읽기 실패는 OSError/ValueError)"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+@contextmanager
+def _file_lock(path):
+    with _thread_lock:
+        if fcntl is None:
+            yield
+            return
+        with open(f"{path}.lock", 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def merge_json(path, updates, removed=()):
+    """파일의 항목을 updates로 갱신하고 removed 키를 삭제 (다른 프로세스가 저장한 항목은 유지)
+
+    Returns:
+        dict: 병합 후 파일 전체 내용
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with _file_lock(path):
+        try:
+            payload = read_json(path)
+        except ValueError:
+            payload = {}  # 깨진 파일은 이 프로세스 항목으로 다시 씀
+        payload.update(updates)
+        for key in removed:
+            payload.pop(key, None)
+
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return payload
@@ -0,0 +1,203 @@
+"""
+API 호출 한도 기반 부하 차단 (단계적 기능 축소)
+
+호출 한도를 다 쓰면 모든 봇과 화면 조회가 같은 우선순위로 재시도를 반복해 손절/익절 체크까지 함께 늦어졌습니다.
+LoadShedder는 주기적으로 최근 API 호출 사용률과 사이클 지연(건너뛴 실행, 틱 지연, 실행 대기 시간)을 보고
+축소 단계를 정합니다. 건너뛴/늦은 실행은 판단 주기마다 LOAD_SHED_LAG_EVENTS건 이상일 때만 압력으로 봅니다
+(느린 사이클 한 번으로 단계가 오르지 않도록).
+
+- 0 normal: 정상
+- 1 shed: 필수가 아닌 호출 생략 (대시보드 평가금액 시세 조회, 코인 추천 스캔, 매도 지연용 RSI 추세 조회)
+- 2 stretch: 추가로 봇의 신호 분석을 LOAD_SHED_STRETCH_FACTOR 사이클에 한 번만 실행
+  (나머지 사이클은 손절/익절 체크만 실행하므로 청산 체크 주기는 그대로 유지,
+  손익 관리(손절/익절)가 적용되는 볼린저 계열 전략의 봇만 늘림)
+
+압력이 커지면 바로 단계를 올리고, LOAD_SHED_RECOVER_CHECKS회 연속 더 낮은 단계 조건이면 한 단계씩 내립니다.
+단계 변경과 생략한 호출 수는 사이클 지표(app.utils.scheduler_metrics)에 기록됩니다.
+
+호출 수는 프로세스별로 집계하며, ENGINE_MODE=process의 웹 프로세스는 엔진 프로세스의 단계를 조회해 사용합니다.
+"""
+import collections
+import logging
+import threading
+import time
+
+from app.utils.engine_ipc import remote_engine
+from app.utils.scheduler_metrics import scheduler_metrics
+from config import Config
+
+LEVEL_NORMAL = 0
+LEVEL_SHED = 1
+LEVEL_STRETCH = 2
+LEVEL_NAMES = ('normal', 'shed', 'stretch')
+
+# 1단계부터 생략하는 필수가 아닌 호출
+SHEDDABLE = ('dashboard_valuation', 'recommender', 'rsi_filter')
+
+
+class ApiBudget:
+    """최근 window초 API 호출 수 (초 단위 버킷)"""
+
+    def __init__(self, rate, window):
+        self.rate = float(rate)
+        self.window = int(window)
+        self.total = 0
+        self._buckets = collections.deque()  # [[초, 호출 수]]
+        self._lock = threading.Lock()
+
+    def _trim(self, second):
+        while self._buckets and self._buckets[0][0] <= second - self.window:
+            self._buckets.popleft()
+
+    def record(self, count=1):
+        second = int(time.time())
+        with self._lock:
+            if self._buckets and self._buckets[-1][0] == second:
+                self._buckets[-1][1] += count
+            else:
+                self._buckets.append([second, count])
+            self.total += count
+            self._trim(second)
+
+    def calls(self):
+        """최근 window초 호출 수"""
+        with self._lock:
+            self._trim(int(time.time()))
+            return sum(count for _, count in self._buckets)
+
+    def used_ratio(self):
+        """최근 window초 한도 사용률 (1 이상이면 한도 소진, 한도 0 이하면 0)"""
+        if self.rate <= 0:
+            return 0.0
+        return self.calls() / (self.rate * self.window)
+
+
+def pressure_level(used_ratio, lag_seconds, lag_events):
+    """현재 관측값이 요구하는 단계
+
+    Args:
+        used_ratio (float): API 호출 한도 사용률
+        lag_seconds (float): 지난 판단 이후 최대 실행 대기 시간
+        lag_events (int): 지난 판단 이후 건너뛴 실행/늦은 실행/틱 지연 수
+    """
+    if used_ratio >= 1 or lag_seconds >= Config.LOAD_SHED_LAG_SECONDS * 2:
+        return LEVEL_STRETCH
+    if (used_ratio >= Config.LOAD_SHED_BUDGET_RATIO or lag_seconds >= Config.LOAD_SHED_LAG_SECONDS
+            or lag_events >= Config.LOAD_SHED_LAG_EVENTS):
+        return LEVEL_SHED
+    return LEVEL_NORMAL
+
+
+class LoadShedder:
+    """부하 차단 단계 판단 및 생략 여부 조회"""
+
+    def __init__(self, budget=None):
+        self.budget = budget or ApiBudget(Config.API_RATE_BUDGET, Config.LOAD_SHED_WINDOW)
+        self.logger = logging.getLogger(__name__)
+        self.level = LEVEL_NORMAL
+
+        self._calm = 0  # 연속으로 더 낮은 단계 조건이었던 판단 수
+        self._counters = None  # 지난 판단 시점의 지연 누적값
+        self._cycles = {}  # {봇 키: stretch 단계에서 실행한 사이클 수}
+        self._remote = (LEVEL_NORMAL, 0.0)  # 웹 프로세스가 조회한 엔진 단계 (단계, 조회 시각)
+        self._last = {}
+        self._lock = threading.Lock()
+        self._stats = {'evaluations': 0, 'escalations': 0, 'recoveries': 0, 'stretched_cycles': 0,
+                       'shed': {kind: 0 for kind in SHEDDABLE}}
+
+    def record_api_call(self, count=1):
+        self.budget.record(count)
+
+    def _lag_counters(self):
+        misfires, delay = scheduler_metrics.take_recent_lag()
+        from app.utils.trading_engine import trading_engine
+        engine = trading_engine.get_stats()
+        return {'misfires': misfires, 'late': engine['late'], 'tick_overruns': engine['tick_overruns']}, delay
+
+    def evaluate(self):
+        """단계 판단 (스케줄러 주기 작업) - 판단 후 단계 반환"""
+        used = self.budget.used_ratio()
+        counters, delay = self._lag_counters()
+        previous_counters, self._counters = self._counters or counters, counters
+        lag_events = sum(max(0, counters[key] - previous_counters[key]) for key in counters)
+        target = pressure_level(used, delay, lag_events)
+
+        with self._lock:
+            previous = self.level
+            if target > self.level:
+                self.level = target
+                self._calm = 0
+                self._stats['escalations'] += 1
+            elif target < self.level:
+                self._calm += 1
+                if self._calm >= Config.LOAD_SHED_RECOVER_CHECKS:
+                    self.level -= 1
+                    self._calm = 0
+                    self._stats['recoveries'] += 1
+            else:
+                self._calm = 0
+            self._stats['evaluations'] += 1
+            self._last = {'used_ratio': round(used, 3), 'lag_seconds': round(delay, 2), 'lag_events': lag_events,
+                          'target': LEVEL_NAMES[target], 'at': time.strftime('%Y-%m-%d %H:%M:%S')}
+            level = self.level
+
+        if level != previous:
+            scheduler_metrics.record_degradation(level, LEVEL_NAMES[level])
+            log = self.logger.warning if level > previous else self.logger.info
+            log(f"부하 차단 단계 변경: {LEVEL_NAMES[previous]} → {LEVEL_NAMES[level]} "
+                f"(한도 사용률 {used:.0%}, 최대 대기 {delay:.1f}초, 지연 {lag_events}건)")
+        return level
+
+    def current_level(self):
+        """현재 단계 (봇을 다른 프로세스에서 실행하면 엔진 단계를 LOAD_SHED_CHECK_SECONDS마다 조회)"""
+        if not Config.LOAD_SHED_ENABLED:
+            return LEVEL_NORMAL
+        engine = remote_engine()
+        if engine is None:
+            return self.level
+
+        level, checked = self._remote
+        if time.time() - checked >= Config.LOAD_SHED_CHECK_SECONDS:
+            try:
+                level = engine.call('load_shed')['level']
+            except Exception as e:
+                self.logger.warning(f"거래 엔진 부하 차단 단계 조회 실패: {e}")
+            self._remote = (level, time.time())
+        return level
+
+    def shed(self, kind):
+        """필수가 아닌 호출(kind)을 이번에 생략해야 하는지 (생략하면 지표에 기록)"""
+        if self.current_level() < LEVEL_SHED:
+            return False
+        with self._lock:
+            self._stats['shed'][kind] = self._stats['shed'].get(kind, 0) + 1
+        scheduler_metrics.record_shed(kind)
+        return True
+
+    def analysis_due(self, key):
+        """이번 사이클에 신호 분석을 실행할지 (stretch 단계에서는 LOAD_SHED_STRETCH_FACTOR 사이클에 한 번)
+
+        False이면 호출한 봇은 이번 사이클에 손절/익절 체크만 실행합니다.
+        """
+        if self.current_level() < LEVEL_STRETCH:
+            with self._lock:
+                self._cycles.pop(key, None)
+            return True
+
+        with self._lock:
+            cycle = self._cycles.get(key, 0)
+            self._cycles[key] = cycle + 1
+            if cycle % max(1, Config.LOAD_SHED_STRETCH_FACTOR) == 0:
+                return True
+            self._stats['stretched_cycles'] += 1
+            return False
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self._stats, shed=dict(self._stats['shed']), enabled=Config.LOAD_SHED_ENABLED,
+                        level=self.level, name=LEVEL_NAMES[self.level], last=dict(self._last),
+                        used_ratio=round(self.budget.used_ratio(), 3), api_calls=self.budget.total)
+
+
+# 글로벌 부하 차단기
+load_shedder = LoadShedder()
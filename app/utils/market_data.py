@@ -0,0 +1,239 @@
+"""
+티커별 공유 1분봉 저장소 및 상위 시간대 리샘플링
+
+여러 전략/봇이 같은 티커의 minute3~minute240 캔들을 각각 조회하는 대신,
+티커당 하나의 1분봉 스트림만 유지하고 필요한 시간대는 로컬에서 리샘플링합니다.
+1분봉 조회는 200개 단위 요청으로 나눠 호출자의 fetch_data(재시도/실행 레인/호출 수 집계)를 거치며,
+부족한 과거 구간은 조회마다 CANDLE_STORE_BACKFILL_PAGES 요청까지만 채웁니다 (그동안은 호출자가 직접 조회).
+"""
+import logging
+import threading
+import time
+
+import pandas as pd
+import pyupbit
+
+from app.utils.load_shedder import load_shedder
+from app.utils.scheduler_metrics import count_api_calls
+from config import Config
+
+# 리샘플링으로 만들 수 있는 분봉 interval → 분 단위
+INTERVAL_MINUTES = {
+    'minute1': 1,
+    'minute3': 3,
+    'minute5': 5,
+    'minute10': 10,
+    'minute15': 15,
+    'minute30': 30,
+    'minute60': 60,
+    'minute240': 240
+}
+
+# 업비트 분봉은 UTC 기준으로 정렬되므로 KST(naive) 인덱스 기준 원점은 09:00
+# (240분봉: KST 01/05/09/13/17/21시 시작)
+UPBIT_CANDLE_ORIGIN = pd.Timestamp('1970-01-01 09:00:00')
+
+# 캔들 마감 시각 (KST 기준 CronTrigger 필드) - 업비트 UTC 정렬 기준
+CANDLE_CLOSE_CRON_FIELDS = {
+    'minute1': {'minute': '*'},
+    'minute3': {'minute': '*/3'},
+    'minute5': {'minute': '*/5'},
+    'minute10': {'minute': '*/10'},
+    'minute15': {'minute': '*/15'},
+    'minute30': {'minute': '*/30'},
+    'minute60': {'minute': '0'},
+    'minute240': {'hour': '1,5,9,13,17,21', 'minute': '0'},
+    'day': {'hour': '9', 'minute': '0'}
+}
+
+# pyupbit 1회 요청 최대 캔들 수
+MAX_CANDLES_PER_REQUEST = 200
+
+
+def resample_ohlcv(df, interval):
+    """1분봉 DataFrame을 업비트 캔들 경계에 맞춰 상위 시간대로 리샘플링
+
+    Args:
+        df (DataFrame): pyupbit 형식의 1분봉 (open, high, low, close, volume[, value])
+        interval (str): 'minute3' ~ 'minute240'
+
+    Returns:
+        DataFrame: 리샘플링된 OHLCV (거래가 없던 구간은 업비트와 동일하게 제외)
+    """
+    minutes = INTERVAL_MINUTES[interval]
+    if minutes == 1:
+        return df.copy()
+
+    agg = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+    if 'value' in df.columns:
+        agg['value'] = 'sum'
+
+    resampled = df.resample(f'{minutes}min', origin=UPBIT_CANDLE_ORIGIN, label='left', closed='left').agg(agg)
+    return resampled.dropna(subset=['open'])
+
+
+def candle_close_cron_fields(interval):
+    """interval의 캔들 마감 시각에 해당하는 CronTrigger 필드 (지원하지 않으면 None)"""
+    fields = CANDLE_CLOSE_CRON_FIELDS.get(interval)
+    return dict(fields) if fields else None
+
+
+def _fetch_minute1(ticker, count, to=None):
+    """업비트 시세 API에서 1분봉 조회 (API 키 불필요, count는 요청 1회 분량 이하)"""
+    return pyupbit.get_ohlcv(ticker, interval='minute1', count=count, to=to)
+
+
+def _call_counted(fetch_func):
+    """호출자 API가 없는 조회 (코디네이터 시세 공유, 간격 조정기) - 부하 차단 호출 한도에 집계"""
+    try:
+        return fetch_func()
+    finally:
+        count_api_calls()
+        load_shedder.record_api_call()
+
+
+class CandleStore:
+    """티커별 1분봉 공유 저장소"""
+
+    def __init__(self, fetcher=None, max_bars=None, refresh_seconds=None):
+        self.fetcher = fetcher or _fetch_minute1
+        self.max_bars = max_bars or Config.CANDLE_STORE_MAX_BARS
+        self.refresh_seconds = refresh_seconds if refresh_seconds is not None else Config.CANDLE_STORE_REFRESH_SECONDS
+        self.logger = logging.getLogger(__name__)
+
+        self._frames = {}  # {ticker: 1분봉 DataFrame}
+        self._last_refresh = {}  # {ticker: 마지막 갱신 시각}
+        self._ticker_locks = {}
+        self._lock = threading.Lock()
+        self.backfill_pages = Config.CANDLE_STORE_BACKFILL_PAGES
+        self._stats = {'fetches': 0, 'backfills': 0, 'served': 0, 'fallbacks': 0}
+
+    def _get_ticker_lock(self, ticker):
+        with self._lock:
+            if ticker not in self._ticker_locks:
+                self._ticker_locks[ticker] = threading.Lock()
+            return self._ticker_locks[ticker]
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _fetch(self, ticker, count, fetch, to=None):
+        """1분봉 요청 1회 (fetch: 호출자의 fetch_data, 없으면 호출 한도에만 집계)"""
+        self._count('fetches')
+        df = (fetch or _call_counted)(lambda: self.fetcher(ticker, count, to))
+        if df is None or len(df) == 0:
+            return None
+        return df
+
+    def _backfill(self, ticker, frame, min_bars, fetch):
+        """가장 오래된 캔들 이전 구간을 요청 backfill_pages회까지 채움 (나머지는 다음 조회에서 이어서)"""
+        for _ in range(self.backfill_pages):
+            if len(frame) >= min_bars:
+                break
+            older = self._fetch(ticker, MAX_CANDLES_PER_REQUEST, fetch, to=frame.index[0])
+            if older is None:
+                break
+            older = older[older.index < frame.index[0]]
+            if len(older) == 0:
+                break  # 상장 이전 구간
+            self._count('backfills')
+            frame = pd.concat([older, frame])
+        return frame
+
+    def _refresh(self, ticker, min_bars, fetch=None):
+        """필요 시 1분봉 갱신 (오래됐으면 최근 구간 조회, 경과 시간만큼 증분 조회, 부족하면 과거 구간 백필)"""
+        now = time.time()
+        frame = self._frames.get(ticker)
+        last_refresh = self._last_refresh.get(ticker, 0)
+        min_bars = min(min_bars, self.max_bars)
+        fresh = now - last_refresh < self.refresh_seconds
+
+        if frame is not None and len(frame) >= min_bars and fresh:
+            return frame
+
+        merged = frame
+        if frame is None or not fresh:
+            elapsed_minutes = int((now - last_refresh) // 60) + 2
+            if frame is None or elapsed_minutes >= MAX_CANDLES_PER_REQUEST:
+                # 최근 구간부터 다시 시작 (과거 구간은 아래 백필)
+                new = self._fetch(ticker, MAX_CANDLES_PER_REQUEST, fetch)
+                if new is None:
+                    return frame
+                merged = new
+            else:
+                # 증분 조회: 마지막 (진행 중) 캔들부터 겹치게 받아서 덮어쓰기
+                new = self._fetch(ticker, elapsed_minutes, fetch)
+                if new is None:
+                    return frame
+                merged = pd.concat([frame[frame.index < new.index[0]], new])
+            merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+            self._last_refresh[ticker] = now
+
+        merged = self._backfill(ticker, merged, min_bars, fetch)
+        if len(merged) > self.max_bars:
+            merged = merged.iloc[-self.max_bars:]
+
+        self._frames[ticker] = merged
+        return merged
+
+    def get_minute1(self, ticker, min_bars=1, fetch=None):
+        """1분봉 조회 (최소 min_bars개 보장 시도, 백필 요청 수 제한으로 부족할 수 있음)"""
+        with self._get_ticker_lock(ticker):
+            return self._refresh(ticker, min_bars, fetch)
+
+    def can_serve(self, interval, count):
+        """저장소 용량으로 해당 interval/count를 만들 수 있는지 여부"""
+        minutes = INTERVAL_MINUTES.get(interval)
+        return minutes is not None and (count + 1) * minutes <= self.max_bars
+
+    def get_ohlcv(self, ticker, interval, count, fetch=None):
+        """공유 1분봉에서 interval 캔들 count개 생성
+
+        Args:
+            fetch (callable): 조회 함수를 받아 실행하는 호출자 API의 fetch_data (재시도/레인/호출 수 집계)
+
+        Returns:
+            DataFrame 또는 None (저장소로 만들 수 없는 경우 - 호출자가 직접 조회해야 함)
+        """
+        if not self.can_serve(interval, count):
+            self._count('fallbacks')
+            return None
+
+        try:
+            minutes = INTERVAL_MINUTES[interval]
+            # 첫 구간이 잘려 있을 수 있으므로 한 구간 여유분 확보
+            frame = self.get_minute1(ticker, (count + 1) * minutes, fetch)
+            if frame is None:
+                self._count('fallbacks')
+                return None
+
+            resampled = resample_ohlcv(frame, interval)
+
+            # 저장소 시작 시각이 구간 중간이면 첫 캔들은 불완전하므로 제외
+            if minutes > 1 and len(resampled) > 0 and frame.index[0] > resampled.index[0]:
+                resampled = resampled.iloc[1:]
+
+            if len(resampled) < count:
+                self._count('fallbacks')
+                return None
+
+            self._count('served')
+            return resampled.iloc[-count:]
+
+        except Exception as e:
+            self.logger.error(f"캔들 리샘플링 실패 ({ticker}, {interval}, {count}): {e}")
+            self._count('fallbacks')
+            return None
+
+    def get_stats(self):
+        """저장소 통계"""
+        with self._lock:
+            tickers = list(self._frames.keys())
+            stats = dict(self._stats)
+        return dict(stats, tickers=len(tickers),
+                    bars={ticker: len(self._frames[ticker]) for ticker in tickers})
+
+
+# 글로벌 캔들 저장소 인스턴스
+candle_store = CandleStore()
@@ -0,0 +1,146 @@
+"""
+샤드 간 시세 공유
+
+봇을 여러 엔진 샤드 프로세스에 나눠 실행하면 프로세스마다 시세 캐시가 따로 생겨 같은 티커를
+샤드 수만큼 조회하게 됩니다. 코디네이터(부모) 프로세스의 MarketDataHub가 시세 조회를 대신하고
+샤드는 제어 채널로 받아 가므로, 샤드 수와 관계없이 같은 틱의 같은 티커 시세는 한 번만 조회합니다.
+"""
+import logging
+import threading
+import time
+
+import pyupbit
+
+from app.api.upbit_api import ohlcv_to_candles
+from app.utils.engine_ipc import engine_client
+from app.utils.market_data import candle_store, INTERVAL_MINUTES
+from app.utils.orderbook import orderbook_cache
+from app.utils.prefetch import CycleSnapshot, SNAPSHOT_ENDPOINTS, merge_requirements
+from config import Config
+
+
+class MarketDataHub:
+    """코디네이터 프로세스의 공유 시세 조회 (같은 틱 안의 중복 요청은 한 번만 조회)"""
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl if ttl is not None else Config.ENGINE_TICK_SECONDS
+        self.logger = logging.getLogger(__name__)
+
+        self._values = {}  # {(endpoint, ticker, interval): (count, 값, 조회 시각)}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'fetches': 0, 'hits': 0, 'price_requests': 0, 'failures': 0}
+
+    def _get_key_lock(self, key):
+        with self._lock:
+            if key not in self._key_locks:
+                self._key_locks[key] = threading.Lock()
+            return self._key_locks[key]
+
+    def _fetch(self, endpoint, ticker, interval, count):
+        if endpoint == 'ohlcv':
+            if Config.CANDLE_RESAMPLE_ENABLED and interval in INTERVAL_MINUTES:
+                data = candle_store.get_ohlcv(ticker, interval, count)
+                if data is not None:
+                    return data
+            return pyupbit.get_ohlcv(ticker, interval=interval, count=count)
+        if endpoint == 'candles':
+            df = pyupbit.get_ohlcv(ticker, interval=interval, count=count)
+            return ohlcv_to_candles(df) if df is not None and not df.empty else None
+        if endpoint == 'orderbook':
+            return orderbook_cache.get(ticker)[0]
+        if endpoint == 'current_price':
+            return pyupbit.get_current_price(ticker)
+        raise ValueError(f"공유할 수 없는 endpoint입니다: {endpoint}")
+
+    def _get(self, endpoint, ticker, interval, count):
+        key = (endpoint, ticker, interval)
+        with self._get_key_lock(key):
+            cached = self._values.get(key)
+            if cached is not None and time.time() - cached[2] < self.ttl and (cached[0] or 0) >= (count or 0):
+                self._stats['hits'] += 1
+                return cached[1]
+
+            self._stats['fetches'] += 1
+            value = self._fetch(endpoint, ticker, interval, count)
+            if value is not None:
+                self._values[key] = (count, value, time.time())
+            return value
+
+    def fetch(self, ticker, requirements):
+        """티커 시세 요구 목록 조회
+
+        Returns:
+            list: [(endpoint, interval, count, 값)] (조회 실패한 항목은 제외)
+        """
+        self._stats['requests'] += 1
+        results = []
+        for endpoint, interval, count in merge_requirements(requirements):
+            if endpoint not in SNAPSHOT_ENDPOINTS:
+                continue  # 잔고는 샤드에서 사용자 API로 조회
+            try:
+                value = self._get(endpoint, ticker, interval, count)
+            except Exception as e:
+                self._stats['failures'] += 1
+                self.logger.warning(f"공유 시세 조회 실패 ({ticker}, {endpoint}): {e}")
+                continue
+            if value is not None:
+                results.append((endpoint, interval, count, value))
+        return results
+
+    def current_prices(self, tickers):
+        """여러 티커 현재가 일괄 조회 ({티커: 가격}, 틱 TTL 동안 재사용)"""
+        self._stats['requests'] += 1
+        tickers = list(tickers)
+        now = time.time()
+        prices = {}
+        missing = []
+        for ticker in tickers:
+            cached = self._values.get(('current_price', ticker, None))
+            if cached is not None and now - cached[2] < self.ttl:
+                prices[ticker] = cached[1]
+            else:
+                missing.append(ticker)
+
+        self._stats['hits'] += len(prices)
+        if missing:
+            self._stats['price_requests'] += 1
+            fetched = pyupbit.get_current_price(missing)
+            if not isinstance(fetched, dict):
+                fetched = {missing[0]: fetched} if len(missing) == 1 and fetched else {}
+            for ticker, price in fetched.items():
+                if price:
+                    self._values[('current_price', ticker, None)] = (None, price, now)
+                    prices[ticker] = price
+        return prices
+
+    def get_stats(self):
+        return dict(self._stats, keys=len(self._values))
+
+
+def hub_price_fetcher(client):
+    """샤드 엔진의 현재가 일괄 조회를 코디네이터 허브로 대체하는 조회 함수"""
+    def fetch(tickers):
+        return client.call('prices', tickers=list(tickers))
+    return fetch
+
+
+def hub_market_fetcher(client):
+    """샤드 엔진의 틱 시세 선조회를 코디네이터 허브로 대체하는 조회 함수 (prefetch와 같은 형식)"""
+    def fetch(api, ticker, requirements, log=None):
+        started = time.time()
+        snapshot = CycleSnapshot(ticker)
+        snapshot.requests = 1
+        for endpoint, interval, count, value in client.call('market', ticker=ticker, requirements=requirements):
+            snapshot.store(endpoint, ticker, interval, count, value)
+            snapshot.shared += 1
+        snapshot.elapsed = time.time() - started
+        return snapshot
+    return fetch
+
+
+def use_market_hub(engine, client=None):
+    """샤드 프로세스의 거래 엔진이 코디네이터 공유 시세를 사용하도록 설정"""
+    client = client or engine_client
+    engine.price_fetcher = hub_price_fetcher(client)
+    engine.market_fetcher = hub_market_fetcher(client)
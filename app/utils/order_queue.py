@@ -0,0 +1,128 @@
+"""
+사용자별 주문 순서 보장 및 주문 식별자
+
+한 사용자의 여러 봇이 동시에 주문하면 각자 캐시된 잔고를 보고 주문해 min_cash를 넘겨 쓸 수 있고,
+fetch_data의 시간 초과 후 재시도가 같은 주문을 두 번 접수할 수도 있었습니다.
+
+- 사용자별 주문 큐: 주문 실행(잔고 확인 → 주문 → 원장 반영)을 사용자 단위로 도착 순서대로 하나씩 처리합니다.
+  큐 안에서 확인하는 원장 잔고에는 앞선 주문 체결이 이미 반영되어 있으므로 신호 평가는 계속 동시에 실행해도 됩니다.
+  전역 잠금이 아니므로 다른 사용자의 주문은 기다리지 않습니다.
+- 주문 식별자: 주문마다 고유 identifier를 붙여 접수하고, 응답을 받지 못한 주문은 재접수 전에
+  identifier로 조회해 이미 접수된 주문이면 그 주문을 사용합니다.
+
+큐는 별도 작업 스레드 없이 호출 스레드가 차례를 기다려 직접 실행하므로 실행 레인/사이클 지표가 그대로 유지됩니다.
+"""
+import collections
+import contextlib
+import logging
+import threading
+import time
+import uuid
+
+from config import Config
+
+
+class OrderQueueTimeout(Exception):
+    """주문 차례를 기다리다 시간 초과"""
+
+
+def new_order_identifier(user_id, ticker, side):
+    """업비트 주문 identifier (계정 내 고유, 재접수 시 같은 값 사용)"""
+    return f"ub-{user_id}-{ticker}-{side}-{uuid.uuid4().hex[:16]}"
+
+
+class UserOrderQueue:
+    """한 사용자의 주문 차례 (도착 순서대로 한 번에 하나, 같은 스레드의 중첩 주문은 바로 실행)"""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self._condition = threading.Condition()
+        self._owner = None  # 실행 중인 스레드
+        self._depth = 0
+        self._waiters = collections.deque()
+        self.stats = {'orders': 0, 'waits': 0, 'wait_ms': 0.0, 'max_queue': 0, 'timeouts': 0}
+
+    @contextlib.contextmanager
+    def turn(self, timeout=None):
+        """주문 차례를 얻어 블록 실행
+
+        Raises:
+            OrderQueueTimeout: timeout 안에 차례가 오지 않음
+        """
+        me = threading.get_ident()
+        with self._condition:
+            if self._owner == me:
+                # 분할 매도 실패 후 전량 매도 재시도처럼 주문 안에서 다시 주문하는 경우
+                self._depth += 1
+            elif self._owner is None and not self._waiters:
+                self._owner, self._depth = me, 1
+                self.stats['orders'] += 1
+            else:
+                started = time.time()
+                self._waiters.append(me)
+                self.stats['waits'] += 1
+                self.stats['max_queue'] = max(self.stats['max_queue'], len(self._waiters))
+                if not self._condition.wait_for(lambda: self._owner == me, timeout):
+                    ahead = self._waiters.index(me)
+                    self._waiters.remove(me)
+                    self.stats['timeouts'] += 1
+                    raise OrderQueueTimeout(f"주문 대기 시간 초과 (사용자: {self.user_id}, 앞선 대기 주문 {ahead}건)")
+                self._depth = 1
+                self.stats['orders'] += 1
+                self.stats['wait_ms'] += (time.time() - started) * 1000
+
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._depth -= 1
+                if self._depth == 0:
+                    # 다음 대기자에게 바로 넘김 (새로 도착한 주문이 끼어들지 않도록)
+                    self._owner = self._waiters.popleft() if self._waiters else None
+                    self._condition.notify_all()
+
+    @property
+    def pending(self):
+        return len(self._waiters)
+
+
+class OrderQueues:
+    """사용자별 주문 큐 모음"""
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout if timeout is not None else Config.ORDER_QUEUE_TIMEOUT
+        self.logger = logging.getLogger(__name__)
+        self._queues = {}
+        self._lock = threading.Lock()
+        self._stats = {'submits': 0, 'resubmits': 0, 'recovered': 0, 'capped': 0, 'rejected': 0}
+
+    def get(self, user_id):
+        with self._lock:
+            if user_id not in self._queues:
+                self._queues[user_id] = UserOrderQueue(user_id)
+            return self._queues[user_id]
+
+    def turn(self, user_id):
+        """사용자의 주문 차례 (ORDER_QUEUE_TIMEOUT까지 대기)"""
+        return self.get(user_id).turn(self.timeout)
+
+    def record(self, key, count=1):
+        with self._lock:
+            self._stats[key] += count
+
+    def get_stats(self):
+        with self._lock:
+            queues = list(self._queues.values())
+            stats = dict(self._stats)
+        stats['users'] = len(queues)
+        stats['pending'] = sum(queue.pending for queue in queues)
+        for key in ('orders', 'waits', 'timeouts'):
+            stats[key] = sum(queue.stats[key] for queue in queues)
+        stats['max_queue'] = max((queue.stats['max_queue'] for queue in queues), default=0)
+        stats['avg_wait_ms'] = round(sum(queue.stats['wait_ms'] for queue in queues) / stats['waits'], 1) \
+            if stats['waits'] else 0
+        return stats
+
+
+# 글로벌 사용자별 주문 큐
+order_queues = OrderQueues()
@@ -0,0 +1,265 @@
+"""
+티커별 공유 호가 캐시 및 호가 깊이 분석
+
+호가는 사용자와 무관한 시세 데이터이므로 티커당 하나만 짧은 TTL로 보관하고,
+매도 압력/시장 심리 분석은 호가 단위를 NumPy 배열로 한 번 변환한 OrderbookDepth에서
+누적 물량, 구간별 불균형, 스프레드, 시장가 주문 슬리피지를 함께 계산합니다.
+"""
+import logging
+import operator
+import threading
+import time
+
+import numpy as np
+import pyupbit
+
+from config import Config
+
+# 불균형을 계산하는 기본 호가 구간 (None: 전체 호가)
+DEFAULT_IMBALANCE_LEVELS = (1, 5, 10, None)
+
+# pyupbit 호가 단위 필드
+UNIT_FIELDS = ('ask_price', 'ask_size', 'bid_price', 'bid_size')
+_UNIT_FIELDS = operator.itemgetter(*UNIT_FIELDS)
+
+
+def _fetch_orderbook(ticker):
+    """업비트 시세 API에서 호가 조회 (API 키 불필요)"""
+    return pyupbit.get_orderbook(ticker)
+
+
+class OrderbookCache:
+    """티커별 호가 공유 캐시
+
+    같은 티커를 거래하는 모든 사용자/봇이 TTL 동안 하나의 호가를 사용합니다.
+    실시간 호가 스트림을 받는 경우 update()로 밀어 넣으면 조회 없이 그 값을 사용합니다.
+    """
+
+    def __init__(self, fetcher=None, ttl=None):
+        self.fetcher = fetcher or _fetch_orderbook
+        self.ttl = ttl if ttl is not None else Config.ORDERBOOK_CACHE_TTL
+        self.logger = logging.getLogger(__name__)
+
+        self._books = {}  # {티커: (호가, 저장 시각)}
+        self._ticker_locks = {}
+        self._lock = threading.Lock()
+        self._stats = {'fetches': 0, 'hits': 0, 'pushes': 0, 'failures': 0}
+
+    def _get_ticker_lock(self, ticker):
+        with self._lock:
+            if ticker not in self._ticker_locks:
+                self._ticker_locks[ticker] = threading.Lock()
+            return self._ticker_locks[ticker]
+
+    def _fresh(self, ticker):
+        entry = self._books.get(ticker)
+        if entry is not None and time.time() - entry[1] < self.ttl:
+            return entry[0]
+        return None
+
+    def get(self, ticker, fetcher=None):
+        """호가 조회 (TTL 이내면 캐시, 아니면 티커당 한 스레드만 조회)
+
+        Returns:
+            (호가 dict 또는 None, 실제 조회 여부)
+        """
+        orderbook = self._fresh(ticker)
+        if orderbook is not None:
+            self._stats['hits'] += 1
+            return orderbook, False
+
+        with self._get_ticker_lock(ticker):
+            # 대기하는 동안 다른 스레드가 갱신했을 수 있음
+            orderbook = self._fresh(ticker)
+            if orderbook is not None:
+                self._stats['hits'] += 1
+                return orderbook, False
+
+            self._stats['fetches'] += 1
+            orderbook = (fetcher or self.fetcher)(ticker)
+            if not orderbook:
+                self._stats['failures'] += 1
+                return None, True
+
+            self._books[ticker] = (orderbook, time.time())
+            return orderbook, True
+
+    def update(self, ticker, orderbook):
+        """외부(실시간 스트림 등)에서 받은 호가 저장"""
+        if orderbook:
+            self._books[ticker] = (orderbook, time.time())
+            self._stats['pushes'] += 1
+
+    def invalidate(self, ticker=None):
+        """주문 후 등 호가가 바뀐 것이 확실할 때 폐기"""
+        if ticker is None:
+            self._books.clear()
+        else:
+            self._books.pop(ticker, None)
+
+    def get_stats(self):
+        """캐시 통계"""
+        lookups = self._stats['hits'] + self._stats['fetches']
+        return dict(self._stats, tickers=len(self._books),
+                    hit_ratio=round(self._stats['hits'] / lookups, 3) if lookups else 0)
+
+
+class OrderbookDepth:
+    """호가 깊이 분석 (매도/매수 호가를 가격 순서대로 배열화)
+
+    배열은 1호가부터 순서대로이며, 누적 물량/누적 금액을 생성 시 한 번만 계산합니다.
+    """
+
+    def __init__(self, ask_prices, ask_sizes, bid_prices, bid_sizes):
+        self.ask_prices = ask_prices
+        self.ask_sizes = ask_sizes
+        self.bid_prices = bid_prices
+        self.bid_sizes = bid_sizes
+
+        self.ask_depth = np.cumsum(ask_sizes)
+        self.bid_depth = np.cumsum(bid_sizes)
+        self.ask_notional = np.cumsum(ask_prices * ask_sizes)
+        self.bid_notional = np.cumsum(bid_prices * bid_sizes)
+
+    @classmethod
+    def from_orderbook(cls, orderbook):
+        """pyupbit 호가 dict로 생성 (호가 단위가 없으면 None)"""
+        if not orderbook:
+            return None
+        units = orderbook.get('orderbook_units') or []
+        if not units:
+            return None
+
+        # 단위당 (ask_price, ask_size, bid_price, bid_size)를 (단위 수, 4) 배열로 한 번에 변환
+        try:
+            values = np.array([_UNIT_FIELDS(unit) for unit in units], dtype=float)
+        except KeyError:
+            values = np.array([tuple(unit.get(field) for field in UNIT_FIELDS) for unit in units], dtype=float)
+        values = np.nan_to_num(values)  # 누락/None은 0
+        return cls(values[:, 0], values[:, 1], values[:, 2], values[:, 3])
+
+    @property
+    def levels(self):
+        return len(self.ask_sizes)
+
+    def _depth_at(self, depth, levels):
+        if len(depth) == 0:
+            return 0.0
+        index = len(depth) if levels is None else min(levels, len(depth))
+        return float(depth[index - 1])
+
+    def ask_volume(self, levels=None):
+        """상위 levels개 매도 호가 물량 합계 (None: 전체)"""
+        return self._depth_at(self.ask_depth, levels)
+
+    def bid_volume(self, levels=None):
+        """상위 levels개 매수 호가 물량 합계 (None: 전체)"""
+        return self._depth_at(self.bid_depth, levels)
+
+    def ask_bid_ratio(self, levels=None):
+        """매도/매수 물량 비율 (매수 물량이 없으면 inf)"""
+        bid = self.bid_volume(levels)
+        return self.ask_volume(levels) / bid if bid > 0 else float('inf')
+
+    def imbalance(self, levels=None):
+        """(매수 - 매도) / (매수 + 매도) 물량 불균형 (-1 ~ 1, 양수면 매수 우위)"""
+        ask, bid = self.ask_volume(levels), self.bid_volume(levels)
+        total = ask + bid
+        return (bid - ask) / total if total > 0 else 0.0
+
+    @property
+    def best_ask(self):
+        return float(self.ask_prices[0]) if self.levels else 0.0
+
+    @property
+    def best_bid(self):
+        return float(self.bid_prices[0]) if self.levels else 0.0
+
+    @property
+    def spread(self):
+        """1호가 스프레드 (어느 한쪽이 비어 있으면 0)"""
+        return self.best_ask - self.best_bid if self.best_ask and self.best_bid else 0.0
+
+    @property
+    def spread_ratio(self):
+        """매수 1호가 대비 스프레드 비율"""
+        return self.spread / self.best_bid if self.best_bid > 0 else 0.0
+
+    @property
+    def mid_price(self):
+        return (self.best_ask + self.best_bid) / 2 if self.best_ask and self.best_bid else 0.0
+
+    @staticmethod
+    def _fill(prices, depth, notional, volume):
+        """호가를 위에서부터 소진하며 volume만큼 체결했을 때 (평균 체결가, 체결 수량)"""
+        if volume <= 0 or len(depth) == 0 or depth[-1] <= 0:
+            return 0.0, 0.0
+
+        filled = min(float(volume), float(depth[-1]))
+        # filled를 채우는 마지막 호가 위치
+        index = int(np.searchsorted(depth, filled))
+        before_volume = float(depth[index - 1]) if index > 0 else 0.0
+        before_notional = float(notional[index - 1]) if index > 0 else 0.0
+        cost = before_notional + (filled - before_volume) * float(prices[index])
+        return cost / filled, filled
+
+    def estimate_buy(self, amount):
+        """시장가 매수 amount(원) 체결 추정
+
+        Returns:
+            dict: {'avg_price', 'volume', 'filled_amount', 'slippage', 'levels_used', 'fully_filled'}
+                  slippage는 매도 1호가 대비 평균 체결가 상승률
+        """
+        if amount <= 0 or len(self.ask_notional) == 0:
+            return None
+
+        filled_amount = min(amount, float(self.ask_notional[-1]))
+        index = int(np.searchsorted(self.ask_notional, filled_amount))
+        before_amount = float(self.ask_notional[index - 1]) if index > 0 else 0.0
+        before_volume = float(self.ask_depth[index - 1]) if index > 0 else 0.0
+        volume = before_volume + (filled_amount - before_amount) / float(self.ask_prices[index])
+        avg_price = filled_amount / volume if volume > 0 else 0.0
+
+        return {
+            'avg_price': avg_price,
+            'volume': volume,
+            'filled_amount': filled_amount,
+            'slippage': avg_price / self.best_ask - 1 if self.best_ask > 0 else 0.0,
+            'levels_used': index + 1,
+            'fully_filled': bool(filled_amount >= amount),
+        }
+
+    def estimate_sell(self, volume):
+        """시장가 매도 volume(코인 수량) 체결 추정
+
+        Returns:
+            dict: {'avg_price', 'volume', 'filled_amount', 'slippage', 'levels_used', 'fully_filled'}
+                  slippage는 매수 1호가 대비 평균 체결가 하락률
+        """
+        avg_price, filled = self._fill(self.bid_prices, self.bid_depth, self.bid_notional, volume)
+        if filled <= 0:
+            return None
+
+        return {
+            'avg_price': avg_price,
+            'volume': filled,
+            'filled_amount': avg_price * filled,
+            'slippage': 1 - avg_price / self.best_bid if self.best_bid > 0 else 0.0,
+            'levels_used': int(np.searchsorted(self.bid_depth, filled)) + 1,
+            'fully_filled': bool(filled >= volume),
+        }
+
+    def summary(self, levels=DEFAULT_IMBALANCE_LEVELS):
+        """모니터링/로그용 요약"""
+        return {
+            'levels': self.levels,
+            'ask_volume': self.ask_volume(),
+            'bid_volume': self.bid_volume(),
+            'spread': self.spread,
+            'spread_ratio': self.spread_ratio,
+            'imbalance': {('all' if level is None else level): round(self.imbalance(level), 4) for level in levels},
+        }
+
+
+# 글로벌 호가 캐시 인스턴스
+orderbook_cache = OrderbookCache()
@@ -0,0 +1,147 @@
+"""
+봇 실행 시점 분산 (위상 배정)
+
+함께 시작하거나 initialize_scheduler가 한꺼번에 복원한 봇들은 모두 같은 시각에 실행되어
+몇 초 동안 요청이 몰리고 나머지 시간은 비어 있었습니다 (복원 시 봇마다 3초씩 쉬는 것으로는 부족했습니다).
+
+PhasePlanner는 작업마다 실행 간격 안의 시작 위상(epoch 초 기준 나머지)을 정해 초 단위 예상 API 호출 수가
+고르게 되도록 합니다. 위상이 o인 간격 I 작업은 epoch 초 t % I == o인 시각에 실행됩니다.
+
+- 예상 부하: PHASE_PLAN_HORIZON초 구간의 초별 예상 API 호출 수 (작업마다 실행되는 초에 사이클당 호출 수를 더함)
+  (간격이 구간을 나누어떨어지지 않는 작업은 구간 안의 실행 초로 근사)
+- 배치: 새 작업은 실행되는 초들의 최대 부하(같으면 합계)가 가장 작은 위상에 넣습니다 (기존 작업은 그대로).
+- 재배치(replan): 작업 추가/제거 후 측정된 사이클당 API 호출 수로 전체 위상을 다시 계산해
+  최대 부하가 PHASE_REPLAN_MIN_GAIN 이상 줄어들 때만 적용합니다 (불필요하게 봇 실행 시각을 옮기지 않도록).
+
+위상 적용(다음 실행 시각 변경)은 스케줄러 관리자(app.utils.scheduler_manager)가 맡습니다.
+"""
+import logging
+import math
+import threading
+import time
+
+from config import Config
+
+# 측정된 API 호출이 없는 작업도 작업 풀은 쓰므로 조금은 분산되도록 하는 최소 비용
+MIN_COST = 0.1
+
+
+def next_phase_time(interval, phase, after):
+    """after 이후(같은 시각 포함) 처음으로 위상이 phase인 실행 시각"""
+    return (math.ceil((after - phase) / interval)) * interval + phase
+
+
+class PhasePlanner:
+    """작업별 시작 위상 배정 (초별 예상 API 호출 수 평탄화)"""
+
+    def __init__(self, horizon=None, default_cost=None):
+        self.horizon = int(horizon or Config.PHASE_PLAN_HORIZON)
+        self.default_cost = float(default_cost or Config.PHASE_DEFAULT_COST)
+        self.logger = logging.getLogger(__name__)
+
+        self._jobs = {}  # {job_id: {'interval', 'cost', 'phase'}}
+        self._load = [0.0] * self.horizon  # 초별 예상 API 호출 수
+        self._lock = threading.Lock()
+        self._stats = {'placed': 0, 'released': 0, 'replans': 0, 'replans_skipped': 0, 'moved': 0}
+
+    def _seconds(self, interval, phase):
+        """구간 안에서 작업이 실행되는 초"""
+        if interval >= self.horizon:
+            return [phase % self.horizon]
+        return range(phase, self.horizon, interval)
+
+    def _add_load(self, job, sign):
+        for second in self._seconds(job['interval'], job['phase']):
+            self._load[second] += sign * job['cost']
+
+    def _best_phase(self, load, interval):
+        """실행되는 초의 최대 부하(같으면 합계)가 가장 작은 위상"""
+        best, best_score = 0, None
+        for phase in range(min(interval, self.horizon)):
+            seconds = self._seconds(interval, phase)
+            score = (max(load[second] for second in seconds), sum(load[second] for second in seconds))
+            if best_score is None or score < best_score:
+                best, best_score = phase, score
+        return best
+
+    def place(self, job_id, interval, cost=None, now=None):
+        """작업 위상 배정 후 첫 실행 시각(epoch 초) 반환 (이미 있으면 새 간격으로 다시 배정)"""
+        interval = max(1, int(interval))
+        now = time.time() if now is None else now
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+            if job is not None:
+                self._add_load(job, -1)
+                cost = cost if cost is not None else job['cost']
+            job = {'interval': interval, 'cost': max(MIN_COST, float(cost if cost is not None else self.default_cost))}
+            job['phase'] = self._best_phase(self._load, interval)
+            self._jobs[job_id] = job
+            self._add_load(job, 1)
+            self._stats['placed'] += 1
+            return next_phase_time(interval, job['phase'], now)
+
+    def remove(self, job_id):
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+            if job is None:
+                return False
+            self._add_load(job, -1)
+            self._stats['released'] += 1
+            return True
+
+    def phase(self, job_id):
+        job = self._jobs.get(job_id)
+        return job['phase'] if job else None
+
+    def replan(self, costs=None):
+        """전체 위상 재계산 - 적용한 경우 {job_id: 새 위상} (바뀐 작업만), 이득이 작으면 빈 dict
+
+        Args:
+            costs (dict): {job_id: 측정된 사이클당 API 호출 수} (없는 작업은 기존 값 사용)
+        """
+        costs = costs or {}
+        with self._lock:
+            jobs = {job_id: dict(job, cost=max(MIN_COST, float(costs.get(job_id, job['cost']))))
+                    for job_id, job in self._jobs.items()}
+            current = [0.0] * self.horizon
+            for job in jobs.values():
+                for second in self._seconds(job['interval'], job['phase']):
+                    current[second] += job['cost']
+
+            # 초당 부하가 큰 작업(짧은 간격, 많은 호출)부터 배치
+            planned = [0.0] * self.horizon
+            phases = {}
+            for job_id, job in sorted(jobs.items(), key=lambda item: (-item[1]['cost'] / item[1]['interval'],
+                                                                      item[1]['interval'], item[0])):
+                phase = self._best_phase(planned, job['interval'])
+                phases[job_id] = phase
+                for second in self._seconds(job['interval'], phase):
+                    planned[second] += job['cost']
+
+            current_peak, planned_peak = max(current, default=0), max(planned, default=0)
+            if not current_peak or planned_peak > current_peak * (1 - Config.PHASE_REPLAN_MIN_GAIN):
+                # 측정 비용만 반영하고 위상은 유지
+                self._jobs, self._load = jobs, current
+                self._stats['replans_skipped'] += 1
+                return {}
+
+            moved = {job_id: phase for job_id, phase in phases.items() if phase != jobs[job_id]['phase']}
+            for job_id, phase in phases.items():
+                jobs[job_id]['phase'] = phase
+            self._jobs, self._load = jobs, planned
+            self._stats['replans'] += 1
+            self._stats['moved'] += len(moved)
+
+        self.logger.info(f"봇 실행 위상 재배치: 작업 {len(moved)}개 이동, "
+                         f"초당 최대 예상 호출 {current_peak:.1f} → {planned_peak:.1f}")
+        return moved
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self._stats, jobs=len(self._jobs), horizon=self.horizon,
+                        peak_calls_per_second=round(max(self._load, default=0), 2),
+                        mean_calls_per_second=round(sum(self._load) / self.horizon, 2))
+
+
+# 글로벌 실행 위상 배정기
+phase_planner = PhasePlanner()
@@ -0,0 +1,314 @@
+"""
+사용자별 포지션 원장
+
+사이클마다 잔고/평균 매수가를 각각 조회하는 대신, 사용자별 원장이 현금, 티커별 수량/평균 매수가/
+실현 손익을 보관합니다. 주문이 체결되면 원장을 바로 갱신하고, 업비트 계좌 조회(get_balances)
+한 번으로 전체를 맞추는 대조는 느린 주기, 체결 직후(실제 체결가 반영), 불일치가 의심될 때만 수행합니다.
+봇/대시보드는 API 호출 없이 원장을 읽고, MCP 서버처럼 다른 프로세스는 저장된 스냅샷 파일을 읽습니다.
+거래 엔진 샤드들은 같은 스냅샷 파일을 쓰므로 저장 시 이 프로세스의 사용자 원장만 병합합니다.
+"""
+import atexit
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+
+from app.utils.high_water_mark import high_water_marks, position_key
+from app.utils.json_store import merge_json
+from config import Config
+
+# 업비트 거래 수수료 (시장가 주문, 체결 금액 대비)
+FEE_RATE = 0.0005
+
+# 대조 시 불일치로 보는 상대 오차
+DRIFT_TOLERANCE = 0.001
+
+
+def normalize_ticker(ticker):
+    """'BTC' / 'KRW-BTC' → 'KRW-BTC'"""
+    return ticker if '-' in ticker else f"KRW-{ticker}"
+
+
+def _to_float(value):
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class PositionLedger:
+    """한 사용자의 현금/포지션 원장"""
+
+    def __init__(self, user_id, reconcile_seconds=None, fill_reconcile_seconds=None):
+        self.user_id = user_id
+        self.reconcile_seconds = reconcile_seconds if reconcile_seconds is not None else Config.LEDGER_RECONCILE_SECONDS
+        self.fill_reconcile_seconds = (fill_reconcile_seconds if fill_reconcile_seconds is not None
+                                       else Config.LEDGER_FILL_RECONCILE_SECONDS)
+        self.logger = logging.getLogger(__name__)
+
+        self.cash = 0.0
+        self.positions = {}  # {티커: {'quantity', 'avg_price', 'realized_pnl', 'opened_at', 'updated_at'}}
+        self.realized_pnl = {}  # 청산된 포지션 포함 티커별 누적 실현 손익 (원장 추정)
+
+        self.synced_at = 0.0  # 마지막 대조 시각 (0: 대조 전)
+        self._reconcile_due = 0.0  # 체결 후 대조 예정 시각
+        self._retry_at = 0.0  # 대조 실패 후 다시 시도할 시각
+        self._lock = threading.RLock()
+        self.stats = {'reads': 0, 'reconciles': 0, 'fills': 0, 'drifts': 0, 'failures': 0}
+
+    # ------------------------------------------------------------------
+    # 대조
+    # ------------------------------------------------------------------
+    @property
+    def synced(self):
+        """한 번이라도 대조에 성공했는지 (대조 전 원장은 잔고를 모르므로 읽으면 안 됨)"""
+        return bool(self.synced_at)
+
+    def needs_reconcile(self, now=None):
+        now = now or time.time()
+        if now < self._retry_at:
+            return False
+        return (not self.synced_at or now - self.synced_at >= self.reconcile_seconds
+                or (self._reconcile_due and now >= self._reconcile_due))
+
+    def ensure_fresh(self, fetch_accounts):
+        """대조 시점이 되었으면 계좌 조회로 원장을 맞춤 (같은 사용자의 동시 요청은 한 번만 조회)"""
+        with self._lock:
+            self.stats['reads'] += 1
+            if self.needs_reconcile():
+                self.reconcile(fetch_accounts)
+
+    def reconcile(self, fetch_accounts):
+        """업비트 계좌 목록으로 원장 갱신, 원장 추정치와 다르면 불일치로 기록"""
+        with self._lock:
+            try:
+                accounts = fetch_accounts()
+            except Exception as e:
+                accounts = None
+                self.logger.error(f"계좌 조회 실패 (사용자: {self.user_id}): {e}")
+
+            if not isinstance(accounts, list):
+                self.stats['failures'] += 1
+                # 계속 실패해도 매 조회마다 재시도하지 않도록 다음 주기로 미룸
+                # (대조 전이면 synced_at은 그대로 두어 호출 측이 직접 잔고 조회로 대체)
+                self._retry_at = time.time() + self.reconcile_seconds
+                self._reconcile_due = 0.0
+                return False
+
+            cash = 0.0
+            actual = {}
+            for account in accounts:
+                currency = account.get('currency')
+                if currency == 'KRW':
+                    cash = _to_float(account.get('balance'))
+                    continue
+                quantity = _to_float(account.get('balance'))
+                if quantity <= 0:
+                    continue
+                ticker = f"{account.get('unit_currency') or 'KRW'}-{currency}"
+                actual[ticker] = (quantity, _to_float(account.get('avg_buy_price')))
+
+            if self.synced_at:
+                self._check_drift(cash, actual)
+
+            now = datetime.now().isoformat(timespec='seconds')
+            positions = {}
+            for ticker, (quantity, avg_price) in actual.items():
+                position = self.positions.get(ticker) or {'realized_pnl': 0.0, 'opened_at': now}
+                positions[ticker] = dict(position, quantity=quantity, avg_price=avg_price, updated_at=now)
+
+            self.cash = cash
+            self.positions = positions
+            self.synced_at = time.time()
+            self._reconcile_due = 0.0
+            self._retry_at = 0.0
+            self.stats['reconciles'] += 1
+            return True
+
+    def _check_drift(self, cash, actual):
+        """원장 추정치와 실제 계좌 비교 (외부 입출금/수동 거래/체결가 차이)"""
+        drifted = []
+        if abs(cash - self.cash) > max(1.0, abs(cash) * DRIFT_TOLERANCE):
+            drifted.append(f"현금 {self.cash:,.0f} → {cash:,.0f}")
+        for ticker in set(actual) | set(self.positions):
+            expected = self.positions.get(ticker, {}).get('quantity', 0.0)
+            quantity = actual.get(ticker, (0.0, 0.0))[0]
+            if abs(quantity - expected) > max(1e-8, abs(quantity) * DRIFT_TOLERANCE):
+                drifted.append(f"{ticker} {expected:.8f} → {quantity:.8f}")
+
+        if drifted:
+            self.stats['drifts'] += 1
+            self.logger.info(f"원장 대조 차이 (사용자: {self.user_id}): {', '.join(drifted)}")
+
+    def mark_drift(self, reason=None):
+        """주문 거절 등 원장이 어긋났을 가능성이 있으면 다음 조회 때 대조"""
+        with self._lock:
+            self._reconcile_due = time.time()
+        if reason:
+            self.logger.info(f"원장 대조 예약 (사용자: {self.user_id}): {reason}")
+
+    # ------------------------------------------------------------------
+    # 체결 반영
+    # ------------------------------------------------------------------
+    def _schedule_fill_reconcile(self):
+        due = time.time() + self.fill_reconcile_seconds
+        self._reconcile_due = min(self._reconcile_due, due) if self._reconcile_due else due
+
+    def record_buy(self, ticker, amount, price):
+        """시장가 매수 체결 반영 (amount원 매수, 수수료 별도 차감)"""
+        if not amount or not price:
+            self.mark_drift(f"{ticker} 매수 체결가를 알 수 없음")
+            return
+
+        ticker = normalize_ticker(ticker)
+        quantity = amount / price
+        now = datetime.now().isoformat(timespec='seconds')
+        with self._lock:
+            position = self.positions.get(ticker)
+            if position is None:
+                position = {'quantity': 0.0, 'avg_price': 0.0, 'realized_pnl': 0.0, 'opened_at': now}
+                self.positions[ticker] = position
+
+            total = position['quantity'] + quantity
+            position['avg_price'] = (position['quantity'] * position['avg_price'] + amount) / total
+            position['quantity'] = total
+            position['updated_at'] = now
+            self.cash -= amount * (1 + FEE_RATE)
+            self.stats['fills'] += 1
+            self._schedule_fill_reconcile()
+
+    def record_sell(self, ticker, volume, price):
+        """시장가 매도 체결 반영 (volume 수량 매도)"""
+        ticker = normalize_ticker(ticker)
+        if not volume or not price:
+            self.mark_drift(f"{ticker} 매도 체결가를 알 수 없음")
+            return
+
+        with self._lock:
+            position = self.positions.get(ticker)
+            if position is None:
+                self.mark_drift(f"{ticker} 원장에 없는 포지션 매도")
+                return
+
+            volume = min(volume, position['quantity'])
+            proceeds = volume * price
+            fee = proceeds * FEE_RATE
+            pnl = (price - position['avg_price']) * volume - fee
+
+            position['quantity'] -= volume
+            position['realized_pnl'] += pnl
+            position['updated_at'] = datetime.now().isoformat(timespec='seconds')
+            self.realized_pnl[ticker] = self.realized_pnl.get(ticker, 0.0) + pnl
+            self.cash += proceeds - fee
+            if position['quantity'] <= 1e-12:
+                del self.positions[ticker]
+            self.stats['fills'] += 1
+            self._schedule_fill_reconcile()
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    def get_quantity(self, ticker):
+        position = self.positions.get(normalize_ticker(ticker))
+        return position['quantity'] if position else 0.0
+
+    def get_avg_price(self, ticker):
+        position = self.positions.get(normalize_ticker(ticker))
+        return position['avg_price'] if position else 0.0
+
+    def unrealized_pnl(self, ticker, price):
+        """평가 손익 (원, 수익률%)"""
+        position = self.positions.get(normalize_ticker(ticker))
+        if not position or not price or not position['avg_price']:
+            return 0.0, 0.0
+        pnl = (price - position['avg_price']) * position['quantity']
+        return pnl, (price - position['avg_price']) / position['avg_price'] * 100
+
+    def accounts(self):
+        """업비트 get_balances 형식의 계좌 목록 (기존 계좌 조회 코드 대체용)"""
+        with self._lock:
+            accounts = [{'currency': 'KRW', 'balance': self.cash, 'avg_buy_price': 0.0, 'unit_currency': 'KRW'}]
+            for ticker, position in self.positions.items():
+                unit, currency = ticker.split('-', 1)
+                accounts.append({'currency': currency, 'balance': position['quantity'],
+                                 'avg_buy_price': position['avg_price'], 'unit_currency': unit})
+            return accounts
+
+    def snapshot(self):
+        """현재 원장 (대시보드/MCP용, 트레일링 스톱 최고가 포함)"""
+        with self._lock:
+            positions = {}
+            for ticker, position in self.positions.items():
+                positions[ticker] = dict(position, peak=high_water_marks.get_peak(position_key(self.user_id, ticker)))
+            return {
+                'user_id': self.user_id,
+                'cash': self.cash,
+                'positions': positions,
+                'realized_pnl': dict(self.realized_pnl),
+                'synced_at': datetime.fromtimestamp(self.synced_at).isoformat(timespec='seconds') if self.synced_at else None,
+                'stats': dict(self.stats),
+            }
+
+
+class LedgerRegistry:
+    """사용자별 원장 모음 및 스냅샷 파일 저장"""
+
+    def __init__(self, path=None, save_interval=None):
+        self.path = path or Config.LEDGER_SNAPSHOT_PATH
+        self.save_interval = save_interval if save_interval is not None else Config.LEDGER_SAVE_SECONDS
+        self.logger = logging.getLogger(__name__)
+
+        self._ledgers = {}  # {user_id: PositionLedger}
+        self._lock = threading.Lock()
+        self._last_save = 0.0
+
+    def get(self, user_id):
+        with self._lock:
+            if user_id not in self._ledgers:
+                self._ledgers[user_id] = PositionLedger(user_id)
+            return self._ledgers[user_id]
+
+    def release(self, user_id):
+        """이 프로세스에서 더 이상 거래하지 않는 사용자 원장 제거 (다른 샤드로 옮겨 간 원장을 덮어쓰지 않도록)"""
+        with self._lock:
+            return self._ledgers.pop(user_id, None) is not None
+
+    def save(self, force=False):
+        """전체 원장 스냅샷 저장 (다른 프로세스 조회용, save_interval 간격)"""
+        now = time.time()
+        with self._lock:
+            if not self._ledgers or (not force and now - self._last_save < self.save_interval):
+                return
+            self._last_save = now
+            ledgers = list(self._ledgers.values())
+
+        payload = {str(ledger.user_id): ledger.snapshot() for ledger in ledgers}
+        try:
+            merge_json(self.path, payload)
+        except OSError as e:
+            self.logger.warning(f"원장 스냅샷 저장 실패 ({self.path}): {e}")
+
+    def get_stats(self):
+        with self._lock:
+            ledgers = list(self._ledgers.values())
+        totals = {'users': len(ledgers), 'reads': 0, 'reconciles': 0, 'fills': 0, 'drifts': 0, 'failures': 0}
+        for ledger in ledgers:
+            for key, value in ledger.stats.items():
+                totals[key] += value
+        return totals
+
+
+def load_ledger_snapshot(user_id, path=None):
+    """저장된 원장 스냅샷 조회 (웹 앱 밖의 프로세스용, 없으면 None)"""
+    path = path or Config.LEDGER_SNAPSHOT_PATH
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f).get(str(user_id))
+    except (OSError, ValueError):
+        return None
+
+
+# 글로벌 원장 모음 (종료 시 스냅샷 저장)
+position_ledgers = LedgerRegistry()
+atexit.register(position_ledgers.save, True)
@@ -0,0 +1,282 @@
+"""거래 사이클 데이터 선조회
+
+전략은 get_data_requirements()로 한 사이클에 필요한 (endpoint, interval, count) 목록을 공개합니다.
+봇은 신호 계산 전에 목록을 합쳐 한 번에 동시 조회하고, 사이클이 끝날 때까지 UpbitAPI의 시세 조회가
+그 결과(CycleSnapshot)에서 처리되도록 합니다. 목록에 없던 조회도 스냅샷에 저장되어 같은 사이클에서
+다시 조회되지 않습니다 (예: 매수 지연 판단에서 호가를 두 번 조회하던 경로).
+거래 엔진은 틱마다 티커별로 시세를 한 번 조회해 게시하고(publish_tick_snapshot), 같은 틱에 실행되는
+봇들은 게시된 시세를 복사해 사용하므로 같은 티커의 봇이 여러 개여도 시세 조회는 한 번입니다.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from app.utils.scheduler_metrics import count_api_calls
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# 선조회 가능한 endpoint → UpbitAPI 메서드
+PREFETCHABLE_ENDPOINTS = {
+    'ohlcv': 'get_ohlcv_data',
+    'candles': 'get_candles_from_ticker',
+    'current_price': 'get_current_price',
+    'orderbook': 'get_orderbook',
+    'balance_cash': 'get_balance_cash',
+    'balance_coin': 'get_balance_coin',
+    'buy_avg': 'get_buy_avg',
+}
+
+# 사이클 동안 스냅샷에서 재사용하는 시세 데이터 (잔고는 주문 후 바뀌므로 기존 TTL 캐시만 데워 둡니다)
+SNAPSHOT_ENDPOINTS = ('ohlcv', 'candles', 'current_price', 'orderbook')
+
+_executor = ThreadPoolExecutor(max_workers=Config.PREFETCH_MAX_WORKERS, thread_name_prefix='Prefetch')
+
+# 거래 엔진 틱에서 티커별로 한 번 조회한 시세 {티커: (CycleSnapshot, 게시 시각)}
+_tick_snapshots = {}
+
+
+def merge_requirements(*groups):
+    """요구 목록 병합 - 같은 (endpoint, interval)은 가장 큰 count 하나로 합칩니다."""
+    merged = {}
+    for group in groups:
+        for endpoint, interval, count in group or ():
+            if endpoint not in PREFETCHABLE_ENDPOINTS:
+                raise ValueError(f"선조회할 수 없는 endpoint입니다: {endpoint}")
+            key = (endpoint, interval)
+            if key not in merged or (count or 0) > (merged[key] or 0):
+                merged[key] = count
+    return [(endpoint, interval, count) for (endpoint, interval), count in merged.items()]
+
+
+def _rows(value):
+    """조회 데이터 크기 (캔들 행 수 / 호가 단위 수 / 단일 값 1)"""
+    if value is None:
+        return 0
+    if isinstance(value, dict):
+        return len(value.get('orderbook_units', [])) or 1
+    if hasattr(value, '__len__'):
+        return len(value)
+    return 1
+
+
+class CycleSnapshot:
+    """한 거래 사이클 동안 재사용하는 시세 데이터"""
+
+    def __init__(self, ticker):
+        self.ticker = ticker
+        self._data = {}
+        self._lock = threading.Lock()
+
+        self.requests = 0  # 선조회 요청 수
+        self.rows = 0  # 조회한 캔들 행/호가 단위 합계
+        self.hits = 0  # 스냅샷에서 처리된 조회
+        self.misses = 0  # 목록에 없어 사이클 중 추가로 조회한 횟수
+        self.shared = 0  # 엔진 틱 시세에서 복사해 조회하지 않은 요청 수
+        self.failures = 0
+        self.elapsed = 0.0
+
+    def store(self, endpoint, ticker, interval, count, value):
+        with self._lock:
+            self._data[(endpoint, ticker, interval)] = (count, value)
+
+    def clear(self):
+        """주문 후 시세 데이터 폐기 (통계는 유지)"""
+        with self._lock:
+            self._data.clear()
+
+    def lookup(self, endpoint, ticker, interval=None, count=None):
+        """(찾음 여부, 값) - 캔들은 더 많이 조회해 둔 결과에서 최근 count개를 잘라 반환"""
+        with self._lock:
+            entry = self._data.get((endpoint, ticker, interval))
+        if entry is None:
+            return False, None
+
+        stored_count, value = entry
+        if endpoint == 'ohlcv':
+            if count is None or stored_count is None or count > stored_count:
+                return False, None
+            # 전략이 컬럼을 추가하는 경우가 있어 복사본 반환
+            return True, value.iloc[-count:].copy()
+        if endpoint == 'candles':
+            if count is None or stored_count is None or count > stored_count:
+                return False, None
+            return True, value[:count]  # 최신 캔들이 먼저 오는 목록
+        return True, value
+
+    def get_or_fetch(self, endpoint, ticker, interval, count, fetch):
+        found, value = self.lookup(endpoint, ticker, interval, count)
+        if found:
+            with self._lock:
+                self.hits += 1
+            return value
+
+        value = fetch()
+        with self._lock:
+            self.misses += 1
+            self.rows += _rows(value)
+        if value is not None:
+            self.store(endpoint, ticker, interval, count, value)
+        return value
+
+    def get_stats(self):
+        return {
+            'ticker': self.ticker,
+            'requests': self.requests,
+            'rows': self.rows,
+            'hits': self.hits,
+            'misses': self.misses,
+            'shared': self.shared,
+            'failures': self.failures,
+            'elapsed_ms': round(self.elapsed * 1000, 1),
+        }
+
+
+class PrefetchStats:
+    """선조회 누적 통계 (모니터링 API용)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.cycles = 0
+        self.requests = 0
+        self.rows = 0
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.failures = 0
+        self.elapsed = 0.0
+
+    def record(self, snapshot):
+        with self._lock:
+            self.cycles += 1
+            self.requests += snapshot.requests
+            self.rows += snapshot.rows
+            self.hits += snapshot.hits
+            self.misses += snapshot.misses
+            self.shared += snapshot.shared
+            self.failures += snapshot.failures
+            self.elapsed += snapshot.elapsed
+
+    def get_stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': Config.PREFETCH_ENABLED,
+                'cycles': self.cycles,
+                'requests': self.requests,
+                'rows': self.rows,
+                'avg_requests_per_cycle': round(self.requests / self.cycles, 2) if self.cycles else 0,
+                'avg_rows_per_cycle': round(self.rows / self.cycles, 1) if self.cycles else 0,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else 0,
+                'shared': self.shared,
+                'failures': self.failures,
+                'avg_elapsed_ms': round(self.elapsed / self.cycles * 1000, 1) if self.cycles else 0,
+            }
+
+
+# 글로벌 선조회 통계
+prefetch_stats = PrefetchStats()
+
+
+def publish_tick_snapshot(snapshot):
+    """엔진 틱에서 조회한 티커 시세 게시 (같은 틱의 봇 선조회가 복사해 사용)"""
+    _tick_snapshots[snapshot.ticker] = (snapshot, time.time())
+
+
+def clear_tick_snapshots():
+    _tick_snapshots.clear()
+
+
+def _shared_snapshot(ticker):
+    """게시된 틱 시세 (다음 틱까지만 유효)"""
+    entry = _tick_snapshots.get(ticker)
+    if entry is None or time.time() - entry[1] > Config.ENGINE_TICK_SECONDS * 2:
+        return None
+    return entry[0]
+
+
+def _fetch(api, ticker, requirement):
+    endpoint, interval, count = requirement
+    method = getattr(api, PREFETCHABLE_ENDPOINTS[endpoint])
+    if endpoint == 'balance_cash':
+        return method()
+    if endpoint in ('ohlcv', 'candles'):
+        return method(ticker, interval, count)
+    return method(ticker)
+
+
+def prefetch(api, ticker, requirements, log=None):
+    """요구 목록을 동시에 조회하여 CycleSnapshot 생성"""
+    log = log or logger
+    snapshot = CycleSnapshot(ticker)
+    requirements = merge_requirements(requirements)
+    started = time.time()
+
+    shared = _shared_snapshot(ticker)
+    if shared is not None:
+        # 엔진 틱에서 이미 조회한 시세는 복사만 하고 나머지만 조회
+        pending = []
+        for requirement in requirements:
+            endpoint, interval, count = requirement
+            if endpoint in SNAPSHOT_ENDPOINTS:
+                found, value = shared.lookup(endpoint, ticker, interval, count)
+                if found:
+                    snapshot.store(endpoint, ticker, interval, count, value)
+                    snapshot.shared += 1
+                    continue
+            pending.append(requirement)
+        requirements = pending
+
+    futures = {requirement: _executor.submit(_fetch, api, ticker, requirement) for requirement in requirements}
+    for requirement, future in futures.items():
+        endpoint, interval, count = requirement
+        snapshot.requests += 1
+        try:
+            value = future.result(timeout=Config.PREFETCH_TIMEOUT)
+        except FutureTimeoutError:
+            log.warning(f"데이터 선조회 시간 초과: {requirement}")
+            snapshot.failures += 1
+            continue
+        except Exception as e:
+            log.warning(f"데이터 선조회 실패 ({requirement}): {str(e)}")
+            snapshot.failures += 1
+            continue
+
+        snapshot.rows += _rows(value)
+        if endpoint in SNAPSHOT_ENDPOINTS and value is not None:
+            snapshot.store(endpoint, ticker, interval, count, value)
+
+    snapshot.elapsed = time.time() - started
+    return snapshot
+
+
+def begin_cycle(api, ticker, requirements, log=None):
+    """사이클 시작 - 선조회 후 티커의 API 시세 조회가 스냅샷을 사용하도록 설정"""
+    if not Config.PREFETCH_ENABLED or not requirements or not hasattr(api, 'activate_snapshot'):
+        return None
+
+    snapshot = prefetch(api, ticker, requirements, log)
+    count_api_calls(snapshot.requests)  # 작업 스레드에서 조회하므로 사이클 지표에 직접 반영
+    api.activate_snapshot(snapshot)
+    return snapshot
+
+
+def end_cycle(api, ticker, log=None):
+    """사이클 종료 - 스냅샷 해제, 사이클 조회량 로그 및 누적 통계 기록"""
+    if not hasattr(api, 'deactivate_snapshot'):
+        return None
+
+    snapshot = api.deactivate_snapshot(ticker)
+    if snapshot is None:
+        return None
+
+    prefetch_stats.record(snapshot)
+    stats = snapshot.get_stats()
+    (log or logger).info(
+        f"사이클 데이터 조회 ({snapshot.ticker}): 선조회 {stats['requests']}건 {stats['elapsed_ms']}ms, "
+        f"조회량 {stats['rows']}행, 재사용 {stats['hits']}회, 추가 조회 {stats['misses']}회, 틱 공유 {stats['shared']}건"
+    )
+    return stats
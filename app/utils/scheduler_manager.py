@@ -1,13 +1,31 @@
 """
 APScheduler를 이용한 트레이딩 봇 스케줄링 관리
+
+SCHEDULER_BACKEND가 'engine'이면 interval 모드 봇은 개별 작업 대신 거래 엔진(app.utils.trading_engine)의
+틱에서 일괄 실행됩니다. 캔들 마감 모드는 캔들 마감 시각에 맞춘 cron 작업을 그대로 사용합니다.
+
+PHASE_PLAN_ENABLED이면 작업의 첫 실행 시각을 실행 위상 배정(app.utils.phase_planner)으로 정해
+함께 시작한 봇들이 같은 초에 몰리지 않도록 하고, 작업 추가/제거 후 PHASE_REPLAN_DELAY초 뒤 위상을 재배치합니다.
 """
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.jobstores.memory import MemoryJobStore
 from apscheduler.executors.pool import ThreadPoolExecutor
-from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_ERROR
+from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_ERROR, EVENT_JOB_MISSED, EVENT_JOB_MAX_INSTANCES
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 import logging
 import threading
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
+from app.utils.fair_share import fair_share
+from app.utils.market_data import candle_close_cron_fields
+from app.utils.phase_planner import next_phase_time, phase_planner
+from app.utils.scheduler_metrics import scheduler_metrics
+from app.utils.trading_engine import trading_engine
+from config import Config
+
+# 실행 위상 재배치 작업 ID
+PHASE_REPLAN_JOB_ID = 'phase_replan'
 
 
 class TradingSchedulerManager:
@@ -16,9 +34,10 @@ class TradingSchedulerManager:
     def __init__(self):
         self.scheduler = None
         self.active_jobs = {}  # {job_id: job_info}
-        self.lock = threading.Lock()
+        self.lock = threading.RLock()
         self.logger = logging.getLogger(__name__)
         self._is_started = False
+        self.misfires = {}  # {job_id: 실행하지 못하고 건너뛴 횟수}
         self._setup_scheduler()
 
     def _setup_scheduler(self):
@@ -46,21 +65,35 @@ class TradingSchedulerManager:
 
         # 이벤트 리스너 추가
         self.scheduler.add_listener(self._job_listener, EVENT_JOB_EXECUTED | EVENT_JOB_ERROR)
+        self.scheduler.add_listener(self._misfire_listener, EVENT_JOB_MISSED | EVENT_JOB_MAX_INSTANCES)
 
     def _job_listener(self, event):
         """작업 실행 이벤트 리스너"""
+        scheduler_metrics.observe_scheduled_run(event.job_id, event.scheduled_run_time)
         if event.exception:
             self.logger.error(f"Job {event.job_id} crashed: {event.exception}")
         else:
             self.logger.info(f"Job {event.job_id} executed successfully")
-            # 작업 실행 정보 업데이트
-            with self.lock:
-                if event.job_id in self.active_jobs:
-                    self.active_jobs[event.job_id]['last_run'] = datetime.now()
-                    if 'run_count' not in self.active_jobs[event.job_id]:
-                        self.active_jobs[event.job_id]['run_count'] = 0
-                    self.active_jobs[event.job_id]['run_count'] += 1
-                    self.logger.info(f"Job {event.job_id} run count: {self.active_jobs[event.job_id]['run_count']}")
+            self._record_run(event.job_id)
+
+    def _record_run(self, job_id):
+        """작업 실행 정보 업데이트"""
+        with self.lock:
+            if job_id in self.active_jobs:
+                self.active_jobs[job_id]['last_run'] = datetime.now()
+                if 'run_count' not in self.active_jobs[job_id]:
+                    self.active_jobs[job_id]['run_count'] = 0
+                self.active_jobs[job_id]['run_count'] += 1
+                self.logger.info(f"Job {job_id} run count: {self.active_jobs[job_id]['run_count']}")
+
+    def _misfire_listener(self, event):
+        """실행 시각을 놓쳤거나 이전 실행이 끝나지 않아 건너뛴 작업 보고 (기존에는 조용히 건너뜀)"""
+        with self.lock:
+            self.misfires[event.job_id] = self.misfires.get(event.job_id, 0) + 1
+            count = self.misfires[event.job_id]
+        scheduler_metrics.record_misfire(event.job_id)
+        reason = '이전 실행 미완료' if event.code == EVENT_JOB_MAX_INSTANCES else '실행 시각 초과'
+        self.logger.warning(f"Job {event.job_id} 실행 건너뜀 ({reason}, 누적 {count}회)")
 
     def is_started(self):
         """스케줄러가 시작되었는지 확인"""
@@ -87,8 +120,18 @@ class TradingSchedulerManager:
             except Exception as e:
                 self.logger.error(f"스케줄러 종료 실패: {e}")
 
-    def add_trading_job(self, job_id, trading_func, interval_seconds, user_id, ticker, strategy):
-        """트레이딩 작업 추가"""
+    def add_trading_job(self, job_id, trading_func, interval_seconds, user_id, ticker, strategy,
+                        trigger_mode=None, candle_interval=None, exit_check_func=None, base_interval=None,
+                        bot=None):
+        """트레이딩 작업 추가
+
+        Args:
+            trigger_mode (str): 'interval' (sleep_time 주기 실행) 또는 'candle_close' (캔들 마감 직후 신호 평가)
+            candle_interval (str): 'candle_close' 모드에서 사용할 봇의 캔들 간격 (예: 'minute15')
+            exit_check_func (callable): 'candle_close' 모드에서 캔들 사이에 interval_seconds 주기로 실행할 손절/익절 체크
+            base_interval (int): 변동성 기반 간격 조정의 기준 간격 (기본값: interval_seconds)
+            bot: 거래 엔진 틱 선조회에 사용할 봇 (engine 백엔드의 interval 모드)
+        """
         with self.lock:
             try:
                 # 스케줄러가 시작되지 않았으면 시작
@@ -105,15 +148,70 @@ class TradingSchedulerManager:
                 except (ValueError, TypeError):
                     interval_seconds = 30  # 기본값
 
-                # 새 작업 추가
-                job = self.scheduler.add_job(
-                    func=trading_func,
-                    trigger='interval',
-                    seconds=interval_seconds,
-                    id=job_id,
-                    replace_existing=True,
-                    next_run_time=datetime.now()
-                )
+                trigger_mode = trigger_mode or Config.SCHEDULER_TRIGGER_MODE
+                cron_fields = None
+                if trigger_mode == 'candle_close':
+                    cron_fields = candle_close_cron_fields(candle_interval)
+                    if cron_fields is None:
+                        self.logger.warning(f"캔들 마감 스케줄을 지원하지 않는 간격({candle_interval})이므로 interval 모드로 실행: {job_id}")
+                        trigger_mode = 'interval'
+                    elif exit_check_func is None:
+                        # 캔들 사이에 손절/익절을 체크할 수 없으면 청산이 한 캔들만큼 늦어지므로 interval 모드로 실행
+                        self.logger.warning(f"캔들 간 손절/익절 체크를 지원하지 않는 전략({strategy})이므로 interval 모드로 실행: {job_id}")
+                        cron_fields = None
+                        trigger_mode = 'interval'
+
+                # 사이클 단계별 소요 시간/API 호출 수 측정 (scheduler_metrics)
+                trading_func = scheduler_metrics.instrument(job_id, trading_func)
+                # 개별 interval 작업은 사용자 동시 실행 상한을 넘으면 이번 실행을 건너뜀 (거래 엔진은 틱에서 공정 분배)
+                # 캔들 마감 작업은 건너뛰면 다음 캔들까지 신호를 놓치므로 상한을 적용하지 않음
+                limited_func = (fair_share.limit(user_id, trading_func)
+                                if Config.FAIR_SHARE_ENABLED and trigger_mode != 'candle_close' else trading_func)
+
+                # 첫 실행 시각 (위상 배정을 사용하지 않으면 바로 실행)
+                first_due = phase_planner.place(job_id, interval_seconds) if Config.PHASE_PLAN_ENABLED else None
+                first_run = datetime.fromtimestamp(first_due) if first_due else datetime.now()
+
+                exit_job_id = None
+                backend = 'apscheduler'
+                if trigger_mode == 'candle_close':
+                    # 캔들 마감 직후 신호 평가 (시작 시 첫 실행 시각에 1회 실행)
+                    job = self.scheduler.add_job(
+                        func=limited_func,
+                        trigger=CronTrigger(second=Config.CANDLE_CLOSE_DELAY_SECONDS, **cron_fields),
+                        id=job_id,
+                        replace_existing=True,
+                        next_run_time=first_run
+                    )
+
+                    # 캔들 사이에는 가격 기반 손절/익절 체크만 실행
+                    if exit_check_func is not None:
+                        exit_job_id = f"{job_id}_exit"
+                        self.scheduler.add_job(
+                            func=scheduler_metrics.instrument(exit_job_id, exit_check_func),
+                            trigger='interval',
+                            seconds=interval_seconds,
+                            id=exit_job_id,
+                            replace_existing=True,
+                            next_run_time=first_run + timedelta(seconds=interval_seconds)
+                        )
+                elif Config.SCHEDULER_BACKEND == 'engine':
+                    # 거래 엔진 틱에서 다른 봇들과 함께 실행
+                    backend = 'engine'
+                    job = None
+                    trading_engine.start(self.scheduler)
+                    trading_engine.register(job_id, trading_func, interval_seconds, ticker, user_id=user_id, bot=bot,
+                                            on_complete=lambda: self._record_run(job_id), first_due=first_due)
+                else:
+                    # 새 작업 추가
+                    job = self.scheduler.add_job(
+                        func=limited_func,
+                        trigger='interval',
+                        seconds=interval_seconds,
+                        id=job_id,
+                        replace_existing=True,
+                        next_run_time=first_run
+                    )
 
                 # 작업 정보 저장
                 self.active_jobs[job_id] = {
@@ -122,30 +220,60 @@ class TradingSchedulerManager:
                     'ticker': ticker,
                     'strategy': strategy,
                     'interval': interval_seconds,
+                    'base_interval': int(base_interval or interval_seconds),
+                    'trigger_mode': trigger_mode,
+                    'backend': backend,
+                    'candle_interval': candle_interval,
+                    'exit_job_id': exit_job_id,
                     'created_at': datetime.now(),
                     'last_run': None,
                     'run_count': 0
                 }
+                self._schedule_replan()
 
-                self.logger.info(f"트레이딩 작업 추가: {job_id} (간격: {interval_seconds}초)")
+                if trigger_mode == 'candle_close':
+                    self.logger.info(f"트레이딩 작업 추가: {job_id} (캔들 마감 모드: {candle_interval}, 손절/익절 체크 간격: {interval_seconds}초)")
+                else:
+                    self.logger.info(f"트레이딩 작업 추가: {job_id} (간격: {interval_seconds}초)")
 
                 # 다음 실행 시간 로깅
-                next_run = job.next_run_time
+                next_run = job.next_run_time if job is not None else trading_engine.next_run_time(job_id)
                 self.logger.info(f"다음 실행 시간: {next_run}")
 
                 return True
 
             except Exception as e:
+                phase_planner.remove(job_id)
                 self.logger.error(f"트레이딩 작업 추가 실패: {e}")
                 return False
 
+    def _companion_job_ids(self, job_id):
+        """작업과 함께 관리되는 보조 작업 ID 목록 (캔들 마감 모드의 손절/익절 체크 작업)"""
+        job_info = self.active_jobs.get(job_id) or {}
+        exit_job_id = job_info.get('exit_job_id')
+        return [exit_job_id] if exit_job_id else []
+
+    def _is_engine_job(self, job_id):
+        return (self.active_jobs.get(job_id) or {}).get('backend') == 'engine'
+
     def remove_job(self, job_id):
         """작업 제거"""
         with self.lock:
             try:
                 if job_id in self.active_jobs:
-                    self.scheduler.remove_job(job_id)
+                    for companion_id in self._companion_job_ids(job_id):
+                        if self.scheduler.get_job(companion_id):
+                            self.scheduler.remove_job(companion_id)
+                    if self.active_jobs[job_id].get('backend') == 'engine':
+                        trading_engine.unregister(job_id)
+                    else:
+                        self.scheduler.remove_job(job_id)
+                    for metrics_job_id in [job_id] + self._companion_job_ids(job_id):
+                        scheduler_metrics.remove_job(metrics_job_id)
                     del self.active_jobs[job_id]
+                    self.misfires.pop(job_id, None)
+                    phase_planner.remove(job_id)
+                    self._schedule_replan()
                     self.logger.info(f"트레이딩 작업 제거: {job_id}")
                     return True
                 return False
@@ -169,10 +297,108 @@ class TradingSchedulerManager:
             return {job_id: info for job_id, info in self.active_jobs.items()
                     if info['user_id'] == user_id}
 
+    def reschedule_job(self, job_id, interval_seconds):
+        """작업 실행 간격 변경 (캔들 마감 모드는 캔들 사이 손절/익절 체크 간격)"""
+        with self.lock:
+            try:
+                job_info = self.active_jobs.get(job_id)
+                if job_info is None:
+                    return False
+
+                if job_info.get('trigger_mode') == 'candle_close':
+                    target_id = job_info.get('exit_job_id')
+                    if target_id is None:
+                        return False
+                elif job_info.get('backend') == 'engine':
+                    # 엔진은 예정된 다음 실행을 간격 차이만큼 옮기고, 그 시각 이후 첫 새 위상 시각에 실행
+                    if not trading_engine.reschedule(job_id, interval_seconds):
+                        return False
+                    if Config.PHASE_PLAN_ENABLED:
+                        phase_planner.place(job_id, interval_seconds)
+                        next_run = trading_engine.next_run_time(job_id)
+                        trading_engine.move(job_id, next_phase_time(int(interval_seconds), phase_planner.phase(job_id),
+                                                                    next_run.timestamp()))
+                    job_info['interval'] = int(interval_seconds)
+                    return True
+                else:
+                    target_id = job_id
+
+                job = self.scheduler.get_job(target_id)
+                if job is None:
+                    return False
+                interval = int(interval_seconds)
+                if job.next_run_time is not None:
+                    # 예정된 다음 실행을 간격 차이만큼 옮긴 시각 기준 (지금부터 다시 세면 실행이 밀리거나 당겨짐)
+                    anchor = job.next_run_time.timestamp() + interval - job_info['interval']
+                else:
+                    anchor = time.time() + interval  # 일시 정지된 작업은 재개 시 이 시각 기준으로 이어짐
+                if Config.PHASE_PLAN_ENABLED:
+                    phase_planner.place(job_id, interval)
+                    anchor = next_phase_time(interval, phase_planner.phase(job_id), anchor)
+
+                trigger = IntervalTrigger(seconds=interval, start_date=datetime.fromtimestamp(anchor))
+                if job.next_run_time is None:
+                    job.modify(trigger=trigger)  # 일시 정지 상태 유지
+                else:
+                    self.scheduler.reschedule_job(target_id, trigger=trigger)
+                job_info['interval'] = interval
+                return True
+            except Exception as e:
+                self.logger.error(f"작업 간격 변경 실패 ({job_id}): {e}")
+                return False
+
+    def _schedule_replan(self):
+        """PHASE_REPLAN_DELAY초 뒤 실행 위상 재배치 (연달아 추가/제거되면 마지막 변경 기준으로 한 번만 실행)"""
+        if not Config.PHASE_PLAN_ENABLED or not self.is_started():
+            return
+        self.scheduler.add_job(
+            func=self.replan_phases,
+            trigger='date',
+            run_date=datetime.now() + timedelta(seconds=Config.PHASE_REPLAN_DELAY),
+            id=PHASE_REPLAN_JOB_ID,
+            replace_existing=True
+        )
+
+    def replan_phases(self):
+        """측정된 사이클당 API 호출 수로 실행 위상 재배치 후 옮겨진 작업의 다음 실행 시각 변경
+
+        옮겨진 작업은 예정된 다음 실행 이후 첫 새 위상 시각에 실행되므로 실행이 한 번 늦어질 수는 있어도 추가로 실행되지는 않습니다.
+        """
+        with self.lock:
+            try:
+                costs = {job_id: scheduler_metrics.job_api_calls(job_id) for job_id in self.active_jobs}
+                moved = phase_planner.replan({job_id: cost for job_id, cost in costs.items() if cost is not None})
+                for job_id, phase in moved.items():
+                    job_info = self.active_jobs.get(job_id)
+                    if job_info is None:
+                        continue
+                    interval = job_info['interval']
+                    if job_info.get('backend') == 'engine':
+                        next_run = trading_engine.next_run_time(job_id)
+                        if next_run is not None:
+                            trading_engine.move(job_id, next_phase_time(interval, phase, next_run.timestamp()))
+                        continue
+
+                    target_id = job_info.get('exit_job_id') if job_info.get('trigger_mode') == 'candle_close' else job_id
+                    job = self.scheduler.get_job(target_id) if target_id else None
+                    if job is None or job.next_run_time is None:
+                        continue  # 일시 정지된 작업은 재개 후 기존 위상 유지
+                    next_due = next_phase_time(interval, phase, job.next_run_time.timestamp())
+                    job.modify(next_run_time=datetime.fromtimestamp(next_due, tz=job.next_run_time.tzinfo))
+                return len(moved)
+            except Exception as e:
+                self.logger.error(f"실행 위상 재배치 실패: {e}")
+                return 0
+
     def pause_job(self, job_id):
         """작업 일시 정지"""
         try:
-            self.scheduler.pause_job(job_id)
+            for companion_id in self._companion_job_ids(job_id):
+                self.scheduler.pause_job(companion_id)
+            if self._is_engine_job(job_id):
+                trading_engine.pause(job_id)
+            else:
+                self.scheduler.pause_job(job_id)
             self.logger.info(f"작업 일시 정지: {job_id}")
             return True
         except Exception as e:
@@ -182,7 +408,12 @@ class TradingSchedulerManager:
     def resume_job(self, job_id):
         """작업 재개"""
         try:
-            self.scheduler.resume_job(job_id)
+            for companion_id in self._companion_job_ids(job_id):
+                self.scheduler.resume_job(companion_id)
+            if self._is_engine_job(job_id):
+                trading_engine.resume(job_id)
+            else:
+                self.scheduler.resume_job(job_id)
             self.logger.info(f"작업 재개: {job_id}")
             return True
         except Exception as e:
@@ -199,15 +430,21 @@ class TradingSchedulerManager:
                     'ticker': job_info['ticker'],
                     'strategy': job_info['strategy'],
                     'interval': job_info['interval'],
+                    'base_interval': job_info.get('base_interval', job_info['interval']),
+                    'trigger_mode': job_info.get('trigger_mode', 'interval'),
+                    'backend': job_info.get('backend', 'apscheduler'),
+                    'candle_interval': job_info.get('candle_interval'),
                     'created_at': job_info['created_at'].isoformat(),
                     'last_run': job_info['last_run'].isoformat() if job_info['last_run'] else None,
-                    'run_count': job_info['run_count']
+                    'run_count': job_info['run_count'],
+                    'misfires': self.misfires.get(job_id, 0) + trading_engine.misfire_count(job_id)
                 }
 
             return {
                 'scheduler_running': self.is_started(),
                 'active_jobs_count': len(self.active_jobs),
                 'job_details': job_details,
+                'misfires': sum(self.misfires.values()) + trading_engine.get_stats()['misfires'],
                 'scheduler_state': self.scheduler.state if self.scheduler else None
             }
 
@@ -0,0 +1,433 @@
+"""
+거래 사이클 실행 지표
+
+작업 리스너는 성공/실패만 로그로 남기고 active_jobs에는 실행 횟수/마지막 실행 시각만 있어
+사이클이 어디서 느려지는지 알 수 없었습니다. 사이클마다 단계별 소요 시간을 재서 최근 구간의
+히스토그램으로 보관합니다.
+
+- 단계: fetch(시세 선조회/조회), signal(신호 계산), order(주문 API), persist(거래 기록 저장)
+- cycle: 사이클 전체 소요 시간, queue_delay: 실행 예정 시각부터 실제 시작까지 대기 시간
+- api_calls: 사이클당 업비트 API 호출 수 (선조회 요청 + 사이클 중 추가 조회 + 주문)
+- misfires: 이전 실행 미완료/실행 시각 초과로 건너뛴 횟수
+
+사이클 안의 코드는 cycle_phase()/mark_phase()/timed_phase()로 현재 스레드의 사이클에 시간을 더하므로
+지표 객체를 인자로 넘길 필요가 없습니다 (사이클 밖에서 호출되면 아무것도 하지 않음).
+"""
+import bisect
+import collections
+import contextlib
+import functools
+import itertools
+import math
+import threading
+import time
+
+from config import Config
+
+# 사이클 단계
+PHASES = ('fetch', 'signal', 'order', 'persist')
+
+# 소요 시간 히스토그램 구간 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# 사이클당 API 호출 수 히스토그램 구간
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34)
+
+_current = threading.local()
+
+
+class RollingHistogram:
+    """최근 window개 관측값의 분포 (백분위용) + 전체 기간 구간별 누적 횟수 (Prometheus용)"""
+
+    def __init__(self, window, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._values = collections.deque(maxlen=window)
+        self._bucket_totals = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        self._values.append(value)
+        self.count += 1
+        self.total += value
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self._bucket_totals[index] += 1
+
+    def _percentile(self, ordered, ratio):
+        index = min(len(ordered) - 1, max(0, math.ceil(ratio * len(ordered)) - 1))
+        return ordered[index]
+
+    def summary(self, scale=1000.0, digits=1):
+        """최근 구간 요약 (기본: 초 → ms)"""
+        ordered = sorted(self._values)
+        if not ordered:
+            return {'count': self.count, 'window': 0}
+        return {
+            'count': self.count,
+            'window': len(ordered),
+            'mean': round(sum(ordered) / len(ordered) * scale, digits),
+            'p50': round(self._percentile(ordered, 0.5) * scale, digits),
+            'p95': round(self._percentile(ordered, 0.95) * scale, digits),
+            'p99': round(self._percentile(ordered, 0.99) * scale, digits),
+            'max': round(ordered[-1] * scale, digits),
+        }
+
+    def bucket_counts(self):
+        """전체 기간의 상한별 누적 횟수 [(상한, 횟수)] (+Inf 포함)"""
+        counts = list(zip(self.buckets, itertools.accumulate(self._bucket_totals)))
+        counts.append(('+Inf', self.count))
+        return counts
+
+
+class CycleTimer:
+    """사이클 한 번의 단계별 소요 시간과 API 호출 수
+
+    단계는 스택으로 관리해 안쪽 단계(예: signal 중 주문)가 실행되는 동안은 바깥 단계 시간을 멈춥니다.
+    각 단계 시간은 해당 단계에서만 쓴 시간이므로 단계 합계는 사이클 시간을 넘지 않습니다.
+    """
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.started = time.time()
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.api_calls = 0
+        self._stack = []  # [[단계, 구간 시작 시각]]
+
+    def _pause_top(self, now):
+        if self._stack:
+            phase, since = self._stack[-1]
+            self.phases[phase] = self.phases.get(phase, 0.0) + now - since
+
+    def push(self, phase):
+        now = time.time()
+        self._pause_top(now)
+        self._stack.append([phase, now])
+
+    def pop(self):
+        now = time.time()
+        self._pause_top(now)
+        self._stack.pop()
+        if self._stack:
+            self._stack[-1][1] = now
+
+    def switch(self, phase):
+        """최상위 단계 전환 (phase가 None이면 최상위 단계 종료, 안쪽 단계 실행 중에는 무시)"""
+        if len(self._stack) > 1:
+            return
+        if self._stack:
+            self.pop()
+        if phase is not None:
+            self.push(phase)
+
+    def finish(self):
+        while self._stack:
+            self.pop()
+
+
+@contextlib.contextmanager
+def cycle_phase(phase):
+    """현재 사이클의 단계 시간 측정 (사이클 밖에서는 아무것도 하지 않음)"""
+    timer = getattr(_current, 'timer', None)
+    if timer is None:
+        yield
+        return
+
+    timer.push(phase)
+    try:
+        yield
+    finally:
+        timer.pop()
+
+
+def mark_phase(phase):
+    """현재 사이클의 최상위 단계를 phase로 전환 (None이면 단계 밖으로)
+
+    긴 함수 본문을 들여쓰기 없이 구간별로 나눌 때 사용합니다.
+    """
+    timer = getattr(_current, 'timer', None)
+    if timer is not None:
+        timer.switch(phase)
+
+
+def timed_phase(phase, api_calls=0):
+    """함수 실행 시간을 현재 사이클의 단계 시간으로 기록하는 데코레이터 (api_calls: 호출당 API 요청 수)"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            count_api_calls(api_calls)
+            with cycle_phase(phase):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count_api_calls(count=1):
+    """현재 사이클의 API 호출 수 추가"""
+    timer = getattr(_current, 'timer', None)
+    if timer is not None and count:
+        timer.api_calls += count
+
+
+class JobMetrics:
+    """작업별 지표"""
+
+    def __init__(self, window):
+        self.histograms = {name: RollingHistogram(window) for name in ('cycle', 'queue_delay') + PHASES}
+        self.histograms['api_calls'] = RollingHistogram(window, COUNT_BUCKETS)
+        self.runs = 0
+        self.errors = 0
+        self.misfires = 0
+        self.started = None  # 마지막 사이클 시작 시각 (APScheduler 대기 시간 계산용)
+        self.last = {}
+
+
+class SchedulerMetrics:
+    """사이클 실행 지표 수집 (모니터링 API / Prometheus용)"""
+
+    def __init__(self, window=None, job_window=None):
+        self.window = window or Config.METRICS_WINDOW
+        self.job_window = job_window or Config.METRICS_JOB_WINDOW
+        self._lock = threading.Lock()
+        self._total = JobMetrics(self.window)
+        self._jobs = {}
+        self._recent_delay = 0.0  # 마지막 take_recent_lag() 이후 최대 대기 시간 (부하 차단 판단용)
+        self._degradation = {'level': 0, 'name': 'normal', 'changes': 0, 'since': None, 'shed': {}}
+
+    def _job(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is None:
+            job = self._jobs[job_id] = JobMetrics(self.job_window)
+        return job
+
+    def instrument(self, job_id, func):
+        """거래 사이클 함수를 측정하는 함수로 감싸기 (작업별 지표는 감싼 작업만 보관)"""
+        with self._lock:
+            self._job(job_id)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            timer = CycleTimer(job_id)
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is not None:
+                    job.started = timer.started
+            previous, _current.timer = getattr(_current, 'timer', None), timer
+            failed = False
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                failed = True
+                raise
+            finally:
+                timer.finish()
+                _current.timer = previous
+                self._observe_cycle(timer, time.time() - timer.started, failed)
+        return wrapper
+
+    def _observe_cycle(self, timer, elapsed, failed):
+        with self._lock:
+            job = self._jobs.get(timer.job_id)
+            targets = (self._total, job) if job is not None else (self._total,)
+            for metrics in targets:
+                metrics.runs += 1
+                metrics.errors += failed
+                metrics.histograms['cycle'].observe(elapsed)
+                metrics.histograms['api_calls'].observe(timer.api_calls)
+                for phase, seconds in timer.phases.items():
+                    metrics.histograms[phase].observe(seconds)
+            if job is None:
+                return  # 실행 중 제거된 작업
+            job.last = {
+                'at': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timer.started)),
+                'cycle_ms': round(elapsed * 1000, 1),
+                'phases_ms': {phase: round(seconds * 1000, 1) for phase, seconds in timer.phases.items()},
+                'api_calls': timer.api_calls,
+                'failed': failed,
+            }
+
+    def observe_queue_delay(self, job_id, seconds):
+        """실행 예정 시각부터 실제 시작까지 대기 시간"""
+        seconds = max(0.0, seconds)
+        with self._lock:
+            self._total.histograms['queue_delay'].observe(seconds)
+            self._recent_delay = max(self._recent_delay, seconds)
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.histograms['queue_delay'].observe(seconds)
+
+    def observe_scheduled_run(self, job_id, scheduled_run_time):
+        """APScheduler 실행 이벤트의 예정 시각으로 대기 시간 기록 (측정 중인 작업만)"""
+        job = self._jobs.get(job_id)
+        if job is None or job.started is None or scheduled_run_time is None:
+            return
+        self.observe_queue_delay(job_id, job.started - scheduled_run_time.timestamp())
+
+    def record_misfire(self, job_id):
+        with self._lock:
+            self._total.misfires += 1
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.misfires += 1
+
+    def remove_job(self, job_id):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def job_api_calls(self, job_id):
+        """작업의 최근 사이클당 평균 API 호출 수 (실행 기록이 없으면 None)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or not job.runs:
+                return None
+            return job.histograms['api_calls'].summary(scale=1, digits=2)['mean']
+
+    def take_recent_lag(self):
+        """(누적 건너뛴 실행 수, 지난 호출 이후 최대 실행 대기 시간(초)) - 호출하면 최대 대기 시간 초기화"""
+        with self._lock:
+            delay, self._recent_delay = self._recent_delay, 0.0
+            return self._total.misfires, delay
+
+    def record_degradation(self, level, name):
+        """부하 차단 단계 변경 기록 (app.utils.load_shedder)"""
+        with self._lock:
+            self._degradation.update(level=level, name=name, changes=self._degradation['changes'] + 1,
+                                     since=time.strftime('%Y-%m-%d %H:%M:%S'))
+
+    def record_shed(self, kind):
+        """부하 차단으로 생략한 호출 기록"""
+        with self._lock:
+            shed = self._degradation['shed']
+            shed[kind] = shed.get(kind, 0) + 1
+
+    def _summaries(self, metrics):
+        summaries = {name: histogram.summary() for name, histogram in metrics.histograms.items()}
+        summaries['api_calls'] = metrics.histograms['api_calls'].summary(scale=1, digits=2)
+        return summaries
+
+    def get_stats(self):
+        """JSON 지표 (소요 시간 단위: ms)"""
+        with self._lock:
+            return {
+                'window': self.window,
+                'runs': self._total.runs,
+                'errors': self._total.errors,
+                'misfires': self._total.misfires,
+                'histograms': self._summaries(self._total),
+                'degradation': dict(self._degradation, shed=dict(self._degradation['shed'])),
+                'jobs': {
+                    job_id: {
+                        'runs': job.runs,
+                        'errors': job.errors,
+                        'misfires': job.misfires,
+                        'histograms': self._summaries(job),
+                        'last': dict(job.last),
+                    }
+                    for job_id, job in self._jobs.items()
+                },
+            }
+
+    def prometheus_text(self, labels=None, include_help=True):
+        """Prometheus 텍스트 형식 지표 (히스토그램은 시작 이후 누적, 백분위는 Prometheus에서 계산)
+
+        Args:
+            labels (dict): 모든 지표에 붙일 라벨 (예: 샤드 번호)
+            include_help (bool): HELP/TYPE 줄 포함 여부 (여러 프로세스 지표를 이어 붙일 때 첫 번째만 포함)
+        """
+        labels = dict(labels or {})
+        lines = []
+
+        def header(name, kind, text):
+            if include_help:
+                lines.append(f"# HELP {name} {text}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            for name, attr, text in (('trading_cycle_runs_total', 'runs', '거래 사이클 실행 수'),
+                                     ('trading_cycle_errors_total', 'errors', '오류로 끝난 거래 사이클 수'),
+                                     ('trading_cycle_misfires_total', 'misfires', '실행하지 못하고 건너뛴 거래 사이클 수')):
+                header(name, 'counter', text)
+                for job_id, job in self._jobs.items():
+                    lines.append(f"{name}{_format_labels(dict(labels, job=job_id))} {getattr(job, attr)}")
+
+            for name, key, text in (('trading_cycle_seconds', 'cycle', '거래 사이클 소요 시간'),
+                                    ('trading_cycle_queue_delay_seconds', 'queue_delay', '실행 예정 시각부터 시작까지 대기 시간'),
+                                    ('trading_cycle_api_calls', 'api_calls', '사이클당 업비트 API 호출 수')):
+                header(name, 'histogram', text)
+                _histogram_lines(lines, name, self._total.histograms[key], labels)
+
+            header('trading_cycle_phase_seconds', 'histogram', '거래 사이클 단계별 소요 시간')
+            for phase in PHASES:
+                _histogram_lines(lines, 'trading_cycle_phase_seconds', self._total.histograms[phase],
+                                 dict(labels, phase=phase))
+
+            header('trading_degradation_level', 'gauge', '부하 차단 단계 (0: 정상, 1: 필수가 아닌 호출 생략, 2: 분석 간격 연장)')
+            lines.append(f"trading_degradation_level{_format_labels(labels)} {self._degradation['level']}")
+            header('trading_load_shed_total', 'counter', '부하 차단으로 생략한 호출 수')
+            for kind, count in sorted(self._degradation['shed'].items()):
+                lines.append(f"trading_load_shed_total{_format_labels(dict(labels, kind=kind))} {count}")
+
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels.items()) + '}'
+
+
+def _histogram_lines(lines, name, histogram, labels):
+    for bound, count in histogram.bucket_counts():
+        lines.append(f"{name}_bucket{_format_labels(dict(labels, le=bound))} {count}")
+    lines.append(f"{name}_sum{_format_labels(labels)} {round(histogram.total, 6)}")
+    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+
+def _merge_summaries(summaries):
+    """여러 프로세스의 히스토그램 요약 병합 (백분위/최댓값은 프로세스 중 최댓값 = 상한)"""
+    summaries = [summary for summary in summaries if summary.get('window')]
+    if not summaries:
+        return {'count': 0, 'window': 0}
+    window = sum(summary['window'] for summary in summaries)
+    merged = {
+        'count': sum(summary['count'] for summary in summaries),
+        'window': window,
+        'mean': round(sum(summary['mean'] * summary['window'] for summary in summaries) / window, 2),
+    }
+    for key in ('p50', 'p95', 'p99', 'max'):
+        merged[key] = max(summary[key] for summary in summaries)
+    return merged
+
+
+def merge_metric_stats(stats_list):
+    """샤드별 get_stats() 결과를 단일 엔진 형식으로 병합 (작업 ID는 샤드 간에 겹치지 않음)
+
+    원본 관측값 없이 요약만 합치므로 백분위는 샤드 중 가장 나쁜 값(상한)입니다.
+    """
+    names = {name for stats in stats_list for name in stats['histograms']}
+    jobs = {}
+    for stats in stats_list:
+        jobs.update(stats['jobs'])
+    # 부하 차단 단계는 가장 높은 샤드 기준, 생략 횟수는 합계
+    degradations = [stats['degradation'] for stats in stats_list if stats.get('degradation')]
+    degradation = dict(max(degradations, key=lambda item: item['level'])) if degradations else {}
+    if degradations:
+        degradation['changes'] = sum(item['changes'] for item in degradations)
+        degradation['shed'] = {}
+        for item in degradations:
+            for kind, count in item['shed'].items():
+                degradation['shed'][kind] = degradation['shed'].get(kind, 0) + count
+    return {
+        'window': sum(stats['window'] for stats in stats_list),
+        'runs': sum(stats['runs'] for stats in stats_list),
+        'errors': sum(stats['errors'] for stats in stats_list),
+        'misfires': sum(stats['misfires'] for stats in stats_list),
+        'histograms': {name: _merge_summaries([stats['histograms'].get(name, {}) for stats in stats_list])
+                       for name in sorted(names)},
+        'degradation': degradation,
+        'jobs': jobs,
+    }
+
+
+# 글로벌 사이클 지표
+scheduler_metrics = SchedulerMetrics()
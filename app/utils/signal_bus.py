@@ -0,0 +1,105 @@
+"""
+사용자 간 매매 신호 공유 버스
+
+여러 사용자가 같은 (티커, 전략, 파라미터) 조합을 실행할 때, 동일한 신호를 사용자마다
+다시 계산하지 않고 입력 데이터 시점(캔들/틱) 단위로 한 번만 계산해서 공유합니다.
+잔고/주문 로직은 각 봇이 그대로 수행합니다.
+"""
+import threading
+import time
+
+from config import Config
+
+
+class SignalBus:
+    """전략 설정별 신호 계산 결과 공유"""
+
+    def __init__(self, subscriber_ttl=None):
+        self.subscriber_ttl = subscriber_ttl if subscriber_ttl is not None else Config.SIGNAL_BUS_SUBSCRIBER_TTL
+        self._entries = {}  # {config_key: entry}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def tick_bucket(seconds=None):
+        """틱 단위 시점 (같은 틱 안의 요청은 같은 입력으로 간주)"""
+        seconds = seconds or Config.SIGNAL_BUS_TICK_SECONDS
+        return int(time.time() // seconds)
+
+    def _get_entry(self, config_key):
+        with self._lock:
+            if config_key not in self._entries:
+                self._entries[config_key] = {
+                    'stamp': None,
+                    'result': None,
+                    'computed_at': None,
+                    'subscribers': {},
+                    'computations': 0,
+                    'hits': 0
+                }
+                self._key_locks[config_key] = threading.Lock()
+            return self._entries[config_key], self._key_locks[config_key]
+
+    def get_or_compute(self, config_key, input_stamp, subscriber, compute_func):
+        """공유 신호 조회 - 같은 입력 시점의 결과가 없으면 한 번만 계산
+
+        Args:
+            config_key (tuple): (티커, 전략, 파라미터...) 전략 설정 키
+            input_stamp: 입력 데이터 시점 (마지막 캔들 시각, 틱 버킷, 배치 계산 시각 등)
+            subscriber: 구독자 식별자 (사용자 ID 등)
+            compute_func (callable): 신호 계산 함수
+
+        Returns:
+            신호 결과 (딕셔너리면 구독자별 복사본)
+        """
+        entry, key_lock = self._get_entry(config_key)
+        now = time.time()
+
+        with self._lock:
+            entry['subscribers'][subscriber] = now
+
+        # 같은 설정을 동시에 요청한 구독자들은 첫 번째 계산이 끝날 때까지 대기 후 결과를 공유
+        with key_lock:
+            if entry['stamp'] == input_stamp and entry['result'] is not None:
+                entry['hits'] += 1
+                result = entry['result']
+            else:
+                result = compute_func()
+                entry['stamp'] = input_stamp
+                entry['result'] = result
+                entry['computed_at'] = time.time()
+                entry['computations'] += 1
+
+        return dict(result) if isinstance(result, dict) else result
+
+    def cleanup(self):
+        """구독자가 모두 사라진 설정 정리"""
+        now = time.time()
+        with self._lock:
+            for config_key in list(self._entries.keys()):
+                subscribers = self._entries[config_key]['subscribers']
+                for subscriber in [s for s, seen in subscribers.items() if now - seen > self.subscriber_ttl]:
+                    del subscribers[subscriber]
+                if not subscribers:
+                    del self._entries[config_key]
+                    del self._key_locks[config_key]
+
+    def get_stats(self):
+        """설정별 팬아웃(구독자 수) 및 계산/공유 횟수"""
+        self.cleanup()
+        stats = []
+        with self._lock:
+            for config_key, entry in self._entries.items():
+                stats.append({
+                    'config': ' / '.join(str(part) for part in config_key),
+                    'fan_out': len(entry['subscribers']),
+                    'subscribers': sorted(str(s) for s in entry['subscribers']),
+                    'computations': entry['computations'],
+                    'hits': entry['hits'],
+                    'last_computed': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry['computed_at'])) if entry['computed_at'] else None
+                })
+        return sorted(stats, key=lambda item: item['fan_out'], reverse=True)
+
+
+# 글로벌 신호 버스 인스턴스
+signal_bus = SignalBus()
@@ -0,0 +1,137 @@
+"""
+계층형 타이밍 휠
+
+거래 엔진은 틱마다 등록된 모든 봇을 훑어 실행 시점이 된 봇을 골랐으므로 봇이 수천 개가 되면
+틱당 비용이 봇 수에 비례했습니다. 타이밍 휠은 만료 시각을 틱 단위 슬롯에 넣어 두고 틱마다 현재 슬롯만 꺼내므로
+등록/취소는 O(1), 틱당 비용은 만료된 타이머 수에 비례합니다.
+
+- 0단계 휠: 슬롯 하나가 틱 하나 (slots 틱 범위)
+- n단계 휠: 슬롯 하나가 slots^n 틱 (아래 단계 휠이 한 바퀴 돌 때 해당 슬롯을 아래 단계로 내려 보냄)
+- 전체 범위(slots^levels 틱)를 넘는 타이머는 넘침 목록에 두었다가 범위에 들어오면 휠에 넣음
+
+타이머는 만료 시각보다 먼저 만료되지 않습니다 (만료 틱 = 만료 시각을 틱 단위로 올림).
+"""
+import math
+import threading
+
+
+class TimingWheel:
+    """키별 타이머 하나를 보관하는 계층형 타이밍 휠"""
+
+    def __init__(self, tick_seconds, slots=64, levels=4, now=0.0):
+        self.tick_seconds = float(tick_seconds)
+        self.slots = int(slots)
+        self.levels = int(levels)
+        self._spans = [self.slots ** level for level in range(self.levels + 1)]  # 단계별 슬롯 폭(틱)
+
+        self._wheels = [[{} for _ in range(self.slots)] for _ in range(self.levels)]  # {키: 만료 틱}
+        self._ready = {}  # 이미 만료된 타이머 (다음 advance에서 반환)
+        self._overflow = {}  # 전체 범위 밖 타이머
+        self._where = {}  # {키: 보관 위치 dict}
+        self._deadlines = {}  # {키: 만료 시각}
+        self._current = int(math.floor(now / self.tick_seconds))  # 마지막으로 처리한 틱
+        self._lock = threading.Lock()
+        self._stats = {'scheduled': 0, 'cancelled': 0, 'expired': 0, 'cascaded': 0}
+
+    def _place(self, key, expire_tick):
+        delta = expire_tick - self._current
+        if delta <= 0:
+            bucket = self._ready
+        elif delta >= self._spans[self.levels]:
+            bucket = self._overflow
+        else:
+            level = 0
+            while delta >= self._spans[level + 1]:
+                level += 1
+            bucket = self._wheels[level][(expire_tick // self._spans[level]) % self.slots]
+        bucket[key] = expire_tick
+        self._where[key] = bucket
+
+    def _remove(self, key):
+        bucket = self._where.pop(key, None)
+        if bucket is None:
+            return False
+        del bucket[key]
+        del self._deadlines[key]
+        return True
+
+    def schedule(self, key, deadline):
+        """key 타이머를 deadline(epoch 초)에 만료되도록 등록 (이미 있으면 교체)"""
+        with self._lock:
+            self._remove(key)
+            self._deadlines[key] = deadline
+            self._place(key, int(math.ceil(deadline / self.tick_seconds)))
+            self._stats['scheduled'] += 1
+
+    def cancel(self, key):
+        with self._lock:
+            removed = self._remove(key)
+            if removed:
+                self._stats['cancelled'] += 1
+            return removed
+
+    def deadline(self, key):
+        return self._deadlines.get(key)
+
+    def _cascade(self, tick):
+        """tick에서 한 바퀴를 마친 아래 단계 휠에 윗 단계 슬롯을 내려 보냄 (윗 단계부터)"""
+        if tick % self._spans[self.levels] == 0 and self._overflow:
+            pending, self._overflow = self._overflow, {}
+            for key, expire_tick in pending.items():
+                self._place(key, expire_tick)
+
+        for level in range(self.levels - 1, 0, -1):
+            if tick % self._spans[level]:
+                continue
+            bucket = self._wheels[level][(tick // self._spans[level]) % self.slots]
+            if not bucket:
+                continue
+            pending = dict(bucket)
+            bucket.clear()
+            self._stats['cascaded'] += len(pending)
+            for key, expire_tick in pending.items():
+                self._place(key, expire_tick)
+
+    def advance(self, now):
+        """now까지 틱을 진행하고 만료된 타이머 키 목록 반환 (반환된 타이머는 휠에서 제거됨)"""
+        target = int(math.floor(now / self.tick_seconds))
+        with self._lock:
+            expired = []
+            if target - self._current > self._spans[self.levels]:
+                # 오래 멈춰 있었으면 틱을 하나씩 돌지 않고 전체를 다시 배치
+                timers = {key: bucket[key] for key, bucket in self._where.items() if bucket is not self._ready}
+                for wheel in self._wheels:
+                    for bucket in wheel:
+                        bucket.clear()
+                self._overflow.clear()
+                self._current = target
+                for key, expire_tick in timers.items():
+                    self._place(key, expire_tick)
+
+            while self._current < target:
+                self._current += 1
+                self._cascade(self._current)
+                bucket = self._wheels[0][self._current % self.slots]
+                if bucket:
+                    expired.extend(bucket)
+                    bucket.clear()
+
+            # 이미 만료된 채 등록됐거나 윗 단계에서 내려오며 만료된 타이머
+            expired.extend(self._ready)
+            self._ready.clear()
+            for key in expired:
+                del self._where[key]
+                del self._deadlines[key]
+            self._stats['expired'] += len(expired)
+            return expired
+
+    def __len__(self):
+        return len(self._where)
+
+    def __contains__(self, key):
+        return key in self._where
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self._stats, timers=len(self._where), overflow=len(self._overflow),
+                        slots=self.slots, levels=self.levels)
@@ -0,0 +1,406 @@
+"""
+틱 단위 중앙 거래 엔진
+
+봇마다 APScheduler 작업을 두면 실행 시간이 긴 봇이 많을 때 스레드 풀(10개)이 부족해 작업이 조용히
+건너뛰어집니다. 엔진은 스케줄러 작업 하나(틱)로 실행 시점이 된 봇들을 모은 뒤
+
+1. 티커별 시세를 한 번에 조회하고 (현재가는 모든 티커를 한 번의 요청으로, 캔들/호가는 티커당 한 번)
+2. 사용자별 계좌를 한 번 맞춘 다음 (포지션 원장 대조)
+3. 봇의 신호 평가/주문을 작업 풀에서 실행합니다.
+
+봇들은 게시된 틱 시세를 복사해 사용하므로 틱당 조회량은 봇 수가 아니라 티커 수에 비례합니다.
+이전 실행이 끝나지 않아 건너뛴 실행(misfire)과 틱 지연은 로그와 통계로 보고합니다.
+공정 분배 대기열에서 아직 차례를 기다리는 봇은 실행 중이 아니므로 misfire로 세지 않고 대기 중인 실행 한 번으로 합칩니다.
+
+실행 시점이 된 봇은 작업 풀 빈 자리만큼 사용자 공정 분배 순서(app.utils.fair_share)로 실행하므로
+봇이 많은 사용자가 작업 풀을 차지해도 다른 사용자의 봇이 뒤로 밀리지 않습니다.
+
+다음 실행 시각은 계층형 타이밍 휠(app.utils.timing_wheel)에 보관하므로 틱마다 전체 봇을 훑지 않고
+실행 시점이 된 봇만 꺼냅니다 (봇 수천 개에서도 등록/해제/일시정지는 O(1), 틱 비용은 실행할 봇 수에 비례).
+봇의 첫 실행 시각은 실행 위상 배정(app.utils.phase_planner) 결과를 받고, 이후 실행이 밀려도 같은 위상을 유지합니다.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+
+import pyupbit
+
+from app.utils.fair_share import fair_share as default_fair_share
+from app.utils.prefetch import (SNAPSHOT_ENDPOINTS, CycleSnapshot, clear_tick_snapshots, merge_requirements,
+                                prefetch, publish_tick_snapshot)
+from app.utils.scheduler_metrics import scheduler_metrics
+from app.utils.timing_wheel import TimingWheel
+from config import Config
+
+# 엔진 틱 스케줄러 작업 ID
+ENGINE_JOB_ID = 'trading_engine_tick'
+
+
+def _fetch_current_prices(tickers):
+    """여러 티커 현재가를 한 번의 요청으로 조회 ({티커: 가격})"""
+    prices = pyupbit.get_current_price(list(tickers))
+    if isinstance(prices, dict):
+        return prices
+    if len(tickers) == 1 and prices:
+        return {tickers[0]: prices}
+    return {}
+
+
+def _catch_up(due, interval, now):
+    """due에서 interval씩 더해 now보다 늦은 첫 실행 시각 (실행 위상 유지)"""
+    interval = max(1, interval)
+    if due > now:
+        return due + interval
+    return due + ((now - due) // interval + 1) * interval
+
+
+class TradingEngine:
+    """실행 시점이 된 봇을 틱마다 모아 일괄 실행하는 엔진"""
+
+    def __init__(self, tick_seconds=None, max_workers=None, price_fetcher=None, market_fetcher=None, fair_share=None):
+        self.tick_seconds = tick_seconds or Config.ENGINE_TICK_SECONDS
+        self.max_workers = max_workers or Config.ENGINE_MAX_WORKERS
+        self.price_fetcher = price_fetcher or _fetch_current_prices
+        # 티커 시세 선조회 (샤드 프로세스에서는 코디네이터 공유 시세로 대체, app.utils.market_hub 참고)
+        self.market_fetcher = market_fetcher or prefetch
+        # 사용자 공정 분배 (비활성화하면 실행 시점이 된 봇을 모두 바로 작업 풀에 넣음)
+        self.fair_share = fair_share or (default_fair_share if Config.FAIR_SHARE_ENABLED else None)
+        self.logger = logging.getLogger(__name__)
+
+        self._entries = {}  # {job_id: 실행 정보}
+        self._wheel = TimingWheel(self.tick_seconds, slots=Config.ENGINE_WHEEL_SLOTS,
+                                  levels=Config.ENGINE_WHEEL_LEVELS, now=time.time())  # {job_id: next_due}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='TradingEngine')
+        # 틱 선조회용 (봇 실행 풀과 분리해 봇이 풀을 모두 차지해도 선조회가 밀리지 않도록)
+        self._prefetch_executor = ThreadPoolExecutor(max_workers=Config.PREFETCH_MAX_WORKERS,
+                                                     thread_name_prefix='EnginePrefetch')
+        self._scheduler = None
+        self._in_flight = 0  # 작업 풀에 넣은 봇 수 (실행 중 + 풀 대기)
+        self._stats = {'ticks': 0, 'dispatched': 0, 'misfires': 0, 'deferred': 0, 'late': 0, 'tick_overruns': 0,
+                       'price_requests': 0, 'market_prefetches': 0, 'account_prefetches': 0, 'errors': 0}
+        self._last_tick = {}
+
+    def start(self, scheduler):
+        """스케줄러에 틱 작업 등록 (이미 등록되어 있으면 무시)"""
+        with self._lock:
+            if self._scheduler is not None:
+                return
+            self._scheduler = scheduler
+        scheduler.add_job(
+            func=self.tick,
+            trigger='interval',
+            seconds=self.tick_seconds,
+            id=ENGINE_JOB_ID,
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
+        self.logger.info(f"거래 엔진 시작: 틱 {self.tick_seconds}초, 작업 풀 {self.max_workers}개")
+
+    # ------------------------------------------------------------------
+    # 작업 관리
+    # ------------------------------------------------------------------
+    def register(self, job_id, func, interval_seconds, ticker, user_id=None, bot=None, on_complete=None,
+                 first_due=None):
+        """봇 실행 등록 (first_due가 없으면 등록 직후 첫 틱에 실행)
+
+        Args:
+            bot: 틱 선조회에 사용할 봇 (get_data_requirements()/api 제공, 없으면 선조회 없이 실행만)
+            on_complete (callable): 실행이 끝날 때마다 호출 (실행 횟수/시각 기록용)
+            first_due (float): 첫 실행 시각 (epoch 초, 실행 위상 배정 결과)
+        """
+        with self._lock:
+            entry = {
+                'job_id': job_id,
+                'func': func,
+                'interval': int(interval_seconds),
+                'ticker': ticker,
+                'user_id': user_id,
+                'bot': bot,
+                'on_complete': on_complete,
+                'next_due': first_due or time.time(),
+                'queued': False,  # 실행 시점이 되어 작업 풀/공정 분배 대기 중
+                'running': False,
+                'paused': False,
+                'misfires': 0,
+            }
+            self._entries[job_id] = entry
+            self._wheel.schedule(job_id, entry['next_due'])
+
+    def unregister(self, job_id):
+        with self._lock:
+            self._wheel.cancel(job_id)
+            return self._entries.pop(job_id, None) is not None
+
+    def reschedule(self, job_id, interval_seconds):
+        """실행 간격 변경 (다음 실행은 새 간격 기준)"""
+        with self._lock:
+            entry = self._entries.get(job_id)
+            if entry is None:
+                return False
+            entry['next_due'] += int(interval_seconds) - entry['interval']
+            entry['interval'] = int(interval_seconds)
+            if not entry['paused']:
+                self._wheel.schedule(job_id, entry['next_due'])
+            return True
+
+    def move(self, job_id, next_due):
+        """다음 실행 시각 변경 (실행 위상 재배치, 이후 실행은 같은 간격으로 이어짐)"""
+        with self._lock:
+            entry = self._entries.get(job_id)
+            if entry is None:
+                return False
+            entry['next_due'] = next_due
+            if not entry['paused']:
+                self._wheel.schedule(job_id, next_due)
+            return True
+
+    def pause(self, job_id):
+        return self._set_paused(job_id, True)
+
+    def resume(self, job_id):
+        return self._set_paused(job_id, False)
+
+    def _set_paused(self, job_id, paused):
+        with self._lock:
+            entry = self._entries.get(job_id)
+            if entry is None:
+                return False
+            entry['paused'] = paused
+            if paused:
+                self._wheel.cancel(job_id)
+            else:
+                entry['next_due'] = max(entry['next_due'], time.time())
+                self._wheel.schedule(job_id, entry['next_due'])
+            return True
+
+    def misfire_count(self, job_id):
+        entry = self._entries.get(job_id)
+        return entry['misfires'] if entry else 0
+
+    def next_run_time(self, job_id):
+        entry = self._entries.get(job_id)
+        return datetime.fromtimestamp(entry['next_due']) if entry else None
+
+    # ------------------------------------------------------------------
+    # 틱 실행
+    # ------------------------------------------------------------------
+    def _collect_due(self, now):
+        """실행 시점이 된 봇 (이전 실행이 아직 끝나지 않은 봇은 이번 실행을 건너뛰고 보고, 대기 중인 봇은 다시 넣지 않음)"""
+        due = []
+        with self._lock:
+            for job_id in self._wheel.advance(now):
+                entry = self._entries.get(job_id)
+                if entry is None or entry['paused']:
+                    continue
+
+                if entry['queued']:
+                    # 이전 실행이 아직 차례를 기다리는 중 - 그 실행으로 합치고 다음 실행 시각만 옮김
+                    self._stats['deferred'] += 1
+                    entry['next_due'] = _catch_up(entry['next_due'], entry['interval'], now)
+                    self._wheel.schedule(job_id, entry['next_due'])
+                    continue
+
+                if entry['running']:
+                    entry['misfires'] += 1
+                    self._stats['misfires'] += 1
+                    scheduler_metrics.record_misfire(entry['job_id'])
+                    entry['next_due'] = _catch_up(entry['next_due'], entry['interval'], now)
+                    self._wheel.schedule(job_id, entry['next_due'])
+                    self.logger.warning(
+                        f"거래 사이클 건너뜀 ({entry['job_id']}): 이전 실행이 {entry['interval']}초 안에 끝나지 않음 "
+                        f"(누적 {entry['misfires']}회)"
+                    )
+                    continue
+
+                if now - entry['next_due'] > max(self.tick_seconds * 2, 1):
+                    self._stats['late'] += 1
+
+                entry['due_at'] = entry['next_due']  # 대기 시간 측정용 (사이클 지표)
+
+                # 고정 주기 유지 (밀린 경우 같은 위상의 다음 실행 시각으로)
+                entry['next_due'] = _catch_up(entry['next_due'], entry['interval'], now)
+                self._wheel.schedule(job_id, entry['next_due'])
+                entry['queued'] = True
+                due.append(entry)
+
+        # 같은 티커의 봇이 연달아 실행되도록 정렬 (틱 시세 재사용)
+        due.sort(key=lambda entry: entry['ticker'] or '')
+        return due
+
+    def tick(self):
+        """스케줄러 틱 - 실행 시점이 된 봇 선조회 후 일괄 실행"""
+        started = time.time()
+        due = self._collect_due(started)
+        with self._lock:
+            self._stats['ticks'] += 1
+        if not due:
+            return 0
+
+        tickers = self._prefetch(due)
+        if self.fair_share is not None:
+            self.fair_share.enqueue(due)
+            self._dispatch()
+        else:
+            self._submit(due)
+
+        elapsed = time.time() - started
+        with self._lock:
+            self._stats['dispatched'] += len(due)
+            self._last_tick = {
+                'at': datetime.fromtimestamp(started).isoformat(timespec='seconds'),
+                'bots': len(due),
+                'tickers': len(tickers),
+                'prefetch_ms': round(elapsed * 1000, 1),
+            }
+            if elapsed > self.tick_seconds:
+                self._stats['tick_overruns'] += 1
+                self.logger.warning(f"거래 엔진 틱 지연: 선조회 {elapsed:.2f}초 (봇 {len(due)}개, 티커 {len(tickers)}개)")
+        return len(due)
+
+    def _submit(self, entries):
+        with self._lock:
+            self._in_flight += len(entries)
+        for entry in entries:
+            self._executor.submit(self._run, entry)
+
+    def _dispatch(self):
+        """작업 풀 빈 자리만큼 사용자 공정 분배 순서로 대기 중인 봇 실행"""
+        with self._lock:
+            free = self.max_workers - self._in_flight
+            entries = self.fair_share.select(free) if free > 0 else []
+            self._in_flight += len(entries)
+        for entry in entries:
+            self._executor.submit(self._run, entry)
+
+    def _run(self, entry):
+        """작업 풀에서 봇 실행 후 다음 대기 봇 실행 (대기 중 해제/일시정지된 봇은 실행하지 않음)"""
+        try:
+            with self._lock:
+                entry['queued'] = False
+                entry['running'] = self._entries.get(entry['job_id']) is entry and not entry['paused']
+            if entry['running']:
+                self._execute(entry)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            if self.fair_share is not None:
+                self.fair_share.finish(entry['user_id'])
+                self._dispatch()
+
+    def _execute(self, entry):
+        """봇 한 사이클 실행 (신호 평가/주문은 봇이 처리)"""
+        scheduler_metrics.observe_queue_delay(entry['job_id'], time.time() - entry['due_at'])
+        try:
+            entry['func']()
+        except Exception as e:
+            with self._lock:
+                self._stats['errors'] += 1
+            self.logger.error(f"거래 사이클 실행 오류 ({entry['job_id']}): {e}", exc_info=True)
+        finally:
+            entry['running'] = False
+            if entry['on_complete'] is not None:
+                try:
+                    entry['on_complete']()
+                except Exception as e:
+                    self.logger.warning(f"실행 기록 갱신 실패 ({entry['job_id']}): {e}")
+
+    # ------------------------------------------------------------------
+    # 틱 선조회
+    # ------------------------------------------------------------------
+    def _market_requirements(self, entries):
+        """티커별 시세 요구 목록 (봇 요구 병합, 잔고/현재가 제외) 및 조회에 사용할 API"""
+        requirements = {}
+        apis = {}
+        for entry in entries:
+            bot = entry['bot']
+            if bot is None or not hasattr(bot, 'get_data_requirements'):
+                continue
+            try:
+                wanted = [requirement for requirement in bot.get_data_requirements()
+                          if requirement[0] in SNAPSHOT_ENDPOINTS and requirement[0] != 'current_price']
+            except Exception as e:
+                self.logger.warning(f"데이터 요구 목록 조회 실패 ({entry['job_id']}): {e}")
+                continue
+            ticker = entry['ticker']
+            requirements.setdefault(ticker, []).extend(wanted)
+            apis.setdefault(ticker, bot.api)
+        return {ticker: merge_requirements(reqs) for ticker, reqs in requirements.items()}, apis
+
+    def _prefetch_accounts(self, api):
+        """사용자 계좌를 한 번 맞춤 (원장 대조 시점이면 계좌 조회 1회, 아니면 조회 없음)"""
+        api.get_accounts()
+
+    def _prefetch(self, due):
+        """틱에 실행할 봇들의 시세/계좌 일괄 조회 후 틱 시세 게시
+
+        Returns:
+            list: 조회한 티커 목록
+        """
+        clear_tick_snapshots()
+        tickers = sorted({entry['ticker'] for entry in due if entry['ticker']})
+        if not Config.PREFETCH_ENABLED or not tickers:
+            return tickers
+
+        requirements, apis = self._market_requirements(due)
+        users = {}
+        for entry in due:
+            bot = entry['bot']
+            if bot is not None and getattr(bot.api, 'ledger', None) is not None and entry['user_id'] not in users:
+                users[entry['user_id']] = bot.api
+
+        prices_future = self._prefetch_executor.submit(self.price_fetcher, tickers)
+        market_futures = {ticker: self._prefetch_executor.submit(self.market_fetcher, apis[ticker], ticker, reqs,
+                                                                 self.logger)
+                          for ticker, reqs in requirements.items() if reqs}
+        account_futures = [self._prefetch_executor.submit(self._prefetch_accounts, api) for api in users.values()]
+        wait([prices_future, *market_futures.values(), *account_futures], timeout=Config.PREFETCH_TIMEOUT)
+
+        try:
+            prices = prices_future.result(timeout=0) or {}
+        except Exception as e:
+            prices = {}
+            self.logger.warning(f"틱 현재가 일괄 조회 실패: {e}")
+
+        snapshots = {}
+        for ticker, future in market_futures.items():
+            try:
+                snapshots[ticker] = future.result(timeout=0)
+            except Exception as e:
+                self.logger.warning(f"틱 시세 선조회 실패 ({ticker}): {e}")
+
+        for ticker in tickers:
+            price = prices.get(ticker)
+            snapshot = snapshots.get(ticker)
+            if snapshot is None:
+                if not price:
+                    continue
+                snapshot = CycleSnapshot(ticker)
+            if price:
+                snapshot.store('current_price', ticker, None, None, float(price))
+            publish_tick_snapshot(snapshot)
+
+        with self._lock:
+            self._stats['price_requests'] += 1
+            self._stats['market_prefetches'] += len(market_futures)
+            self._stats['account_prefetches'] += len(account_futures)
+        return tickers
+
+    def get_stats(self):
+        """엔진 통계 (모니터링 API용)"""
+        with self._lock:
+            running = sum(1 for entry in self._entries.values() if entry['running'])
+            return dict(self._stats, backend=Config.SCHEDULER_BACKEND, tick_seconds=self.tick_seconds,
+                        jobs=len(self._entries), running=running, in_flight=self._in_flight,
+                        queued=self.fair_share.queued if self.fair_share is not None else 0,
+                        last_tick=dict(self._last_tick),
+                        wheel=self._wheel.get_stats(),
+                        avg_bots_per_tick=round(self._stats['dispatched'] / self._stats['ticks'], 2)
+                        if self._stats['ticks'] else 0)
+
+
+# 글로벌 거래 엔진
+trading_engine = TradingEngine()
@@ -0,0 +1,155 @@
+"""전략 백테스트 CLI
+
+사용 예:
+    # 1년치 5분봉 다운로드
+    python backtest.py download --ticker KRW-BTC --interval minute5 --count 105120 --out data/KRW-BTC_minute5.csv
+
+    # 볼린저 밴드 전략 백테스트
+    python backtest.py run --data data/KRW-BTC_minute5.csv --data-interval minute5 \\
+        --strategy bollinger --interval minute5 --window 20 --multiplier 2 --buy-amount 10000
+
+    # 파라미터 탐색 (연속 절반 탐색, 샤프 비율 우선 정렬)
+    python backtest.py sweep --data data/KRW-BTC_minute5.csv --strategy bollinger --interval minute5 \\
+        --method halving --param window=10:40:5 --param multiplier=1.5,2,2.5,3 --objective sharpe,total_return
+"""
+import os
+import sys
+import json
+
+# 앱 임포트 시 스케줄러가 시작되어 저장된 봇이 복원되지 않도록 비활성화
+os.environ.setdefault('ENABLE_SCHEDULER', 'False')
+
+from datetime import datetime
+
+from app.backtest.data import download_ohlcv, load_ohlcv
+from app.backtest.engine import BacktestEngine
+from app.backtest.sweep import run_sweep_job, parse_param_spec
+from config import Config
+
+SETTING_KEYS = [
+    'interval', 'window', 'multiplier', 'buy_multiplier', 'sell_multiplier', 'buy_amount', 'min_cash',
+    'max_order_amount', 'sell_portion', 'prevent_loss_sale', 'long_term_investment', 'k', 'target_profit',
+    'stop_loss', 'rsi_period', 'rsi_oversold', 'rsi_overbought', 'rsi_timeframe',
+]
+
+
+def add_setting_arguments(parser):
+    """봇 설정 인자 (지정하지 않으면 봇 기본값 사용)"""
+    parser.add_argument('--interval')
+    parser.add_argument('--window', type=int)
+    parser.add_argument('--multiplier', type=float)
+    parser.add_argument('--buy-multiplier', type=float)
+    parser.add_argument('--sell-multiplier', type=float)
+    parser.add_argument('--buy-amount', type=float)
+    parser.add_argument('--min-cash', type=float)
+    parser.add_argument('--max-order-amount', type=float)
+    parser.add_argument('--sell-portion', type=float)
+    parser.add_argument('--prevent-loss-sale', choices=['Y', 'N'])
+    parser.add_argument('--long-term-investment', choices=['Y', 'N'])
+    parser.add_argument('--k', type=float)
+    parser.add_argument('--target-profit', type=float)
+    parser.add_argument('--stop-loss', type=float)
+    parser.add_argument('--rsi-period', type=int)
+    parser.add_argument('--rsi-oversold', type=float)
+    parser.add_argument('--rsi-overbought', type=float)
+    parser.add_argument('--rsi-timeframe')
+
+
+def build_settings(args):
+    """CLI 인자를 봇 설정 dict로 변환 (지정한 값만 포함)"""
+    settings = {'ticker': args.ticker, 'strategy': args.strategy}
+    for key in SETTING_KEYS:
+        value = getattr(args, key, None)
+        if value is not None:
+            settings[key] = value
+    return settings
+
+
+def run_backtest(args):
+    df = load_ohlcv(args.data)
+    engine = BacktestEngine(df, args.data_interval, build_settings(args), initial_cash=args.initial_cash,
+                            fee_rate=args.fee, slippage=args.slippage)
+    result = engine.run(mode=args.mode, start=args.start)
+
+    print(json.dumps(result.summary(), ensure_ascii=False, indent=2))
+    if args.out:
+        result.save(args.out)
+        print(f"결과 저장: {args.out}_equity.csv, {args.out}_trades.csv")
+
+
+def run_sweep(args):
+    df = load_ohlcv(args.data)
+    space = dict(parse_param_spec(spec) for spec in args.param) if args.param else None
+    sweep_id = args.id or f"{args.strategy}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+    results = run_sweep_job(
+        sweep_id, df, args.data_interval, build_settings(args), args.results_dir, top=args.top,
+        space=space, method=args.method, objective=args.objective, samples=args.samples,
+        workers=args.workers or Config.SWEEP_MAX_WORKERS or None, min_trades=args.min_trades, eta=args.eta,
+        seed=args.seed, engine_kwargs={'initial_cash': args.initial_cash, 'fee_rate': args.fee,
+                                       'slippage': args.slippage}
+    )
+
+    for rank, row in enumerate(results[:args.top], 1):
+        print(f"{rank:>3}. {row['params']} {row['scores']} (거래 {row['summary']['trades']}회)")
+    print(f"결과 저장: {args.results_dir}/{sweep_id}.json")
+
+
+def run_download(args):
+    df = download_ohlcv(args.ticker, args.interval, args.count, args.out)
+    print(f"다운로드 완료: {len(df)}개 ({df.index[0]} ~ {df.index[-1]}) → {args.out}")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='업비트 자동매매 전략 백테스트')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    download_parser = subparsers.add_parser('download', help='과거 OHLCV 다운로드')
+    download_parser.add_argument('--ticker', required=True)
+    download_parser.add_argument('--interval', default='minute5')
+    download_parser.add_argument('--count', type=int, default=105120, help='캔들 개수 (기본값: 5분봉 1년치)')
+    download_parser.add_argument('--out', required=True, help='저장할 CSV 경로')
+
+    run_parser = subparsers.add_parser('run', help='백테스트 실행')
+    run_parser.add_argument('--mode', default='vectorized', choices=['vectorized', 'replay'])
+    run_parser.add_argument('--start', type=int, default=0, help='시작 바 인덱스')
+    run_parser.add_argument('--out', help='결과 CSV 경로 접두사')
+
+    sweep_parser = subparsers.add_parser('sweep', help='파라미터 탐색')
+    sweep_parser.add_argument('--method', default='grid', choices=['grid', 'random', 'halving'])
+    sweep_parser.add_argument('--param', action='append', help='탐색 범위 (예: window=10:40:5, multiplier=1.5,2,2.5)')
+    sweep_parser.add_argument('--objective', default='total_return',
+                              help='정렬 기준 (total_return, excess_return, sharpe, calmar, win_rate / 쉼표로 복수 지정)')
+    sweep_parser.add_argument('--samples', type=int, help='random/halving 후보 수')
+    sweep_parser.add_argument('--workers', type=int, help='워커 프로세스 수 (기본값: CPU 코어 수)')
+    sweep_parser.add_argument('--min-trades', type=int, default=1, help='순위 대상 최소 거래 수')
+    sweep_parser.add_argument('--eta', type=int, default=3, help='연속 절반 탐색 감소 비율')
+    sweep_parser.add_argument('--seed', type=int)
+    sweep_parser.add_argument('--top', type=int, default=20)
+    sweep_parser.add_argument('--id', help='탐색 ID (기본값: 전략_시각)')
+    sweep_parser.add_argument('--results-dir', default=Config.SWEEP_RESULTS_DIR)
+
+    for sub in (run_parser, sweep_parser):
+        sub.add_argument('--data', required=True, help='OHLCV CSV 경로')
+        sub.add_argument('--data-interval', default='minute5', help='CSV 캔들 간격')
+        sub.add_argument('--ticker', default='KRW-BTC')
+        sub.add_argument('--strategy', default='bollinger',
+                         choices=['bollinger', 'bollinger_asymmetric', 'rsi', 'volatility', 'ensemble', 'adaptive'])
+        sub.add_argument('--initial-cash', type=float, default=1000000)
+        sub.add_argument('--fee', type=float, default=0.0005)
+        sub.add_argument('--slippage', type=float, default=0.0)
+        add_setting_arguments(sub)
+
+    args = parser.parse_args()
+    try:
+        if args.command == 'download':
+            run_download(args)
+        elif args.command == 'sweep':
+            run_sweep(args)
+        else:
+            run_backtest(args)
+    except Exception as e:
+        print(f'오류 발생: {str(e)}')
+        sys.exit(1)
@@ -0,0 +1,114 @@
+"""전략/지표/유틸리티 마이크로 벤치마크 CLI
+
+사용 예:
+    # 기준선 저장
+    python benchmark.py run --out results/benchmarks/baseline.json
+
+    # 변경 후 기준선과 비교 (지연 또는 API 호출 수 회귀 시 종료 코드 1)
+    python benchmark.py compare --baseline results/benchmarks/baseline.json
+
+    # 실제 시세 픽스처 녹화 후 전략 케이스만 측정
+    python benchmark.py record --ticker KRW-BTC --out data/bench_KRW-BTC_minute1.csv
+    python benchmark.py run --fixture data/bench_KRW-BTC_minute1.csv --case 'strategy.*'
+"""
+import os
+import sys
+
+# 앱 임포트 시 스케줄러가 시작되어 저장된 봇이 복원되지 않도록 비활성화
+os.environ.setdefault('ENABLE_SCHEDULER', 'False')
+
+from app.backtest.data import download_ohlcv
+from app.benchmark.fixtures import SYNTHETIC, DEFAULT_FIXTURE_DAYS
+from app.benchmark.runner import (run_benchmarks, save_results, load_results, compare_results, DEFAULT_REPEAT,
+                                  DEFAULT_MIN_TIME, DEFAULT_LATENCY_THRESHOLD, DEFAULT_NOISE_FLOOR_US)
+
+DEFAULT_BASELINE = os.path.join('results', 'benchmarks', 'baseline.json')
+
+
+def print_progress(name, result):
+    if 'error' in result:
+        print(f"{name:<48} 오류: {result['error']}")
+    else:
+        calls = f"  API {result['api_calls_total']:g}회" if result['api_calls'] else ''
+        print(f"{name:<48} {result['median_us']:>12,.1f} µs{calls}")
+
+
+def run_cases(args):
+    return run_benchmarks(args.case, args.fixture, args.repeat, args.min_time, progress=print_progress)
+
+
+def run_run(args):
+    results = run_cases(args)
+    if args.out:
+        save_results(results, args.out)
+        print(f"결과 저장: {args.out}")
+
+
+def run_compare(args):
+    baseline = load_results(args.baseline)
+    current = load_results(args.current) if args.current else run_cases(args)
+    if args.out:
+        save_results(current, args.out)
+
+    rows = compare_results(baseline, current, args.threshold, args.noise_floor)
+    print()
+    for row in rows:
+        if row['change'] is not None:
+            line = f"{row['baseline_us']:>12,.1f} → {row['current_us']:>12,.1f} µs ({row['change']:+.1%})"
+        else:
+            line = row.get('error', '')
+        for method, (before, after) in sorted(row['api_changes'].items()):
+            line += f"  {method} {before:g}→{after:g}"
+        print(f"[{row['status']:>10}] {row['name']:<48} {line}")
+
+    regressions = [row for row in rows if row['status'] == 'regression']
+    print(f"\n회귀 {len(regressions)}건 / 전체 {len(rows)}건")
+    if regressions:
+        sys.exit(1)
+
+
+def run_record(args):
+    df = download_ohlcv(args.ticker, 'minute1', args.days * 24 * 60, args.out)
+    print(f"픽스처 저장: {len(df)}개 ({df.index[0]} ~ {df.index[-1]}) → {args.out}")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='업비트 자동매매 마이크로 벤치마크')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='벤치마크 실행')
+    run_parser.add_argument('--out', help='결과 JSON 경로 (기준선으로 사용)')
+
+    compare_parser = subparsers.add_parser('compare', help='기준선과 비교')
+    compare_parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='기준선 JSON 경로')
+    compare_parser.add_argument('--current', help='비교할 결과 JSON (생략 시 지금 실행)')
+    compare_parser.add_argument('--out', help='이번 실행 결과 저장 경로')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_LATENCY_THRESHOLD,
+                                help='지연 회귀 판정 비율 (기본값: 0.25 = 25%%)')
+    compare_parser.add_argument('--noise-floor', type=float, default=DEFAULT_NOISE_FLOOR_US,
+                                help='회귀로 보지 않는 절대 증가량 (µs)')
+
+    for sub in (run_parser, compare_parser):
+        sub.add_argument('--case', action='append', help='케이스 이름/그룹 패턴 (예: strategy.*, utils)')
+        sub.add_argument('--fixture', default=SYNTHETIC, help="캔들 픽스처 ('synthetic' 또는 녹화한 CSV 경로)")
+        sub.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+        sub.add_argument('--min-time', type=float, default=DEFAULT_MIN_TIME, help='라운드당 최소 측정 시간 (초)')
+
+    record_parser = subparsers.add_parser('record', help='실제 1분봉 픽스처 녹화')
+    record_parser.add_argument('--ticker', default='KRW-BTC')
+    record_parser.add_argument('--days', type=int, default=DEFAULT_FIXTURE_DAYS)
+    record_parser.add_argument('--out', required=True, help='저장할 CSV 경로')
+
+    args = parser.parse_args()
+    try:
+        if args.command == 'record':
+            run_record(args)
+        elif args.command == 'compare':
+            run_compare(args)
+        else:
+            run_run(args)
+    except Exception as e:
+        print(f'오류 발생: {str(e)}')
+        sys.exit(1)
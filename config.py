@@ -5,6 +5,20 @@ basedir = os.path.abspath(os.path.dirname(__file__))
 # .env 파일에서 환경 변수 로드
 load_dotenv()
 
+# 설정하지 않은 SECRET_KEY 기본값 (공개된 값이므로 거래 엔진 제어 채널 키로 쓰지 않음)
+DEFAULT_SECRET_KEY = 'your-secret-key-here'
+
+# 거래 엔진 제어 채널이 사용할 수 있는 로컬 주소
+LOOPBACK_HOSTS = ('127.0.0.1', 'localhost', '::1')
+
+# 거래 엔진 프로세스 표시 환경 변수 (app 패키지 임포트 시 create_app()이 실행되므로
+# engine_server.py는 app 모듈을 임포트하기 전에 환경 변수로 표시합니다)
+ENGINE_PROCESS_ENV = 'UPBIT_ENGINE_PROCESS'
+
+
+def mark_engine_process(environ=os.environ):
+    environ[ENGINE_PROCESS_ENV] = '1'
+
 class Config:
     UPBIT_ACCESS_KEY = os.environ.get("UPBIT_ACCESS_KEY")
     UPBIT_SECRET_KEY = os.environ.get("UPBIT_SECRET_KEY")
@@ -16,6 +30,15 @@ class Config:
     CACHE_DURATION_OHLCV = int(os.environ.get("CACHE_DURATION_OHLCV", "60"))
     CACHE_DURATION_PRICE_AVG = int(os.environ.get("CACHE_DURATION_PRICE_AVG", "10"))
 
+    # 공유 1분봉 저장소 및 리샘플링 설정
+    CANDLE_RESAMPLE_ENABLED = os.environ.get("CANDLE_RESAMPLE_ENABLED", "True").lower() == "true"
+    CANDLE_STORE_MAX_BARS = int(os.environ.get("CANDLE_STORE_MAX_BARS", "4000"))
+    CANDLE_STORE_REFRESH_SECONDS = int(os.environ.get("CANDLE_STORE_REFRESH_SECONDS", "5"))
+    CANDLE_STORE_BACKFILL_PAGES = int(os.environ.get("CANDLE_STORE_BACKFILL_PAGES", "3"))
+
+    # 티커별 공유 호가 캐시 유지 시간 (초)
+    ORDERBOOK_CACHE_TTL = float(os.environ.get("ORDERBOOK_CACHE_TTL", "1.0"))
+
     # 텔레그램 설정
     TELEGRAM_BOT_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN")
     TELEGRAM_CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID")
@@ -35,7 +58,7 @@ class Config:
     TIMEZONE = 'Asia/Seoul'
 
     # SocketIO 설정
-    SECRET_KEY = os.environ.get('SECRET_KEY') or 'your-secret-key-here'
+    SECRET_KEY = os.environ.get('SECRET_KEY') or DEFAULT_SECRET_KEY
     SOCKETIO_ASYNC_MODE = 'threading'
     SOCKETIO_PING_TIMEOUT = 60
     SOCKETIO_PING_INTERVAL = 25
@@ -50,10 +73,136 @@ class Config:
         'max_thread_age': int(os.environ.get('MAX_THREAD_AGE_THRESHOLD', '3600'))
     }
 
+    # 앱 임포트 시 스케줄러 시작 및 봇 복원 여부 (백테스트 등 CLI 도구에서는 False)
+    ENABLE_SCHEDULER = os.environ.get('ENABLE_SCHEDULER', 'True').lower() == 'true'
+
+    # 백테스트 설정
+    BACKTEST_DATA_DIR = os.environ.get('BACKTEST_DATA_DIR', os.path.join(basedir, 'data'))
+    SWEEP_RESULTS_DIR = os.environ.get('SWEEP_RESULTS_DIR', os.path.join(basedir, 'results', 'sweeps'))
+    SWEEP_MAX_WORKERS = int(os.environ.get('SWEEP_MAX_WORKERS', '0'))  # 0: CPU 코어 수
+
+    # 트레이딩 작업 스케줄 설정 ('interval': sleep_time 주기, 'candle_close': 캔들 마감 직후 신호 평가)
+    SCHEDULER_TRIGGER_MODE = os.environ.get('SCHEDULER_TRIGGER_MODE', 'interval')
+    CANDLE_CLOSE_DELAY_SECONDS = int(os.environ.get('CANDLE_CLOSE_DELAY_SECONDS', '3'))
+
+    # 트레이딩 작업 실행 방식 ('engine': 틱마다 실행 시점이 된 봇을 모아 일괄 실행, 'apscheduler': 봇마다 개별 작업)
+    SCHEDULER_BACKEND = os.environ.get('SCHEDULER_BACKEND', 'apscheduler')
+    ENGINE_TICK_SECONDS = int(os.environ.get('ENGINE_TICK_SECONDS', '1'))
+    ENGINE_MAX_WORKERS = int(os.environ.get('ENGINE_MAX_WORKERS', '20'))
+    # 엔진 타이밍 휠 (단계당 슬롯 수, 단계 수 - 기본 64^4틱 범위, 넘는 타이머는 넘침 목록에서 대기)
+    ENGINE_WHEEL_SLOTS = int(os.environ.get('ENGINE_WHEEL_SLOTS', '64'))
+    ENGINE_WHEEL_LEVELS = int(os.environ.get('ENGINE_WHEEL_LEVELS', '4'))
+
+    # 거래 엔진 실행 위치 ('embedded': 웹 프로세스에서 실행, 'process': engine_server.py 별도 프로세스에서 실행)
+    ENGINE_MODE = os.environ.get('ENGINE_MODE', 'embedded')
+    ENGINE_IPC_HOST = os.environ.get('ENGINE_IPC_HOST', '127.0.0.1')
+    ENGINE_IPC_PORT = int(os.environ.get('ENGINE_IPC_PORT', '5100'))
+    ENGINE_IPC_AUTHKEY = os.environ.get('ENGINE_IPC_AUTHKEY', '')  # process 모드 필수 (SECRET_KEY와 다른 값)
+    ENGINE_IPC_TIMEOUT = int(os.environ.get('ENGINE_IPC_TIMEOUT', '10'))
+    ENGINE_LOG_BUFFER = int(os.environ.get('ENGINE_LOG_BUFFER', '1000'))
+    WEB_WORKERS = int(os.environ.get('WEB_WORKERS', '1'))  # process 모드에서만 적용
+
+    # 거래 엔진 샤드 설정 (process 모드에서 봇을 ENGINE_SHARDS개 프로세스에 사용자/티커 해시로 분산, 1이면 분산 안 함)
+    ENGINE_SHARDS = int(os.environ.get('ENGINE_SHARDS', '1'))
+    ENGINE_SHARD_KEY = os.environ.get('ENGINE_SHARD_KEY', 'user')  # 'user' / 'ticker'
+    ENGINE_SHARD_CHECK_SECONDS = int(os.environ.get('ENGINE_SHARD_CHECK_SECONDS', '5'))
+    ENGINE_SHARD_MAX_RESTARTS = int(os.environ.get('ENGINE_SHARD_MAX_RESTARTS', '5'))  # 재시작 기간 내 최대 재시작 수
+    ENGINE_SHARD_RESTART_WINDOW = int(os.environ.get('ENGINE_SHARD_RESTART_WINDOW', '600'))
+    ENGINE_SHARD_IMBALANCE = int(os.environ.get('ENGINE_SHARD_IMBALANCE', '3'))  # 샤드 간 봇 수 차이 허용치
+
+    # 사이클 지표 설정 (최근 몇 사이클로 지연 분포를 계산할지, 전체/작업별)
+    METRICS_WINDOW = int(os.environ.get('METRICS_WINDOW', '2000'))
+    METRICS_JOB_WINDOW = int(os.environ.get('METRICS_JOB_WINDOW', '200'))
+
+    # API 실행 레인 설정 (주문/손절·익절 체크는 order 레인, 앙상블/코인 추천 분석은 analysis 레인, 호출 한도: 초당 횟수)
+    EXECUTION_LANES_ENABLED = os.environ.get('EXECUTION_LANES_ENABLED', 'True').lower() == 'true'
+    ORDER_LANE_WORKERS = int(os.environ.get('ORDER_LANE_WORKERS', '4'))
+    ORDER_LANE_RATE = float(os.environ.get('ORDER_LANE_RATE', '8'))  # 업비트 주문 API 초당 8회
+    ORDER_LANE_MAX_RETRIES = int(os.environ.get('ORDER_LANE_MAX_RETRIES', '3'))
+    ORDER_LANE_RETRY_DELAY = float(os.environ.get('ORDER_LANE_RETRY_DELAY', '0.2'))
+    ANALYSIS_LANE_WORKERS = int(os.environ.get('ANALYSIS_LANE_WORKERS', '3'))
+    ANALYSIS_LANE_RATE = float(os.environ.get('ANALYSIS_LANE_RATE', '4'))
+    ANALYSIS_LANE_MAX_YIELD = float(os.environ.get('ANALYSIS_LANE_MAX_YIELD', '2'))  # order 레인 처리 중 양보 최대 시간(초)
+
+    # 사용자별 주문 큐 설정 (주문 차례 대기 시간(초), 응답 없는 주문의 접수 시도 횟수 - 재접수 전 identifier로 조회)
+    ORDER_QUEUE_TIMEOUT = float(os.environ.get('ORDER_QUEUE_TIMEOUT', '30'))
+    ORDER_SUBMIT_ATTEMPTS = int(os.environ.get('ORDER_SUBMIT_ATTEMPTS', '3'))
+
+    # 사용자별 공정 분배 설정 (사용자별 동시 실행 봇 수 상한, DRR 라운드당 API 호출 몫, 가중치 '사용자ID:가중치,...',
+    # 사용자별 API 호출 점유율 집계 구간(초))
+    FAIR_SHARE_ENABLED = os.environ.get('FAIR_SHARE_ENABLED', 'True').lower() == 'true'
+    FAIR_SHARE_USER_MAX_CONCURRENCY = int(os.environ.get('FAIR_SHARE_USER_MAX_CONCURRENCY', '5'))
+    FAIR_SHARE_QUANTUM = float(os.environ.get('FAIR_SHARE_QUANTUM', '3'))
+    FAIR_SHARE_WEIGHTS = os.environ.get('FAIR_SHARE_WEIGHTS', '')
+    FAIR_SHARE_WINDOW = int(os.environ.get('FAIR_SHARE_WINDOW', '60'))
+
+    # 봇 실행 위상 배정 설정 (예상 부하 계산 구간(초), 측정 전 사이클당 예상 API 호출 수,
+    # 작업 추가/제거 후 재배치까지 대기 시간(초), 재배치를 적용할 최소 최대 부하 감소율)
+    PHASE_PLAN_ENABLED = os.environ.get('PHASE_PLAN_ENABLED', 'True').lower() == 'true'
+    PHASE_PLAN_HORIZON = int(os.environ.get('PHASE_PLAN_HORIZON', '3600'))
+    PHASE_DEFAULT_COST = float(os.environ.get('PHASE_DEFAULT_COST', '2'))
+    PHASE_REPLAN_DELAY = int(os.environ.get('PHASE_REPLAN_DELAY', '30'))
+    PHASE_REPLAN_MIN_GAIN = float(os.environ.get('PHASE_REPLAN_MIN_GAIN', '0.2'))
+
+    # API 호출 한도 기반 부하 차단 설정 (초당 호출 한도, 집계 구간(초), shed 단계 사용률, shed 단계 대기 시간(초, 두 배면 stretch),
+    # stretch 단계에서 신호 분석을 실행할 사이클 간격, 판단 주기(초), 단계를 내리기 전 연속 확인 횟수)
+    LOAD_SHED_ENABLED = os.environ.get('LOAD_SHED_ENABLED', 'False').lower() == 'true'
+    API_RATE_BUDGET = float(os.environ.get('API_RATE_BUDGET', '10'))
+    LOAD_SHED_WINDOW = int(os.environ.get('LOAD_SHED_WINDOW', '10'))
+    LOAD_SHED_BUDGET_RATIO = float(os.environ.get('LOAD_SHED_BUDGET_RATIO', '0.8'))
+    LOAD_SHED_LAG_SECONDS = float(os.environ.get('LOAD_SHED_LAG_SECONDS', '5'))
+    LOAD_SHED_LAG_EVENTS = int(os.environ.get('LOAD_SHED_LAG_EVENTS', '3'))
+    LOAD_SHED_STRETCH_FACTOR = int(os.environ.get('LOAD_SHED_STRETCH_FACTOR', '3'))
+    LOAD_SHED_CHECK_SECONDS = int(os.environ.get('LOAD_SHED_CHECK_SECONDS', '10'))
+    LOAD_SHED_RECOVER_CHECKS = int(os.environ.get('LOAD_SHED_RECOVER_CHECKS', '3'))
+
+    # 변동성 기반 봇 실행 간격 조정 설정 (간격은 sleep_time 기준 MIN~MAX 범위, 히스테리시스 비율)
+    CADENCE_ENABLED = os.environ.get('CADENCE_ENABLED', 'False').lower() == 'true'
+    CADENCE_UPDATE_SECONDS = int(os.environ.get('CADENCE_UPDATE_SECONDS', '300'))
+    CADENCE_MIN_SECONDS = int(os.environ.get('CADENCE_MIN_SECONDS', '30'))
+    CADENCE_MAX_SECONDS = int(os.environ.get('CADENCE_MAX_SECONDS', '300'))
+    CADENCE_HYSTERESIS = float(os.environ.get('CADENCE_HYSTERESIS', '0.2'))
+
     # 스레드 풀 설정
     MAX_WORKERS = int(os.environ.get('MAX_WORKERS', '5'))
     THREAD_NAME_PREFIX = os.environ.get('THREAD_NAME_PREFIX', 'AsyncWorker')
 
+    # 앙상블 전략 병렬 실행 설정
+    ENSEMBLE_MAX_WORKERS = int(os.environ.get('ENSEMBLE_MAX_WORKERS', '8'))
+    ENSEMBLE_TIMEOUT = int(os.environ.get('ENSEMBLE_TIMEOUT', '30'))
+
+    # 거래 사이클 데이터 선조회 설정 (전략별 데이터 요구 목록을 신호 계산 전에 동시 조회)
+    PREFETCH_ENABLED = os.environ.get('PREFETCH_ENABLED', 'True').lower() == 'true'
+    PREFETCH_MAX_WORKERS = int(os.environ.get('PREFETCH_MAX_WORKERS', '8'))
+    PREFETCH_TIMEOUT = int(os.environ.get('PREFETCH_TIMEOUT', '10'))
+
+    # 변동성 돌파 일일 기준값 설정 (09:00 일봉 리셋 후 계산 지연, 일봉 수정 확인 시점)
+    DAILY_LEVELS_PATH = os.environ.get('DAILY_LEVELS_PATH', os.path.join(basedir, 'data', 'daily_levels.json'))
+    DAILY_LEVELS_DELAY_SECONDS = int(os.environ.get('DAILY_LEVELS_DELAY_SECONDS', '10'))
+    DAILY_LEVELS_VERIFY_MINUTES = int(os.environ.get('DAILY_LEVELS_VERIFY_MINUTES', '5'))
+
+    # 트레일링 스톱 최고가 추적 설정 (새 고점은 SAVE_SECONDS 간격으로 모아서 저장)
+    HIGH_WATER_MARK_PATH = os.environ.get('HIGH_WATER_MARK_PATH', os.path.join(basedir, 'data', 'high_water_marks.json'))
+    HIGH_WATER_MARK_SAVE_SECONDS = int(os.environ.get('HIGH_WATER_MARK_SAVE_SECONDS', '10'))
+
+    # 포지션 원장 설정 (잔고/평균 매수가를 원장에서 읽고 계좌 조회는 대조 주기에만 수행)
+    LEDGER_ENABLED = os.environ.get('LEDGER_ENABLED', 'False').lower() == 'true'
+    LEDGER_RECONCILE_SECONDS = int(os.environ.get('LEDGER_RECONCILE_SECONDS', '60'))
+    LEDGER_FILL_RECONCILE_SECONDS = int(os.environ.get('LEDGER_FILL_RECONCILE_SECONDS', '1'))
+    LEDGER_SNAPSHOT_PATH = os.environ.get('LEDGER_SNAPSHOT_PATH', os.path.join(basedir, 'data', 'position_ledger.json'))
+    LEDGER_SAVE_SECONDS = int(os.environ.get('LEDGER_SAVE_SECONDS', '10'))
+
+    # 티커 간 배치 볼린저 평가 설정
+    BATCH_EVAL_ENABLED = os.environ.get('BATCH_EVAL_ENABLED', 'True').lower() == 'true'
+    BATCH_EVAL_TTL = int(os.environ.get('BATCH_EVAL_TTL', '5'))
+    BATCH_EVAL_MEMBER_TTL = int(os.environ.get('BATCH_EVAL_MEMBER_TTL', '600'))
+    BATCH_EVAL_FAILURE_TTL = int(os.environ.get('BATCH_EVAL_FAILURE_TTL', '60'))  # 조회 실패 티커를 그룹 평가에서 뺄 시간(초)
+
+    # 사용자 간 신호 공유 버스 설정
+    SIGNAL_BUS_ENABLED = os.environ.get('SIGNAL_BUS_ENABLED', 'True').lower() == 'true'
+    SIGNAL_BUS_TICK_SECONDS = int(os.environ.get('SIGNAL_BUS_TICK_SECONDS', '5'))
+    SIGNAL_BUS_SUBSCRIBER_TTL = int(os.environ.get('SIGNAL_BUS_SUBSCRIBER_TTL', '600'))
+
     # MCP 서버 관련 설정 추가
     MCP_SERVER_HOST = os.environ.get('MCP_SERVER_HOST', '0.0.0.0')
     MCP_SERVER_PORT = int(os.environ.get('MCP_SERVER_PORT', 5001))
@@ -61,4 +210,16 @@ class Config:
     MCP_AUTH_TOKEN = os.environ.get('MCP_AUTH_TOKEN', 'mcp-auth-token-2025')
 
 
+def engine_ipc_error():
+    """거래 엔진 제어 채널 설정 오류 메시지 (문제 없으면 None)
 
+    제어 채널(multiprocessing.connection)은 pickle로 메시지를 주고받으므로 키를 아는 쪽은 엔진 프로세스(사용자 API 키 보관)에
+    임의의 객체를 보낼 수 있습니다. 명시적으로 설정한 키와 로컬 주소만 허용합니다.
+    """
+    if not Config.ENGINE_IPC_AUTHKEY:
+        return "ENGINE_IPC_AUTHKEY를 설정해야 합니다"
+    if Config.ENGINE_IPC_AUTHKEY in (Config.SECRET_KEY, DEFAULT_SECRET_KEY):
+        return "ENGINE_IPC_AUTHKEY는 SECRET_KEY와 다른 값이어야 합니다"
+    if Config.ENGINE_IPC_HOST not in LOOPBACK_HOSTS:
+        return f"ENGINE_IPC_HOST는 로컬 주소({', '.join(LOOPBACK_HOSTS)})만 사용할 수 있습니다"
+    return None
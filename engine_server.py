@@ -0,0 +1,164 @@
+# engine_server.py
+"""
+거래 엔진 프로세스
+
+ENGINE_MODE=process 설정 시 스케줄러/봇/시세 데이터를 웹 서버(gunicorn)와 분리해 이 프로세스에서 실행합니다.
+웹 워커는 로컬 제어 채널(ENGINE_IPC_HOST:ENGINE_IPC_PORT)로 봇 시작/중지/상태 조회를 요청하고
+봇 로그를 스트림으로 받아 WebSocket으로 전달하므로, 웹 워커 수(WEB_WORKERS)를 늘려도 봇은 한 번만 실행됩니다.
+
+ENGINE_SHARDS > 1이면 이 프로세스는 코디네이터로 실행되어 봇을 샤드 프로세스(같은 스크립트)에 나눠 배치하고
+샤드들이 사용할 공유 시세를 조회합니다 (app.utils.engine_shards 참고).
+
+실행:
+    python engine_server.py
+    gunicorn -c gunicorn_config.py app:app
+"""
+import os
+import signal
+import sys
+import threading
+
+# 프로젝트 루트 추가
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import Config, engine_ipc_error, mark_engine_process
+
+# embedded 모드에서는 웹 프로세스가 봇을 실행하므로 앱 임포트(봇 복원) 전에 중단 (봇 중복 실행 방지)
+if Config.ENGINE_MODE != 'process':
+    sys.exit("ENGINE_MODE=process 에서만 실행할 수 있습니다 (embedded 모드에서는 웹 프로세스가 봇을 실행).")
+
+# 제어 채널 키/주소가 안전하지 않으면 봇(사용자 API 키)을 불러오기 전에 중단
+if engine_ipc_error():
+    sys.exit(f"거래 엔진 제어 채널 설정 오류: {engine_ipc_error()}")
+
+# 샤드를 사용하면 직접 실행한 프로세스는 코디네이터 (샤드 프로세스는 코디네이터가 UPBIT_ENGINE_SHARD를 설정해 실행)
+COORDINATOR = Config.ENGINE_SHARDS > 1 and 'UPBIT_ENGINE_SHARD' not in os.environ
+
+# app 패키지 임포트(스케줄러 시작/봇 복원) 전에 엔진 프로세스로 표시 (코디네이터는 봇을 실행하지 않음)
+if not COORDINATOR:
+    mark_engine_process()
+
+from app import app, db
+from app.models import User
+from app.routes import start_bot, stop_bot, build_scheduler_status, build_scheduler_metrics, export_user_bots
+from app.utils.engine_ipc import EngineServer
+from app.utils.engine_shards import ShardCoordinator, current_shard, shard_address
+from app.utils.high_water_mark import high_water_marks
+from app.utils.load_shedder import load_shedder
+from app.utils.market_hub import MarketDataHub
+from app.utils.position_ledger import position_ledgers
+from app.utils.scheduler_manager import scheduler_manager
+from app.utils.shared import scheduled_bots
+
+
+def _in_app_context(func):
+    """제어 명령을 앱 컨텍스트에서 실행 (요청마다 DB 세션 정리)"""
+    def wrapper(**kwargs):
+        with app.app_context():
+            try:
+                return func(**kwargs)
+            finally:
+                db.session.remove()
+    return wrapper
+
+
+def _wait_for_signal():
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+    stop_event.wait()
+
+
+def handle_start(user_id, ticker, strategy_name, settings):
+    user = User.query.get(user_id)
+    if user is None:
+        raise ValueError(f"사용자를 찾을 수 없습니다: {user_id}")
+    # 다른 샤드에서 옮겨 온 봇이면 그 샤드가 저장한 최고가로 이어서 추적
+    high_water_marks.reload()
+    job_id = start_bot(ticker, strategy_name, settings, user=user)
+    if job_id is None:
+        raise RuntimeError(f"봇 시작에 실패했습니다: {ticker}")
+    return job_id
+
+
+def handle_stop(user_id, ticker):
+    stopped = stop_bot(user_id, ticker)
+    # 다른 샤드로 옮겨 가는 봇이 최고가/원장을 이어받도록 바로 저장
+    high_water_marks.flush()
+    position_ledgers.save(force=True)
+    if not scheduled_bots.get(user_id):
+        position_ledgers.release(user_id)
+    return stopped
+
+
+def handle_bots(user_id=None):
+    if user_id is None:
+        return {uid: export_user_bots(uid) for uid in list(scheduled_bots)}
+    return export_user_bots(user_id)
+
+
+def run_engine():
+    """봇 실행 엔진 (단일 엔진 또는 샤드)"""
+    shard = current_shard()
+    server = EngineServer({
+        'ping': lambda: shard,
+        'start': _in_app_context(handle_start),
+        'stop': _in_app_context(handle_stop),
+        'status': _in_app_context(lambda: dict(build_scheduler_status(), engine_ipc=server.get_stats())),
+        'bots': _in_app_context(handle_bots),
+        'metrics': build_scheduler_metrics,
+        'load_shed': load_shedder.get_stats,
+    }, address=shard_address(shard) if shard is not None else None)
+
+    server.start()
+    app.logger.info(f"거래 엔진 프로세스 시작 (pid {os.getpid()}"
+                    f"{f', 샤드 {shard}' if shard is not None else ''})")
+    _wait_for_signal()
+
+    server.close()
+    scheduler_manager.shutdown()
+    app.logger.info("거래 엔진 프로세스 종료")
+
+
+def run_coordinator():
+    """샤드 코디네이터 (봇 배치/장애 복구 및 공유 시세 제공)"""
+    hub = MarketDataHub()
+    coordinator = ShardCoordinator()
+    server = EngineServer({
+        'ping': lambda: None,
+        'start': coordinator.start_bot,
+        'stop': coordinator.stop_bot,
+        'status': lambda: dict(coordinator.status(), engine_ipc=server.get_stats(), market_hub=hub.get_stats()),
+        'bots': coordinator.user_bots,
+        'metrics': coordinator.metrics,
+        'load_shed': coordinator.load_shed,
+        'rebalance': coordinator.rebalance,
+        'market': hub.fetch,
+        'prices': hub.current_prices,
+    })
+
+    # 샤드가 봇 복원 직후부터 공유 시세를 조회하므로 제어 채널을 먼저 시작
+    server.start()
+    coordinator.start()
+    app.logger.info(f"거래 엔진 코디네이터 시작 (pid {os.getpid()}, 샤드 {len(coordinator.shards)}개)")
+    _wait_for_signal()
+
+    coordinator.close()
+    server.close()
+    app.logger.info("거래 엔진 코디네이터 종료")
+
+
+def main():
+    if not Config.ENABLE_SCHEDULER:
+        print("ENABLE_SCHEDULER=False 설정으로 스케줄러가 시작되지 않았습니다.")
+        return 1
+
+    if COORDINATOR:
+        run_coordinator()
+    else:
+        run_engine()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,10 +2,15 @@
 import multiprocessing
 import os
 from app.utils.scheduler_manager import scheduler_manager
+from config import Config
+
+# 거래 엔진을 별도 프로세스(engine_server.py)로 실행하면 웹 워커는 봇을 실행하지 않음
+ENGINE_PROCESS_MODE = Config.ENGINE_MODE == 'process'
 
 # 기본 설정
 bind = "0.0.0.0:5000"
-workers = 1  # 중요: 스케줄러를 위해 단일 워커 사용
+# 중요: 스케줄러가 웹 프로세스에 내장된 경우 단일 워커 사용 (봇 중복 실행 방지)
+workers = Config.WEB_WORKERS if ENGINE_PROCESS_MODE else 1
 worker_class = "eventlet"
 worker_connections = 1000
 max_requests = 1000
@@ -26,6 +31,9 @@ pidfile = "gunicorn.pid"
 # 스케줄러 관리 함수들
 def when_ready(server):
     """Gunicorn 서버가 준비되면 스케줄러 시작"""
+    if ENGINE_PROCESS_MODE:
+        server.log.info(f"거래 엔진은 별도 프로세스에서 실행 (웹 워커 {workers}개)")
+        return
     try:
         scheduler_manager.start()
         server.log.info("APScheduler 시작됨 (Gunicorn)")
@@ -34,6 +42,8 @@ def when_ready(server):
 
 def on_exit(server):
     """Gunicorn 서버 종료 시 스케줄러 정리"""
+    if ENGINE_PROCESS_MODE:
+        return
     try:
         scheduler_manager.shutdown()
         server.log.info("APScheduler 종료됨 (Gunicorn)")
@@ -16,6 +16,7 @@ from mcp.server.models import InitializationOptions
 
 # Your app imports
 from app.models import User, TradeRecord, TradingFavorite
+from app.utils.position_ledger import load_ledger_snapshot
 from app import create_app, db
 import pyupbit
 
@@ -205,6 +206,22 @@ async def get_portfolio_status(user_id: int = 1) -> str:
                 ]
             }
 
+            # 웹 앱이 저장한 포지션 원장 (업비트 API 호출 없음)
+            ledger = load_ledger_snapshot(user_id)
+            if ledger:
+                result["cash"] = f"{ledger['cash']:,.0f}원"
+                result["positions"] = [
+                    {
+                        "ticker": ticker,
+                        "quantity": position['quantity'],
+                        "avg_price": f"{position['avg_price']:,}원",
+                        "peak": f"{position['peak']:,}원" if position.get('peak') else None,
+                        "realized_pnl": f"{position['realized_pnl']:,.0f}원"
+                    } for ticker, position in ledger['positions'].items()
+                ]
+                result["realized_pnl"] = f"{sum(ledger['realized_pnl'].values()):,.0f}원"
+                result["ledger_synced_at"] = ledger['synced_at']
+
             return json.dumps(result, ensure_ascii=False, indent=2)
 
     except Exception as e:
@@ -0,0 +1,18 @@
+"""
+pytest 공통 설정
+
+app 패키지는 임포트할 때 create_app()을 실행하므로 테스트용 환경 변수(메모리 DB, 스케줄러 비활성화)를 먼저 설정합니다.
+"""
+import os
+import sys
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+os.environ.setdefault('ENCRYPTION_KEY', 'test-encryption-key')
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+os.environ['ENABLE_SCHEDULER'] = 'False'
+
+# 업비트/텔레그램에 직접 요청하는 수동 실행 스크립트는 수집하지 않음
+collect_ignore = ['test.py', 'sudden_drop_test.py', 'test_telegram.py', 'file_downloader.py',
+                  'webfont_download_script.py']
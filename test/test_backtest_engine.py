@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.backtest.data import MarketData
+from app.backtest.engine import BacktestEngine
+from app.backtest.simulated_api import SimulatedUpbitAPI
+
+
+def sine_ohlcv(periods, amplitude=0.1, cycle=60):
+    """5분봉 사인파 시세 (cycle 바 주기, 기준가 100,000원)"""
+    index = pd.date_range('2024-01-01 09:00', periods=periods, freq='5min')
+    close = 100000 * (1 + amplitude * np.sin(np.arange(periods) * 2 * np.pi / cycle))
+    return pd.DataFrame({'open': close, 'high': close * 1.001, 'low': close * 0.999, 'close': close,
+                         'volume': np.ones(periods)}, index=index)
+
+
+def test_simulated_orders_apply_fees_and_average_price():
+    df = pd.DataFrame({'open': [100.0, 200.0], 'high': [100.0, 200.0], 'low': [100.0, 200.0],
+                       'close': [100.0, 200.0], 'volume': [1.0, 1.0]},
+                      index=pd.date_range('2024-01-01 09:00', periods=2, freq='5min'))
+    api = SimulatedUpbitAPI(MarketData(df, 'minute5'), 'KRW-BTC', 100000, fee_rate=0.001)
+
+    api.order_buy_market('KRW-BTC', 10000)
+    assert api.cash == pytest.approx(100000 - 10000 - 10)
+    assert api.coin == pytest.approx(100)
+
+    api.set_cursor(1)
+    api.order_buy_market('KRW-BTC', 20000)
+    assert api.avg_price == pytest.approx(150)  # 100원 100개 + 200원 100개
+
+    api.order_sell_market('KRW-BTC', api.coin)
+    assert api.coin == 0
+    assert api.get_buy_avg('KRW-BTC') == 0
+    assert api.trades[-1]['profit_loss'] == pytest.approx(100 / 3)
+    assert api.cash == pytest.approx(100000 - 10010 - 20020 + 40000 - 40)
+
+
+def test_higher_interval_values_wait_for_candle_close():
+    data = MarketData(sine_ohlcv(6), 'minute5')  # 09:00 ~ 09:25
+
+    # 15분봉 09:00 캔들은 09:10 바가 끝나는 09:15에 마감
+    assert data.closed_positions('minute15').tolist() == [-1, -1, 0, 0, 0, 1]
+    aligned = data.align(data.bars('minute15')['close'].to_numpy(), 'minute15')
+    assert np.isnan(aligned[:2]).all()
+    assert aligned[2] == data.close[2]
+
+
+def test_bollinger_run_accounts_equity_and_trades():
+    df = sine_ohlcv(1000)
+    result = BacktestEngine(df, 'minute5', {'strategy': 'bollinger', 'buy_amount': 100000}).run(start=100)
+    summary = result.summary()
+    trades = result.trades
+
+    assert summary['bars'] == 900
+    assert summary['buys'] > 0 and summary['sells'] > 0
+    assert summary['trades'] == len(trades)
+    assert summary['fees'] == pytest.approx(trades['fee'].sum(), abs=0.01)
+
+    # 마지막 자산 = 마지막 체결 후 현금 + 코인 평가액
+    last = trades.iloc[-1]
+    assert result.equity.iloc[-1] == pytest.approx(last['cash_after'] + last['coin_after'] * df['close'].iloc[-1])
+
+    # prevent_loss_sale='Y'(기본값)이면 손실 매도 없음
+    assert (trades.loc[trades['side'] == 'SELL', 'profit_loss'] > 0).all()
+
+
+def test_replay_matches_vectorized():
+    df = sine_ohlcv(300)
+    settings = {'strategy': 'bollinger', 'buy_amount': 100000}
+
+    vectorized = BacktestEngine(df, 'minute5', settings).run(start=100)
+    replay = BacktestEngine(df, 'minute5', settings).run(mode='replay', start=100)
+
+    assert len(vectorized.trades) > 0
+    pd.testing.assert_frame_equal(vectorized.trades, replay.trades)
+    pd.testing.assert_series_equal(vectorized.equity, replay.equity)
+
+
+def test_unknown_mode_raises():
+    with pytest.raises(ValueError):
+        BacktestEngine(sine_ohlcv(10), 'minute5', {}).run(mode='live')
@@ -0,0 +1,63 @@
+import pytest
+
+from app.bot.bot_config import (BollingerBotConfig, BotConfig, RsiBotConfig, VolatilityBotConfig,
+                                compile_bot_config)
+
+
+class Field:
+    """WTForms 필드처럼 .data로 값을 노출"""
+
+    def __init__(self, data):
+        self.data = data
+
+
+def test_strategy_selects_config_class():
+    assert type(compile_bot_config({'ticker': 'KRW-BTC'})) is BollingerBotConfig
+    assert type(compile_bot_config({'ticker': 'KRW-BTC', 'strategy': 'bollinger_asymmetric'})) is BollingerBotConfig
+    assert type(compile_bot_config({'ticker': 'KRW-BTC', 'strategy': 'volatility'})) is VolatilityBotConfig
+    assert type(compile_bot_config({'ticker': 'KRW-BTC', 'strategy': 'rsi'})) is RsiBotConfig
+    assert type(compile_bot_config({'ticker': 'KRW-BTC', 'strategy': 'ensemble'})) is BotConfig
+
+
+def test_values_are_converted_and_defaulted():
+    config = compile_bot_config({'ticker': ' KRW-ETH ', 'buy_amount': '10000.0', 'sell_portion': '0.5',
+                                 'prevent_loss_sale': 'n', 'window': '', 'multiplier': 2.5})
+    assert config.ticker == 'KRW-ETH'
+    assert config.buy_amount == 10000
+    assert config.sell_portion == 0.5
+    assert config.prevent_loss_sale == 'N'
+    assert config.window == 20  # 빈 값은 기본값
+    assert config.multiplier == 2.5
+    assert config.sleep_time == 60
+
+
+def test_form_fields_and_objects_are_read():
+    class Form:
+        ticker = Field('KRW-XRP')
+        strategy = Field('volatility')
+        k = Field('0.7')
+
+    config = compile_bot_config(Form())
+    assert (config.ticker, config.k, config.target_profit) == ('KRW-XRP', 0.7, 3.0)
+
+
+def test_invalid_values_are_reported_together():
+    with pytest.raises(ValueError) as excinfo:
+        compile_bot_config({'buy_amount': -1, 'long_term_investment': 'maybe'})
+    message = str(excinfo.value)
+    assert 'ticker' in message
+    assert 'buy_amount' in message
+    assert 'long_term_investment' in message
+
+
+def test_rsi_thresholds_are_validated():
+    with pytest.raises(ValueError):
+        compile_bot_config({'ticker': 'KRW-BTC', 'strategy': 'rsi', 'rsi_oversold': 70, 'rsi_overbought': 30})
+
+
+def test_config_is_read_only_and_compiled_once():
+    config = compile_bot_config({'ticker': 'KRW-BTC'})
+    with pytest.raises(AttributeError):
+        config.ticker = 'KRW-ETH'
+    assert compile_bot_config(config) is config
+    assert config.to_dict()['ticker'] == 'KRW-BTC'
@@ -0,0 +1,77 @@
+from app.utils.fair_share import FairShareScheduler, parse_weights
+
+
+def entries(user_id, count):
+    return [{'user_id': user_id, 'name': f"{user_id}{n}"} for n in range(1, count + 1)]
+
+
+def names(chosen):
+    return [entry['name'] for entry in chosen]
+
+
+def make_scheduler(max_concurrency=10, weights=None):
+    return FairShareScheduler(max_concurrency=max_concurrency, quantum=1, weights=weights or {}, window=60)
+
+
+def test_round_robin_between_users():
+    scheduler = make_scheduler()
+    scheduler.enqueue(entries('a', 5))
+    scheduler.enqueue(entries('b', 1))
+
+    # 봇이 많은 사용자가 먼저 들어왔어도 라운드마다 한 개씩 번갈아 실행
+    assert names(scheduler.select(3)) == ['a1', 'b1', 'a2']
+    assert scheduler.queued == 3
+
+
+def test_weight_scales_share_per_round():
+    scheduler = make_scheduler(weights={'a': 2})
+    scheduler.enqueue(entries('a', 5))
+    scheduler.enqueue(entries('b', 5))
+
+    assert names(scheduler.select(6)) == ['a1', 'a2', 'b1', 'a3', 'a4', 'b2']
+
+
+def test_deficit_accumulates_for_expensive_bots():
+    scheduler = make_scheduler()
+    # 사용자 a의 봇은 사이클당 API 호출 4회
+    scheduler.record_api_call('a', 4)
+    scheduler.finish('a')
+    scheduler.enqueue(entries('a', 3))
+    scheduler.enqueue(entries('b', 5))
+
+    # a는 라운드마다 몫 1을 모아 4가 되었을 때 한 번 실행
+    assert names(scheduler.select(4)) == ['b1', 'b2', 'b3', 'a1']
+
+
+def test_capped_user_is_skipped():
+    scheduler = make_scheduler(max_concurrency=1)
+    scheduler.enqueue(entries('a', 3))
+    scheduler.enqueue(entries('b', 1))
+
+    assert names(scheduler.select(3)) == ['a1', 'b1']
+    # 모든 사용자가 상한이면 빈 자리가 있어도 선택하지 않음
+    assert scheduler.select(3) == []
+
+    scheduler.finish('a')
+    assert names(scheduler.select(3)) == ['a2']
+    assert scheduler.get_stats()['users']['a']['capped'] >= 1
+
+
+def test_limit_skips_run_when_capped():
+    scheduler = make_scheduler(max_concurrency=1)
+    scheduler.enqueue(entries('a', 1))
+    scheduler.select(1)
+
+    calls = []
+    job = scheduler.limit('a', lambda: calls.append('run') or 'done')
+    assert job() is None
+    assert calls == []
+
+    scheduler.finish('a')
+    assert job() == 'done'
+    assert calls == ['run']
+    assert scheduler.get_stats()['skipped_runs'] == 1
+
+
+def test_parse_weights_ignores_invalid_items():
+    assert parse_weights('1:2, 2:0, x:3, 4') == {1: 2.0, 2: 0.1}
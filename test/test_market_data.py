@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+from app.utils.market_data import CandleStore, candle_close_cron_fields, resample_ohlcv
+
+
+def minute1_frame(start, periods):
+    """pyupbit 형식 1분봉 (KST naive 인덱스, 종가는 0부터 1씩 증가)"""
+    index = pd.date_range(start, periods=periods, freq='1min')
+    close = np.arange(periods, dtype=float)
+    return pd.DataFrame({'open': close, 'high': close + 0.5, 'low': close - 0.5, 'close': close,
+                         'volume': np.ones(periods), 'value': close}, index=index)
+
+
+def test_resample_aligns_minute240_to_upbit_boundaries():
+    df = minute1_frame('2024-01-01 00:00', 24 * 60)
+    resampled = resample_ohlcv(df, 'minute240')
+
+    # 업비트 240분봉은 UTC 기준이므로 KST 01/05/09/13/17/21시에 시작
+    assert [ts.hour for ts in resampled.index] == [21, 1, 5, 9, 13, 17, 21]
+    bar = resampled.loc['2024-01-01 01:00']
+    assert bar['open'] == 60  # 01:00 1분봉
+    assert bar['close'] == 60 + 239  # 04:59 1분봉
+    assert bar['high'] == 299.5
+    assert bar['low'] == 59.5
+    assert bar['volume'] == 240
+    assert bar['value'] == sum(range(60, 300))
+
+
+def test_resample_minute_bars_use_clock_boundaries():
+    df = minute1_frame('2024-01-01 08:57', 20)  # 08:57 ~ 09:16
+    minute5 = resample_ohlcv(df, 'minute5')
+    assert list(minute5.index.strftime('%H:%M')) == ['08:55', '09:00', '09:05', '09:10', '09:15']
+    assert minute5.loc['2024-01-01 09:00', 'open'] == 3
+    assert minute5.loc['2024-01-01 09:00', 'close'] == 7
+
+    minute60 = resample_ohlcv(df, 'minute60')
+    assert list(minute60.index.strftime('%H:%M')) == ['08:00', '09:00']
+
+
+def test_resample_skips_intervals_without_trades():
+    df = minute1_frame('2024-01-01 09:00', 10).drop(pd.date_range('2024-01-01 09:03', periods=3, freq='1min'))
+    minute3 = resample_ohlcv(df, 'minute3')
+    assert list(minute3.index.strftime('%H:%M')) == ['09:00', '09:06', '09:09']
+
+
+def test_candle_close_cron_fields():
+    assert candle_close_cron_fields('minute240') == {'hour': '1,5,9,13,17,21', 'minute': '0'}
+    assert candle_close_cron_fields('week') is None
+
+
+class FakeMarket:
+    """pyupbit.get_ohlcv처럼 to 이전 count개 1분봉 반환"""
+
+    def __init__(self, df):
+        self.df = df
+        self.requests = []
+
+    def __call__(self, ticker, count, to=None):
+        self.requests.append((count, to))
+        df = self.df if to is None else self.df[self.df.index < to]
+        return df.iloc[-count:]
+
+
+def counting_fetch(calls):
+    def fetch(fetch_func):
+        calls.append(fetch_func)
+        return fetch_func()
+    return fetch
+
+
+def test_candle_store_serves_complete_bars_through_caller_fetch():
+    market = FakeMarket(minute1_frame('2024-01-01 00:00', 3000))  # ~ 2024-01-03 01:59
+    store = CandleStore(fetcher=market, max_bars=2000, refresh_seconds=3600)
+    calls = []
+
+    candles = store.get_ohlcv('KRW-BTC', 'minute60', 2, fetch=counting_fetch(calls))
+
+    assert list(candles.index.strftime('%m-%d %H:%M')) == ['01-03 00:00', '01-03 01:00']
+    assert candles['volume'].tolist() == [60, 60]
+    assert len(calls) == len(market.requests) == 1
+
+    # 갱신 주기 안에서는 다시 조회하지 않음
+    store.get_ohlcv('KRW-BTC', 'minute5', 10, fetch=counting_fetch(calls))
+    assert len(calls) == 1
+
+
+def test_candle_store_caps_backfill_pages_per_call():
+    market = FakeMarket(minute1_frame('2024-01-01 00:00', 3000))
+    store = CandleStore(fetcher=market, max_bars=2000, refresh_seconds=3600)
+    store.backfill_pages = 2
+    calls = []
+
+    # 60분봉 12개 = 1분봉 780개 필요: 최근 200개 + 백필 2페이지(600개)로는 부족
+    assert store.get_ohlcv('KRW-BTC', 'minute60', 12, fetch=counting_fetch(calls)) is None
+    assert len(calls) == 3
+    assert market.requests[1][1] == market.df.index[-200]  # 가장 오래된 캔들 이전 구간
+
+    # 다음 조회에서 이어서 백필 (1페이지로 충분)
+    candles = store.get_ohlcv('KRW-BTC', 'minute60', 12, fetch=counting_fetch(calls))
+    assert len(calls) == 4
+    assert len(candles) == 12
+    assert candles.index[-1] == pd.Timestamp('2024-01-03 01:00')
+    assert store.get_stats()['fallbacks'] == 1
+
+
+def test_candle_store_falls_back_beyond_capacity():
+    store = CandleStore(fetcher=FakeMarket(minute1_frame('2024-01-01 00:00', 10)), max_bars=100)
+    assert store.can_serve('minute5', 19) is True
+    assert store.can_serve('minute5', 20) is False
+    assert store.can_serve('day', 1) is False
+    assert store.get_ohlcv('KRW-BTC', 'minute60', 2) is None
@@ -0,0 +1,66 @@
+from app.utils.phase_planner import PhasePlanner, next_phase_time
+
+
+def test_next_phase_time():
+    assert next_phase_time(60, 15, 1000) == 1035
+    assert next_phase_time(60, 15, 1035) == 1035  # 같은 시각 포함
+    assert next_phase_time(60, 15, 1036) == 1095
+
+
+def test_place_spreads_jobs_with_same_interval():
+    planner = PhasePlanner(horizon=60, default_cost=1)
+    for n in range(6):
+        planner.place(f"bot{n}", 10, now=1000)
+
+    assert sorted(planner.phase(f"bot{n}") for n in range(6)) == [0, 1, 2, 3, 4, 5]
+    assert planner.get_stats()['peak_calls_per_second'] == 1
+
+
+def test_place_returns_first_run_at_phase():
+    planner = PhasePlanner(horizon=60, default_cost=1)
+    planner.place('a', 60, now=1000)
+    first_run = planner.place('b', 60, now=1000)
+
+    assert first_run >= 1000
+    assert first_run % 60 == planner.phase('b') != planner.phase('a')
+
+
+def test_place_avoids_seconds_of_shorter_interval_jobs():
+    planner = PhasePlanner(horizon=60, default_cost=1)
+    planner.place('fast', 2, now=0)  # 짝수 초마다 실행
+    planner.place('slow', 60, now=0)
+
+    assert planner.phase('fast') == 0
+    assert planner.phase('slow') % 2 == 1
+
+
+def test_remove_releases_load():
+    planner = PhasePlanner(horizon=60, default_cost=1)
+    planner.place('a', 10, now=0)
+    assert planner.remove('a') is True
+    assert planner.remove('a') is False
+    assert planner.get_stats()['peak_calls_per_second'] == 0
+
+
+def test_replan_moves_jobs_when_measured_costs_change():
+    planner = PhasePlanner(horizon=4, default_cost=1)
+    planner.place('a', 2, now=0)  # 0, 2초
+    planner.place('b', 2, now=0)  # 1, 3초
+    planner.place('c', 4, now=0)  # 0초 (부하가 같으면 앞쪽 위상)
+    assert (planner.phase('a'), planner.phase('b'), planner.phase('c')) == (0, 1, 0)
+
+    # 측정 결과 a, c의 호출이 많음: 0초 부하 10 → 재배치 후 최대 6
+    assert planner.replan({'a': 5, 'c': 5}) == {'c': 1}
+    assert planner.phase('c') == 1
+    assert planner.get_stats()['peak_calls_per_second'] == 6
+
+
+def test_replan_keeps_phases_when_gain_is_small():
+    planner = PhasePlanner(horizon=60, default_cost=1)
+    for n in range(3):
+        planner.place(f"bot{n}", 10, now=0)
+    phases = {f"bot{n}": planner.phase(f"bot{n}") for n in range(3)}
+
+    assert planner.replan() == {}
+    assert {job_id: planner.phase(job_id) for job_id in phases} == phases
+    assert planner.get_stats()['replans_skipped'] == 1
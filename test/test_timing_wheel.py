@@ -0,0 +1,75 @@
+from app.utils.timing_wheel import TimingWheel
+
+
+def advance_each_tick(wheel, until):
+    """1초 단위로 진행하며 {만료 틱: [키]} 기록"""
+    fired = {}
+    for now in range(1, until + 1):
+        expired = wheel.advance(now)
+        if expired:
+            fired[now] = sorted(expired)
+    return fired
+
+
+def test_timer_expires_at_deadline_not_before():
+    wheel = TimingWheel(tick_seconds=1, slots=4, levels=2)
+    wheel.schedule('a', 3)
+    wheel.schedule('b', 2.5)  # 틱 단위로 올림 → 3
+
+    assert wheel.advance(2) == []
+    assert sorted(wheel.advance(3)) == ['a', 'b']
+    assert len(wheel) == 0
+    assert wheel.deadline('a') is None
+
+
+def test_cancel_and_reschedule():
+    wheel = TimingWheel(tick_seconds=1, slots=4, levels=2)
+    wheel.schedule('a', 5)
+    wheel.schedule('b', 5)
+    assert wheel.cancel('a') is True
+    assert wheel.cancel('a') is False
+    assert 'a' not in wheel
+
+    wheel.schedule('b', 7)  # 기존 타이머 교체
+    assert wheel.deadline('b') == 7
+    assert advance_each_tick(wheel, 8) == {7: ['b']}
+    assert wheel.get_stats()['cancelled'] == 1
+
+
+def test_cascade_from_upper_level():
+    # 0단계 4틱, 1단계 16틱 범위
+    wheel = TimingWheel(tick_seconds=1, slots=4, levels=2)
+    wheel.schedule('far', 10)
+    wheel.schedule('near', 2)
+
+    assert advance_each_tick(wheel, 12) == {2: ['near'], 10: ['far']}
+    assert wheel.get_stats()['cascaded'] >= 1
+
+
+def test_overflow_beyond_wheel_range():
+    wheel = TimingWheel(tick_seconds=1, slots=4, levels=2)
+    wheel.schedule('late', 40)
+    assert wheel.get_stats()['overflow'] == 1
+
+    fired = advance_each_tick(wheel, 45)
+    assert fired == {40: ['late']}
+    assert wheel.get_stats()['overflow'] == 0
+
+
+def test_past_deadline_expires_on_next_advance():
+    wheel = TimingWheel(tick_seconds=1, slots=4, levels=2, now=10)
+    wheel.schedule('late', 5)
+    assert wheel.advance(10) == ['late']
+
+
+def test_long_stall_replaces_timers():
+    wheel = TimingWheel(tick_seconds=1, slots=4, levels=2)
+    wheel.schedule('a', 5)
+    wheel.schedule('b', 100)
+    wheel.schedule('c', 1000)
+
+    # 전체 범위(16틱)보다 오래 멈춘 뒤 진행
+    assert sorted(wheel.advance(200)) == ['a', 'b']
+    assert 'c' in wheel
+    assert wheel.advance(999) == []
+    assert wheel.advance(1000) == ['c']